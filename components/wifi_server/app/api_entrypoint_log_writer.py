@@ -0,0 +1,175 @@
+from __future__ import annotations
+from enum import IntEnum
+from app.database import DatabaseFactory, ApiEntrypoint
+from datetime import datetime
+from typing import List, Tuple, Dict, Callable
+from collections import deque
+import threading
+import random
+import json
+import time
+
+
+class ApiEntrypointLogOverflowPolicy(IntEnum):
+	DropNewest = 1,  # the log being added is dropped
+	DropOldest = 2,  # the oldest buffered log is dropped to make room
+	Block = 3,  # the caller waits until the flusher makes room
+
+
+class ApiEntrypointLogWriter():
+
+	def __init__(self, *, database_factory: DatabaseFactory, flush_interval_seconds: float, flush_rows_total: int, buffered_rows_total_maximum: int, overflow_policy: ApiEntrypointLogOverflowPolicy, sample_rate: float, is_request_headers_captured: bool, on_exception: Callable[[Exception], None]):
+		# NOTE logs are buffered in memory and written by a background flusher in batches of up to flush_rows_total
+		#  every flush_interval_seconds, or sooner once flush_rows_total logs are waiting
+
+		self.__database_factory = database_factory
+		self.__flush_interval_seconds = flush_interval_seconds
+		self.__flush_rows_total = flush_rows_total
+		self.__buffered_rows_total_maximum = buffered_rows_total_maximum
+		self.__overflow_policy = overflow_policy
+		self.__sample_rate = sample_rate
+		self.__is_request_headers_captured = is_request_headers_captured
+		self.__on_exception = on_exception
+
+		self.__buffered_rows = deque()  # type: deque
+		self.__buffered_rows_condition = threading.Condition()
+		self.__written_rows_total = 0
+		self.__dropped_rows_total = 0
+		self.__sampled_out_rows_total = 0
+		self.__is_disposed = False
+
+		self.__flush_thread = threading.Thread(
+			target=self.__flush_thread_method,
+			daemon=True
+		)
+		self.__flush_thread.start()
+
+	def is_request_headers_captured(self) -> bool:
+		return self.__is_request_headers_captured
+
+	def get_written_rows_total(self) -> int:
+		return self.__written_rows_total
+
+	def get_dropped_rows_total(self) -> int:
+		return self.__dropped_rows_total
+
+	def get_sampled_out_rows_total(self) -> int:
+		return self.__sampled_out_rows_total
+
+	def get_buffered_rows_total(self) -> int:
+		return len(self.__buffered_rows)
+
+	def add_api_entrypoint_log(self, *, client_guid: str, api_entrypoint: ApiEntrypoint, input_json: Dict) -> bool:
+
+		# the input json is only serialized by the flusher so that the request does not wait on it
+		_row = (client_guid, api_entrypoint, input_json, datetime.utcnow())  # type: Tuple[str, ApiEntrypoint, Dict, datetime]
+
+		self.__buffered_rows_condition.acquire()
+
+		try:
+			if self.__is_disposed:
+				raise Exception("Cannot add api entrypoint log after the writer has been disposed.")
+
+			if self.__sample_rate < 1 and random.random() >= self.__sample_rate:
+				self.__sampled_out_rows_total += 1
+				_is_buffered = False
+			else:
+				if len(self.__buffered_rows) >= self.__buffered_rows_total_maximum:
+					if self.__overflow_policy == ApiEntrypointLogOverflowPolicy.Block:
+						while len(self.__buffered_rows) >= self.__buffered_rows_total_maximum and not self.__is_disposed:
+							self.__buffered_rows_condition.notify_all()
+							self.__buffered_rows_condition.wait()
+					elif self.__overflow_policy == ApiEntrypointLogOverflowPolicy.DropOldest:
+						self.__buffered_rows.popleft()
+						self.__dropped_rows_total += 1
+
+				if len(self.__buffered_rows) >= self.__buffered_rows_total_maximum:
+					self.__dropped_rows_total += 1
+					_is_buffered = False
+				else:
+					self.__buffered_rows.append(_row)
+					_is_buffered = True
+
+					if len(self.__buffered_rows) >= self.__flush_rows_total:
+						self.__buffered_rows_condition.notify_all()
+		except Exception as ex:
+			self.__buffered_rows_condition.release()
+			raise ex
+
+		self.__buffered_rows_condition.release()
+
+		return _is_buffered
+
+	def __get_next_rows(self) -> List[Tuple[str, ApiEntrypoint, Dict, datetime]]:
+
+		# NOTE must be called while holding the buffered rows condition
+		_rows = []  # type: List[Tuple[str, ApiEntrypoint, Dict, datetime]]
+		while len(self.__buffered_rows) != 0 and len(_rows) < self.__flush_rows_total:
+			_rows.append(self.__buffered_rows.popleft())
+
+		# wake any callers blocked on a full buffer
+		self.__buffered_rows_condition.notify_all()
+
+		return _rows
+
+	def __write_rows(self, *, rows: List[Tuple[str, ApiEntrypoint, Dict, datetime]]):
+
+		if len(rows) != 0:
+			try:
+				self.__database_factory.get_database().insert_api_entrypoint_logs(
+					api_entrypoint_logs=[(_client_guid, _api_entrypoint, json.dumps(_input_json), _row_created_datetime) for _client_guid, _api_entrypoint, _input_json, _row_created_datetime in rows]
+				)
+				_is_written = True
+			except Exception as ex:
+				_is_written = False
+				self.__on_exception(ex)
+
+			self.__buffered_rows_condition.acquire()
+			if _is_written:
+				self.__written_rows_total += len(rows)
+			else:
+				self.__dropped_rows_total += len(rows)
+			self.__buffered_rows_condition.release()
+
+	def __flush_thread_method(self):
+
+		_is_disposed = False
+		while not _is_disposed:
+			self.__buffered_rows_condition.acquire()
+			_wait_end_time = time.perf_counter() + self.__flush_interval_seconds
+			while len(self.__buffered_rows) < self.__flush_rows_total and not self.__is_disposed:
+				_wait_seconds = _wait_end_time - time.perf_counter()
+				if _wait_seconds <= 0:
+					break
+				self.__buffered_rows_condition.wait(_wait_seconds)
+			_is_disposed = self.__is_disposed
+			_rows = self.__get_next_rows()
+			self.__buffered_rows_condition.release()
+
+			self.__write_rows(
+				rows=_rows
+			)
+
+		self.flush()
+
+	def flush(self):
+
+		self.__buffered_rows_condition.acquire()
+		_rows = self.__get_next_rows()
+		while len(_rows) != 0:
+			self.__buffered_rows_condition.release()
+			self.__write_rows(
+				rows=_rows
+			)
+			self.__buffered_rows_condition.acquire()
+			_rows = self.__get_next_rows()
+		self.__buffered_rows_condition.release()
+
+	def dispose(self):
+
+		self.__buffered_rows_condition.acquire()
+		self.__is_disposed = True
+		self.__buffered_rows_condition.notify_all()
+		self.__buffered_rows_condition.release()
+
+		self.__flush_thread.join()
@@ -2,9 +2,16 @@ from __future__ import annotations
 from enum import IntEnum
 import sqlite3
 import uuid
-from datetime import datetime
-from typing import Tuple, List, Dict
+from datetime import datetime, timedelta
+from typing import Tuple, List, Dict, Callable, Iterator, Set
+from concurrent.futures import Future
 import threading
+import queue
+import pathlib
+import time
+import os
+import zlib
+from collections import OrderedDict
 
 
 class Purpose(IntEnum):
@@ -13,6 +20,24 @@ class Purpose(IntEnum):
 	DeskController = 2
 
 
+class DatabaseSynchronous(IntEnum):
+
+	Off = 0,
+	Normal = 1,
+	Full = 2,
+	Extra = 3
+
+
+class TransmissionStatus(IntEnum):
+
+	Pending = 1,
+	InFlight = 2,
+	Failed = 3,
+	Retry = 4,
+	Complete = 5,
+	Cancelled = 6
+
+
 class ApiEntrypoint(IntEnum):
 
 	TestGet = 1,
@@ -22,11 +47,15 @@ class ApiEntrypoint(IntEnum):
 	V1ReceiveDeviceTransmission = 5,
 	V1ListDevices = 6,
 	V1GetUuid = 7,
-	V1DownloadGitRepository = 8
+	V1DownloadGitRepository = 8,
+	V1ReceiveDeviceTransmissionBatch = 9,
+	V1GetQueueStats = 10
 
 
 class Client():
 
+	__slots__ = ("__client_guid", "__ip_address")
+
 	def __init__(self, *, client_guid: str, ip_address: str):
 
 		self.__client_guid = client_guid
@@ -57,6 +86,8 @@ class Client():
 
 class ApiEntrypointLog():
 
+	__slots__ = ("__api_entrypoint_log_id", "__api_entrypoint_id", "__request_client_guid", "__input_json_string", "__row_created_datetime")
+
 	def __init__(self, *, api_entrypoint_log_id: int, api_entrypoint_id: int, request_client_guid: str, input_json_string: str, row_created_datetime: datetime):
 
 		self.__api_entrypoint_log_id = api_entrypoint_log_id
@@ -90,12 +121,14 @@ class ApiEntrypointLog():
 				api_entrypoint_id=row[1],
 				request_client_guid=row[2],
 				input_json_string=row[3],
-				row_created_datetime=datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S.%f")
+				row_created_datetime=datetime.fromisoformat(row[4])
 			)
 
 
 class Device():
 
+	__slots__ = ("__device_guid", "__instance_guid", "__purpose_guid", "__socket_port", "__last_known_client_guid", "__last_known_datetime", "__last_known_client")
+
 	def __init__(self, *, device_guid: str, instance_guid: str, purpose_guid: str, socket_port: int, last_known_client_guid: str, last_known_datetime: datetime):
 
 		self.__device_guid = device_guid
@@ -153,12 +186,14 @@ class Device():
 				purpose_guid=row[2],
 				socket_port=int(row[3]),
 				last_known_client_guid=row[4],
-				last_known_datetime=datetime.strptime(row[5], "%Y-%m-%d %H:%M:%S.%f"),
+				last_known_datetime=datetime.fromisoformat(row[5]),
 			)
 
 
 class Queue():
 
+	__slots__ = ("__queue_guid",)
+
 	def __init__(self, *, queue_guid: str):
 
 		self.__queue_guid = queue_guid
@@ -183,6 +218,8 @@ class Queue():
 
 class Transmission():
 
+	__slots__ = ("__transmission_guid", "__queue_guid", "__source_device_guid", "__source_device_instance_guid", "__request_client_guid", "__stored_transmission_json_string", "__destination_device_guid", "__destination_device_instance_guid", "__row_created_datetime", "__is_retry_ready", "__status", "__source_device", "__destination_device")
+
 	def __init__(self, *,
 				 transmission_guid: str,
 				 queue_guid: str,
@@ -193,7 +230,8 @@ class Transmission():
 				 destination_device_guid: str,
 				 destination_device_instance_guid: str,
 				 row_created_datetime: datetime,
-				 is_retry_ready: bool
+				 is_retry_ready: bool,
+				 status: TransmissionStatus
 	):
 		self.__transmission_guid = transmission_guid
 		self.__queue_guid = queue_guid
@@ -205,6 +243,7 @@ class Transmission():
 		self.__destination_device_instance_guid = destination_device_instance_guid
 		self.__row_created_datetime = row_created_datetime
 		self.__is_retry_ready = is_retry_ready
+		self.__status = status
 
 		self.__source_device = None  # type: Device
 		self.__destination_device = None  # type: Device
@@ -236,6 +275,9 @@ class Transmission():
 	def get_is_retry_ready(self) -> bool:
 		return self.__is_retry_ready
 
+	def get_status(self) -> TransmissionStatus:
+		return self.__status
+
 	def set_source_device(self, *, source_device: Device):
 		self.__source_device = source_device
 
@@ -260,14 +302,15 @@ class Transmission():
 			"destination_device_instance_guid": self.__destination_device_instance_guid,
 			"row_created_datetime": self.__row_created_datetime.strftime("%Y-%m-%d %H:%M:%S.%f") if self.__row_created_datetime is not None else None,
 			"is_retry_ready": self.__is_retry_ready,
+			"status": int(self.__status),
 			"source_device": None if self.__source_device is None else self.__source_device.to_json(),
 			"destination_device": None if self.__destination_device is None else self.__destination_device.to_json()
 		}
 
 	@staticmethod
 	def parse_row(*, row: Dict) -> Transmission:
-		if len(row) != 10:
-			raise Exception(f"Unexpected number of columns in row. Expected 10, found {len(row)}.")
+		if len(row) != 11:
+			raise Exception(f"Unexpected number of columns in row. Expected 11, found {len(row)}.")
 		else:
 			return Transmission(
 				transmission_guid=row[0],
@@ -278,13 +321,172 @@ class Transmission():
 				stored_transmission_json_string=row[5],
 				destination_device_guid=row[6],
 				destination_device_instance_guid=row[7],
-				row_created_datetime=datetime.strptime(row[8], "%Y-%m-%d %H:%M:%S.%f"),
-				is_retry_ready=row[9]
+				row_created_datetime=datetime.fromisoformat(row[8]),
+				is_retry_ready=row[9],
+				status=TransmissionStatus(row[10])
+			)
+
+
+class TransmissionReceipt():
+
+	__slots__ = ("__transmission_guid", "__queue_guid", "__sequence", "__row_created_datetime")
+
+	def __init__(self, *, transmission_guid: str, queue_guid: str, sequence: int, row_created_datetime: datetime):
+
+		self.__transmission_guid = transmission_guid
+		self.__queue_guid = queue_guid
+		self.__sequence = sequence
+		self.__row_created_datetime = row_created_datetime
+
+	def get_transmission_guid(self) -> str:
+		return self.__transmission_guid
+
+	def get_queue_guid(self) -> str:
+		return self.__queue_guid
+
+	def get_sequence(self) -> int:
+		return self.__sequence
+
+	def get_row_created_datetime(self) -> datetime:
+		return self.__row_created_datetime
+
+	def to_json(self) -> object:
+		return {
+			"transmission_guid": self.__transmission_guid,
+			"queue_guid": self.__queue_guid,
+			"sequence": self.__sequence,
+			"row_created_datetime": self.__row_created_datetime.strftime("%Y-%m-%d %H:%M:%S.%f") if self.__row_created_datetime is not None else None
+		}
+
+
+class QueueStats():
+
+	__slots__ = ("__queue_guid", "__pending_total", "__in_flight_total", "__failed_total", "__retry_requested_total", "__oldest_pending_sequence", "__oldest_pending_row_created_datetime")
+
+	def __init__(self, *, queue_guid: str, pending_total: int, in_flight_total: int, failed_total: int, retry_requested_total: int, oldest_pending_sequence: int, oldest_pending_row_created_datetime: datetime):
+
+		self.__queue_guid = queue_guid
+		self.__pending_total = pending_total
+		self.__in_flight_total = in_flight_total
+		self.__failed_total = failed_total
+		self.__retry_requested_total = retry_requested_total
+		self.__oldest_pending_sequence = oldest_pending_sequence
+		self.__oldest_pending_row_created_datetime = oldest_pending_row_created_datetime
+
+	def get_queue_guid(self) -> str:
+		return self.__queue_guid
+
+	def get_pending_total(self) -> int:
+		return self.__pending_total
+
+	def get_in_flight_total(self) -> int:
+		return self.__in_flight_total
+
+	def get_failed_total(self) -> int:
+		return self.__failed_total
+
+	def get_retry_requested_total(self) -> int:
+		return self.__retry_requested_total
+
+	def get_oldest_pending_sequence(self) -> int:
+		return self.__oldest_pending_sequence
+
+	def get_oldest_pending_row_created_datetime(self) -> datetime:
+		return self.__oldest_pending_row_created_datetime
+
+	def to_json(self) -> object:
+		return {
+			"queue_guid": self.__queue_guid,
+			"pending_total": self.__pending_total,
+			"in_flight_total": self.__in_flight_total,
+			"failed_total": self.__failed_total,
+			"retry_requested_total": self.__retry_requested_total,
+			"oldest_pending_sequence": self.__oldest_pending_sequence,
+			"oldest_pending_row_created_datetime": self.__oldest_pending_row_created_datetime.strftime("%Y-%m-%d %H:%M:%S.%f") if self.__oldest_pending_row_created_datetime is not None else None
+		}
+
+	@staticmethod
+	def parse_row(*, row: Dict) -> QueueStats:
+		if len(row) != 7:
+			raise Exception(f"Unexpected number of columns in row. Expected 7, found {len(row)}.")
+		else:
+			return QueueStats(
+				queue_guid=row[0],
+				pending_total=row[1],
+				in_flight_total=row[2],
+				failed_total=row[3],
+				retry_requested_total=row[4],
+				oldest_pending_sequence=row[5],
+				oldest_pending_row_created_datetime=None if row[6] is None else datetime.fromisoformat(row[6])
+			)
+
+
+class DestinationDeviceStats():
+
+	__slots__ = ("__destination_device_guid", "__pending_total", "__in_flight_total", "__failed_total", "__retry_requested_total", "__oldest_pending_sequence", "__oldest_pending_row_created_datetime")
+
+	def __init__(self, *, destination_device_guid: str, pending_total: int, in_flight_total: int, failed_total: int, retry_requested_total: int, oldest_pending_sequence: int, oldest_pending_row_created_datetime: datetime):
+
+		self.__destination_device_guid = destination_device_guid
+		self.__pending_total = pending_total
+		self.__in_flight_total = in_flight_total
+		self.__failed_total = failed_total
+		self.__retry_requested_total = retry_requested_total
+		self.__oldest_pending_sequence = oldest_pending_sequence
+		self.__oldest_pending_row_created_datetime = oldest_pending_row_created_datetime
+
+	def get_destination_device_guid(self) -> str:
+		return self.__destination_device_guid
+
+	def get_pending_total(self) -> int:
+		return self.__pending_total
+
+	def get_in_flight_total(self) -> int:
+		return self.__in_flight_total
+
+	def get_failed_total(self) -> int:
+		return self.__failed_total
+
+	def get_retry_requested_total(self) -> int:
+		return self.__retry_requested_total
+
+	def get_oldest_pending_sequence(self) -> int:
+		return self.__oldest_pending_sequence
+
+	def get_oldest_pending_row_created_datetime(self) -> datetime:
+		return self.__oldest_pending_row_created_datetime
+
+	def to_json(self) -> object:
+		return {
+			"destination_device_guid": self.__destination_device_guid,
+			"pending_total": self.__pending_total,
+			"in_flight_total": self.__in_flight_total,
+			"failed_total": self.__failed_total,
+			"retry_requested_total": self.__retry_requested_total,
+			"oldest_pending_sequence": self.__oldest_pending_sequence,
+			"oldest_pending_row_created_datetime": self.__oldest_pending_row_created_datetime.strftime("%Y-%m-%d %H:%M:%S.%f") if self.__oldest_pending_row_created_datetime is not None else None
+		}
+
+	@staticmethod
+	def parse_row(*, row: Dict) -> DestinationDeviceStats:
+		if len(row) != 7:
+			raise Exception(f"Unexpected number of columns in row. Expected 7, found {len(row)}.")
+		else:
+			return DestinationDeviceStats(
+				destination_device_guid=row[0],
+				pending_total=row[1],
+				in_flight_total=row[2],
+				failed_total=row[3],
+				retry_requested_total=row[4],
+				oldest_pending_sequence=row[5],
+				oldest_pending_row_created_datetime=None if row[6] is None else datetime.fromisoformat(row[6])
 			)
 
 
 class TransmissionDequeue():
 
+	__slots__ = ("__transmission_dequeue_guid", "__transmission_guid", "__request_client_guid", "__destination_client_guid", "__row_created_datetime", "__transmission")
+
 	def __init__(self, *,
 				 transmission_dequeue_guid: str,
 				 transmission_guid: str,
@@ -341,12 +543,14 @@ class TransmissionDequeue():
 				transmission_guid=row[1],
 				request_client_guid=row[2],
 				destination_client_guid=row[3],
-				row_created_datetime=datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S.%f")
+				row_created_datetime=datetime.fromisoformat(row[4])
 			)
 
 
 class TransmissionDequeueErrorTransmission():
 
+	__slots__ = ("__transmission_dequeue_error_transmission_guid", "__request_client_guid", "__transmission_dequeue_guid", "__error_message_json_string", "__row_created_datetime", "__is_retry_ready", "__transmission_dequeue")
+
 	def __init__(self, *,
 				 transmission_dequeue_error_transmission_guid: str,
 				 request_client_guid: str,
@@ -409,13 +613,15 @@ class TransmissionDequeueErrorTransmission():
 				request_client_guid=row[1],
 				transmission_dequeue_guid=row[2],
 				error_message_json_string=row[3],
-				row_created_datetime=datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S.%f"),
+				row_created_datetime=datetime.fromisoformat(row[4]),
 				is_retry_ready=row[5]
 			)
 
 
 class TransmissionDequeueErrorTransmissionDequeue():
 
+	__slots__ = ("__transmission_dequeue_error_transmission_dequeue_guid", "__transmission_dequeue_error_transmission_guid", "__request_client_guid", "__destination_client_guid", "__row_created_datetime", "__transmission_dequeue_error_transmission", "__destination_client")
+
 	def __init__(self, *,
 				 transmission_dequeue_error_transmission_dequeue_guid: str,
 				 transmission_dequeue_error_transmission_guid: str,
@@ -480,23 +686,207 @@ class TransmissionDequeueErrorTransmissionDequeue():
 				transmission_dequeue_error_transmission_guid=row[1],
 				request_client_guid=row[2],
 				destination_client_guid=row[3],
-				row_created_datetime=datetime.strptime(row[4], "%Y-%m-%d %H:%M:%S.%f")
+				row_created_datetime=datetime.fromisoformat(row[4])
 			)
 
 
-class Database():
+class ClientCache():
+
+	def __init__(self, *, clients_total_maximum: int):
+		# NOTE keeps the most recently used clients by ip address, since a client is never changed once inserted
+
+		self.__clients_total_maximum = clients_total_maximum
+
+		self.__client_per_ip_address = OrderedDict()  # type: OrderedDict[str, Client]
+		self.__client_per_ip_address_semaphore = threading.Semaphore()
+		self.__hits_total = 0
+		self.__misses_total = 0
+
+	def get_hits_total(self) -> int:
+		return self.__hits_total
+
+	def get_misses_total(self) -> int:
+		return self.__misses_total
+
+	def try_get_client(self, *, ip_address: str) -> Tuple[bool, Client]:
+
+		self.__client_per_ip_address_semaphore.acquire()
+
+		_client = self.__client_per_ip_address.get(ip_address, None)
+		if _client is None:
+			self.__misses_total += 1
+		else:
+			self.__hits_total += 1
+			self.__client_per_ip_address.move_to_end(ip_address)
+
+		self.__client_per_ip_address_semaphore.release()
+
+		return _client is not None, _client
+
+	def add_client(self, *, client: Client):
+
+		self.__client_per_ip_address_semaphore.acquire()
+
+		if self.__clients_total_maximum > 0:
+			self.__client_per_ip_address[client.get_ip_address()] = client
+			self.__client_per_ip_address.move_to_end(client.get_ip_address())
+			while len(self.__client_per_ip_address) > self.__clients_total_maximum:
+				self.__client_per_ip_address.popitem(last=False)
+
+		self.__client_per_ip_address_semaphore.release()
+
+
+class TransmissionCoordinationIndex():
 
 	def __init__(self):
+		# NOTE gives out the sequences of the transmissions of every shard and keeps the sequences of the transmissions not yet in a terminal state
+		#  per destination device, so that a shard only delivers a transmission once every earlier transmission to its destination device has finished
+
+		self.__last_sequence = 0
+		self.__sequences_per_destination_device_guid = {}  # type: Dict[str, OrderedDict]
+		self.__sequences_semaphore = threading.Semaphore()
+
+	def initialize(self, *, last_sequence: int, destination_device_guid_and_sequences: List[Tuple[str, int]]):
+
+		self.__sequences_semaphore.acquire()
+
+		self.__last_sequence = max(self.__last_sequence, last_sequence)
+		for _destination_device_guid, _sequence in sorted(destination_device_guid_and_sequences, key=lambda _destination_device_guid_and_sequence: _destination_device_guid_and_sequence[1]):
+			if _destination_device_guid not in self.__sequences_per_destination_device_guid:
+				self.__sequences_per_destination_device_guid[_destination_device_guid] = OrderedDict()
+			self.__sequences_per_destination_device_guid[_destination_device_guid][_sequence] = None
+			self.__last_sequence = max(self.__last_sequence, _sequence)
+
+		self.__sequences_semaphore.release()
+
+	def reserve_sequences(self, *, destination_device_guids: List[str]) -> int:
+
+		# NOTE returns the first of the consecutive sequences given to the destination devices in the order provided
+		self.__sequences_semaphore.acquire()
+
+		_first_sequence = self.__last_sequence + 1
+		for _destination_device_guid in destination_device_guids:
+			self.__last_sequence += 1
+			if _destination_device_guid not in self.__sequences_per_destination_device_guid:
+				self.__sequences_per_destination_device_guid[_destination_device_guid] = OrderedDict()
+			self.__sequences_per_destination_device_guid[_destination_device_guid][self.__last_sequence] = None
+
+		self.__sequences_semaphore.release()
+
+		return _first_sequence
+
+	def release_sequences(self, *, destination_device_guid_and_sequences: List[Tuple[str, int]]):
+
+		self.__sequences_semaphore.acquire()
+
+		for _destination_device_guid, _sequence in destination_device_guid_and_sequences:
+			_sequences = self.__sequences_per_destination_device_guid.get(_destination_device_guid, None)
+			if _sequences is not None:
+				_sequences.pop(_sequence, None)
+				if len(_sequences) == 0:
+					del self.__sequences_per_destination_device_guid[_destination_device_guid]
+
+		self.__sequences_semaphore.release()
+
+	def is_next_sequence(self, *, destination_device_guid: str, sequence: int) -> bool:
+
+		self.__sequences_semaphore.acquire()
+
+		_sequences = self.__sequences_per_destination_device_guid.get(destination_device_guid, None)
+		_is_next_sequence = _sequences is not None and next(iter(_sequences)) == sequence
+
+		self.__sequences_semaphore.release()
+
+		return _is_next_sequence
+
+	def get_next_sequences(self, *, destination_device_guid: str, sequences_total: int) -> List[int]:
+
+		# NOTE the sequences of the earliest transmissions to the destination device not yet in a terminal state, across every shard
 
-		#self.__connection = sqlite3.connect(":memory:;foreign keys=true;")
-		self.__connection = sqlite3.connect(":memory:", check_same_thread=False)
+		self.__sequences_semaphore.acquire()
 
-		self.__connection_semaphore = threading.Semaphore()
+		_next_sequences = []  # type: List[int]
+		for _sequence in self.__sequences_per_destination_device_guid.get(destination_device_guid, OrderedDict()):
+			if len(_next_sequences) == sequences_total:
+				break
+			_next_sequences.append(_sequence)
+
+		self.__sequences_semaphore.release()
+
+		return _next_sequences
+
+	def get_destination_devices_total(self) -> int:
+		return len(self.__sequences_per_destination_device_guid)
+
+
+class Database():
+
+	def __init__(self, *, database_file_path: str = None, synchronous: DatabaseSynchronous = DatabaseSynchronous.Normal, mmap_size_bytes: int = 268435456, cache_size_kibibytes: int = 65536, read_connections_total: int = 4, cached_clients_total_maximum: int = 1024, restore_snapshot_file_path: str = None, transmission_coordination_index: TransmissionCoordinationIndex = None, busy_timeout_seconds: float = 5.0, transmission_dequeue_lease_seconds: float = 30.0):
+		# NOTE a database_file_path of None keeps everything in memory; otherwise the file is opened in WAL mode
+		#  and the synchronous, mmap_size_bytes, and cache_size_kibibytes settings are applied to it
+		# NOTE all writes are performed by a single writer thread on its own connection while reads are spread
+		#  across read_connections_total read-only connections so that they do not wait behind the writes,
+		#  except for an in-memory database whose reads take turns with the writes on the connection of the writer
+		# NOTE an in-memory database starts from the contents of restore_snapshot_file_path when it is provided
+		# NOTE a shard is given the transmission_coordination_index shared by every shard, which then sequences its transmissions
+		# NOTE a database file may be shared by several processes, in which case a write waits up to busy_timeout_seconds
+		#  for the write lock held by another process
+		# NOTE a claimed transmission is exposed again by reap_expired_transmission_dequeues once its dequeue has not been completed,
+		#  failed, or renewed within transmission_dequeue_lease_seconds
+
+		if restore_snapshot_file_path is not None and database_file_path is not None:
+			raise Exception("Only an in-memory database can be restored from a snapshot.")
+
+		self.__database_file_path = database_file_path
+		self.__synchronous = synchronous
+		self.__mmap_size_bytes = mmap_size_bytes
+		self.__cache_size_kibibytes = cache_size_kibibytes
+		self.__read_connections_total = read_connections_total
+		self.__transmission_coordination_index = transmission_coordination_index
+		self.__busy_timeout_seconds = busy_timeout_seconds
+		self.__transmission_dequeue_lease_seconds = transmission_dequeue_lease_seconds
+
+		# the coordinated sequences reserved within the current write operation, released if it fails,
+		#  and those of the transmissions reaching a terminal state within it, released once it succeeds
+		self.__reserved_destination_device_guid_and_sequences = []  # type: List[Tuple[str, int]]
+		self.__released_destination_device_guid_and_sequences = []  # type: List[Tuple[str, int]]
+
+		self.__client_cache = ClientCache(
+			clients_total_maximum=cached_clients_total_maximum
+		)
+
+		if self.__database_file_path is None:
+			self.__database_uri = f"file:{str(uuid.uuid4()).upper()}?mode=memory"
+		else:
+			self.__database_uri = f"{pathlib.Path(self.__database_file_path).absolute().as_uri()}?mode=rwc"
+
+		self.__connection = sqlite3.connect(self.__database_uri, uri=True, check_same_thread=False, timeout=self.__busy_timeout_seconds)
 		self.__connection.isolation_level = None
 		self.__drop_tables_if_exist = False
+		self.__is_snapshot_in_progress = False
+
+		if restore_snapshot_file_path is not None:
+			self.__restore_snapshot(
+				snapshot_file_path=restore_snapshot_file_path
+			)
 
 		self.__initialize()
 
+		# NOTE a reader sharing the cache of an in-memory database either fails while a write is in progress or, reading uncommitted, sees part of it,
+		#  so its reads are performed on the connection of the writer between the write operations instead
+		self.__in_memory_connection_lock = threading.RLock()
+		self.__read_connections = queue.Queue()  # type: queue.Queue
+		if self.__database_file_path is not None:
+			for _index in range(self.__read_connections_total):
+				self.__read_connections.put(self.__get_read_connection())
+
+		self.__write_operations = queue.Queue()  # type: queue.Queue
+		self.__write_thread = threading.Thread(
+			target=self.__write_thread_method,
+			daemon=True
+		)
+		self.__write_thread.start()
+
 	def __enter__(self):
 		return self
 
@@ -510,10 +900,103 @@ class Database():
 			PRAGMA foreign_keys = ON;
 		''')
 
-		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS client;")
+		if self.__database_file_path is not None:
+			# PRAGMA statements do not accept parameters
+			_cursor.execute("PRAGMA journal_mode = WAL;")
+			_cursor.execute(f"PRAGMA synchronous = {int(self.__synchronous)};")
+			_cursor.execute(f"PRAGMA mmap_size = {int(self.__mmap_size_bytes)};")
+			_cursor.execute(f"PRAGMA cache_size = {-int(self.__cache_size_kibibytes)};")
+
 		_cursor.execute('''
-			CREATE TABLE client
+			CREATE TABLE IF NOT EXISTS schema_version
+			(
+				version INTEGER PRIMARY KEY,
+				row_created_datetime TIMESTAMP
+			)
+		''')
+
+		_migrate_methods = self.__get_migrate_methods()
+
+		# an up to date database only has its version checked
+		if self.__get_schema_version(cursor=_cursor) != len(_migrate_methods):
+			# the version is checked again within the transaction in case another process migrated the database in the meantime
+			_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			try:
+				for _version in range(self.__get_schema_version(cursor=_cursor) + 1, len(_migrate_methods) + 1):
+					_migrate_methods[_version - 1](
+						cursor=_cursor
+					)
+					_cursor.execute('''
+						INSERT INTO schema_version
+						(
+							version,
+							row_created_datetime
+						)
+						VALUES (?, ?)
+					''', (_version, datetime.utcnow()))
+				_cursor.execute('''
+					COMMIT
+				''')
+			except Exception as ex:
+				if self.__connection.in_transaction:
+					self.__connection.rollback()
+				raise ex
+
+	def __get_schema_version(self, *, cursor: sqlite3.Cursor) -> int:
+
+		_select_result = cursor.execute('''
+			SELECT
+				MAX(sv.version)
+			FROM schema_version AS sv
+		''')
+		_rows = _select_result.fetchall()
+
+		if _rows[0][0] is None:
+			_schema_version = 0
+		else:
+			_schema_version = _rows[0][0]
+
+		return _schema_version
+
+	def __get_migrate_methods(self) -> List[Callable[..., None]]:
+
+		# NOTE the method at index i migrates the schema from version i to version i + 1 and must not change once released,
+		#  so every change to the schema, including a new ApiEntrypoint member, is made by appending a migrate method
+		return [
+			self.__migrate_to_version_1,
+			self.__migrate_to_version_2,
+			self.__migrate_to_version_3,
+			self.__migrate_to_version_4,
+			self.__migrate_to_version_5,
+			self.__migrate_to_version_6,
+			self.__migrate_to_version_7
+		]
+
+	def __insert_api_entrypoints(self, *, cursor: sqlite3.Cursor, api_entrypoints: List[ApiEntrypoint]):
+
+		cursor.executemany('''
+			INSERT OR IGNORE INTO api_entrypoint
+			(
+				api_entrypoint_id,
+				name
+			)
+			VALUES
+			(
+				?,
+				?
+			)
+		''', [(int(_api_entrypoint), _api_entrypoint.name) for _api_entrypoint in api_entrypoints])
+
+	def __migrate_to_version_1(self, *, cursor: sqlite3.Cursor):
+
+		# NOTE databases created before the schema was versioned already match this version, so everything here must be idempotent
+
+		if self.__drop_tables_if_exist:
+			cursor.execute("DROP TABLE IF EXISTS client;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS client
 			(
 				client_guid GUID PRIMARY KEY,
 				ip_address TEXT,
@@ -521,18 +1004,18 @@ class Database():
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS queue;")
-		_cursor.execute('''
-			CREATE TABLE queue
+			cursor.execute("DROP TABLE IF EXISTS queue;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS queue
 			(
 				queue_guid GUID PRIMARY KEY,
 				row_created_datetime TIMESTAMP
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS device;")
-		_cursor.execute('''
-			CREATE TABLE device
+			cursor.execute("DROP TABLE IF EXISTS device;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS device
 			(
 				device_guid GUID PRIMARY KEY,
 				instance_guid GUID,
@@ -544,10 +1027,28 @@ class Database():
 				FOREIGN KEY (last_known_client_guid) REFERENCES client(client_guid)
 			)
 		''')
+		# the last sequence given out per table, so that rows can be ordered without depending on datetime resolution
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission;")
-		_cursor.execute('''
-			CREATE TABLE transmission
+			cursor.execute("DROP TABLE IF EXISTS sequence_counter;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS sequence_counter
+			(
+				table_name TEXT PRIMARY KEY,
+				sequence INTEGER
+			)
+		''')
+		cursor.executemany('''
+			INSERT OR IGNORE INTO sequence_counter
+			(
+				table_name,
+				sequence
+			)
+			VALUES (?, ?)
+		''', [("transmission", 0), ("transmission_dequeue_error_transmission", 0)])
+		if self.__drop_tables_if_exist:
+			cursor.execute("DROP TABLE IF EXISTS transmission;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission
 			(
 				transmission_guid GUID PRIMARY KEY,
 				queue_guid GUID,
@@ -559,16 +1060,43 @@ class Database():
 				destination_device_instance_guid GUID,
 				row_created_datetime TIMESTAMP,
 				is_retry_ready INTEGER,
+				status INTEGER,
+				is_deliverable INTEGER,
+				sequence INTEGER,
 				FOREIGN KEY (queue_guid) REFERENCES queue(queue_guid),
 				FOREIGN KEY (source_device_guid) REFERENCES device(device_guid),
 				FOREIGN KEY (request_client_guid) REFERENCES client(client_guid),
 				FOREIGN KEY (destination_device_guid) REFERENCES device(device_guid)
 			)
 		''')
+		# the earliest transmission not in a terminal state for each destination device and for each queue
+		#  a transmission is deliverable only while it is the head of both its destination device and its queue
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_dequeue;")
-		_cursor.execute('''
-			CREATE TABLE transmission_dequeue
+			cursor.execute("DROP TABLE IF EXISTS transmission_destination_head;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_destination_head
+			(
+				destination_device_guid GUID PRIMARY KEY,
+				transmission_guid GUID,
+				FOREIGN KEY (destination_device_guid) REFERENCES device(device_guid),
+				FOREIGN KEY (transmission_guid) REFERENCES transmission(transmission_guid)
+			)
+		''')
+		if self.__drop_tables_if_exist:
+			cursor.execute("DROP TABLE IF EXISTS transmission_queue_head;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_queue_head
+			(
+				queue_guid GUID PRIMARY KEY,
+				transmission_guid GUID,
+				FOREIGN KEY (queue_guid) REFERENCES queue(queue_guid),
+				FOREIGN KEY (transmission_guid) REFERENCES transmission(transmission_guid)
+			)
+		''')
+		if self.__drop_tables_if_exist:
+			cursor.execute("DROP TABLE IF EXISTS transmission_dequeue;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_dequeue
 			(
 				transmission_dequeue_guid GUID PRIMARY KEY,
 				transmission_guid GUID,
@@ -581,9 +1109,9 @@ class Database():
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_complete;")
-		_cursor.execute('''
-			CREATE TABLE transmission_complete
+			cursor.execute("DROP TABLE IF EXISTS transmission_complete;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_complete
 			(
 				transmission_complete_guid GUID PRIMARY KEY,
 				transmission_dequeue_guid GUID,
@@ -594,9 +1122,9 @@ class Database():
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission;")
-		_cursor.execute('''
-			CREATE TABLE transmission_dequeue_error_transmission
+			cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_dequeue_error_transmission
 			(
 				transmission_dequeue_error_transmission_guid GUID PRIMARY KEY,
 				transmission_dequeue_guid GUID,
@@ -604,14 +1132,15 @@ class Database():
 				error_message_json_string TEXT,
 				row_created_datetime TIMESTAMP,
 				is_retry_ready INTEGER,
+				sequence INTEGER,
 				FOREIGN KEY (request_client_guid) REFERENCES client(client_guid),
 				FOREIGN KEY (transmission_dequeue_guid) REFERENCES transmission_dequeue(transmission_dequeue_guid)
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_dequeue;")
-		_cursor.execute('''
-			CREATE TABLE transmission_dequeue_error_transmission_dequeue
+			cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_dequeue;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_dequeue_error_transmission_dequeue
 			(
 				transmission_dequeue_error_transmission_dequeue_guid GUID PRIMARY KEY,
 				transmission_dequeue_error_transmission_guid GUID,
@@ -624,9 +1153,9 @@ class Database():
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_complete;")
-		_cursor.execute('''
-			CREATE TABLE transmission_dequeue_error_transmission_complete
+			cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_complete;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_dequeue_error_transmission_complete
 			(
 				transmission_dequeue_error_transmission_complete_guid GUID PRIMARY KEY,
 				transmission_dequeue_error_transmission_dequeue_guid GUID,
@@ -638,9 +1167,9 @@ class Database():
 			)
 		''')
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_error;")
-		_cursor.execute('''
-			CREATE TABLE transmission_dequeue_error_transmission_error
+			cursor.execute("DROP TABLE IF EXISTS transmission_dequeue_error_transmission_error;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS transmission_dequeue_error_transmission_error
 			(
 				transmission_dequeue_error_transmission_error_guid GUID PRIMARY KEY,
 				transmission_dequeue_error_transmission_dequeue_guid GUID,
@@ -651,32 +1180,101 @@ class Database():
 				FOREIGN KEY (request_client_guid) REFERENCES client(client_guid)
 			)
 		''')
+
+		# indexes supporting the dequeue queries and the foreign keys of the transmission chain
+		#  the partial indexes only hold transmissions that are not in a terminal state (status < 5) or are deliverable, so their size follows the in-flight work instead of the history
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_destination_device_guid_sequence_active
+			ON transmission (destination_device_guid, sequence)
+			WHERE status < 5
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_queue_guid_sequence_active
+			ON transmission (queue_guid, sequence)
+			WHERE status < 5
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_sequence_deliverable
+			ON transmission (sequence)
+			WHERE is_deliverable = 1
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_destination_head_transmission_guid
+			ON transmission_destination_head (transmission_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_queue_head_transmission_guid
+			ON transmission_queue_head (transmission_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_source_device_guid
+			ON transmission (source_device_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_sequence
+			ON transmission (sequence)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_transmission_guid
+			ON transmission_dequeue (transmission_guid, transmission_dequeue_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_complete_transmission_dequeue_guid
+			ON transmission_complete (transmission_dequeue_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_error_transmission_transmission_dequeue_guid
+			ON transmission_dequeue_error_transmission (transmission_dequeue_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_error_transmission_sequence
+			ON transmission_dequeue_error_transmission (sequence)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_error_transmission_dequeue_tdet_guid
+			ON transmission_dequeue_error_transmission_dequeue (transmission_dequeue_error_transmission_guid)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_error_transmission_complete_tdetd_guid
+			ON transmission_dequeue_error_transmission_complete (transmission_dequeue_error_transmission_dequeue_guid, is_retry_requested)
+		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_error_transmission_error_tdetd_guid
+			ON transmission_dequeue_error_transmission_error (transmission_dequeue_error_transmission_dequeue_guid)
+		''')
+
+		# device lists are requested by purpose and optionally limited to recently announced devices
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_device_purpose_guid_last_known_datetime
+			ON device (purpose_guid, last_known_datetime)
+		''')
+
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS api_entrypoint;")
-		_cursor.execute('''
-			CREATE TABLE api_entrypoint
+			cursor.execute("DROP TABLE IF EXISTS api_entrypoint;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS api_entrypoint
 			(
 				api_entrypoint_id INTEGER PRIMARY KEY,
 				name TEXT
 			)
 		''')
-		for _api_entrypoint in list(ApiEntrypoint):
-			_cursor.execute('''
-				INSERT INTO api_entrypoint
-				(
-					api_entrypoint_id,
-					name
-				)
-				VALUES
-				(
-					?,
-					?
-				)
-		''', (int(_api_entrypoint), str(_api_entrypoint)))
+		self.__insert_api_entrypoints(
+			cursor=cursor,
+			api_entrypoints=[
+				ApiEntrypoint.TestGet,
+				ApiEntrypoint.TestPost,
+				ApiEntrypoint.TestJson,
+				ApiEntrypoint.V1ReceiveDeviceAnnouncement,
+				ApiEntrypoint.V1ReceiveDeviceTransmission,
+				ApiEntrypoint.V1ListDevices,
+				ApiEntrypoint.V1GetUuid,
+				ApiEntrypoint.V1DownloadGitRepository
+			]
+		)
 		if self.__drop_tables_if_exist:
-			_cursor.execute("DROP TABLE IF EXISTS api_entrypoint_log;")
-		_cursor.execute('''
-			CREATE TABLE api_entrypoint_log
+			cursor.execute("DROP TABLE IF EXISTS api_entrypoint_log;")
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS api_entrypoint_log
 			(
 				api_entrypoint_log_id INTEGER PRIMARY KEY AUTOINCREMENT,
 				api_entrypoint_id INTEGER,
@@ -687,34 +1285,523 @@ class Database():
 				FOREIGN KEY (request_client_guid) REFERENCES client(client_guid)
 			)
 		''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_api_entrypoint_log_row_created_datetime_api_entrypoint_log_id
+			ON api_entrypoint_log (row_created_datetime, api_entrypoint_log_id)
+		''')
 
-	def dispose(self):
+		# transmissions in a terminal state (status >= 5) are the candidates for archiving
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_terminal
+			ON transmission (row_created_datetime)
+			WHERE status >= 5
+		''')
 
-		self.__connection_semaphore.acquire()
+	def __migrate_to_version_2(self, *, cursor: sqlite3.Cursor):
 
-		self.__connection.close()
+		self.__insert_api_entrypoints(
+			cursor=cursor,
+			api_entrypoints=[
+				ApiEntrypoint.V1ReceiveDeviceTransmissionBatch
+			]
+		)
 
-		self.__connection_semaphore.release()
+	def __migrate_to_version_3(self, *, cursor: sqlite3.Cursor):
 
-	def insert_client(self, *, ip_address: str) -> Client:
+		cursor.execute('''
+			CREATE TABLE IF NOT EXISTS lease
+			(
+				lease_name TEXT PRIMARY KEY,
+				holder_guid TEXT NOT NULL,
+				expiration_datetime TIMESTAMP NOT NULL,
+				row_created_datetime TIMESTAMP NOT NULL
+			)
+		''')
 
-		self.__connection_semaphore.acquire()
+	def __migrate_to_version_4(self, *, cursor: sqlite3.Cursor):
 
-		try:
-			_client_guid = str(uuid.uuid4()).upper()
+		# the lease of a dequeue is only set while its transmission is in flight, so the partial index holds the open leases alone
+		#  and the column is only added if missing since a column cannot be added twice
+		_select_result = cursor.execute('''
+			PRAGMA table_info(transmission_dequeue)
+		''')
+		if "lease_expiration_datetime" not in [_row[1] for _row in _select_result.fetchall()]:
+			cursor.execute('''
+				ALTER TABLE transmission_dequeue ADD COLUMN lease_expiration_datetime TIMESTAMP
+			''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_dequeue_lease_expiration_datetime
+			ON transmission_dequeue (lease_expiration_datetime)
+			WHERE lease_expiration_datetime IS NOT NULL
+		''')
 
-			_insert_cursor = self.__connection.cursor()
-			_insert_cursor.execute('''
-				INSERT OR IGNORE INTO client
-				(
-					client_guid,
-					ip_address
+		# transmissions claimed before leases existed were claimed by a process that is no longer running, so they are exposed again right away
+		cursor.execute('''
+			UPDATE transmission_dequeue
+			SET
+				lease_expiration_datetime = ?
+			WHERE
+				transmission_dequeue_guid IN (
+					SELECT
+						td.transmission_dequeue_guid
+					FROM transmission AS t
+					INNER JOIN transmission_dequeue AS td
+					ON
+						td.transmission_guid = t.transmission_guid
+					WHERE
+						t.status = ?
+						AND NOT EXISTS (
+							SELECT 1
+							FROM transmission_complete AS tc
+							WHERE
+								tc.transmission_dequeue_guid = td.transmission_dequeue_guid
+						)
+						AND NOT EXISTS (
+							SELECT 1
+							FROM transmission_dequeue_error_transmission AS tdet
+							WHERE
+								tdet.transmission_dequeue_guid = td.transmission_dequeue_guid
+						)
 				)
-				VALUES (?, ?)
-			''', (_client_guid, ip_address))
+		''', (datetime.utcnow(), int(TransmissionStatus.InFlight)))
 
-			_get_guid_cursor = self.__connection.cursor()
-			_get_guid_result = _get_guid_cursor.execute('''
+	def __migrate_to_version_5(self, *, cursor: sqlite3.Cursor):
+
+		self.__insert_api_entrypoints(
+			cursor=cursor,
+			api_entrypoints=[
+				ApiEntrypoint.V1GetQueueStats
+			]
+		)
+
+		# the number of transmissions pending (pending or ready to retry), in flight, and failed while awaiting the decision of their source device,
+		#  per queue and per destination device, kept up to date by the triggers below whenever a transmission is inserted, changes status, or is archived
+		for _table_name, _column_name in [("transmission_queue_stats", "queue_guid"), ("transmission_destination_stats", "destination_device_guid")]:
+			cursor.execute(f'''
+				CREATE TABLE IF NOT EXISTS {_table_name}
+				(
+					{_column_name} GUID PRIMARY KEY,
+					pending_total INTEGER NOT NULL,
+					in_flight_total INTEGER NOT NULL,
+					failed_total INTEGER NOT NULL
+				)
+			''')
+
+			cursor.execute(f'''
+				CREATE TRIGGER IF NOT EXISTS tr_{_table_name}_transmission_insert
+				AFTER INSERT ON transmission
+				BEGIN
+					INSERT INTO {_table_name}
+					(
+						{_column_name},
+						pending_total,
+						in_flight_total,
+						failed_total
+					)
+					VALUES (NEW.{_column_name}, NEW.status IN (1, 4), NEW.status = 2, NEW.status = 3)  -- pending or retry, in flight, failed
+					ON CONFLICT ({_column_name}) DO UPDATE SET
+						pending_total = pending_total + excluded.pending_total,
+						in_flight_total = in_flight_total + excluded.in_flight_total,
+						failed_total = failed_total + excluded.failed_total;
+				END
+			''')
+			cursor.execute(f'''
+				CREATE TRIGGER IF NOT EXISTS tr_{_table_name}_transmission_update
+				AFTER UPDATE OF status ON transmission
+				WHEN OLD.status <> NEW.status
+				BEGIN
+					UPDATE {_table_name}
+					SET
+						pending_total = pending_total + (NEW.status IN (1, 4)) - (OLD.status IN (1, 4)),
+						in_flight_total = in_flight_total + (NEW.status = 2) - (OLD.status = 2),
+						failed_total = failed_total + (NEW.status = 3) - (OLD.status = 3)
+					WHERE
+						{_column_name} = NEW.{_column_name};
+				END
+			''')
+			cursor.execute(f'''
+				CREATE TRIGGER IF NOT EXISTS tr_{_table_name}_transmission_delete
+				AFTER DELETE ON transmission
+				WHEN OLD.status < 5  -- not in a terminal state
+				BEGIN
+					UPDATE {_table_name}
+					SET
+						pending_total = pending_total - (OLD.status IN (1, 4)),
+						in_flight_total = in_flight_total - (OLD.status = 2),
+						failed_total = failed_total - (OLD.status = 3)
+					WHERE
+						{_column_name} = OLD.{_column_name};
+				END
+			''')
+
+			# the counters start from the transmissions already present
+			cursor.execute(f'''
+				DELETE FROM {_table_name}
+			''')
+			cursor.execute(f'''
+				INSERT INTO {_table_name}
+				(
+					{_column_name},
+					pending_total,
+					in_flight_total,
+					failed_total
+				)
+				SELECT
+					t.{_column_name},
+					SUM(t.status IN (1, 4)),
+					SUM(t.status = 2),
+					SUM(t.status = 3)
+				FROM transmission AS t
+				GROUP BY
+					t.{_column_name}
+			''')
+
+	def __migrate_to_version_6(self, *, cursor: sqlite3.Cursor):
+
+		# a failed transmission whose retry was requested for a later time becomes ready to retry once its retry datetime passed,
+		#  so the partial index only holds the scheduled retries
+		_select_result = cursor.execute('''
+			PRAGMA table_info(transmission)
+		''')
+		if "retry_datetime" not in [_row[1] for _row in _select_result.fetchall()]:
+			cursor.execute('''
+				ALTER TABLE transmission ADD COLUMN retry_datetime TIMESTAMP
+			''')
+		cursor.execute('''
+			CREATE INDEX IF NOT EXISTS ix_transmission_retry_datetime
+			ON transmission (retry_datetime)
+			WHERE retry_datetime IS NOT NULL
+		''')
+
+	def __migrate_to_version_7(self, *, cursor: sqlite3.Cursor):
+
+		# a failed transmission whose retry was requested is counted apart from those awaiting the decision of their source device,
+		#  so the triggers of version 5 are replaced by ones that also follow the retry flag and the counters start over from the transmissions present
+		for _table_name, _column_name in [("transmission_queue_stats", "queue_guid"), ("transmission_destination_stats", "destination_device_guid")]:
+			_select_result = cursor.execute(f'''
+				PRAGMA table_info({_table_name})
+			''')
+			if "retry_requested_total" not in [_row[1] for _row in _select_result.fetchall()]:
+				cursor.execute(f'''
+					ALTER TABLE {_table_name} ADD COLUMN retry_requested_total INTEGER NOT NULL DEFAULT 0
+				''')
+
+			for _trigger_suffix in ["insert", "update", "delete"]:
+				cursor.execute(f'''
+					DROP TRIGGER IF EXISTS tr_{_table_name}_transmission_{_trigger_suffix}
+				''')
+
+			cursor.execute(f'''
+				CREATE TRIGGER tr_{_table_name}_transmission_insert
+				AFTER INSERT ON transmission
+				BEGIN
+					INSERT INTO {_table_name}
+					(
+						{_column_name},
+						pending_total,
+						in_flight_total,
+						failed_total,
+						retry_requested_total
+					)
+					VALUES (NEW.{_column_name}, NEW.status IN (1, 4), NEW.status = 2, NEW.status = 3 AND NEW.is_retry_ready IS NOT 0, NEW.status = 3 AND NEW.is_retry_ready IS 0)  -- pending or retry, in flight, failed, retry requested
+					ON CONFLICT ({_column_name}) DO UPDATE SET
+						pending_total = pending_total + excluded.pending_total,
+						in_flight_total = in_flight_total + excluded.in_flight_total,
+						failed_total = failed_total + excluded.failed_total,
+						retry_requested_total = retry_requested_total + excluded.retry_requested_total;
+				END
+			''')
+			cursor.execute(f'''
+				CREATE TRIGGER tr_{_table_name}_transmission_update
+				AFTER UPDATE OF status, is_retry_ready ON transmission
+				WHEN OLD.status <> NEW.status OR OLD.is_retry_ready IS NOT NEW.is_retry_ready
+				BEGIN
+					UPDATE {_table_name}
+					SET
+						pending_total = pending_total + (NEW.status IN (1, 4)) - (OLD.status IN (1, 4)),
+						in_flight_total = in_flight_total + (NEW.status = 2) - (OLD.status = 2),
+						failed_total = failed_total + (NEW.status = 3 AND NEW.is_retry_ready IS NOT 0) - (OLD.status = 3 AND OLD.is_retry_ready IS NOT 0),
+						retry_requested_total = retry_requested_total + (NEW.status = 3 AND NEW.is_retry_ready IS 0) - (OLD.status = 3 AND OLD.is_retry_ready IS 0)
+					WHERE
+						{_column_name} = NEW.{_column_name};
+				END
+			''')
+			cursor.execute(f'''
+				CREATE TRIGGER tr_{_table_name}_transmission_delete
+				AFTER DELETE ON transmission
+				WHEN OLD.status < 5  -- not in a terminal state
+				BEGIN
+					UPDATE {_table_name}
+					SET
+						pending_total = pending_total - (OLD.status IN (1, 4)),
+						in_flight_total = in_flight_total - (OLD.status = 2),
+						failed_total = failed_total - (OLD.status = 3 AND OLD.is_retry_ready IS NOT 0),
+						retry_requested_total = retry_requested_total - (OLD.status = 3 AND OLD.is_retry_ready IS 0)
+					WHERE
+						{_column_name} = OLD.{_column_name};
+				END
+			''')
+
+			cursor.execute(f'''
+				DELETE FROM {_table_name}
+			''')
+			cursor.execute(f'''
+				INSERT INTO {_table_name}
+				(
+					{_column_name},
+					pending_total,
+					in_flight_total,
+					failed_total,
+					retry_requested_total
+				)
+				SELECT
+					t.{_column_name},
+					SUM(t.status IN (1, 4)),
+					SUM(t.status = 2),
+					SUM(t.status = 3 AND t.is_retry_ready IS NOT 0),
+					SUM(t.status = 3 AND t.is_retry_ready IS 0)
+				FROM transmission AS t
+				GROUP BY
+					t.{_column_name}
+			''')
+
+	def __restore_snapshot(self, *, snapshot_file_path: str):
+
+		if not os.path.exists(snapshot_file_path):
+			raise Exception(f"Failed to find snapshot file: \"{snapshot_file_path}\".")
+
+		_snapshot_connection = sqlite3.connect(snapshot_file_path)
+		try:
+			_snapshot_connection.backup(self.__connection)
+		except Exception as ex:
+			_snapshot_connection.close()
+			raise ex
+
+		_snapshot_connection.close()
+
+	def __get_read_connection(self) -> sqlite3.Connection:
+
+		_connection = sqlite3.connect(self.__database_uri, uri=True, check_same_thread=False, timeout=self.__busy_timeout_seconds)
+		_connection.isolation_level = None
+
+		_cursor = _connection.cursor()
+		_cursor.execute("PRAGMA query_only = 1;")
+		_cursor.execute(f"PRAGMA mmap_size = {int(self.__mmap_size_bytes)};")
+		_cursor.execute(f"PRAGMA cache_size = {-int(self.__cache_size_kibibytes)};")
+
+		return _connection
+
+	def __acquire_read_connection(self) -> sqlite3.Connection:
+		if self.__database_file_path is None:
+			self.__in_memory_connection_lock.acquire()
+			return self.__connection
+		return self.__read_connections.get()
+
+	def __release_read_connection(self, *, connection: sqlite3.Connection):
+		if self.__database_file_path is None:
+			self.__in_memory_connection_lock.release()
+		else:
+			self.__read_connections.put(connection)
+
+	def __perform_write_operation(self, *, write_operation: Tuple[Callable[..., object], Future]):
+
+		_write_function, _write_future = write_operation
+		# NOTE the lock is only contended by the reads of an in-memory database and is reentrant for the writes performed during a snapshot
+		self.__in_memory_connection_lock.acquire()
+		try:
+			_write_result = _write_function(
+				connection=self.__connection
+			)
+		except Exception as ex:
+			if self.__connection.in_transaction:
+				self.__connection.rollback()
+			self.__in_memory_connection_lock.release()
+			if len(self.__reserved_destination_device_guid_and_sequences) != 0:
+				self.__transmission_coordination_index.release_sequences(
+					destination_device_guid_and_sequences=self.__reserved_destination_device_guid_and_sequences
+				)
+			self.__reserved_destination_device_guid_and_sequences.clear()
+			self.__released_destination_device_guid_and_sequences.clear()
+			_write_future.set_exception(ex)
+		else:
+			self.__in_memory_connection_lock.release()
+			self.__reserved_destination_device_guid_and_sequences.clear()
+			if len(self.__released_destination_device_guid_and_sequences) != 0:
+				self.__transmission_coordination_index.release_sequences(
+					destination_device_guid_and_sequences=self.__released_destination_device_guid_and_sequences
+				)
+				self.__released_destination_device_guid_and_sequences.clear()
+			_write_future.set_result(_write_result)
+
+	def __perform_queued_write_operations(self):
+
+		# NOTE must be called on the writer thread
+		#  only the write operations queued so far are performed so that a steady stream of writes cannot keep the caller waiting
+		for _index in range(self.__write_operations.qsize()):
+			_write_operation = self.__write_operations.get_nowait()
+			if _write_operation is None:
+				# leave the request to stop for the writer thread method
+				self.__write_operations.put(None)
+				break
+			self.__perform_write_operation(
+				write_operation=_write_operation
+			)
+
+	def __write_thread_method(self):
+
+		while True:
+			_write_operation = self.__write_operations.get()
+			if _write_operation is None:
+				break
+
+			self.__perform_write_operation(
+				write_operation=_write_operation
+			)
+
+	def __write(self, *, write_function: Callable[..., object]) -> object:
+
+		# NOTE the write_function runs on the writer thread and must only use the connection it is given
+		_write_future = Future()
+		self.__write_operations.put((write_function, _write_future))
+		return _write_future.result()
+
+	def dispose(self):
+
+		self.__write_operations.put(None)
+		self.__write_thread.join()
+
+		if self.__database_file_path is not None:
+			for _index in range(self.__read_connections_total):
+				_read_connection = self.__acquire_read_connection()
+				_read_connection.close()
+
+		self.__connection.close()
+
+	def get_client_cache(self) -> ClientCache:
+		return self.__client_cache
+
+	def get_schema_version(self) -> int:
+
+		_connection = self.__acquire_read_connection()
+
+		try:
+			_schema_version = self.__get_schema_version(
+				cursor=_connection.cursor()
+			)
+		except Exception as ex:
+			self.__release_read_connection(connection=_connection)
+			raise ex
+
+		self.__release_read_connection(connection=_connection)
+
+		return _schema_version
+
+	@staticmethod
+	def get_snapshot_file_paths(*, snapshot_directory_path: str) -> List[str]:
+
+		# NOTE ordered from oldest to newest since the snapshot file names start with the time they were taken
+		_snapshot_file_paths = []  # type: List[str]
+		if os.path.exists(snapshot_directory_path):
+			for _file_name in sorted(os.listdir(snapshot_directory_path)):
+				if _file_name.startswith("snapshot_") and _file_name.endswith(".db"):
+					_snapshot_file_paths.append(os.path.join(snapshot_directory_path, _file_name))
+		return _snapshot_file_paths
+
+	def snapshot(self, *, snapshot_directory_path: str, pages_per_step: int, restarts_total_maximum: int = 4) -> Dict[str, object]:
+
+		# NOTE the online backup runs on the writer thread pages_per_step pages at a time and the writes queued in the meantime are performed between the steps,
+		#  so a write waits for at most one step instead of the whole backup
+		# NOTE writing to an in-memory database restarts its backup, so after restarts_total_maximum restarts the queued writes are left
+		#  until the remaining pages are copied, which bounds the pause by the time to copy the whole database once
+
+		os.makedirs(snapshot_directory_path, exist_ok=True)
+
+		_snapshot_file_path = os.path.join(snapshot_directory_path, f"snapshot_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}.db")
+
+		def _write(*, connection: sqlite3.Connection) -> Dict[str, object]:
+
+			if self.__is_snapshot_in_progress:
+				raise Exception("Cannot take a snapshot while another snapshot is in progress.")
+
+			self.__is_snapshot_in_progress = True
+
+			_steps_total = 0
+			_restarts_total = 0
+			_pages_total = 0
+			_previous_remaining_pages_total = None  # type: int
+			_maximum_pause_seconds = 0.0
+			_start_time = time.perf_counter()
+			_pause_start_time = _start_time
+
+			def _progress(status: int, remaining: int, total: int):
+				nonlocal _steps_total, _restarts_total, _pages_total, _previous_remaining_pages_total, _maximum_pause_seconds, _pause_start_time
+
+				_steps_total += 1
+				_pages_total = total
+				if _previous_remaining_pages_total is not None and remaining > _previous_remaining_pages_total:
+					_restarts_total += 1
+				_previous_remaining_pages_total = remaining
+
+				if remaining != 0 and _restarts_total < restarts_total_maximum:
+					_maximum_pause_seconds = max(_maximum_pause_seconds, time.perf_counter() - _pause_start_time)
+					self.__perform_queued_write_operations()
+					_pause_start_time = time.perf_counter()
+
+			# the snapshot only appears under its final name once it is completely written
+			_temporary_file_path = f"{_snapshot_file_path}.tmp"
+			_snapshot_connection = sqlite3.connect(_temporary_file_path)
+			try:
+				connection.backup(_snapshot_connection, pages=pages_per_step, progress=_progress)
+				_maximum_pause_seconds = max(_maximum_pause_seconds, time.perf_counter() - _pause_start_time)
+				_snapshot_connection.close()
+				os.replace(_temporary_file_path, _snapshot_file_path)
+			except Exception as ex:
+				_snapshot_connection.close()
+				if os.path.exists(_temporary_file_path):
+					os.remove(_temporary_file_path)
+				self.__is_snapshot_in_progress = False
+				raise ex
+
+			self.__is_snapshot_in_progress = False
+
+			return {
+				"snapshot_file_path": _snapshot_file_path,
+				"pages_total": _pages_total,
+				"steps_total": _steps_total,
+				"restarts_total": _restarts_total,
+				"maximum_pause_seconds": _maximum_pause_seconds,
+				"total_seconds": time.perf_counter() - _start_time
+			}
+
+		_snapshot_statistics = self.__write(
+			write_function=_write
+		)
+
+		return _snapshot_statistics
+
+	def insert_client(self, *, ip_address: str) -> Client:
+
+		_is_cached, _client = self.__client_cache.try_get_client(
+			ip_address=ip_address
+		)
+		if _is_cached:
+			return _client
+
+		def _write(*, connection: sqlite3.Connection) -> List:
+			_client_guid = str(uuid.uuid4()).upper()
+
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				INSERT OR IGNORE INTO client
+				(
+					client_guid,
+					ip_address
+				)
+				VALUES (?, ?)
+			''', (_client_guid, ip_address))
+
+			_get_guid_cursor = connection.cursor()
+			_get_guid_result = _get_guid_cursor.execute('''
 				SELECT
 					c.client_guid,
 					c.ip_address
@@ -724,11 +1811,12 @@ class Database():
 			''', (ip_address, ))
 
 			_rows = _get_guid_result.fetchall()
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+			return _rows
+
+		_rows = self.__write(
+			write_function=_write
+		)
 
 		if len(_rows) != 1:
 			raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
@@ -737,16 +1825,18 @@ class Database():
 				row=_rows[0]
 			)
 
+		self.__client_cache.add_client(
+			client=_client
+		)
+
 		return _client
 
 	def insert_api_entrypoint_log(self, *, client_guid: str, api_entrypoint: ApiEntrypoint, input_json_string: str):
 
-		self.__connection_semaphore.acquire()
-
-		try:
+		def _write(*, connection: sqlite3.Connection):
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 			_insert_cursor.execute('''
 				INSERT INTO api_entrypoint_log
 				(
@@ -758,21 +1848,52 @@ class Database():
 				)
 				VALUES (?, ?, ?, ?, ?)
 			''', (None, int(api_entrypoint), client_guid, input_json_string, _row_created_datetime))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+		self.__write(
+			write_function=_write
+		)
+
+	def insert_api_entrypoint_logs(self, *, api_entrypoint_logs: List[Tuple[str, ApiEntrypoint, str, datetime]]):
+		# NOTE each api entrypoint log is a tuple of client_guid, api_entrypoint, input_json_string, and row_created_datetime
+
+		def _write(*, connection: sqlite3.Connection):
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_insert_cursor.executemany('''
+				INSERT INTO api_entrypoint_log
+				(
+					api_entrypoint_log_id,
+					api_entrypoint_id,
+					request_client_guid,
+					input_json_string,
+					row_created_datetime
+				)
+				VALUES (?, ?, ?, ?, ?)
+			''', [(None, int(_api_entrypoint), _client_guid, _input_json_string, _row_created_datetime) for _client_guid, _api_entrypoint, _input_json_string, _row_created_datetime in api_entrypoint_logs])
+			_insert_cursor.execute('''
+				COMMIT
+			''')
 
-	def insert_device(self, *, device_guid: str, client_guid: str, purpose_guid: str, socket_port: int) -> Device:
+		self.__write(
+			write_function=_write
+		)
 
-		self.__connection_semaphore.acquire()
+	def insert_device(self, *, device_guid: str, client_guid: str, purpose_guid: str, socket_port: int, instance_guid: str = None) -> Device:
 
-		try:
+		# NOTE a new instance guid is generated unless one is provided, such as when an announcement is repeated on every shard
 
-			_instance_guid = str(uuid.uuid4()).upper()
+		def _write(*, connection: sqlite3.Connection):
+			if instance_guid is None:
+				_instance_guid = str(uuid.uuid4()).upper()
+			else:
+				_instance_guid = instance_guid
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
 			_insert_cursor.execute('''
 				INSERT OR IGNORE INTO device
 				(
@@ -786,7 +1907,7 @@ class Database():
 				VALUES (?, ?, ?, ?, ?, ?)
 			''', (device_guid, _instance_guid, purpose_guid, socket_port, client_guid, datetime.utcnow()))
 
-			_update_known_datetime_cursor = self.__connection.cursor()
+			_update_known_datetime_cursor = connection.cursor()
 			_update_known_datetime_cursor.execute('''
 				UPDATE device
 				SET
@@ -799,17 +1920,27 @@ class Database():
 					device_guid = ?
 			''', (_instance_guid, purpose_guid, socket_port, client_guid, datetime.utcnow(), device_guid))
 
-			_transmission_retry_cursor = self.__connection.cursor()
+			_transmission_retry_cursor = connection.cursor()
 			_transmission_retry_cursor.execute('''
 				UPDATE transmission
 				SET
-					is_retry_ready = 1
+					is_retry_ready = 1,
+					status = ?,
+					retry_datetime = NULL
 				WHERE
 					is_retry_ready = 0
 					AND destination_device_guid = ?
-			''', (device_guid,))
+					AND status < 5
+			''', (int(TransmissionStatus.Retry), device_guid))
+
+			# a transmission ready to retry is deliverable again if it is still the head of its queue
+			self.__refresh_transmission_heads(
+				cursor=_transmission_retry_cursor,
+				destination_device_guid=device_guid,
+				queue_guid=None
+			)
 
-			_error_retry_cursor = self.__connection.cursor()
+			_error_retry_cursor = connection.cursor()
 			_error_retry_cursor.execute('''
 				UPDATE transmission_dequeue_error_transmission
 				SET
@@ -826,11 +1957,14 @@ class Database():
 				)
 				AND is_retry_ready = 0
 			''', (device_guid,))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+			_insert_cursor.execute('''
+				COMMIT
+			''')
+
+		self.__write(
+			write_function=_write
+		)
 
 		_is_successful, _device = self.try_get_device(
 			device_guid=device_guid
@@ -843,12 +1977,10 @@ class Database():
 
 	def insert_queue(self, *, queue_guid: str) -> Queue:
 
-		self.__connection_semaphore.acquire()
-
-		try:
+		def _write(*, connection: sqlite3.Connection):
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 			_insert_cursor.execute('''
 				INSERT OR IGNORE INTO queue
 				(
@@ -857,11 +1989,10 @@ class Database():
 				)
 				VALUES (?, ?)
 			''', (queue_guid, _row_created_datetime))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+		self.__write(
+			write_function=_write
+		)
 
 		_queue = self.get_queue(
 			queue_guid=queue_guid
@@ -871,10 +2002,10 @@ class Database():
 
 	def get_queue(self, *, queue_guid: str) -> Queue:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_select_cursor = self.__connection.cursor()
+			_select_cursor = _connection.cursor()
 			_select_result = _select_cursor.execute('''
 				SELECT
 					q.queue_guid
@@ -885,10 +2016,10 @@ class Database():
 
 			_rows = _select_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) != 1:
 			raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
@@ -904,10 +2035,10 @@ class Database():
 
 	def get_all_devices(self) -> List[Device]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					d.device_guid,
@@ -923,10 +2054,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		_devices = []  # type: List[Device]
 
@@ -953,13 +2084,18 @@ class Database():
 
 	def insert_transmission(self, *, queue_guid: str, source_device_guid: str, source_device_instance_guid: str, client_guid: str, stored_transmission_json_string: str, destination_device_guid: str, destination_device_instance_guid: str) -> Transmission:
 
-		self.__connection_semaphore.acquire()
-
-		try:
+		def _write(*, connection: sqlite3.Connection) -> str:
 			_transmission_guid = str(uuid.uuid4()).upper()
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_sequence = self.__reserve_transmission_sequences(
+				cursor=_insert_cursor,
+				destination_device_guids=[destination_device_guid]
+			)
 			_insert_cursor.execute('''
 				INSERT INTO transmission
 				(
@@ -972,14 +2108,28 @@ class Database():
 					destination_device_guid,
 					destination_device_instance_guid,
 					row_created_datetime,
-					is_retry_ready
-				) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-			''', (_transmission_guid, queue_guid, source_device_guid, source_device_instance_guid, client_guid, stored_transmission_json_string, destination_device_guid, destination_device_instance_guid, _row_created_datetime, None))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
+					is_retry_ready,
+					status,
+					is_deliverable,
+					sequence
+				) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+			''', (_transmission_guid, queue_guid, source_device_guid, source_device_instance_guid, client_guid, stored_transmission_json_string, destination_device_guid, destination_device_instance_guid, _row_created_datetime, None, int(TransmissionStatus.Pending), 0, _sequence))
+
+			self.__refresh_transmission_heads(
+				cursor=_insert_cursor,
+				destination_device_guid=destination_device_guid,
+				queue_guid=queue_guid
+			)
+
+			_insert_cursor.execute('''
+				COMMIT
+			''')
+
+			return _transmission_guid
 
-		self.__connection_semaphore.release()
+		_transmission_guid = self.__write(
+			write_function=_write
+		)
 
 		_is_successful, _transmission = self.try_get_transmission(
 			transmission_guid=_transmission_guid
@@ -990,12 +2140,86 @@ class Database():
 
 		return _transmission
 
+	def insert_transmissions(self, *, client_guid: str, transmissions: List[Tuple[str, str, str, str, str, str]]) -> List[TransmissionReceipt]:
+
+		# NOTE each transmission is (queue_guid, source_device_guid, source_device_instance_guid, stored_transmission_json_string, destination_device_guid, destination_device_instance_guid)
+		#  and they are sequenced in the order given, so transmissions within the same queue are delivered in that order
+
+		def _write(*, connection: sqlite3.Connection) -> List[TransmissionReceipt]:
+			_row_created_datetime = datetime.utcnow()
+
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_first_sequence = self.__reserve_transmission_sequences(
+				cursor=_insert_cursor,
+				destination_device_guids=[_transmission[4] for _transmission in transmissions]
+			)
+
+			_transmission_rows = []  # type: List[Tuple]
+			_transmission_receipts = []  # type: List[TransmissionReceipt]
+			_heads = {}  # type: Dict[Tuple[str, str], None]
+			for _index, (_queue_guid, _source_device_guid, _source_device_instance_guid, _stored_transmission_json_string, _destination_device_guid, _destination_device_instance_guid) in enumerate(transmissions):
+				_transmission_guid = str(uuid.uuid4()).upper()
+				_sequence = _first_sequence + _index
+				_transmission_rows.append((_transmission_guid, _queue_guid, _source_device_guid, _source_device_instance_guid, client_guid, _stored_transmission_json_string, _destination_device_guid, _destination_device_instance_guid, _row_created_datetime, None, int(TransmissionStatus.Pending), 0, _sequence))
+				_transmission_receipts.append(TransmissionReceipt(
+					transmission_guid=_transmission_guid,
+					queue_guid=_queue_guid,
+					sequence=_sequence,
+					row_created_datetime=_row_created_datetime
+				))
+				_heads[(_destination_device_guid, _queue_guid)] = None
+
+			_insert_cursor.executemany('''
+				INSERT INTO transmission
+				(
+					transmission_guid,
+					queue_guid,
+					source_device_guid,
+					source_device_instance_guid,
+					request_client_guid,
+					stored_transmission_json_string,
+					destination_device_guid,
+					destination_device_instance_guid,
+					row_created_datetime,
+					is_retry_ready,
+					status,
+					is_deliverable,
+					sequence
+				) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+			''', _transmission_rows)
+
+			# the heads only need refreshing once per destination device and queue pair instead of once per transmission
+			for _destination_device_guid, _queue_guid in _heads.keys():
+				self.__refresh_transmission_heads(
+					cursor=_insert_cursor,
+					destination_device_guid=_destination_device_guid,
+					queue_guid=_queue_guid
+				)
+
+			_insert_cursor.execute('''
+				COMMIT
+			''')
+
+			return _transmission_receipts
+
+		if len(transmissions) == 0:
+			_transmission_receipts = []
+		else:
+			_transmission_receipts = self.__write(
+				write_function=_write
+			)
+
+		return _transmission_receipts
+
 	def try_get_transmission(self, *, transmission_guid: str) -> Tuple[bool, Transmission]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					transmission_guid,
@@ -1007,7 +2231,8 @@ class Database():
 					destination_device_guid,
 					destination_device_instance_guid,
 					row_created_datetime,
-					is_retry_ready
+					is_retry_ready,
+					status
 				FROM transmission
 				WHERE
 					transmission_guid = ?
@@ -1015,10 +2240,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_transmission = None
@@ -1047,10 +2272,10 @@ class Database():
 
 	def try_get_device(self, *, device_guid: str) -> Tuple[bool, Device]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					d.device_guid,
@@ -1066,10 +2291,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_device = None
@@ -1095,191 +2320,793 @@ class Database():
 
 	def try_get_transmission_dequeue(self, *, transmission_dequeue_guid: str) -> Tuple[bool, TransmissionDequeue]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
-			_get_result = _get_cursor.execute('''
-				SELECT
-					transmission_dequeue_guid,
-					transmission_guid,
-					request_client_guid,
-					destination_client_guid,
-					row_created_datetime
-				FROM transmission_dequeue
-				WHERE
-					transmission_dequeue_guid = ?
-			''', (transmission_dequeue_guid,))
+			_get_cursor = _connection.cursor()
+			_get_result = _get_cursor.execute(self.__get_transmission_dequeue_graphs_sql(
+				transmission_dequeue_guids_total=1
+			), (transmission_dequeue_guid,))
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_transmission_dequeue = None
 		elif len(_rows) > 1:
 			raise Exception(f"Unexpected number of rows. Expected 0 or 1, found {len(_rows)}.")
 		else:
-			_row = _rows[0]
-
-			_transmission_dequeue = TransmissionDequeue.parse_row(
-				row=_row
+			_transmission_dequeue = self.__parse_transmission_dequeue_graph_row(
+				row=_rows[0]
 			)
 
-			_is_successful, _transmission = self.try_get_transmission(
-				transmission_guid=_transmission_dequeue.get_transmission_guid()
+		return _transmission_dequeue is not None, _transmission_dequeue
+
+	@staticmethod
+	def __get_transmission_dequeue_graphs_sql(*, transmission_dequeue_guids_total: int) -> str:
+		# the transmission dequeue, its transmission, and both devices with their last known clients in one statement
+		return f'''
+			SELECT
+				td.transmission_dequeue_guid,
+				td.transmission_guid,
+				td.request_client_guid,
+				td.destination_client_guid,
+				td.row_created_datetime,
+				t.transmission_guid,
+				t.queue_guid,
+				t.source_device_guid,
+				t.source_device_instance_guid,
+				t.request_client_guid,
+				t.stored_transmission_json_string,
+				t.destination_device_guid,
+				t.destination_device_instance_guid,
+				t.row_created_datetime,
+				t.is_retry_ready,
+				t.status,
+				sd.device_guid,
+				sd.instance_guid,
+				sd.purpose_guid,
+				sd.socket_port,
+				sd.last_known_client_guid,
+				sd.last_known_datetime,
+				sc.client_guid,
+				sc.ip_address,
+				dd.device_guid,
+				dd.instance_guid,
+				dd.purpose_guid,
+				dd.socket_port,
+				dd.last_known_client_guid,
+				dd.last_known_datetime,
+				dc.client_guid,
+				dc.ip_address
+			FROM transmission_dequeue AS td
+			INNER JOIN transmission AS t
+			ON
+				t.transmission_guid = td.transmission_guid
+			INNER JOIN device AS sd
+			ON
+				sd.device_guid = t.source_device_guid
+			INNER JOIN client AS sc
+			ON
+				sc.client_guid = sd.last_known_client_guid
+			INNER JOIN device AS dd
+			ON
+				dd.device_guid = t.destination_device_guid
+			INNER JOIN client AS dc
+			ON
+				dc.client_guid = dd.last_known_client_guid
+			WHERE
+				td.transmission_dequeue_guid IN ({", ".join(["?"] * transmission_dequeue_guids_total)})
+		'''
+
+	@staticmethod
+	def __parse_transmission_dequeue_graph_row(*, row: Tuple) -> TransmissionDequeue:
+
+		if len(row) != 32:
+			raise Exception(f"Unexpected number of columns in row. Expected 32, found {len(row)}.")
+
+		_transmission_dequeue = TransmissionDequeue.parse_row(
+			row=row[0:5]
+		)
+		_transmission = Transmission.parse_row(
+			row=row[5:16]
+		)
+		_source_device = Device.parse_row(
+			row=row[16:22]
+		)
+		_source_device.set_last_known_client(
+			last_known_client=Client.parse_row(
+				row=row[22:24]
+			)
+		)
+		_destination_device = Device.parse_row(
+			row=row[24:30]
+		)
+		_destination_device.set_last_known_client(
+			last_known_client=Client.parse_row(
+				row=row[30:32]
 			)
+		)
+		_transmission.set_source_device(
+			source_device=_source_device
+		)
+		_transmission.set_destination_device(
+			destination_device=_destination_device
+		)
+		_transmission_dequeue.set_transmission(
+			transmission=_transmission
+		)
 
-			if not _is_successful:
-				raise Exception(f"Failed to find transmission with guid: \"{_transmission_dequeue.get_transmission_guid()}\".")
-			else:
+		return _transmission_dequeue
 
-				_transmission_dequeue.set_transmission(
-					transmission=_transmission
-				)
+	def __get_next_sequence(self, *, cursor: sqlite3.Cursor, table_name: str, sequences_total: int = 1) -> int:
+
+		# NOTE must be called on the writer thread inside of an open transaction
+		#  reserves sequences_total consecutive sequences and returns the first of them
+		cursor.execute('''
+			UPDATE sequence_counter
+			SET
+				sequence = sequence + ?
+			WHERE
+				table_name = ?
+		''', (sequences_total, table_name))
+		_select_result = cursor.execute('''
+			SELECT
+				sc.sequence
+			FROM sequence_counter AS sc
+			WHERE
+				sc.table_name = ?
+		''', (table_name,))
+		_rows = _select_result.fetchall()
 
-		return _transmission_dequeue is not None, _transmission_dequeue
+		if len(_rows) != 1:
+			raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
 
-	def get_next_transmission_dequeue(self, *, client_guid: str) -> TransmissionDequeue:
+		return _rows[0][0] - sequences_total + 1
 
-		self.__connection_semaphore.acquire()
+	def __reserve_transmission_sequences(self, *, cursor: sqlite3.Cursor, destination_device_guids: List[str]) -> int:
 
-		try:
-			_transmission_dequeue_guid = str(uuid.uuid4()).upper()
-			_row_created_datetime = datetime.utcnow()
+		# NOTE must be called on the writer thread inside of an open transaction
+		#  returns the first of the consecutive sequences of the transmissions to the destination devices in the order provided
 
-			_insert_cursor = self.__connection.cursor()
-			_insert_cursor.execute('''
-				BEGIN
-			''')
-			_insert_cursor.execute('''
-				INSERT INTO transmission_dequeue
-				(
-					transmission_dequeue_guid,
-					transmission_guid,
-					request_client_guid,
-					destination_client_guid,
-					row_created_datetime
+		if self.__transmission_coordination_index is None:
+			_first_sequence = self.__get_next_sequence(
+				cursor=cursor,
+				table_name="transmission",
+				sequences_total=len(destination_device_guids)
+			)
+		else:
+			_first_sequence = self.__transmission_coordination_index.reserve_sequences(
+				destination_device_guids=destination_device_guids
+			)
+			for _index, _destination_device_guid in enumerate(destination_device_guids):
+				self.__reserved_destination_device_guid_and_sequences.append((_destination_device_guid, _first_sequence + _index))
+
+			# the counter keeps the last sequence given out to this shard so that the coordination index continues after it on restart
+			cursor.execute('''
+				UPDATE sequence_counter
+				SET
+					sequence = MAX(sequence, ?)
+				WHERE
+					table_name = ?
+			''', (_first_sequence + len(destination_device_guids) - 1, "transmission"))
+
+		return _first_sequence
+
+	def __refresh_transmission_heads(self, *, cursor: sqlite3.Cursor, destination_device_guid: str, queue_guid: str):
+
+		# NOTE must be called on the writer thread inside of an open transaction
+
+		if destination_device_guid is not None:
+			cursor.execute('''
+				DELETE FROM transmission_destination_head
+				WHERE
+					destination_device_guid = ?
+			''', (destination_device_guid,))
+			cursor.execute('''
+				INSERT INTO transmission_destination_head
+				(
+					destination_device_guid,
+					transmission_guid
 				)
 				SELECT
-					?,
-					t.transmission_guid,
-					?,
-					d.last_known_client_guid,
-					?
+					t.destination_device_guid,
+					t.transmission_guid
 				FROM transmission AS t
-				INNER JOIN device AS d 
-				ON 
-					d.device_guid = t.destination_device_guid
 				WHERE
+					t.destination_device_guid = ?
+					AND t.status < 5  -- not in a terminal state
+				ORDER BY
+					t.sequence
+				LIMIT 1
+			''', (destination_device_guid,))
+
+		if queue_guid is not None:
+			cursor.execute('''
+				DELETE FROM transmission_queue_head
+				WHERE
+					queue_guid = ?
+			''', (queue_guid,))
+			cursor.execute('''
+				INSERT INTO transmission_queue_head
+				(
+					queue_guid,
+					transmission_guid
+				)
+				SELECT
+					t.queue_guid,
+					t.transmission_guid
+				FROM transmission AS t
+				WHERE
+					t.queue_guid = ?
+					AND t.status < 5  -- not in a terminal state
+				ORDER BY
+					t.sequence
+				LIMIT 1
+			''', (queue_guid,))
+
+		cursor.execute('''
+			UPDATE transmission
+			SET
+				is_deliverable = CASE WHEN
+					status IN (?, ?)
+					AND EXISTS (
+						SELECT 1
+						FROM transmission_destination_head AS tdh
+						WHERE
+							tdh.transmission_guid = transmission.transmission_guid
+					)
+					AND EXISTS (
+						SELECT 1
+						FROM transmission_queue_head AS tqh
+						WHERE
+							tqh.transmission_guid = transmission.transmission_guid
+					)
+				THEN 1 ELSE 0 END
+			WHERE
+				transmission_guid IN (
+					SELECT
+						tdh.transmission_guid
+					FROM transmission_destination_head AS tdh
+					WHERE
+						tdh.destination_device_guid = ?
+					UNION
+					SELECT
+						tqh.transmission_guid
+					FROM transmission_queue_head AS tqh
+					WHERE
+						tqh.queue_guid = ?
+				)
+		''', (int(TransmissionStatus.Pending), int(TransmissionStatus.Retry), destination_device_guid, queue_guid))
+
+	def __update_transmission_status(self, *, cursor: sqlite3.Cursor, transmission_guid: str, status: TransmissionStatus):
+
+		# NOTE must be called on the writer thread inside of an open transaction
+
+		cursor.execute('''
+			UPDATE transmission
+			SET
+				status = ?,
+				is_deliverable = 0
+			WHERE
+				transmission_guid = ?
+		''', (int(status), transmission_guid))
+
+		_select_result = cursor.execute('''
+			SELECT
+				t.destination_device_guid,
+				t.queue_guid,
+				t.sequence
+			FROM transmission AS t
+			WHERE
+				t.transmission_guid = ?
+		''', (transmission_guid,))
+		_rows = _select_result.fetchall()
+
+		if len(_rows) != 1:
+			raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
+		else:
+			_destination_device_guid, _queue_guid, _sequence = _rows[0]
+			if self.__transmission_coordination_index is not None and status >= TransmissionStatus.Complete:
+				self.__released_destination_device_guid_and_sequences.append((_destination_device_guid, _sequence))
+			self.__refresh_transmission_heads(
+				cursor=cursor,
+				destination_device_guid=_destination_device_guid,
+				queue_guid=_queue_guid
+			)
+
+	def __close_transmission_dequeue_lease(self, *, cursor: sqlite3.Cursor, transmission_dequeue_guid: str):
+
+		# NOTE must be called on the writer thread inside of an open transaction
+		#  a dequeue whose lease expired was already given up and its transmission may have been claimed again
+
+		cursor.execute('''
+			UPDATE transmission_dequeue
+			SET
+				lease_expiration_datetime = NULL
+			WHERE
+				transmission_dequeue_guid = ?
+				AND lease_expiration_datetime IS NOT NULL
+		''', (transmission_dequeue_guid,))
+
+		if cursor.rowcount != 1:
+			raise Exception(f"Failed to find transmission dequeue with an open lease with guid: \"{transmission_dequeue_guid}\".")
+
+	def __get_transmission_guid_by_transmission_dequeue_guid(self, *, cursor: sqlite3.Cursor, transmission_dequeue_guid: str) -> str:
+
+		_select_result = cursor.execute('''
+			SELECT
+				td.transmission_guid
+			FROM transmission_dequeue AS td
+			WHERE
+				td.transmission_dequeue_guid = ?
+		''', (transmission_dequeue_guid,))
+		_rows = _select_result.fetchall()
+
+		if len(_rows) != 1:
+			raise Exception(f"Failed to find transmission dequeue with guid: \"{transmission_dequeue_guid}\".")
+
+		return _rows[0][0]
+
+	@staticmethod
+	def __get_next_transmission_dequeues_sql() -> str:
+		# every deliverable transmission is the head of a distinct destination device and a distinct queue, so they never block each other
+		return '''
+			SELECT
+				t.transmission_guid,
+				d.last_known_client_guid,
+				t.destination_device_guid,
+				t.sequence
+			FROM transmission AS t
+			INNER JOIN device AS d
+			ON
+				d.device_guid = t.destination_device_guid
+			WHERE
+				t.is_deliverable = 1  -- pending or ready to retry while at the head of both its destination device and its queue
+			ORDER BY
+				t.sequence
+			LIMIT ?
+		'''
+
+	@staticmethod
+	def __get_transmission_destination_followers_sql() -> str:
+		# the transmissions following a claimed transmission to its destination device and if each may be sent along with it
+		return '''
+			SELECT
+				t.transmission_guid,
+				t.sequence,
+				t.queue_guid = t_head.queue_guid
+					AND t.status = ?  -- pending, since a transmission ready to retry waits on the decision of its source device
+					AND t.source_device_guid = t_head.source_device_guid
+					AND t.source_device_instance_guid = t_head.source_device_instance_guid
+					AND t.destination_device_instance_guid = t_head.destination_device_instance_guid
+					AND json_extract(t.stored_transmission_json_string, '$.parser_type') = ?
+			FROM transmission AS t_head
+			INNER JOIN transmission AS t
+			ON
+				t.destination_device_guid = t_head.destination_device_guid
+				AND t.status < 5  -- not in a terminal state
+				AND t.sequence > t_head.sequence
+			WHERE
+				t_head.transmission_guid = ?
+				AND json_extract(t_head.stored_transmission_json_string, '$.parser_type') = ?
+			ORDER BY
+				t.sequence
+			LIMIT ?
+		'''
+
+	@staticmethod
+	def __get_transmission_queue_followers_sql() -> str:
+		# the transmissions following a claimed transmission within its queue
+		return '''
+			SELECT
+				t.transmission_guid
+			FROM transmission AS t_head
+			INNER JOIN transmission AS t
+			ON
+				t.queue_guid = t_head.queue_guid
+				AND t.status < 5  -- not in a terminal state
+				AND t.sequence > t_head.sequence
+			WHERE
+				t_head.transmission_guid = ?
+			ORDER BY
+				t.sequence
+			LIMIT ?
+		'''
+
+	def __get_transmission_batch_follower_guids(self, *, cursor: sqlite3.Cursor, transmission_guid: str, destination_device_guid: str, followers_total_maximum: int, batched_parser_type: str) -> List[str]:
+
+		# NOTE must be called on the writer thread inside of an open transaction
+		#  a follower is only sent along with the claimed transmission if it is next in line for both its destination device and its queue,
+		#  so that the batch is delivered in the same order as its transmissions would have been one after another
+
+		_select_result = cursor.execute(self.__get_transmission_destination_followers_sql(), (int(TransmissionStatus.Pending), batched_parser_type, transmission_guid, batched_parser_type, followers_total_maximum))
+		_destination_follower_rows = _select_result.fetchall()
+		if len(_destination_follower_rows) == 0:
+			return []
+
+		_select_result = cursor.execute(self.__get_transmission_queue_followers_sql(), (transmission_guid, followers_total_maximum))
+		_queue_follower_guids = [_row[0] for _row in _select_result.fetchall()]
+
+		if self.__transmission_coordination_index is None:
+			_next_sequences = None
+		else:
+			# an earlier transmission to the same destination device may be waiting in another shard
+			_next_sequences = self.__transmission_coordination_index.get_next_sequences(
+				destination_device_guid=destination_device_guid,
+				sequences_total=followers_total_maximum + 1
+			)[1:]
+
+		_follower_guids = []  # type: List[str]
+		for _index, (_follower_guid, _follower_sequence, _is_batchable) in enumerate(_destination_follower_rows):
+			if not _is_batchable or _index >= len(_queue_follower_guids) or _queue_follower_guids[_index] != _follower_guid:
+				break
+			if _next_sequences is not None and (_index >= len(_next_sequences) or _next_sequences[_index] != _follower_sequence):
+				break
+			_follower_guids.append(_follower_guid)
+
+		return _follower_guids
+
+	@staticmethod
+	def __get_next_failed_transmission_dequeue_sql() -> str:
+		return '''
+			INSERT INTO transmission_dequeue_error_transmission_dequeue
+			(
+				transmission_dequeue_error_transmission_dequeue_guid,
+				transmission_dequeue_error_transmission_guid,
+				request_client_guid,
+				destination_client_guid,
+				row_created_datetime
+			)
+			SELECT
+				?,
+				tdet.transmission_dequeue_error_transmission_guid,
+				?,
+				d.last_known_client_guid,
+				?
+			FROM transmission_dequeue_error_transmission AS tdet
+			INNER JOIN transmission_dequeue AS td
+			ON
+				td.transmission_dequeue_guid = tdet.transmission_dequeue_guid
+			INNER JOIN transmission AS t
+			ON
+				t.transmission_guid = td.transmission_guid
+			INNER JOIN device AS d 
+			ON 
+				d.device_guid = t.source_device_guid
+			WHERE
+				(
+					NOT EXISTS ( -- there does not exist an active transmission
+						SELECT 1
+						FROM transmission_dequeue_error_transmission_dequeue AS tdetd_inner
+						WHERE
+							tdetd_inner.transmission_dequeue_error_transmission_guid = tdet.transmission_dequeue_error_transmission_guid
+					)
+					OR
 					(
-						NOT EXISTS ( -- there does not exist an active transmission
-							SELECT 1
-							FROM transmission_dequeue AS td_inner
-							WHERE
-								td_inner.transmission_guid = t.transmission_guid
-						)
-						OR
-						( -- or this specific transmission needs to be retransmitted
-							t.is_retry_ready = 1
-						)
+						tdet.is_retry_ready = 1
 					)
-					AND
-					( -- there does not exist an earlier transmission that is not yet in a terminal state
-						NOT EXISTS (
-							SELECT 1
-							FROM transmission AS t_earlier
-							WHERE
-								t_earlier.row_created_datetime < t.row_created_datetime
-								AND
-								( -- an earlier destination device or queued transmission
-									t_earlier.destination_device_guid = t.destination_device_guid
-									OR
-									t_earlier.queue_guid = t.queue_guid
-								)
-								AND
-								( -- the transmission is not in a terminal state
-									NOT EXISTS ( -- not in a normal complete state
-										SELECT 1
-										FROM transmission_dequeue AS td_earlier
-										INNER JOIN transmission_complete AS tc_earlier
-										ON
-											tc_earlier.transmission_dequeue_guid = td_earlier.transmission_dequeue_guid
-										WHERE
-											td_earlier.transmission_guid = t_earlier.transmission_guid
-									)
-									AND NOT EXISTS ( -- not in an failed transmission completed where a retry was not requested (basically cancelling the transmission after it failed to be sent to the destination)
-										SELECT 1
-										FROM transmission_dequeue AS td_earlier
-										INNER JOIN transmission_dequeue_error_transmission AS tdet_earlier
-										ON
-											tdet_earlier.transmission_dequeue_guid = td_earlier.transmission_dequeue_guid
-										INNER JOIN transmission_dequeue_error_transmission_dequeue AS tdetd_earlier
-										ON
-											tdetd_earlier.transmission_dequeue_error_transmission_guid = tdet_earlier.transmission_dequeue_error_transmission_guid
-										INNER JOIN transmission_dequeue_error_transmission_complete AS tdetc_earlier
-										ON
-											tdetc_earlier.transmission_dequeue_error_transmission_dequeue_guid = tdetd_earlier.transmission_dequeue_error_transmission_dequeue_guid
-										WHERE
-											td_earlier.transmission_guid = t_earlier.transmission_guid
-											AND tdetc_earlier.is_retry_requested = 0
-									)
+				)
+				AND
+				(  -- there does not exist an earlier failed transmission not yet in a terminal state
+					NOT EXISTS (
+						SELECT 1
+						FROM transmission_dequeue_error_transmission AS tdet_earlier
+						INNER JOIN transmission_dequeue AS td_earlier
+						ON
+							td_earlier.transmission_dequeue_guid = tdet_earlier.transmission_dequeue_guid
+						INNER JOIN transmission AS t_earlier
+						ON
+							t_earlier.transmission_guid = td_earlier.transmission_guid
+						WHERE
+							t_earlier.source_device_guid = t.source_device_guid
+							AND tdet_earlier.sequence < tdet.sequence
+							AND
+							( -- the failed transmission is not in a terminal state
+								NOT EXISTS ( -- not in a failed transaction complete state
+									SELECT 1
+									FROM transmission_dequeue_error_transmission_dequeue AS tdetd_earlier
+									INNER JOIN transmission_dequeue_error_transmission_complete AS tdetc_earlier
+									ON
+										tdetc_earlier.transmission_dequeue_error_transmission_dequeue_guid = tdetd_earlier.transmission_dequeue_error_transmission_dequeue_guid
+									WHERE
+										tdetd_earlier.transmission_dequeue_error_transmission_guid = tdet_earlier.transmission_dequeue_error_transmission_guid
 								)
-								-- entries in the transmission_dequeue_error_transmission_error table are not valid terminal conditions because the transmissions may need to be received sequentially via a retry
-						)
+								-- an entry in transmission_dequeue_error_transmission_error can occur multiple times and will not stop retrying until it succeeds
+								--AND NOT EXISTS ( -- not in a failed transaction that failed state
+								--	SELECT 1
+								--	FROM transmission_dequeue_error_transmission_dequeue AS tdetd_earlier
+								--	INNER JOIN transmission_dequeue_error_transmission_error AS tdete_earlier
+								--	ON
+								--		tdete_earlier.transmission_dequeue_error_transmission_dequeue_guid = tdetd_earlier.transmission_dequeue_error_transmission_dequeue_guid
+								--	WHERE
+								--		tdetd_earlier.transmission_dequeue_error_transmission_guid = tdet_earlier.transmission_dequeue_error_transmission_guid
+								--)
+							)
 					)
-				ORDER BY
-					t.row_created_datetime
-				LIMIT 1
-			''', (_transmission_dequeue_guid, client_guid, _row_created_datetime))
+				)
+			ORDER BY
+				t.sequence
+			LIMIT 1
+		'''
+
+	def get_query_plans(self) -> Dict[str, List[str]]:
+
+		_connection = self.__acquire_read_connection()
+
+		try:
+			_query_plans = {}  # type: Dict[str, List[str]]
+			for _query_name, _query_sql, _query_parameters in [
+				("get_next_transmission_dequeues", self.__get_next_transmission_dequeues_sql(), (1,)),
+				("get_next_failed_transmission_dequeue", self.__get_next_failed_transmission_dequeue_sql(), (None, None, None)),
+				("get_transmission_dequeue_graphs", self.__get_transmission_dequeue_graphs_sql(transmission_dequeue_guids_total=1), (None,)),
+				("get_devices_by_purpose", self.__get_devices_by_purpose_sql(is_last_known_datetime_filtered=True), (None, None)),
+				("get_archivable_transmissions", self.__get_archivable_transmissions_sql(), (None, 1)),
+				("get_expired_transmission_dequeues", self.__get_expired_transmission_dequeues_sql(), (None, 1)),
+				("get_scheduled_transmission_retries", self.__get_scheduled_transmission_retries_sql(), (None, 1)),
+				("get_transmission_destination_followers", self.__get_transmission_destination_followers_sql(), (1, None, None, None, 1)),
+				("get_transmission_queue_followers", self.__get_transmission_queue_followers_sql(), (None, 1)),
+				("get_queue_stats", self.__get_transmission_stats_sql(table_name="transmission_queue_stats", column_name="queue_guid"), ()),
+				("get_destination_device_stats", self.__get_transmission_stats_sql(table_name="transmission_destination_stats", column_name="destination_device_guid"), ()),
+				("get_api_entrypoint_logs_page", self.__get_api_entrypoint_logs_page_sql(is_after_api_entrypoint_log_filtered=True, is_api_entrypoint_filtered=True, is_client_filtered=True), (None, None, None, None, None, None, 1))
+			]:
+				_explain_cursor = _connection.cursor()
+				_explain_result = _explain_cursor.execute(f"EXPLAIN QUERY PLAN {_query_sql}", _query_parameters)
+				_query_plans[_query_name] = [_row[3] for _row in _explain_result.fetchall()]
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
+
+		return _query_plans
+
+	def get_next_transmission_dequeue(self, *, client_guid: str) -> TransmissionDequeue:
 
-		_is_successful, _transmission_dequeue = self.try_get_transmission_dequeue(
-			transmission_dequeue_guid=_transmission_dequeue_guid
+		_transmission_dequeues = self.get_next_transmission_dequeues(
+			client_guid=client_guid,
+			limit=1
 		)
 
-		self.__connection_semaphore.acquire()
+		if len(_transmission_dequeues) == 0:
+			_transmission_dequeue = None
+		else:
+			_transmission_dequeue = _transmission_dequeues[0]
 
-		try:
-			if _is_successful:
+		return _transmission_dequeue
 
-				if _transmission_dequeue.get_transmission().get_is_retry_ready():
-					_insert_cursor.execute('''
-						UPDATE transmission
-						SET
-							is_retry_ready = NULL
-						WHERE
-							transmission_guid = ?
-					''', (_transmission_dequeue.get_transmission_guid(),))
+	def get_next_transmission_dequeues(self, *, client_guid: str, limit: int) -> List[TransmissionDequeue]:
+
+		_transmission_dequeues = []  # type: List[TransmissionDequeue]
+		for _transmission_dequeue_batch in self.get_next_transmission_dequeue_batches(
+			client_guid=client_guid,
+			limit=limit
+		):
+			_transmission_dequeues.extend(_transmission_dequeue_batch)
+
+		return _transmission_dequeues
+
+	def get_next_transmission_dequeue_batches(self, *, client_guid: str, limit: int, batch_transmissions_total_maximum: int = 1, batched_parser_type: str = None, excluded_destination_device_guids: Set[str] = None, on_excluded: Callable[[List[str]], None] = None) -> List[List[TransmissionDequeue]]:
+
+		# NOTE claims up to limit deliverable transmissions, each along with up to batch_transmissions_total_maximum - 1 of the pending transmissions
+		#  following it to the same destination device instance from the same queue and source device instance, stored by the batched_parser_type,
+		#  so that every batch may be sent over one connection
+		# NOTE transmissions to the excluded_destination_device_guids are left deliverable for a later claim,
+		#  and on_excluded is called with the destination devices of the deliverable transmissions that were passed over, if any
+
+		if batch_transmissions_total_maximum > 1 and batched_parser_type is None:
+			raise Exception("The parser type of the transmissions to batch is required.")
+
+		def _write(*, connection: sqlite3.Connection) -> Tuple[List[List[Tuple]], List[str]]:
+			_row_created_datetime = datetime.utcnow()
+			_excluded_destination_device_guids = []  # type: List[str]
+
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			if self.__transmission_coordination_index is None and not excluded_destination_device_guids:
+				_select_result = _insert_cursor.execute(self.__get_next_transmission_dequeues_sql(), (limit,))
+				_rows = _select_result.fetchall()
+			else:
+				# a transmission at the head of this shard may still wait behind an earlier transmission to the same destination device in another shard
+				_select_result = _insert_cursor.execute(self.__get_next_transmission_dequeues_sql(), (-1,))
+				_rows = []
+				for _row in _select_result.fetchall():
+					if self.__transmission_coordination_index is None or self.__transmission_coordination_index.is_next_sequence(
+						destination_device_guid=_row[2],
+						sequence=_row[3]
+					):
+						if excluded_destination_device_guids and _row[2] in excluded_destination_device_guids:
+							_excluded_destination_device_guids.append(_row[2])
+							continue
+						_rows.append(_row)
+						if len(_rows) == limit:
+							break
+
+			_lease_expiration_datetime = _row_created_datetime + timedelta(seconds=self.__transmission_dequeue_lease_seconds)
+			_transmission_dequeue_rows = []  # type: List[Tuple[str, str, str, str, datetime, datetime]]
+			_batch_sizes = []  # type: List[int]
+			for _transmission_guid, _destination_client_guid, _destination_device_guid, _sequence in _rows:
+				if batch_transmissions_total_maximum == 1:
+					_batch_transmission_guids = [_transmission_guid]
+				else:
+					_batch_transmission_guids = [_transmission_guid] + self.__get_transmission_batch_follower_guids(
+						cursor=_insert_cursor,
+						transmission_guid=_transmission_guid,
+						destination_device_guid=_destination_device_guid,
+						followers_total_maximum=batch_transmissions_total_maximum - 1,
+						batched_parser_type=batched_parser_type
+					)
+				for _batch_transmission_guid in _batch_transmission_guids:
+					_transmission_dequeue_guid = str(uuid.uuid4()).upper()
+					_transmission_dequeue_rows.append((_transmission_dequeue_guid, _batch_transmission_guid, client_guid, _destination_client_guid, _row_created_datetime, _lease_expiration_datetime))
+				_batch_sizes.append(len(_batch_transmission_guids))
+
+			if len(_transmission_dequeue_rows) != 0:
+				_insert_cursor.executemany('''
+					INSERT INTO transmission_dequeue
+					(
+						transmission_dequeue_guid,
+						transmission_guid,
+						request_client_guid,
+						destination_client_guid,
+						row_created_datetime,
+						lease_expiration_datetime
+					)
+					VALUES (?, ?, ?, ?, ?, ?)
+				''', _transmission_dequeue_rows)
+
+				# the transmissions remain the heads of their destination devices and queues while in flight
+				_insert_cursor.executemany('''
+					UPDATE transmission
+					SET
+						status = ?,
+						is_deliverable = 0,
+						is_retry_ready = NULL
+					WHERE
+						transmission_guid = ?
+				''', [(int(TransmissionStatus.InFlight), _transmission_dequeue_row[1]) for _transmission_dequeue_row in _transmission_dequeue_rows])
+
+				# hydrate the claimed transmission dequeues before the transaction ends instead of querying each link afterwards
+				_select_result = _insert_cursor.execute(self.__get_transmission_dequeue_graphs_sql(
+					transmission_dequeue_guids_total=len(_transmission_dequeue_rows)
+				), [_transmission_dequeue_row[0] for _transmission_dequeue_row in _transmission_dequeue_rows])
+				_transmission_dequeue_graph_row_per_transmission_dequeue_guid = {}  # type: Dict[str, Tuple]
+				for _transmission_dequeue_graph_row in _select_result.fetchall():
+					_transmission_dequeue_graph_row_per_transmission_dequeue_guid[_transmission_dequeue_graph_row[0]] = _transmission_dequeue_graph_row
+
+				if len(_transmission_dequeue_graph_row_per_transmission_dequeue_guid) != len(_transmission_dequeue_rows):
+					raise Exception(f"Unexpected number of rows. Expected {len(_transmission_dequeue_rows)}, found {len(_transmission_dequeue_graph_row_per_transmission_dequeue_guid)}.")
+
+				# keep the order in which the transmissions were claimed
+				_transmission_dequeue_graph_row_batches = []  # type: List[List[Tuple]]
+				_transmission_dequeue_row_index = 0
+				for _batch_size in _batch_sizes:
+					_transmission_dequeue_graph_row_batches.append([_transmission_dequeue_graph_row_per_transmission_dequeue_guid[_transmission_dequeue_row[0]] for _transmission_dequeue_row in _transmission_dequeue_rows[_transmission_dequeue_row_index:_transmission_dequeue_row_index + _batch_size]])
+					_transmission_dequeue_row_index += _batch_size
+			else:
+				_transmission_dequeue_graph_row_batches = []
 
 			_insert_cursor.execute('''
 				COMMIT
 			''')
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+			return _transmission_dequeue_graph_row_batches, _excluded_destination_device_guids
 
-		return _transmission_dequeue
+		_transmission_dequeue_graph_row_batches, _excluded_destination_device_guids = self.__write(
+			write_function=_write
+		)
+
+		if on_excluded is not None and len(_excluded_destination_device_guids) != 0:
+			on_excluded(_excluded_destination_device_guids)
+
+		_transmission_dequeue_batches = []  # type: List[List[TransmissionDequeue]]
+		for _transmission_dequeue_graph_rows in _transmission_dequeue_graph_row_batches:
+			_transmission_dequeue_batch = []  # type: List[TransmissionDequeue]
+			for _transmission_dequeue_graph_row in _transmission_dequeue_graph_rows:
+				_transmission_dequeue = self.__parse_transmission_dequeue_graph_row(
+					row=_transmission_dequeue_graph_row
+				)
+				_transmission_dequeue_batch.append(_transmission_dequeue)
+			_transmission_dequeue_batches.append(_transmission_dequeue_batch)
+
+		return _transmission_dequeue_batches
+
+	def renew_transmission_dequeue_lease(self, *, transmission_dequeue_guid: str) -> bool:
+
+		# NOTE extends the lease of a transmission still being delivered and returns False if the lease already expired or was closed
+
+		def _write(*, connection: sqlite3.Connection) -> int:
+			_update_cursor = connection.cursor()
+			_update_cursor.execute('''
+				UPDATE transmission_dequeue
+				SET
+					lease_expiration_datetime = ?
+				WHERE
+					transmission_dequeue_guid = ?
+					AND lease_expiration_datetime > ?
+			''', (datetime.utcnow() + timedelta(seconds=self.__transmission_dequeue_lease_seconds), transmission_dequeue_guid, datetime.utcnow()))
+			return _update_cursor.rowcount
+
+		_rows_total = self.__write(
+			write_function=_write
+		)
+
+		return _rows_total == 1
+
+	@staticmethod
+	def __get_expired_transmission_dequeues_sql() -> str:
+		return '''
+			SELECT
+				td.transmission_dequeue_guid,
+				td.transmission_guid
+			FROM transmission_dequeue AS td
+			WHERE
+				td.lease_expiration_datetime IS NOT NULL
+				AND td.lease_expiration_datetime <= ?
+			ORDER BY
+				td.lease_expiration_datetime
+			LIMIT ?
+		'''
+
+	def reap_expired_transmission_dequeues(self, *, transmission_dequeues_total_maximum: int) -> int:
+
+		# NOTE gives up to transmission_dequeues_total_maximum of the dequeues with an expired lease, oldest first, and makes their transmissions pending again
+		#  so that they are delivered again in their original order, and returns the number of dequeues given up
+
+		def _write(*, connection: sqlite3.Connection) -> int:
+			_update_cursor = connection.cursor()
+			_update_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_select_result = _update_cursor.execute(self.__get_expired_transmission_dequeues_sql(), (datetime.utcnow(), transmission_dequeues_total_maximum))
+			_rows = _select_result.fetchall()
+
+			for _transmission_dequeue_guid, _transmission_guid in _rows:
+				self.__close_transmission_dequeue_lease(
+					cursor=_update_cursor,
+					transmission_dequeue_guid=_transmission_dequeue_guid
+				)
+				self.__update_transmission_status(
+					cursor=_update_cursor,
+					transmission_guid=_transmission_guid,
+					status=TransmissionStatus.Pending
+				)
+
+			_update_cursor.execute('''
+				COMMIT
+			''')
+
+			return len(_rows)
+
+		return self.__write(
+			write_function=_write
+		)
 
 	def transmission_completed(self, *, client_guid: str, transmission_dequeue_guid: str):
 
-		self.__connection_semaphore.acquire()
+		self.transmissions_completed(
+			client_guid=client_guid,
+			transmission_dequeue_guids=[transmission_dequeue_guid]
+		)
 
-		try:
-			_transmission_complete_guid = str(uuid.uuid4()).upper()
+	def transmissions_completed(self, *, client_guid: str, transmission_dequeue_guids: List[str]):
+
+		# NOTE completes every dequeue of a batch sent at once within one transaction
+
+		def _write(*, connection: sqlite3.Connection):
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_insert_cursor.executemany('''
 				INSERT INTO transmission_complete
 				(
 					transmission_complete_guid,
@@ -1288,22 +3115,77 @@ class Database():
 					row_created_datetime
 				)
 				VALUES (?, ?, ?, ?)
-			''', (_transmission_complete_guid, transmission_dequeue_guid, client_guid, _row_created_datetime))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
+			''', [(str(uuid.uuid4()).upper(), _transmission_dequeue_guid, client_guid, _row_created_datetime) for _transmission_dequeue_guid in transmission_dequeue_guids])
 
-		self.__connection_semaphore.release()
+			for _transmission_dequeue_guid in transmission_dequeue_guids:
+				self.__close_transmission_dequeue_lease(
+					cursor=_insert_cursor,
+					transmission_dequeue_guid=_transmission_dequeue_guid
+				)
 
-	def transmission_failed(self, *, client_guid: str, transmission_dequeue_guid: str, error_message_json_string: str) -> TransmissionDequeueErrorTransmission:
+				self.__update_transmission_status(
+					cursor=_insert_cursor,
+					transmission_guid=self.__get_transmission_guid_by_transmission_dequeue_guid(
+						cursor=_insert_cursor,
+						transmission_dequeue_guid=_transmission_dequeue_guid
+					),
+					status=TransmissionStatus.Complete
+				)
 
-		self.__connection_semaphore.acquire()
+			_insert_cursor.execute('''
+				COMMIT
+			''')
 
-		try:
+		self.__write(
+			write_function=_write
+		)
+
+	def release_transmission_dequeues(self, *, transmission_dequeue_guids: List[str]):
+
+		# NOTE gives up dequeues that were claimed but not sent, such as the rest of a batch after a failure, so that their transmissions are delivered again
+
+		def _write(*, connection: sqlite3.Connection):
+			_update_cursor = connection.cursor()
+			_update_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+
+			for _transmission_dequeue_guid in transmission_dequeue_guids:
+				self.__close_transmission_dequeue_lease(
+					cursor=_update_cursor,
+					transmission_dequeue_guid=_transmission_dequeue_guid
+				)
+				self.__update_transmission_status(
+					cursor=_update_cursor,
+					transmission_guid=self.__get_transmission_guid_by_transmission_dequeue_guid(
+						cursor=_update_cursor,
+						transmission_dequeue_guid=_transmission_dequeue_guid
+					),
+					status=TransmissionStatus.Pending
+				)
+
+			_update_cursor.execute('''
+				COMMIT
+			''')
+
+		self.__write(
+			write_function=_write
+		)
+
+	def transmission_failed(self, *, client_guid: str, transmission_dequeue_guid: str, error_message_json_string: str) -> TransmissionDequeueErrorTransmission:
+
+		def _write(*, connection: sqlite3.Connection) -> str:
 			_transmission_dequeue_error_transmission_guid = str(uuid.uuid4()).upper()
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_sequence = self.__get_next_sequence(
+				cursor=_insert_cursor,
+				table_name="transmission_dequeue_error_transmission"
+			)
 			_insert_cursor.execute('''
 				INSERT INTO transmission_dequeue_error_transmission
 				(
@@ -1312,15 +3194,35 @@ class Database():
 					transmission_dequeue_guid,
 					error_message_json_string,
 					row_created_datetime,
-					is_retry_ready
+					is_retry_ready,
+					sequence
 				)
-				VALUES (?, ?, ?, ?, ?, ?)
-			''', (_transmission_dequeue_error_transmission_guid, client_guid, transmission_dequeue_guid, error_message_json_string, _row_created_datetime, None))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
+				VALUES (?, ?, ?, ?, ?, ?, ?)
+			''', (_transmission_dequeue_error_transmission_guid, client_guid, transmission_dequeue_guid, error_message_json_string, _row_created_datetime, None, _sequence))
+
+			self.__close_transmission_dequeue_lease(
+				cursor=_insert_cursor,
+				transmission_dequeue_guid=transmission_dequeue_guid
+			)
 
-		self.__connection_semaphore.release()
+			self.__update_transmission_status(
+				cursor=_insert_cursor,
+				transmission_guid=self.__get_transmission_guid_by_transmission_dequeue_guid(
+					cursor=_insert_cursor,
+					transmission_dequeue_guid=transmission_dequeue_guid
+				),
+				status=TransmissionStatus.Failed
+			)
+
+			_insert_cursor.execute('''
+				COMMIT
+			''')
+
+			return _transmission_dequeue_error_transmission_guid
+
+		_transmission_dequeue_error_transmission_guid = self.__write(
+			write_function=_write
+		)
 
 		_is_successful, _transmission_dequeue_error_transmission = self.try_get_transmission_dequeue_error_transmission(
 			transmission_dequeue_error_transmission_guid=_transmission_dequeue_error_transmission_guid
@@ -1333,10 +3235,10 @@ class Database():
 
 	def try_get_transmission_dequeue_error_transmission_dequeue(self, *, transmission_dequeue_error_transmission_dequeue_guid: str) -> Tuple[bool, TransmissionDequeueErrorTransmissionDequeue]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					transmission_dequeue_error_transmission_dequeue_guid,
@@ -1351,10 +3253,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_transmission_dequeue_error_transmission_dequeue = None
@@ -1395,10 +3297,10 @@ class Database():
 
 	def try_get_transmission_dequeue_error_transmission(self, *, transmission_dequeue_error_transmission_guid: str) -> Tuple[bool, TransmissionDequeueErrorTransmission]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					transmission_dequeue_error_transmission_guid,
@@ -1414,10 +3316,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_transmission_dequeue_error_transmission = None
@@ -1446,145 +3348,60 @@ class Database():
 
 	def get_next_failed_transmission_dequeue(self, *, client_guid: str) -> TransmissionDequeueErrorTransmissionDequeue:
 
-		self.__connection_semaphore.acquire()
+		_transmission_dequeue_error_transmission_dequeue_guid = str(uuid.uuid4()).upper()
 
-		try:
-			_transmission_dequeue_error_transmission_dequeue_guid = str(uuid.uuid4()).upper()
+		def _write(*, connection: sqlite3.Connection):
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 
 			_insert_cursor.execute('''
-				BEGIN
+				BEGIN IMMEDIATE
 			''')
 
+			_insert_cursor.execute(self.__get_next_failed_transmission_dequeue_sql(), (_transmission_dequeue_error_transmission_dequeue_guid, client_guid, _row_created_datetime))
+
+			# the readers cannot see the uncommitted dequeue, so the retry flag is checked on this connection
 			_insert_cursor.execute('''
-				INSERT INTO transmission_dequeue_error_transmission_dequeue
-				(
-					transmission_dequeue_error_transmission_dequeue_guid,
-					transmission_dequeue_error_transmission_guid,
-					request_client_guid,
-					destination_client_guid,
-					row_created_datetime
-				)
-				SELECT
-					?,
-					tdet.transmission_dequeue_error_transmission_guid,
-					?,
-					d.last_known_client_guid,
-					?
-				FROM transmission_dequeue_error_transmission AS tdet
-				INNER JOIN transmission_dequeue AS td
-				ON
-					td.transmission_dequeue_guid = tdet.transmission_dequeue_guid
-				INNER JOIN transmission AS t
-				ON
-					t.transmission_guid = td.transmission_guid
-				INNER JOIN device AS d 
-				ON 
-					d.device_guid = t.source_device_guid
+				UPDATE transmission_dequeue_error_transmission
+				SET
+					is_retry_ready = NULL
 				WHERE
-					(
-						NOT EXISTS ( -- there does not exist an active transmission
-							SELECT 1
-							FROM transmission_dequeue_error_transmission_dequeue AS tdetd_inner
-							WHERE
-								tdetd_inner.transmission_dequeue_error_transmission_guid = tdet.transmission_dequeue_error_transmission_guid
-						)
-						OR
-						(
-							tdet.is_retry_ready = 1
-						)
-					)
-					AND
-					(  -- there does not exist an earlier failed transmission not yet in a terminal state
-						NOT EXISTS (
-							SELECT 1
-							FROM transmission_dequeue_error_transmission AS tdet_earlier
-							INNER JOIN transmission_dequeue AS td_earlier
-							ON
-								td_earlier.transmission_dequeue_guid = tdet_earlier.transmission_dequeue_guid
-							INNER JOIN transmission AS t_earlier
-							ON
-								t_earlier.transmission_guid = td_earlier.transmission_guid
-							WHERE
-								t_earlier.source_device_guid = t.source_device_guid
-								AND tdet_earlier.row_created_datetime < tdet.row_created_datetime
-								AND
-								( -- the failed transmission is not in a terminal state
-									NOT EXISTS ( -- not in a failed transaction complete state
-										SELECT 1
-										FROM transmission_dequeue_error_transmission_dequeue AS tdetd_earlier
-										INNER JOIN transmission_dequeue_error_transmission_complete AS tdetc_earlier
-										ON
-											tdetc_earlier.transmission_dequeue_error_transmission_dequeue_guid = tdetd_earlier.transmission_dequeue_error_transmission_dequeue_guid
-										WHERE
-											tdetd_earlier.transmission_dequeue_error_transmission_guid = tdet_earlier.transmission_dequeue_error_transmission_guid
-									)
-									-- an entry in transmission_dequeue_error_transmission_error can occur multiple times and will not stop retrying until it succeeds
-									--AND NOT EXISTS ( -- not in a failed transaction that failed state
-									--	SELECT 1
-									--	FROM transmission_dequeue_error_transmission_dequeue AS tdetd_earlier
-									--	INNER JOIN transmission_dequeue_error_transmission_error AS tdete_earlier
-									--	ON
-									--		tdete_earlier.transmission_dequeue_error_transmission_dequeue_guid = tdetd_earlier.transmission_dequeue_error_transmission_dequeue_guid
-									--	WHERE
-									--		tdetd_earlier.transmission_dequeue_error_transmission_guid = tdet_earlier.transmission_dequeue_error_transmission_guid
-									--)
-								)
-						)
-					)
-				ORDER BY
-					t.row_created_datetime
-				LIMIT 1
-			''', (_transmission_dequeue_error_transmission_dequeue_guid, client_guid, _row_created_datetime))
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
-
-		self.__connection_semaphore.release()
-
-		_is_successful, _transmission_dequeue_error_transmission_dequeue = self.try_get_transmission_dequeue_error_transmission_dequeue(
-			transmission_dequeue_error_transmission_dequeue_guid=_transmission_dequeue_error_transmission_dequeue_guid
-		)
-
-		self.__connection_semaphore.acquire()
-
-		try:
-			if _is_successful:
-
-				if _transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission().get_is_retry_ready():
-
-					_insert_cursor.execute('''
-						UPDATE transmission_dequeue_error_transmission
-						SET
-							is_retry_ready = NULL
+					transmission_dequeue_error_transmission_guid IN (
+						SELECT
+							tdetd.transmission_dequeue_error_transmission_guid
+						FROM transmission_dequeue_error_transmission_dequeue AS tdetd
 						WHERE
-							transmission_dequeue_error_transmission_guid = ?
-					''', (_transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission_guid(),))
+							tdetd.transmission_dequeue_error_transmission_dequeue_guid = ?
+					)
+					AND is_retry_ready = 1
+			''', (_transmission_dequeue_error_transmission_dequeue_guid,))
 
 			_insert_cursor.execute('''
 				COMMIT
 			''')
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+		self.__write(
+			write_function=_write
+		)
+
+		_is_successful, _transmission_dequeue_error_transmission_dequeue = self.try_get_transmission_dequeue_error_transmission_dequeue(
+			transmission_dequeue_error_transmission_dequeue_guid=_transmission_dequeue_error_transmission_dequeue_guid
+		)
 
 		return _transmission_dequeue_error_transmission_dequeue
 
-	def failed_transmission_completed(self, *, client_guid: str, transmission_dequeue_error_transmission_dequeue_guid: str, is_retry_requested: bool):
+	def failed_transmission_completed(self, *, client_guid: str, transmission_dequeue_error_transmission_dequeue_guid: str, is_retry_requested: bool, retry_datetime: datetime = None):
 
-		self.__connection_semaphore.acquire()
+		# NOTE a requested retry waits for the destination device to announce itself again or, if provided, for the retry_datetime to pass
 
-		try:
+		def _write(*, connection: sqlite3.Connection):
 			_transmission_dequeue_error_transmission_complete_guid = str(uuid.uuid4()).upper()
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 			_insert_cursor.execute('''
-				BEGIN
+				BEGIN IMMEDIATE
 			''')
 			_insert_cursor.execute('''
 				INSERT INTO transmission_dequeue_error_transmission_complete
@@ -1597,46 +3414,58 @@ class Database():
 				)
 				VALUES (?, ?, ?, ?, ?)
 			''', (_transmission_dequeue_error_transmission_complete_guid, transmission_dequeue_error_transmission_dequeue_guid, client_guid, is_retry_requested, _row_created_datetime))
-			_insert_cursor.execute('''
-				UPDATE transmission
-				SET
-					is_retry_ready = 0
+			_select_result = _insert_cursor.execute('''
+				SELECT
+					td.transmission_guid
+				FROM transmission_dequeue_error_transmission_dequeue AS tdetd
+				INNER JOIN transmission_dequeue_error_transmission AS tdet
+				ON
+					tdet.transmission_dequeue_error_transmission_guid = tdetd.transmission_dequeue_error_transmission_guid
+				INNER JOIN transmission_dequeue AS td
+				ON
+					td.transmission_dequeue_guid = tdet.transmission_dequeue_guid
 				WHERE
-					? = 1
-					AND EXISTS (
-						SELECT 1
-						FROM transmission_dequeue AS td
-						INNER JOIN transmission_dequeue_error_transmission AS tdet
-						ON
-							tdet.transmission_dequeue_guid = td.transmission_dequeue_guid
-						INNER JOIN transmission_dequeue_error_transmission_dequeue tdetd
-						ON
-							tdetd.transmission_dequeue_error_transmission_guid = tdet.transmission_dequeue_error_transmission_guid
-						WHERE
-							td.transmission_guid = transmission.transmission_guid
-							AND tdetd.transmission_dequeue_error_transmission_dequeue_guid = ?
-					)
-			''', (is_retry_requested, transmission_dequeue_error_transmission_dequeue_guid))
+					tdetd.transmission_dequeue_error_transmission_dequeue_guid = ?
+			''', (transmission_dequeue_error_transmission_dequeue_guid,))
+			_rows = _select_result.fetchall()
+			if len(_rows) != 1:
+				raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
+			_transmission_guid = _rows[0][0]
+
+			if is_retry_requested:
+				# the transmission remains failed until the destination device announces itself again or it is retried as scheduled
+				_insert_cursor.execute('''
+					UPDATE transmission
+					SET
+						is_retry_ready = 0,
+						retry_datetime = ?
+					WHERE
+						transmission_guid = ?
+				''', (retry_datetime, _transmission_guid))
+			else:
+				self.__update_transmission_status(
+					cursor=_insert_cursor,
+					transmission_guid=_transmission_guid,
+					status=TransmissionStatus.Cancelled
+				)
+
 			_insert_cursor.execute('''
 				COMMIT
 			''')
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+		self.__write(
+			write_function=_write
+		)
 
 	def failed_transmission_failed(self, *, client_guid: str, transmission_dequeue_error_transmission_dequeue_guid: str, error_message_json_string: str):
 
-		self.__connection_semaphore.acquire()
-
-		try:
+		def _write(*, connection: sqlite3.Connection):
 			_transmission_dequeue_error_transmission_error_guid = str(uuid.uuid4()).upper()
 			_row_created_datetime = datetime.utcnow()
 
-			_insert_cursor = self.__connection.cursor()
+			_insert_cursor = connection.cursor()
 			_insert_cursor.execute('''
-				BEGIN
+				BEGIN IMMEDIATE
 			''')
 			_insert_cursor.execute('''
 				INSERT INTO transmission_dequeue_error_transmission_error
@@ -1665,95 +3494,266 @@ class Database():
 			_insert_cursor.execute('''
 				COMMIT
 			''')
-		except Exception as ex:
-			self.__connection_semaphore.release()
-			raise ex
 
-		self.__connection_semaphore.release()
+		self.__write(
+			write_function=_write
+		)
+
+	@staticmethod
+	def __get_scheduled_transmission_retries_sql() -> str:
+		return '''
+			SELECT
+				t.transmission_guid
+			FROM transmission AS t
+			WHERE
+				t.retry_datetime <= ?
+				AND t.is_retry_ready = 0
+				AND t.status < 5
+			ORDER BY
+				t.retry_datetime
+			LIMIT ?
+		'''
+
+	def retry_scheduled_transmissions(self, *, transmissions_total_maximum: int) -> List[str]:
+
+		# NOTE makes up to transmissions_total_maximum failed transmissions whose retry datetime passed ready to retry and returns their guids,
+		#  where each is only deliverable again while it is still the head of its destination device and queue, so the order of both is kept
+
+		def _write(*, connection: sqlite3.Connection) -> List[str]:
+			_update_cursor = connection.cursor()
+			_update_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_select_result = _update_cursor.execute(self.__get_scheduled_transmission_retries_sql(), (datetime.utcnow(), transmissions_total_maximum))
+			_transmission_guids = [_row[0] for _row in _select_result.fetchall()]
+
+			for _transmission_guid in _transmission_guids:
+				_update_cursor.execute('''
+					UPDATE transmission
+					SET
+						is_retry_ready = 1,
+						retry_datetime = NULL
+					WHERE
+						transmission_guid = ?
+				''', (_transmission_guid,))
+				self.__update_transmission_status(
+					cursor=_update_cursor,
+					transmission_guid=_transmission_guid,
+					status=TransmissionStatus.Retry
+				)
+
+			_update_cursor.execute('''
+				COMMIT
+			''')
+
+			return _transmission_guids
+
+		_transmission_guids = self.__write(
+			write_function=_write
+		)
 
-	def get_devices_by_purpose(self, *, purpose_guid: str) -> List[Device]:
+		return _transmission_guids
 
-		self.__connection_semaphore.acquire()
+	def get_transmission_dequeue_error_transmissions(self, *, transmission_guid: str) -> List[TransmissionDequeueErrorTransmission]:
+
+		# NOTE returns every failure of the transmission from the earliest, without their transmission dequeues
+
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
-					d.device_guid,
-					d.instance_guid,
-					d.purpose_guid,
-					d.socket_port,
-					d.last_known_client_guid,
-					d.last_known_datetime
-				FROM device AS d
+					tdet.transmission_dequeue_error_transmission_guid,
+					tdet.request_client_guid,
+					tdet.transmission_dequeue_guid,
+					tdet.error_message_json_string,
+					tdet.row_created_datetime,
+					tdet.is_retry_ready
+				FROM transmission_dequeue AS td
+				INNER JOIN transmission_dequeue_error_transmission AS tdet
+				ON
+					tdet.transmission_dequeue_guid = td.transmission_dequeue_guid
 				WHERE
-					d.purpose_guid = ?
-			''', (purpose_guid,))
+					td.transmission_guid = ?
+				ORDER BY
+					tdet.sequence
+			''', (transmission_guid,))
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
-		_devices = []  # type: List[Device]
+		_transmission_dequeue_error_transmissions = []  # type: List[TransmissionDequeueErrorTransmission]
 		for _row in _rows:
-			_device = Device.parse_row(
+			_transmission_dequeue_error_transmission = TransmissionDequeueErrorTransmission.parse_row(
 				row=_row
 			)
-			_is_successful, _last_known_client = self.try_get_client(
-				client_guid=_device.get_last_known_client_guid()
+			_transmission_dequeue_error_transmissions.append(_transmission_dequeue_error_transmission)
+
+		return _transmission_dequeue_error_transmissions
+
+	@staticmethod
+	def __get_devices_by_purpose_sql(*, is_last_known_datetime_filtered: bool) -> str:
+		return f'''
+			SELECT
+				d.device_guid,
+				d.instance_guid,
+				d.purpose_guid,
+				d.socket_port,
+				d.last_known_client_guid,
+				d.last_known_datetime,
+				c.client_guid,
+				c.ip_address
+			FROM device AS d
+			INNER JOIN client AS c
+			ON
+				c.client_guid = d.last_known_client_guid
+			WHERE
+				d.purpose_guid = ?
+				{"AND d.last_known_datetime >= ?" if is_last_known_datetime_filtered else ""}
+		'''
+
+	@staticmethod
+	def __device_with_last_known_client_row_factory(cursor: sqlite3.Cursor, row: Tuple) -> Device:
+		_device = Device.parse_row(
+			row=row[0:6]
+		)
+		_device.set_last_known_client(
+			last_known_client=Client.parse_row(
+				row=row[6:8]
 			)
-			if not _is_successful:
-				raise Exception(f"Failed to find client guid \"{_device.get_last_known_client_guid()}\" for device guid \"{_device.get_device_guid()}\".")
-			else:
-				_device.set_last_known_client(
-					last_known_client=_last_known_client
-				)
-			_devices.append(_device)
-		return _devices
+		)
+		return _device
 
-	def get_api_entrypoint_logs(self, *, inclusive_start_row_created_datetime: datetime, exclusive_end_row_created_datetime: datetime) -> List[ApiEntrypointLog]:
+	def get_devices_by_purpose(self, *, purpose_guid: str, minimum_last_known_datetime: datetime = None) -> List[Device]:
+		# NOTE a minimum_last_known_datetime excludes the devices that have not announced themselves since then
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_select_cursor = self.__connection.cursor()
-			_select_result = _select_cursor.execute('''
-				SELECT
-					ael.api_entrypoint_log_id,
-					ael.api_entrypoint_id,
-					ael.request_client_guid,
-					ael.input_json_string,
-					ael.row_created_datetime
-				FROM api_entrypoint_log AS ael
-				WHERE
-					ael.row_created_datetime >= ?
-					AND ael.row_created_datetime < ?
-			''', (inclusive_start_row_created_datetime, exclusive_end_row_created_datetime))
+			_get_cursor = _connection.cursor()
+			_get_cursor.row_factory = self.__device_with_last_known_client_row_factory
+			if minimum_last_known_datetime is None:
+				_get_result = _get_cursor.execute(self.__get_devices_by_purpose_sql(
+					is_last_known_datetime_filtered=False
+				), (purpose_guid,))
+			else:
+				_get_result = _get_cursor.execute(self.__get_devices_by_purpose_sql(
+					is_last_known_datetime_filtered=True
+				), (purpose_guid, minimum_last_known_datetime))
 
-			_rows = _select_result.fetchall()
+			_devices = _get_result.fetchall()  # type: List[Device]
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
-		_api_entrypoint_logs = []  # type: List[ApiEntrypointLog]
-		for _row in _rows:
-			_api_entrypoint_log = ApiEntrypointLog.parse_row(
-				row=_row
-			)
-			_api_entrypoint_logs.append(_api_entrypoint_log)
-		return _api_entrypoint_logs
+		return _devices
+
+	@staticmethod
+	def __api_entrypoint_log_row_factory(cursor: sqlite3.Cursor, row: Tuple) -> ApiEntrypointLog:
+		return ApiEntrypointLog.parse_row(
+			row=row
+		)
+
+	def __get_api_entrypoint_logs_page_sql(self, *, is_after_api_entrypoint_log_filtered: bool, is_api_entrypoint_filtered: bool, is_client_filtered: bool) -> str:
+
+		# NOTE pages are keyed on (row_created_datetime, api_entrypoint_log_id) so that each page seeks into ix_api_entrypoint_log_row_created_datetime_api_entrypoint_log_id
+		#  where the previous page ended instead of skipping over every row already read
+		_filters = [
+			"ael.row_created_datetime >= ?",
+			"ael.row_created_datetime < ?"
+		]  # type: List[str]
+		if is_after_api_entrypoint_log_filtered:
+			_filters.append("(ael.row_created_datetime, ael.api_entrypoint_log_id) > (?, ?)")
+		if is_api_entrypoint_filtered:
+			_filters.append("ael.api_entrypoint_id = ?")
+		if is_client_filtered:
+			_filters.append("ael.request_client_guid = ?")
+
+		_filters_sql = "\n\t\t\t\tAND ".join(_filters)
+
+		return f'''
+			SELECT
+				ael.api_entrypoint_log_id,
+				ael.api_entrypoint_id,
+				ael.request_client_guid,
+				ael.input_json_string,
+				ael.row_created_datetime
+			FROM api_entrypoint_log AS ael
+			WHERE
+				{_filters_sql}
+			ORDER BY
+				ael.row_created_datetime,
+				ael.api_entrypoint_log_id
+			LIMIT ?
+		'''
+
+	def iterate_api_entrypoint_logs(self, *, inclusive_start_row_created_datetime: datetime, exclusive_end_row_created_datetime: datetime, api_entrypoint: ApiEntrypoint = None, client_guid: str = None, page_rows_total: int = 1000) -> Iterator[ApiEntrypointLog]:
+
+		# NOTE only one page of at most page_rows_total logs is held at a time and the read connection is released before each page is yielded
+		#  so that a slow consumer does not keep a read connection from other requests
+
+		_last_row_created_datetime = None  # type: datetime
+		_last_api_entrypoint_log_id = None  # type: int
+		_is_page_full = True
+		while _is_page_full:
+			_is_after_api_entrypoint_log_filtered = _last_api_entrypoint_log_id is not None
+
+			_parameters = [inclusive_start_row_created_datetime, exclusive_end_row_created_datetime]
+			if _is_after_api_entrypoint_log_filtered:
+				_parameters.extend((_last_row_created_datetime, _last_api_entrypoint_log_id))
+			if api_entrypoint is not None:
+				_parameters.append(int(api_entrypoint))
+			if client_guid is not None:
+				_parameters.append(client_guid)
+			_parameters.append(page_rows_total)
+
+			_connection = self.__acquire_read_connection()
+
+			try:
+				_select_cursor = _connection.cursor()
+				_select_cursor.row_factory = self.__api_entrypoint_log_row_factory
+				_select_result = _select_cursor.execute(self.__get_api_entrypoint_logs_page_sql(
+					is_after_api_entrypoint_log_filtered=_is_after_api_entrypoint_log_filtered,
+					is_api_entrypoint_filtered=api_entrypoint is not None,
+					is_client_filtered=client_guid is not None
+				), _parameters)
+				_api_entrypoint_logs = _select_result.fetchall()  # type: List[ApiEntrypointLog]
+			except Exception as ex:
+				self.__release_read_connection(connection=_connection)
+				raise ex
+
+			self.__release_read_connection(connection=_connection)
+
+			_is_page_full = len(_api_entrypoint_logs) == page_rows_total
+			if len(_api_entrypoint_logs) != 0:
+				_last_row_created_datetime = _api_entrypoint_logs[-1].get_row_created_datetime()
+				_last_api_entrypoint_log_id = _api_entrypoint_logs[-1].get_api_entrypoint_log_id()
+
+			for _api_entrypoint_log in _api_entrypoint_logs:
+				yield _api_entrypoint_log
+
+	def get_api_entrypoint_logs(self, *, inclusive_start_row_created_datetime: datetime, exclusive_end_row_created_datetime: datetime, api_entrypoint: ApiEntrypoint = None, client_guid: str = None) -> List[ApiEntrypointLog]:
+
+		return list(self.iterate_api_entrypoint_logs(
+			inclusive_start_row_created_datetime=inclusive_start_row_created_datetime,
+			exclusive_end_row_created_datetime=exclusive_end_row_created_datetime,
+			api_entrypoint=api_entrypoint,
+			client_guid=client_guid
+		))
 
 	def try_get_client(self, *, client_guid: str) -> Tuple[bool, Client]:
 
-		self.__connection_semaphore.acquire()
+		_connection = self.__acquire_read_connection()
 
 		try:
-			_get_cursor = self.__connection.cursor()
+			_get_cursor = _connection.cursor()
 			_get_result = _get_cursor.execute('''
 				SELECT
 					client_guid,
@@ -1765,10 +3765,10 @@ class Database():
 
 			_rows = _get_result.fetchall()
 		except Exception as ex:
-			self.__connection_semaphore.release()
+			self.__release_read_connection(connection=_connection)
 			raise ex
 
-		self.__connection_semaphore.release()
+		self.__release_read_connection(connection=_connection)
 
 		if len(_rows) == 0:
 			_client = None
@@ -1783,13 +3783,471 @@ class Database():
 
 		return _client is not None, _client
 
+	@staticmethod
+	def __get_archivable_transmissions_sql() -> str:
+		# a terminal transmission is only archived once every failure reported for it has been completed by its source device
+		return '''
+			SELECT
+				t.transmission_guid
+			FROM transmission AS t
+			WHERE
+				t.status >= 5
+				AND t.row_created_datetime < ?
+				AND NOT EXISTS (
+					SELECT 1
+					FROM transmission_dequeue AS td
+					INNER JOIN transmission_dequeue_error_transmission AS tdet
+					ON
+						tdet.transmission_dequeue_guid = td.transmission_dequeue_guid
+					WHERE
+						td.transmission_guid = t.transmission_guid
+						AND NOT EXISTS (
+							SELECT 1
+							FROM transmission_dequeue_error_transmission_dequeue AS tdetd
+							INNER JOIN transmission_dequeue_error_transmission_complete AS tdetc
+							ON
+								tdetc.transmission_dequeue_error_transmission_dequeue_guid = tdetd.transmission_dequeue_error_transmission_dequeue_guid
+							WHERE
+								tdetd.transmission_dequeue_error_transmission_guid = tdet.transmission_dequeue_error_transmission_guid
+						)
+				)
+			ORDER BY
+				t.row_created_datetime
+			LIMIT ?
+		'''
+
+	@staticmethod
+	def __get_archived_transmission_chain_tables() -> List[Tuple[str, str]]:
+		# every table of a transmission chain with the condition that selects the rows belonging to temp.archived_transmission, parents before children
+		_transmission_dequeue_guids_sql = "SELECT td.transmission_dequeue_guid FROM transmission_dequeue AS td WHERE td.transmission_guid IN (SELECT transmission_guid FROM temp.archived_transmission)"
+		_transmission_dequeue_error_transmission_guids_sql = f"SELECT tdet.transmission_dequeue_error_transmission_guid FROM transmission_dequeue_error_transmission AS tdet WHERE tdet.transmission_dequeue_guid IN ({_transmission_dequeue_guids_sql})"
+		_transmission_dequeue_error_transmission_dequeue_guids_sql = f"SELECT tdetd.transmission_dequeue_error_transmission_dequeue_guid FROM transmission_dequeue_error_transmission_dequeue AS tdetd WHERE tdetd.transmission_dequeue_error_transmission_guid IN ({_transmission_dequeue_error_transmission_guids_sql})"
+		return [
+			("transmission", "transmission_guid IN (SELECT transmission_guid FROM temp.archived_transmission)"),
+			("transmission_dequeue", "transmission_guid IN (SELECT transmission_guid FROM temp.archived_transmission)"),
+			("transmission_complete", f"transmission_dequeue_guid IN ({_transmission_dequeue_guids_sql})"),
+			("transmission_dequeue_error_transmission", f"transmission_dequeue_guid IN ({_transmission_dequeue_guids_sql})"),
+			("transmission_dequeue_error_transmission_dequeue", f"transmission_dequeue_error_transmission_guid IN ({_transmission_dequeue_error_transmission_guids_sql})"),
+			("transmission_dequeue_error_transmission_complete", f"transmission_dequeue_error_transmission_dequeue_guid IN ({_transmission_dequeue_error_transmission_dequeue_guids_sql})"),
+			("transmission_dequeue_error_transmission_error", f"transmission_dequeue_error_transmission_dequeue_guid IN ({_transmission_dequeue_error_transmission_dequeue_guids_sql})")
+		]
+
+	@staticmethod
+	def __get_archive_rows(*, cursor: sqlite3.Cursor) -> List[Dict]:
+		_column_names = [_column[0] for _column in cursor.description]
+		return [dict(zip(_column_names, _row)) for _row in cursor.fetchall()]
+
+	def archive_terminal_transmissions(self, *, maximum_row_created_datetime: datetime, transmissions_total_maximum: int, write_archive_segment_method: Callable[[Dict[str, List[Dict]]], None]) -> Dict[str, int]:
+		# NOTE removes up to transmissions_total_maximum terminal transmission chains created before maximum_row_created_datetime
+		#  the rows of every table are given to write_archive_segment_method before the removal is committed, so a failure to archive keeps them in place
+
+		def _write(*, connection: sqlite3.Connection) -> Dict[str, int]:
+			_archive_cursor = connection.cursor()
+			_archive_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_archive_cursor.execute('''
+				CREATE TEMP TABLE IF NOT EXISTS archived_transmission
+				(
+					transmission_guid GUID PRIMARY KEY
+				)
+			''')
+			_archive_cursor.execute('''
+				DELETE FROM temp.archived_transmission
+			''')
+			_archive_cursor.execute(f'''
+				INSERT INTO temp.archived_transmission
+				(
+					transmission_guid
+				)
+				{self.__get_archivable_transmissions_sql()}
+			''', (maximum_row_created_datetime, transmissions_total_maximum))
+
+			_rows_per_table_name = {}  # type: Dict[str, List[Dict]]
+			if _archive_cursor.rowcount != 0:
+				for _table_name, _table_condition in self.__get_archived_transmission_chain_tables():
+					_archive_cursor.execute(f"SELECT * FROM {_table_name} WHERE {_table_condition}")
+					_rows_per_table_name[_table_name] = self.__get_archive_rows(
+						cursor=_archive_cursor
+					)
+
+				write_archive_segment_method(_rows_per_table_name)
+
+				for _table_name, _table_condition in reversed(self.__get_archived_transmission_chain_tables()):
+					_archive_cursor.execute(f"DELETE FROM {_table_name} WHERE {_table_condition}")
+
+			_archive_cursor.execute('''
+				COMMIT
+			''')
+
+			return {_table_name: len(_rows) for _table_name, _rows in _rows_per_table_name.items()}
+
+		_archived_rows_total_per_table_name = self.__write(
+			write_function=_write
+		)
+
+		return _archived_rows_total_per_table_name
+
+	def archive_api_entrypoint_logs(self, *, maximum_row_created_datetime: datetime, api_entrypoint_logs_total_maximum: int, write_archive_segment_method: Callable[[Dict[str, List[Dict]]], None]) -> Dict[str, int]:
+
+		def _write(*, connection: sqlite3.Connection) -> Dict[str, int]:
+			_archive_cursor = connection.cursor()
+			_archive_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_archive_cursor.execute('''
+				SELECT
+					*
+				FROM api_entrypoint_log AS ael
+				WHERE
+					ael.row_created_datetime < ?
+				ORDER BY
+					ael.row_created_datetime
+				LIMIT ?
+			''', (maximum_row_created_datetime, api_entrypoint_logs_total_maximum))
+			_rows = self.__get_archive_rows(
+				cursor=_archive_cursor
+			)
+
+			if len(_rows) != 0:
+				write_archive_segment_method({"api_entrypoint_log": _rows})
+
+				_archive_cursor.executemany('''
+					DELETE FROM api_entrypoint_log
+					WHERE
+						api_entrypoint_log_id = ?
+				''', [(_row["api_entrypoint_log_id"],) for _row in _rows])
+
+			_archive_cursor.execute('''
+				COMMIT
+			''')
+
+			return {} if len(_rows) == 0 else {"api_entrypoint_log": len(_rows)}
+
+		_archived_rows_total_per_table_name = self.__write(
+			write_function=_write
+		)
+
+		return _archived_rows_total_per_table_name
+
+	def try_acquire_lease(self, *, lease_name: str, holder_guid: str, lease_seconds: float) -> bool:
+
+		# NOTE acquires or renews the lease for holder_guid unless another holder has a lease that has not expired yet,
+		#  so that only one of the processes sharing the database file acts on behalf of all of them
+
+		def _write(*, connection: sqlite3.Connection) -> List:
+			_now = datetime.utcnow()
+
+			_insert_cursor = connection.cursor()
+			_insert_cursor.execute('''
+				BEGIN IMMEDIATE
+			''')
+			_insert_cursor.execute('''
+				INSERT INTO lease
+				(
+					lease_name,
+					holder_guid,
+					expiration_datetime,
+					row_created_datetime
+				)
+				VALUES (?, ?, ?, ?)
+				ON CONFLICT (lease_name) DO UPDATE SET
+					holder_guid = excluded.holder_guid,
+					expiration_datetime = excluded.expiration_datetime
+				WHERE
+					lease.holder_guid = excluded.holder_guid
+					OR lease.expiration_datetime <= ?
+			''', (lease_name, holder_guid, _now + timedelta(seconds=lease_seconds), _now, _now))
+
+			_select_result = _insert_cursor.execute('''
+				SELECT
+					l.holder_guid
+				FROM lease AS l
+				WHERE
+					l.lease_name = ?
+			''', (lease_name, ))
+			_rows = _select_result.fetchall()
+
+			_insert_cursor.execute('''
+				COMMIT
+			''')
+
+			return _rows
+
+		_rows = self.__write(
+			write_function=_write
+		)
+
+		if len(_rows) != 1:
+			raise Exception(f"Unexpected number of rows. Expected 1, found {len(_rows)}.")
+
+		return _rows[0][0] == holder_guid
+
+	def release_lease(self, *, lease_name: str, holder_guid: str):
+
+		def _write(*, connection: sqlite3.Connection):
+			_delete_cursor = connection.cursor()
+			_delete_cursor.execute('''
+				DELETE FROM lease
+				WHERE
+					lease_name = ?
+					AND holder_guid = ?
+			''', (lease_name, holder_guid))
+
+		self.__write(
+			write_function=_write
+		)
+
+	def get_transmission_coordination_state(self) -> Tuple[int, List[Tuple[str, int]]]:
+
+		# NOTE the last sequence given out and the destination device and sequence of every transmission not yet in a terminal state
+
+		_connection = self.__acquire_read_connection()
+
+		try:
+			_select_cursor = _connection.cursor()
+			_select_result = _select_cursor.execute('''
+				SELECT
+					sc.sequence
+				FROM sequence_counter AS sc
+				WHERE
+					sc.table_name = ?
+			''', ("transmission",))
+			_last_sequence = _select_result.fetchall()[0][0]
+
+			_select_result = _select_cursor.execute('''
+				SELECT
+					t.destination_device_guid,
+					t.sequence
+				FROM transmission AS t
+				WHERE
+					t.status < 5  -- not in a terminal state
+			''')
+			_destination_device_guid_and_sequences = _select_result.fetchall()  # type: List[Tuple[str, int]]
+		except Exception as ex:
+			self.__release_read_connection(connection=_connection)
+			raise ex
+
+		self.__release_read_connection(connection=_connection)
+
+		return _last_sequence, _destination_device_guid_and_sequences
+
+	@staticmethod
+	def __get_transmission_stats_sql(*, table_name: str, column_name: str) -> str:
+		# the counters come from the trigger maintained table and only the oldest pending transmission of each row is looked up, from the partial index
+		return f'''
+			SELECT
+				ts.{column_name},
+				ts.pending_total,
+				ts.in_flight_total,
+				ts.failed_total,
+				ts.retry_requested_total,
+				t.sequence,
+				t.row_created_datetime
+			FROM {table_name} AS ts
+			LEFT JOIN transmission AS t
+			ON
+				t.transmission_guid = (
+					SELECT
+						t_oldest.transmission_guid
+					FROM transmission AS t_oldest
+					WHERE
+						t_oldest.{column_name} = ts.{column_name}
+						AND t_oldest.status < 5  -- not in a terminal state
+						AND t_oldest.status IN (1, 4)  -- pending or ready to retry
+					ORDER BY
+						t_oldest.sequence
+					LIMIT 1
+				)
+			WHERE
+				ts.pending_total + ts.in_flight_total + ts.failed_total + ts.retry_requested_total > 0
+			ORDER BY
+				ts.{column_name}
+		'''
+
+	def get_queue_stats(self) -> Tuple[List[QueueStats], List[DestinationDeviceStats]]:
+
+		# NOTE the queues and the destination devices with at least one transmission not yet in a terminal state
+
+		_connection = self.__acquire_read_connection()
+
+		try:
+			_select_cursor = _connection.cursor()
+			_select_result = _select_cursor.execute(self.__get_transmission_stats_sql(
+				table_name="transmission_queue_stats",
+				column_name="queue_guid"
+			))
+			_queue_stats = [QueueStats.parse_row(row=_row) for _row in _select_result.fetchall()]  # type: List[QueueStats]
+
+			_select_result = _select_cursor.execute(self.__get_transmission_stats_sql(
+				table_name="transmission_destination_stats",
+				column_name="destination_device_guid"
+			))
+			_destination_device_stats = [DestinationDeviceStats.parse_row(row=_row) for _row in _select_result.fetchall()]  # type: List[DestinationDeviceStats]
+		except Exception as ex:
+			self.__release_read_connection(connection=_connection)
+			raise ex
+
+		self.__release_read_connection(connection=_connection)
+
+		return _queue_stats, _destination_device_stats
+
+	def get_table_rows_totals(self) -> Dict[str, int]:
+
+		_connection = self.__acquire_read_connection()
+
+		try:
+			_select_cursor = _connection.cursor()
+			_table_rows_totals = {}  # type: Dict[str, int]
+			for _table_name in ["client", "device", "queue", "transmission", "transmission_dequeue", "transmission_complete", "transmission_dequeue_error_transmission", "transmission_dequeue_error_transmission_dequeue", "transmission_dequeue_error_transmission_complete", "transmission_dequeue_error_transmission_error", "api_entrypoint_log"]:
+				_select_result = _select_cursor.execute(f"SELECT COUNT(*) FROM {_table_name}")
+				_table_rows_totals[_table_name] = _select_result.fetchone()[0]
+		except Exception as ex:
+			self.__release_read_connection(connection=_connection)
+			raise ex
+
+		self.__release_read_connection(connection=_connection)
+
+		return _table_rows_totals
+
 
 class DatabaseFactory():
 
-	def __init__(self):
-		self.__database = None
+	def __init__(self, *, database_file_path: str = None, synchronous: DatabaseSynchronous = DatabaseSynchronous.Normal, mmap_size_bytes: int = 268435456, cache_size_kibibytes: int = 65536, read_connections_total: int = 4, cached_clients_total_maximum: int = 1024, snapshot_directory_path: str = None, shards_total: int = 1, busy_timeout_seconds: float = 5.0, transmission_dequeue_lease_seconds: float = 30.0):
+		# NOTE an in-memory database is restored from the newest snapshot within snapshot_directory_path, if there is one
+		# NOTE with more than one shard the transmissions are spread across shards_total independent databases by their queue,
+		#  the first of which is the one returned by get_database, and the files of the other shards are placed next to database_file_path
 
-	def get_database(self):
-		if self.__database is None:
-			self.__database = Database()
-		return self.__database
+		if shards_total < 1:
+			raise Exception(f"Unexpected number of shards: {shards_total}.")
+
+		if shards_total > 1 and snapshot_directory_path is not None:
+			raise Exception("Snapshots are not supported for sharded databases.")
+
+		self.__database_file_path = database_file_path
+		self.__synchronous = synchronous
+		self.__mmap_size_bytes = mmap_size_bytes
+		self.__cache_size_kibibytes = cache_size_kibibytes
+		self.__read_connections_total = read_connections_total
+		self.__cached_clients_total_maximum = cached_clients_total_maximum
+		self.__snapshot_directory_path = snapshot_directory_path
+		self.__shards_total = shards_total
+		self.__busy_timeout_seconds = busy_timeout_seconds
+		self.__transmission_dequeue_lease_seconds = transmission_dequeue_lease_seconds
+
+		self.__databases = None  # type: List[Database]
+
+	def __get_shard_database_file_path(self, *, shard_index: int) -> str:
+
+		if self.__database_file_path is None:
+			_shard_database_file_path = None
+		elif shard_index == 0:
+			_shard_database_file_path = self.__database_file_path
+		else:
+			_database_file_path_root, _database_file_path_extension = os.path.splitext(self.__database_file_path)
+			_shard_database_file_path = f"{_database_file_path_root}_shard_{shard_index}{_database_file_path_extension}"
+
+		return _shard_database_file_path
+
+	def __get_databases(self) -> List[Database]:
+		if self.__databases is None:
+			if self.__shards_total == 1:
+				_restore_snapshot_file_path = None  # type: str
+				if self.__database_file_path is None and self.__snapshot_directory_path is not None:
+					_snapshot_file_paths = Database.get_snapshot_file_paths(
+						snapshot_directory_path=self.__snapshot_directory_path
+					)
+					if len(_snapshot_file_paths) != 0:
+						_restore_snapshot_file_path = _snapshot_file_paths[-1]
+
+				self.__databases = [Database(
+					database_file_path=self.__database_file_path,
+					synchronous=self.__synchronous,
+					mmap_size_bytes=self.__mmap_size_bytes,
+					cache_size_kibibytes=self.__cache_size_kibibytes,
+					read_connections_total=self.__read_connections_total,
+					cached_clients_total_maximum=self.__cached_clients_total_maximum,
+					restore_snapshot_file_path=_restore_snapshot_file_path,
+					busy_timeout_seconds=self.__busy_timeout_seconds,
+					transmission_dequeue_lease_seconds=self.__transmission_dequeue_lease_seconds
+				)]
+			else:
+				_transmission_coordination_index = TransmissionCoordinationIndex()
+				_databases = []  # type: List[Database]
+				for _shard_index in range(self.__shards_total):
+					_databases.append(Database(
+						database_file_path=self.__get_shard_database_file_path(
+							shard_index=_shard_index
+						),
+						synchronous=self.__synchronous,
+						mmap_size_bytes=self.__mmap_size_bytes,
+						cache_size_kibibytes=self.__cache_size_kibibytes,
+						read_connections_total=self.__read_connections_total,
+						cached_clients_total_maximum=self.__cached_clients_total_maximum,
+						transmission_coordination_index=_transmission_coordination_index,
+						busy_timeout_seconds=self.__busy_timeout_seconds,
+						transmission_dequeue_lease_seconds=self.__transmission_dequeue_lease_seconds
+					))
+
+				# persisted shards continue from the transmissions they still hold, ordered across every shard at once
+				_last_sequence = 0
+				_destination_device_guid_and_sequences = []  # type: List[Tuple[str, int]]
+				for _database in _databases:
+					_shard_last_sequence, _shard_destination_device_guid_and_sequences = _database.get_transmission_coordination_state()
+					_last_sequence = max(_last_sequence, _shard_last_sequence)
+					_destination_device_guid_and_sequences.extend(_shard_destination_device_guid_and_sequences)
+				_transmission_coordination_index.initialize(
+					last_sequence=_last_sequence,
+					destination_device_guid_and_sequences=_destination_device_guid_and_sequences
+				)
+
+				self.__databases = _databases
+		return self.__databases
+
+	def get_database(self) -> Database:
+		return self.__get_databases()[0]
+
+	def get_shards_total(self) -> int:
+		return self.__shards_total
+
+	def get_shard_databases(self) -> List[Database]:
+		return self.__get_databases().copy()
+
+	def get_shard_index(self, *, queue_guid: str) -> int:
+		# the hash must not change between processes, which rules out the builtin hash of a str
+		return zlib.crc32(queue_guid.upper().encode()) % self.__shards_total
+
+	def get_queue_stats(self) -> Tuple[List[QueueStats], List[DestinationDeviceStats]]:
+
+		# NOTE a queue lives within one shard while transmissions to a destination device may be spread across every shard
+
+		_queue_stats = []  # type: List[QueueStats]
+		_destination_device_stats_per_destination_device_guid = {}  # type: Dict[str, DestinationDeviceStats]
+		for _database in self.__get_databases():
+			_shard_queue_stats, _shard_destination_device_stats = _database.get_queue_stats()
+			_queue_stats.extend(_shard_queue_stats)
+			for _destination_device_stats in _shard_destination_device_stats:
+				_other_destination_device_stats = _destination_device_stats_per_destination_device_guid.get(_destination_device_stats.get_destination_device_guid(), None)
+				if _other_destination_device_stats is not None:
+					if _other_destination_device_stats.get_oldest_pending_sequence() is not None and (_destination_device_stats.get_oldest_pending_sequence() is None or _other_destination_device_stats.get_oldest_pending_sequence() < _destination_device_stats.get_oldest_pending_sequence()):
+						_oldest_pending_destination_device_stats = _other_destination_device_stats
+					else:
+						_oldest_pending_destination_device_stats = _destination_device_stats
+					_destination_device_stats = DestinationDeviceStats(
+						destination_device_guid=_destination_device_stats.get_destination_device_guid(),
+						pending_total=_destination_device_stats.get_pending_total() + _other_destination_device_stats.get_pending_total(),
+						in_flight_total=_destination_device_stats.get_in_flight_total() + _other_destination_device_stats.get_in_flight_total(),
+						failed_total=_destination_device_stats.get_failed_total() + _other_destination_device_stats.get_failed_total(),
+						retry_requested_total=_destination_device_stats.get_retry_requested_total() + _other_destination_device_stats.get_retry_requested_total(),
+						oldest_pending_sequence=_oldest_pending_destination_device_stats.get_oldest_pending_sequence(),
+						oldest_pending_row_created_datetime=_oldest_pending_destination_device_stats.get_oldest_pending_row_created_datetime()
+					)
+				_destination_device_stats_per_destination_device_guid[_destination_device_stats.get_destination_device_guid()] = _destination_device_stats
+
+		_queue_stats.sort(key=lambda _queue_stats_element: _queue_stats_element.get_queue_guid())
+		return _queue_stats, [_destination_device_stats_per_destination_device_guid[_destination_device_guid] for _destination_device_guid in sorted(_destination_device_stats_per_destination_device_guid.keys())]
+
+	def get_shard_database(self, *, queue_guid: str) -> Database:
+		return self.__get_databases()[self.get_shard_index(
+			queue_guid=queue_guid
+		)]
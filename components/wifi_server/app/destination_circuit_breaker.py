@@ -0,0 +1,223 @@
+from __future__ import annotations
+from app.periodic_worker import PeriodicWorker
+from enum import IntEnum
+from typing import List, Tuple, Dict, Callable, Set
+import threading
+import random
+import time
+
+
+class DestinationCircuitState(IntEnum):
+	Closed = 1,  # deliveries are attempted, after a failure once its backoff passed
+	Open = 2,  # deliveries are skipped until the backoff passed
+	HalfOpen = 3,  # a single trial delivery is attempted
+
+
+class DestinationCircuit():
+
+	__slots__ = ("__destination_device_guid", "__state", "__failures_total", "__retry_time")
+
+	def __init__(self, *, destination_device_guid: str, state: DestinationCircuitState, failures_total: int, retry_time: float):
+
+		self.__destination_device_guid = destination_device_guid
+		self.__state = state
+		self.__failures_total = failures_total
+		self.__retry_time = retry_time
+
+	def get_destination_device_guid(self) -> str:
+		return self.__destination_device_guid
+
+	def get_state(self) -> DestinationCircuitState:
+		return self.__state
+
+	def set_state(self, *, state: DestinationCircuitState):
+		self.__state = state
+
+	def get_failures_total(self) -> int:
+		return self.__failures_total
+
+	def set_failures_total(self, *, failures_total: int):
+		self.__failures_total = failures_total
+
+	def get_retry_time(self) -> float:
+		return self.__retry_time
+
+	def set_retry_time(self, *, retry_time: float):
+		self.__retry_time = retry_time
+
+	def to_json(self) -> Dict:
+		return {
+			"destination_device_guid": self.__destination_device_guid,
+			"state": self.__state.name,
+			"failures_total": self.__failures_total,
+			"retry_after_seconds": max(0.0, self.__retry_time - time.perf_counter())
+		}
+
+
+class DestinationCircuitBreaker():
+
+	def __init__(self, *, failures_total_threshold: int, backoff_seconds_minimum: float, backoff_seconds_maximum: float, jitter_ratio: float, cycle_interval_seconds: float, on_backoff_elapsed: Callable[[], None], on_exception: Callable[[Exception], None]):
+		# NOTE after each failed delivery to a destination device its deliveries are held back for an exponential backoff from backoff_seconds_minimum up to backoff_seconds_maximum,
+		#  shortened by up to jitter_ratio of itself so that devices that failed together are not retried together
+		# NOTE after failures_total_threshold consecutive failures the circuit opens, as it does again when its half-open trial delivery fails,
+		#  until a delivery completes or the device announces itself again
+		# NOTE every cycle_interval_seconds on_backoff_elapsed is called if a backoff passed since the previous cycle, since nothing else would claim the held back transmissions
+
+		if failures_total_threshold < 1:
+			raise Exception(f"At least one failure is required to open a circuit. Found: {failures_total_threshold}.")
+
+		self.__failures_total_threshold = failures_total_threshold
+		self.__backoff_seconds_minimum = backoff_seconds_minimum
+		self.__backoff_seconds_maximum = backoff_seconds_maximum
+		self.__jitter_ratio = jitter_ratio
+		self.__on_backoff_elapsed = on_backoff_elapsed
+
+		self.__destination_circuit_per_destination_device_guid = {}  # type: Dict[str, DestinationCircuit]
+		self.__backing_off_destination_device_guids = set()  # type: Set[str]
+		self.__opened_total = 0
+		self.__skipped_total = 0
+		self.__circuits_lock = threading.Lock()
+		self.__periodic_worker = PeriodicWorker(
+			name="DestinationCircuitBreaker",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.signal_elapsed_backoffs,
+			on_exception=on_exception
+		)
+
+	def __get_backoff_seconds(self, *, failures_total: int) -> float:
+		_backoff_seconds = min(self.__backoff_seconds_maximum, self.__backoff_seconds_minimum * 2 ** (failures_total - 1))
+		return _backoff_seconds * (1 - self.__jitter_ratio * random.random())
+
+	def get_blocked_destination_device_guids(self) -> Set[str]:
+
+		# NOTE returns the destination devices whose deliveries are held back
+
+		self.__circuits_lock.acquire()
+		_now_time = time.perf_counter()
+		_blocked_destination_device_guids = set(_destination_circuit.get_destination_device_guid() for _destination_circuit in self.__destination_circuit_per_destination_device_guid.values() if _now_time < _destination_circuit.get_retry_time())
+		self.__circuits_lock.release()
+
+		return _blocked_destination_device_guids
+
+	def record_skipped(self, *, destination_device_guids: List[str]):
+
+		# NOTE the destination devices whose next deliverable transmission was passed over while held back
+
+		self.__circuits_lock.acquire()
+		self.__skipped_total += len(destination_device_guids)
+		self.__circuits_lock.release()
+
+	def record_success(self, *, destination_device_guid: str):
+
+		self.__circuits_lock.acquire()
+		self.__destination_circuit_per_destination_device_guid.pop(destination_device_guid, None)
+		self.__backing_off_destination_device_guids.discard(destination_device_guid)
+		self.__circuits_lock.release()
+
+	def record_failure(self, *, destination_device_guid: str) -> DestinationCircuitState:
+
+		# NOTE returns the state of the circuit after the failure, where an open circuit means that the failure should be reported instead of retried
+
+		self.__circuits_lock.acquire()
+
+		try:
+			_destination_circuit = self.__destination_circuit_per_destination_device_guid.get(destination_device_guid, None)
+			if _destination_circuit is None:
+				_destination_circuit = DestinationCircuit(
+					destination_device_guid=destination_device_guid,
+					state=DestinationCircuitState.Closed,
+					failures_total=0,
+					retry_time=float("-inf")
+				)
+				self.__destination_circuit_per_destination_device_guid[destination_device_guid] = _destination_circuit
+
+			_destination_circuit.set_failures_total(
+				failures_total=_destination_circuit.get_failures_total() + 1
+			)
+			if _destination_circuit.get_state() == DestinationCircuitState.HalfOpen or _destination_circuit.get_failures_total() >= self.__failures_total_threshold:
+				if _destination_circuit.get_state() != DestinationCircuitState.Open:
+					self.__opened_total += 1
+				_destination_circuit.set_state(
+					state=DestinationCircuitState.Open
+				)
+			_destination_circuit.set_retry_time(
+				retry_time=time.perf_counter() + self.__get_backoff_seconds(
+					failures_total=_destination_circuit.get_failures_total()
+				)
+			)
+			self.__backing_off_destination_device_guids.add(destination_device_guid)
+			_state = _destination_circuit.get_state()
+		except Exception as ex:
+			self.__circuits_lock.release()
+			raise ex
+
+		self.__circuits_lock.release()
+
+		return _state
+
+	def reset(self, *, destination_device_guid: str):
+
+		# NOTE closes the circuit of the device, for when it announced itself again and is expected to be reachable
+
+		self.record_success(
+			destination_device_guid=destination_device_guid
+		)
+
+	def get_destination_circuits(self) -> List[DestinationCircuit]:
+
+		self.__circuits_lock.acquire()
+		_destination_circuits = list(self.__destination_circuit_per_destination_device_guid.values())
+		self.__circuits_lock.release()
+
+		return _destination_circuits
+
+	def get_statistics(self) -> Dict:
+
+		# NOTE a circuit is backing off while its deliveries are held back, whatever its state, and a closed circuit whose backoff passed is not
+		self.__circuits_lock.acquire()
+		_now_time = time.perf_counter()
+		_states = [_destination_circuit.get_state() for _destination_circuit in self.__destination_circuit_per_destination_device_guid.values()]
+		_statistics = {
+			"backing_off_total": len([_destination_circuit for _destination_circuit in self.__destination_circuit_per_destination_device_guid.values() if _now_time < _destination_circuit.get_retry_time()]),
+			"open_total": _states.count(DestinationCircuitState.Open),
+			"half_open_total": _states.count(DestinationCircuitState.HalfOpen),
+			"opened_total": self.__opened_total,
+			"skipped_total": self.__skipped_total
+		}
+		self.__circuits_lock.release()
+
+		return _statistics
+
+	def signal_elapsed_backoffs(self) -> int:
+
+		# NOTE calls on_backoff_elapsed once if any backoff passed since the previous call and returns the number of destination devices whose backoff passed,
+		#  where an open circuit whose backoff passed becomes half-open to allow a trial delivery
+
+		self.__circuits_lock.acquire()
+
+		try:
+			_now_time = time.perf_counter()
+			_elapsed_destination_device_guids = [_destination_device_guid for _destination_device_guid in self.__backing_off_destination_device_guids if self.__destination_circuit_per_destination_device_guid[_destination_device_guid].get_retry_time() <= _now_time]
+			self.__backing_off_destination_device_guids.difference_update(_elapsed_destination_device_guids)
+			for _destination_device_guid in _elapsed_destination_device_guids:
+				_destination_circuit = self.__destination_circuit_per_destination_device_guid[_destination_device_guid]
+				if _destination_circuit.get_state() == DestinationCircuitState.Open:
+					_destination_circuit.set_state(
+						state=DestinationCircuitState.HalfOpen
+					)
+		except Exception as ex:
+			self.__circuits_lock.release()
+			raise ex
+
+		self.__circuits_lock.release()
+
+		if len(_elapsed_destination_device_guids) != 0:
+			self.__on_backoff_elapsed()
+
+		return len(_elapsed_destination_device_guids)
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+		self.__periodic_worker.dispose()
@@ -0,0 +1,315 @@
+from __future__ import annotations
+from app.periodic_worker import PeriodicWorker
+from typing import List, Tuple, Dict, Callable
+import threading
+import socket
+import time
+
+
+def is_socket_open(*, socket_object: socket.socket) -> bool:
+
+	# NOTE peeks without blocking, where a connection closed by the device reads as the end of the stream
+	#  and an idle connection with unread bytes is no longer in step with the device
+
+	_timeout = socket_object.gettimeout()
+	socket_object.setblocking(False)
+	try:
+		socket_object.recv(1, socket.MSG_PEEK)
+	except BlockingIOError:
+		return True
+	except OSError:
+		return False
+	finally:
+		socket_object.settimeout(_timeout)
+
+	return False
+
+
+class DeviceConnection():
+
+	__slots__ = ("__device_guid", "__instance_guid", "__ip_address", "__port", "__connection", "__opened_time", "__released_time")
+
+	def __init__(self, *, device_guid: str, instance_guid: str, ip_address: str, port: int, connection: object, opened_time: float):
+
+		self.__device_guid = device_guid
+		self.__instance_guid = instance_guid
+		self.__ip_address = ip_address
+		self.__port = port
+		self.__connection = connection
+		self.__opened_time = opened_time
+		self.__released_time = None  # type: float
+
+	def get_device_guid(self) -> str:
+		return self.__device_guid
+
+	def get_instance_guid(self) -> str:
+		return self.__instance_guid
+
+	def get_ip_address(self) -> str:
+		return self.__ip_address
+
+	def get_port(self) -> int:
+		return self.__port
+
+	def get_connection(self) -> object:
+		return self.__connection
+
+	def get_opened_time(self) -> float:
+		return self.__opened_time
+
+	def get_released_time(self) -> float:
+		return self.__released_time
+
+	def set_released_time(self, *, released_time: float):
+		self.__released_time = released_time
+
+	def is_addressed_to(self, *, instance_guid: str, ip_address: str, port: int) -> bool:
+		return self.__instance_guid == instance_guid and self.__ip_address == ip_address and self.__port == port
+
+
+class DeviceConnectionPool():
+
+	def __init__(self, *, open_connection: Callable[[str, int], object], close_connection: Callable[[object], None], idle_seconds: float, connection_seconds_maximum: float, connections_per_device_maximum: int, cycle_interval_seconds: float, on_exception: Callable[[Exception], None], is_connection_open: Callable[[object], bool] = None):
+		# NOTE open connections are kept per device instance and address and reused until they were idle for idle_seconds or open for connection_seconds_maximum,
+		#  while no more than connections_per_device_maximum connections to a device are open at the same time
+		# NOTE an idle_seconds of zero closes every connection once released, which is required by devices that close the connection after each transmission
+		# NOTE every cycle_interval_seconds the expired idle connections are closed
+		# NOTE if is_connection_open is provided an idle connection is checked with it before being reused, so that one closed by the device is replaced
+
+		if connections_per_device_maximum < 1:
+			raise Exception(f"At least one connection per device is required. Found: {connections_per_device_maximum}.")
+
+		self.__open_connection = open_connection
+		self.__close_connection = close_connection
+		self.__idle_seconds = idle_seconds
+		self.__connection_seconds_maximum = connection_seconds_maximum
+		self.__connections_per_device_maximum = connections_per_device_maximum
+		self.__on_exception = on_exception
+		self.__is_connection_open = is_connection_open
+
+		self.__idle_device_connections_per_device_guid = {}  # type: Dict[str, List[DeviceConnection]]
+		self.__leased_device_connections_total_per_device_guid = {}  # type: Dict[str, int]
+		self.__invalidated_time_per_device_guid = {}  # type: Dict[str, float]
+		self.__opened_connections_total = 0
+		self.__reused_connections_total = 0
+		self.__stale_connections_total = 0
+		self.__closed_connections_total = 0
+		self.__connections_condition = threading.Condition()
+		self.__periodic_worker = PeriodicWorker(
+			name="DeviceConnectionPool",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.close_expired,
+			on_exception=on_exception
+		)
+
+	def __is_expired(self, *, device_connection: DeviceConnection, now_time: float) -> bool:
+		return device_connection.get_opened_time() <= self.__invalidated_time_per_device_guid.get(device_connection.get_device_guid(), float("-inf")) or \
+			now_time - device_connection.get_released_time() >= self.__idle_seconds or \
+			now_time - device_connection.get_opened_time() >= self.__connection_seconds_maximum
+
+	def __close(self, *, device_connections: List[DeviceConnection]):
+
+		# NOTE called without holding the condition since closing a connection may block on the network
+
+		for _device_connection in device_connections:
+			try:
+				self.__close_connection(_device_connection.get_connection())
+			except Exception as ex:
+				self.__on_exception(ex)
+
+		self.__connections_condition.acquire()
+		self.__closed_connections_total += len(device_connections)
+		self.__connections_condition.release()
+
+	def acquire(self, *, device_guid: str, instance_guid: str, ip_address: str, port: int) -> Tuple[DeviceConnection, bool]:
+
+		# NOTE returns an open connection to the device and if it was reused, waiting while the device has the maximum number of connections in use
+
+		_to_close_device_connections = []  # type: List[DeviceConnection]
+		_device_connection = None  # type: DeviceConnection
+
+		self.__connections_condition.acquire()
+
+		try:
+			while self.__leased_device_connections_total_per_device_guid.get(device_guid, 0) >= self.__connections_per_device_maximum:
+				self.__connections_condition.wait()
+
+			# connections to a previous instance or address of the device are of no further use
+			_now_time = time.perf_counter()
+			_idle_device_connections = self.__idle_device_connections_per_device_guid.pop(device_guid, [])
+			for _idle_device_connection in _idle_device_connections:
+				if self.__is_expired(device_connection=_idle_device_connection, now_time=_now_time) or not _idle_device_connection.is_addressed_to(instance_guid=instance_guid, ip_address=ip_address, port=port):
+					_to_close_device_connections.append(_idle_device_connection)
+				elif _device_connection is None:
+					_device_connection = _idle_device_connection
+				else:
+					self.__idle_device_connections_per_device_guid.setdefault(device_guid, []).append(_idle_device_connection)
+
+			self.__leased_device_connections_total_per_device_guid[device_guid] = self.__leased_device_connections_total_per_device_guid.get(device_guid, 0) + 1
+		except Exception as ex:
+			self.__connections_condition.release()
+			raise ex
+
+		self.__connections_condition.release()
+
+		if _device_connection is not None and self.__is_connection_open is not None:
+			try:
+				_is_connection_open = self.__is_connection_open(_device_connection.get_connection())
+			except Exception as ex:
+				_is_connection_open = False
+				self.__on_exception(ex)
+			if not _is_connection_open:
+				# the device closed the connection while it was idle, so a new connection is opened before anything is written
+				_to_close_device_connections.append(_device_connection)
+				_device_connection = None
+				self.__connections_condition.acquire()
+				self.__stale_connections_total += 1
+				self.__connections_condition.release()
+
+		self.__close(
+			device_connections=_to_close_device_connections
+		)
+
+		if _device_connection is not None:
+			self.__connections_condition.acquire()
+			self.__reused_connections_total += 1
+			self.__connections_condition.release()
+			return _device_connection, True
+
+		try:
+			_connection = self.__open_connection(ip_address, port)
+		except Exception as ex:
+			self.__connections_condition.acquire()
+			self.__release_lease(
+				device_guid=device_guid
+			)
+			self.__connections_condition.release()
+			raise ex
+
+		self.__connections_condition.acquire()
+		self.__opened_connections_total += 1
+		self.__connections_condition.release()
+
+		return DeviceConnection(
+			device_guid=device_guid,
+			instance_guid=instance_guid,
+			ip_address=ip_address,
+			port=port,
+			connection=_connection,
+			opened_time=time.perf_counter()
+		), False
+
+	def __release_lease(self, *, device_guid: str):
+
+		# NOTE called while holding the condition
+
+		self.__leased_device_connections_total_per_device_guid[device_guid] -= 1
+		if self.__leased_device_connections_total_per_device_guid[device_guid] == 0:
+			del self.__leased_device_connections_total_per_device_guid[device_guid]
+		self.__connections_condition.notify_all()
+
+	def release(self, *, device_connection: DeviceConnection, is_reusable: bool):
+
+		# NOTE a connection is only reusable if the transmission sent over it completed, since a failed write may leave it in an unknown state
+
+		_to_close_device_connections = []  # type: List[DeviceConnection]
+
+		self.__connections_condition.acquire()
+
+		try:
+			_now_time = time.perf_counter()
+			device_connection.set_released_time(
+				released_time=_now_time
+			)
+			if is_reusable and not self.__periodic_worker.is_disposed() and not self.__is_expired(device_connection=device_connection, now_time=_now_time):
+				self.__idle_device_connections_per_device_guid.setdefault(device_connection.get_device_guid(), []).append(device_connection)
+			else:
+				_to_close_device_connections.append(device_connection)
+			self.__release_lease(
+				device_guid=device_connection.get_device_guid()
+			)
+		except Exception as ex:
+			self.__connections_condition.release()
+			raise ex
+
+		self.__connections_condition.release()
+
+		self.__close(
+			device_connections=_to_close_device_connections
+		)
+
+	def invalidate(self, *, device_guid: str):
+
+		# NOTE closes the connections to the device, for when it announced a new instance or address, where those in use are closed once released
+
+		self.__connections_condition.acquire()
+		self.__invalidated_time_per_device_guid[device_guid] = time.perf_counter()
+		_to_close_device_connections = self.__idle_device_connections_per_device_guid.pop(device_guid, [])
+		self.__connections_condition.release()
+
+		self.__close(
+			device_connections=_to_close_device_connections
+		)
+
+	def close_expired(self) -> int:
+
+		_to_close_device_connections = []  # type: List[DeviceConnection]
+
+		self.__connections_condition.acquire()
+
+		try:
+			_now_time = time.perf_counter()
+			for _device_guid in list(self.__idle_device_connections_per_device_guid.keys()):
+				_idle_device_connections = []  # type: List[DeviceConnection]
+				for _idle_device_connection in self.__idle_device_connections_per_device_guid[_device_guid]:
+					if self.__is_expired(device_connection=_idle_device_connection, now_time=_now_time):
+						_to_close_device_connections.append(_idle_device_connection)
+					else:
+						_idle_device_connections.append(_idle_device_connection)
+				if len(_idle_device_connections) == 0:
+					del self.__idle_device_connections_per_device_guid[_device_guid]
+				else:
+					self.__idle_device_connections_per_device_guid[_device_guid] = _idle_device_connections
+		except Exception as ex:
+			self.__connections_condition.release()
+			raise ex
+
+		self.__connections_condition.release()
+
+		self.__close(
+			device_connections=_to_close_device_connections
+		)
+
+		return len(_to_close_device_connections)
+
+	def get_statistics(self) -> Dict:
+
+		self.__connections_condition.acquire()
+		_statistics = {
+			"idle_connections_total": sum([len(_idle_device_connections) for _idle_device_connections in self.__idle_device_connections_per_device_guid.values()]),
+			"leased_connections_total": sum(self.__leased_device_connections_total_per_device_guid.values()),
+			"opened_connections_total": self.__opened_connections_total,
+			"reused_connections_total": self.__reused_connections_total,
+			"stale_connections_total": self.__stale_connections_total,
+			"closed_connections_total": self.__closed_connections_total
+		}
+		self.__connections_condition.release()
+
+		return _statistics
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+
+		self.__periodic_worker.dispose()
+
+		# the connections still in use are closed once released
+		self.__connections_condition.acquire()
+		_to_close_device_connections = [_idle_device_connection for _idle_device_connections in self.__idle_device_connections_per_device_guid.values() for _idle_device_connection in _idle_device_connections]
+		self.__idle_device_connections_per_device_guid.clear()
+		self.__connections_condition.release()
+
+		self.__close(
+			device_connections=_to_close_device_connections
+		)
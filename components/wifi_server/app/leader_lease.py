@@ -0,0 +1,100 @@
+from __future__ import annotations
+from app.database import DatabaseFactory
+from app.periodic_worker import PeriodicWorker
+from typing import List, Tuple, Dict, Callable
+import threading
+import uuid
+
+
+class LeaderLease():
+
+	def __init__(self, *, database_factory: DatabaseFactory, lease_name: str, lease_seconds: float, cycle_interval_seconds: float, on_leader_cycle: Callable[[], None], on_exception: Callable[[Exception], None]):
+		# NOTE every process sharing the database file tries to acquire the lease every cycle_interval_seconds and the one holding it
+		#  calls on_leader_cycle, so a leader that stops renewing is replaced once lease_seconds have passed
+
+		if cycle_interval_seconds >= lease_seconds:
+			raise Exception(f"The lease must outlast the cycle interval. Cycle interval: {cycle_interval_seconds}, lease: {lease_seconds}.")
+
+		self.__database_factory = database_factory
+		self.__lease_name = lease_name
+		self.__lease_seconds = lease_seconds
+		self.__on_leader_cycle = on_leader_cycle
+
+		self.__holder_guid = str(uuid.uuid4()).upper()
+		self.__is_leader = False
+		self.__leader_terms_total = 0
+		self.__cycle_semaphore = threading.Semaphore()
+		self.__periodic_worker = PeriodicWorker(
+			name="LeaderLease",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.cycle,
+			on_exception=on_exception,
+			is_cycled_on_start=True
+		)
+
+	def get_holder_guid(self) -> str:
+		return self.__holder_guid
+
+	def is_leader(self) -> bool:
+		return self.__is_leader
+
+	def cycle(self) -> bool:
+
+		# NOTE acquires or renews the lease, calls on_leader_cycle while holding it, and returns if this process is the leader
+
+		self.__cycle_semaphore.acquire()
+
+		try:
+			try:
+				_is_leader = self.__database_factory.get_database().try_acquire_lease(
+					lease_name=self.__lease_name,
+					holder_guid=self.__holder_guid,
+					lease_seconds=self.__lease_seconds
+				)
+			except Exception as ex:
+				# a lease that could not be renewed may already belong to another process
+				self.__is_leader = False
+				raise ex
+
+			if _is_leader and not self.__is_leader:
+				self.__leader_terms_total += 1
+			self.__is_leader = _is_leader
+
+			if self.__is_leader:
+				self.__on_leader_cycle()
+		except Exception as ex:
+			self.__cycle_semaphore.release()
+			raise ex
+
+		self.__cycle_semaphore.release()
+
+		return self.__is_leader
+
+	def get_statistics(self) -> Dict:
+		return {
+			"holder_guid": self.__holder_guid,
+			"is_leader": self.__is_leader,
+			"leader_terms_total": self.__leader_terms_total
+		}
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+
+		self.__periodic_worker.dispose()
+
+		# another process may take over right away instead of waiting for the lease to expire
+		self.__cycle_semaphore.acquire()
+		try:
+			if self.__is_leader:
+				self.__is_leader = False
+				self.__database_factory.get_database().release_lease(
+					lease_name=self.__lease_name,
+					holder_guid=self.__holder_guid
+				)
+		except Exception as ex:
+			self.__cycle_semaphore.release()
+			raise ex
+
+		self.__cycle_semaphore.release()
@@ -1,14 +1,23 @@
 from fastapi import FastAPI, Request
-from app.database import DatabaseFactory, Database, ApiEntrypoint
+from app.database import DatabaseFactory, Database, ApiEntrypoint, Device, TransmissionReceipt
 import traceback
 from typing import List, Tuple, Dict
 import json
 import uuid
 from concurrent.futures import ThreadPoolExecutor
 import asyncio
+import os
+from datetime import datetime, timedelta
 from pydantic import BaseModel
 from austin_heller_repo.socket import ClientSocketFactory, ClientSocket
-from app.transmitter import Transmitter, TransmissionDequeueCyclingUnitOfWork
+from app.transmitter import Transmitter, TransmissionDequeueCyclingUnitOfWork, get_device_connection_pool
+from app.destination_circuit_breaker import DestinationCircuitBreaker
+from app.api_entrypoint_log_writer import ApiEntrypointLogWriter, ApiEntrypointLogOverflowPolicy
+from app.retention import Retention
+from app.snapshotter import Snapshotter
+from app.leader_lease import LeaderLease
+from app.transmission_dequeue_reaper import TransmissionDequeueReaper
+from app.transmission_retry_scheduler import TransmissionRetryScheduler
 from app.transmission_parser import SendJsonTransmissionParser, ChangePurposeTransmissionParser, SendJsonTransmissionParserFactory, ChangePurposeTransmissionParserFactory
 
 
@@ -23,7 +32,30 @@ app = FastAPI()
 
 
 # setup Transmitter
-__database_factory = DatabaseFactory()
+# NOTE set WIFI_SERVER_DATABASE_FILE_PATH to keep queued transmissions across restarts, otherwise the database is in memory
+#  and set WIFI_SERVER_SNAPSHOT_DIRECTORY_PATH to have the in-memory database restored from its newest periodic snapshot instead
+# NOTE set WIFI_SERVER_DATABASE_SHARDS_TOTAL to spread transmissions by queue across that many databases, each with its own transmitter
+# NOTE set WIFI_SERVER_TRANSMITTER_DELIVERY_WORKERS_TOTAL to the number of destination devices each transmitter delivers to at the same time
+# NOTE set WIFI_SERVER_TRANSMITTER_BATCH_TRANSMISSIONS_TOTAL_MAXIMUM to the number of consecutive json transmissions to a device sent under one header,
+#  split so that the files of a header stay within WIFI_SERVER_TRANSMITTER_BATCH_BYTES_TOTAL_MAXIMUM bytes
+# NOTE WEB_CONCURRENCY is the number of worker processes started by uvicorn, which then share the database file
+#  and elect one of them through a lease in the database to run the transmitters
+__workers_total = int(os.environ.get("WEB_CONCURRENCY", 1))
+if __workers_total > 1:
+	if os.environ.get("WIFI_SERVER_DATABASE_FILE_PATH", None) is None:
+		raise Exception("WIFI_SERVER_DATABASE_FILE_PATH must be set when running more than one worker, since an in-memory database is not shared between processes.")
+	if os.environ.get("WIFI_SERVER_SNAPSHOT_DIRECTORY_PATH", None) is not None:
+		raise Exception("Snapshots are not supported when running more than one worker.")
+	if int(os.environ.get("WIFI_SERVER_DATABASE_SHARDS_TOTAL", 1)) > 1:
+		raise Exception("Shards are not supported when running more than one worker, since their delivery order is coordinated within one process.")
+
+__database_factory = DatabaseFactory(
+	database_file_path=os.environ.get("WIFI_SERVER_DATABASE_FILE_PATH", None),
+	snapshot_directory_path=os.environ.get("WIFI_SERVER_SNAPSHOT_DIRECTORY_PATH", None),
+	shards_total=int(os.environ.get("WIFI_SERVER_DATABASE_SHARDS_TOTAL", 1)),
+	busy_timeout_seconds=float(os.environ.get("WIFI_SERVER_DATABASE_BUSY_TIMEOUT_SECONDS", 5.0)),
+	transmission_dequeue_lease_seconds=float(os.environ.get("WIFI_SERVER_TRANSMISSION_DEQUEUE_LEASE_SECONDS", 30))
+)
 __client_socket_factory = ClientSocketFactory(
 	to_server_packet_bytes_length=4096,
 	server_read_failed_delay_seconds=0.1
@@ -34,19 +66,170 @@ def __on_exception(ex: Exception):
 	print(f"Error: Transmitter: {ex}")
 
 
+def __on_device_connection_pool_exception(ex: Exception):
+	print(f"Error: DeviceConnectionPool: {ex}")
+
+
+# NOTE set WIFI_SERVER_DEVICE_CONNECTION_IDLE_SECONDS to keep connections to devices open between transmissions for devices that read more than one transmission per connection,
+#  otherwise a connection is opened for every transmission
+__device_connection_pool = get_device_connection_pool(
+	client_socket_factory=__client_socket_factory,
+	idle_seconds=float(os.environ.get("WIFI_SERVER_DEVICE_CONNECTION_IDLE_SECONDS", 0)),
+	connection_seconds_maximum=float(os.environ.get("WIFI_SERVER_DEVICE_CONNECTION_SECONDS_MAXIMUM", 300)),
+	connections_per_device_maximum=int(os.environ.get("WIFI_SERVER_DEVICE_CONNECTIONS_PER_DEVICE_MAXIMUM", 1)),
+	cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_DEVICE_CONNECTION_POOL_CYCLE_INTERVAL_SECONDS", 1)),
+	on_exception=__on_device_connection_pool_exception
+)
+__device_connection_pool.start()
+
+
 _send_json_transmission_parser_factory = SendJsonTransmissionParserFactory()
 
 _change_purpose_transmission_parser_factory = ChangePurposeTransmissionParserFactory()
 
-__transmitter = Transmitter(
-	transmission_dequeue_cycling_unit_of_work=TransmissionDequeueCyclingUnitOfWork(
+__transmitters = []  # type: List[Transmitter]
+
+
+def __on_destination_backoff_elapsed():
+	global __transmitters
+	global __leader_lease
+	# the transmissions held back from a destination device may be claimed again, by this worker only while it is the leader
+	if __leader_lease is None or __leader_lease.is_leader():
+		for _transmitter in __transmitters:
+			_transmitter.trigger_transmission_dequeue()
+
+
+def __on_destination_circuit_breaker_exception(ex: Exception):
+	print(f"Error: DestinationCircuitBreaker: {ex}")
+
+
+# NOTE a destination device that failed a delivery is backed off for WIFI_SERVER_DESTINATION_BACKOFF_SECONDS_MINIMUM doubling up to WIFI_SERVER_DESTINATION_BACKOFF_SECONDS_MAXIMUM,
+#  while its transmissions are only recorded as failed once WIFI_SERVER_DESTINATION_CIRCUIT_FAILURES_TOTAL_THRESHOLD consecutive deliveries failed
+__destination_circuit_breaker = DestinationCircuitBreaker(
+	failures_total_threshold=int(os.environ.get("WIFI_SERVER_DESTINATION_CIRCUIT_FAILURES_TOTAL_THRESHOLD", 3)),
+	backoff_seconds_minimum=float(os.environ.get("WIFI_SERVER_DESTINATION_BACKOFF_SECONDS_MINIMUM", 1)),
+	backoff_seconds_maximum=float(os.environ.get("WIFI_SERVER_DESTINATION_BACKOFF_SECONDS_MAXIMUM", 300)),
+	jitter_ratio=float(os.environ.get("WIFI_SERVER_DESTINATION_BACKOFF_JITTER_RATIO", 0.5)),
+	cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_DESTINATION_CIRCUIT_BREAKER_CYCLE_INTERVAL_SECONDS", 0.5)),
+	on_backoff_elapsed=__on_destination_backoff_elapsed,
+	on_exception=__on_destination_circuit_breaker_exception
+)
+__destination_circuit_breaker.start()
+
+
+def __on_transmission_dequeues_processed():
+	global __transmitters
+	# a delivered transmission may have been holding back transmissions to the same destination device within other shards
+	for _transmitter in __transmitters:
+		_transmitter.trigger_transmission_dequeue()
+
+
+for _shard_index in range(__database_factory.get_shards_total()):
+	__transmitters.append(Transmitter(
+		transmission_dequeue_cycling_unit_of_work=TransmissionDequeueCyclingUnitOfWork(
+			database_factory=__database_factory,
+			client_socket_factory=__client_socket_factory,
+			send_json_transmission_parser_factory=_send_json_transmission_parser_factory,
+			change_purpose_transmission_parser_factory=_change_purpose_transmission_parser_factory,
+			delivery_workers_total=int(os.environ.get("WIFI_SERVER_TRANSMITTER_DELIVERY_WORKERS_TOTAL", 4)),
+			shard_index=_shard_index,
+			on_transmission_dequeues_processed=__on_transmission_dequeues_processed if __database_factory.get_shards_total() > 1 else None,
+			transmission_dequeue_lease_renew_interval_seconds=float(os.environ.get("WIFI_SERVER_TRANSMISSION_DEQUEUE_LEASE_SECONDS", 30)) / 3,
+			device_connection_pool=__device_connection_pool,
+			batch_transmissions_total_maximum=int(os.environ.get("WIFI_SERVER_TRANSMITTER_BATCH_TRANSMISSIONS_TOTAL_MAXIMUM", 16)),
+			batch_bytes_total_maximum=int(os.environ.get("WIFI_SERVER_TRANSMITTER_BATCH_BYTES_TOTAL_MAXIMUM", 65536)),
+			destination_circuit_breaker=__destination_circuit_breaker
+		),
+		on_exception=__on_exception
+	))
+
+
+def __on_leader_cycle():
+	global __transmitters
+	# the leader picks up the transmissions sent through the other workers
+	for _transmitter in __transmitters:
+		_transmitter.trigger_transmission_dequeue()
+
+
+def __on_leader_lease_exception(ex: Exception):
+	print(f"Error: LeaderLease: {ex}")
+
+
+if __workers_total == 1:
+	__leader_lease = None
+else:
+	__leader_lease = LeaderLease(
 		database_factory=__database_factory,
-		client_socket_factory=__client_socket_factory,
-		send_json_transmission_parser_factory=_send_json_transmission_parser_factory,
-		change_purpose_transmission_parser_factory=_change_purpose_transmission_parser_factory
-	),
-	on_exception=__on_exception
+		lease_name="transmitter",
+		lease_seconds=float(os.environ.get("WIFI_SERVER_TRANSMITTER_LEASE_SECONDS", 5)),
+		cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_TRANSMITTER_LEASE_CYCLE_INTERVAL_SECONDS", 0.5)),
+		on_leader_cycle=__on_leader_cycle,
+		on_exception=__on_leader_lease_exception
+	)
+	__leader_lease.start()
+
+
+def trigger_transmission_dequeue(*, queue_guid: str):
+	global __database_factory
+	global __transmitters
+	global __leader_lease
+	# trigger the transmitter of the shard holding the queue, potentially adding a processing thread
+	#  unless another worker is the leader, which then finds the transmission within its next cycle
+	if __leader_lease is None or __leader_lease.is_leader():
+		__transmitters[__database_factory.get_shard_index(
+			queue_guid=queue_guid
+		)].trigger_transmission_dequeue()
+
+
+def __on_transmission_dequeues_reaped(reaped_rows_total: int):
+	global __transmitters
+	global __leader_lease
+	print(f"TransmissionDequeueReaper: {reaped_rows_total} transmission(s) with an expired lease exposed again")
+	if __leader_lease is None or __leader_lease.is_leader():
+		for _transmitter in __transmitters:
+			_transmitter.trigger_transmission_dequeue()
+
+
+def __on_transmission_dequeue_reaper_exception(ex: Exception):
+	print(f"Error: TransmissionDequeueReaper: {ex}")
+
+
+# NOTE transmissions claimed by a transmitter that stopped before completing or failing them are delivered again once their lease expires
+__transmission_dequeue_reaper = TransmissionDequeueReaper(
+	database_factory=__database_factory,
+	batch_rows_total=int(os.environ.get("WIFI_SERVER_TRANSMISSION_DEQUEUE_REAPER_BATCH_ROWS_TOTAL", 100)),
+	cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_TRANSMISSION_DEQUEUE_REAPER_CYCLE_INTERVAL_SECONDS", 1)),
+	on_reaped=__on_transmission_dequeues_reaped,
+	on_exception=__on_transmission_dequeue_reaper_exception
+)
+__transmission_dequeue_reaper.start()
+
+
+def __on_transmissions_retried(retried_total: int):
+	global __transmitters
+	global __leader_lease
+	print(f"TransmissionRetryScheduler: {retried_total} failed transmission(s) ready to retry")
+	if __leader_lease is None or __leader_lease.is_leader():
+		for _transmitter in __transmitters:
+			_transmitter.trigger_transmission_dequeue()
+
+
+def __on_transmission_retry_scheduler_exception(ex: Exception):
+	print(f"Error: TransmissionRetryScheduler: {ex}")
+
+
+# NOTE failed transmissions are retried after the comma separated WIFI_SERVER_TRANSMISSION_RETRY_BACKOFF_SECONDS, one for each failure in turn,
+#  until WIFI_SERVER_TRANSMISSION_RETRY_ATTEMPTS_TOTAL_MAXIMUM deliveries failed and the transmission is cancelled as dead-lettered
+__transmission_retry_scheduler = TransmissionRetryScheduler(
+	database_factory=__database_factory,
+	attempts_total_maximum=int(os.environ.get("WIFI_SERVER_TRANSMISSION_RETRY_ATTEMPTS_TOTAL_MAXIMUM", 5)),
+	backoff_seconds=[float(_backoff_seconds) for _backoff_seconds in os.environ.get("WIFI_SERVER_TRANSMISSION_RETRY_BACKOFF_SECONDS", "5,30,120,600").split(",")],
+	batch_rows_total=int(os.environ.get("WIFI_SERVER_TRANSMISSION_RETRY_BATCH_ROWS_TOTAL", 100)),
+	cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_TRANSMISSION_RETRY_CYCLE_INTERVAL_SECONDS", 1)),
+	on_retried=__on_transmissions_retried,
+	on_exception=__on_transmission_retry_scheduler_exception
 )
+__transmission_retry_scheduler.start()
 
 
 def get_database() -> Database:
@@ -54,6 +237,99 @@ def get_database() -> Database:
 	return __database_factory.get_database()
 
 
+def __on_api_entrypoint_log_writer_exception(ex: Exception):
+	print(f"Error: ApiEntrypointLogWriter: {ex}")
+
+
+# NOTE api entrypoint logs are buffered and written in batches and the buffer is written out on shutdown,
+#  so the most recent logs are only lost if the process is killed without shutting down
+__api_entrypoint_log_writer = ApiEntrypointLogWriter(
+	database_factory=__database_factory,
+	flush_interval_seconds=float(os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_FLUSH_INTERVAL_SECONDS", 0.25)),
+	flush_rows_total=int(os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_FLUSH_ROWS_TOTAL", 256)),
+	buffered_rows_total_maximum=int(os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_BUFFERED_ROWS_TOTAL_MAXIMUM", 8192)),
+	overflow_policy=ApiEntrypointLogOverflowPolicy[os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_OVERFLOW_POLICY", ApiEntrypointLogOverflowPolicy.DropOldest.name)],
+	sample_rate=float(os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_SAMPLE_RATE", 1.0)),
+	is_request_headers_captured=os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_IS_REQUEST_HEADERS_CAPTURED", "true").lower() == "true",
+	on_exception=__on_api_entrypoint_log_writer_exception
+)
+
+
+def get_api_entrypoint_log_writer() -> ApiEntrypointLogWriter:
+	global __api_entrypoint_log_writer
+	return __api_entrypoint_log_writer
+
+
+def __on_retention_exception(ex: Exception):
+	print(f"Error: Retention: {ex}")
+
+
+# NOTE set WIFI_SERVER_ARCHIVE_DIRECTORY_PATH to periodically move completed transmissions and old api entrypoint logs into archive segment files
+if os.environ.get("WIFI_SERVER_ARCHIVE_DIRECTORY_PATH", None) is None:
+	__retention = None
+else:
+	__retention = Retention(
+		database_factory=__database_factory,
+		archive_directory_path=os.environ["WIFI_SERVER_ARCHIVE_DIRECTORY_PATH"],
+		transmission_retention_seconds=float(os.environ.get("WIFI_SERVER_TRANSMISSION_RETENTION_SECONDS", 24 * 60 * 60)),
+		api_entrypoint_log_retention_seconds=float(os.environ.get("WIFI_SERVER_API_ENTRYPOINT_LOG_RETENTION_SECONDS", 7 * 24 * 60 * 60)),
+		batch_rows_total=int(os.environ.get("WIFI_SERVER_RETENTION_BATCH_ROWS_TOTAL", 500)),
+		cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_RETENTION_CYCLE_INTERVAL_SECONDS", 60)),
+		on_exception=__on_retention_exception
+	)
+	__retention.start()
+
+
+def __on_snapshotter_exception(ex: Exception):
+	print(f"Error: Snapshotter: {ex}")
+
+
+if os.environ.get("WIFI_SERVER_SNAPSHOT_DIRECTORY_PATH", None) is None:
+	__snapshotter = None
+else:
+	__snapshotter = Snapshotter(
+		database_factory=__database_factory,
+		snapshot_directory_path=os.environ["WIFI_SERVER_SNAPSHOT_DIRECTORY_PATH"],
+		pages_per_step=int(os.environ.get("WIFI_SERVER_SNAPSHOT_PAGES_PER_STEP", 256)),
+		snapshots_total_maximum=int(os.environ.get("WIFI_SERVER_SNAPSHOTS_TOTAL_MAXIMUM", 3)),
+		cycle_interval_seconds=float(os.environ.get("WIFI_SERVER_SNAPSHOT_CYCLE_INTERVAL_SECONDS", 60)),
+		on_exception=__on_snapshotter_exception
+	)
+	__snapshotter.start()
+
+
+@app.on_event("shutdown")
+def __on_shutdown():
+	global __api_entrypoint_log_writer
+	global __retention
+	global __snapshotter
+	global __leader_lease
+	global __transmission_dequeue_reaper
+	global __transmitters
+	global __device_connection_pool
+	global __destination_circuit_breaker
+	global __transmission_retry_scheduler
+	# write out the buffered api entrypoint logs so that they are kept in the database and its last snapshot
+	__api_entrypoint_log_writer.dispose()
+	__transmission_dequeue_reaper.dispose()
+	__transmission_retry_scheduler.dispose()
+	__destination_circuit_breaker.dispose()
+	# let the transmissions in flight finish before another worker may claim the next ones
+	for _transmitter in __transmitters:
+		_transmitter.dispose()
+	__device_connection_pool.dispose()
+	# hand the transmitters over to another worker right away
+	if __leader_lease is not None:
+		__leader_lease.dispose()
+	# let an archive in progress finish so that the last snapshot does not capture it halfway
+	if __retention is not None:
+		__retention.dispose()
+	# take one last snapshot so that a restart resumes from where this process stopped
+	if __snapshotter is not None:
+		__snapshotter.dispose()
+		__snapshotter.snapshot()
+
+
 def log_api_entrypoint(*, api_entrypoint: ApiEntrypoint, args_json: Dict, request: Request):
 	try:
 		_altered_json = args_json.copy()
@@ -70,22 +346,25 @@ def log_api_entrypoint(*, api_entrypoint: ApiEntrypoint, args_json: Dict, reques
 			"client": {
 				"host": request.client.host,
 				"port": request.client.port
-			},
-			"headers": request.headers.items()
+			}
 		}
 
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer()
+		if _api_entrypoint_log_writer.is_request_headers_captured():
+			_altered_json["request"]["headers"] = request.headers.items()
+
 		_database = get_database()
 		_client = _database.insert_client(
 			ip_address=request.client.host
 		)
 
-		# NOTE errors here could indicate that new api entry point has not been added to database
+		# NOTE errors when the logs are flushed could indicate that new api entry point has not been added to database
 		#  check the __initialize function in the database module
 
-		_database.insert_api_entrypoint_log(
+		_api_entrypoint_log_writer.add_api_entrypoint_log(
 			client_guid=_client.get_client_guid(),
 			api_entrypoint=api_entrypoint,
-			input_json_string=json.dumps(_altered_json)
+			input_json=_altered_json
 		)
 	except Exception as ex:
 		_error_message = f"{str(ex)} after entry point {api_entrypoint}"
@@ -173,15 +452,28 @@ def v1_receive_device_announcement(receive_device_announcement_base_model: Recei
 	_error_message = None
 
 	try:
-		_database = get_database()
-		_client = _database.insert_client(
-			ip_address=request.client.host
+		# every shard needs the device for the transmissions to and from it and to mark them ready to retry
+		_device = None  # type: Device
+		for _database in __database_factory.get_shard_databases():
+			_client = _database.insert_client(
+				ip_address=request.client.host
+			)
+			_shard_device = _database.insert_device(
+				device_guid=receive_device_announcement_base_model.device_guid,
+				client_guid=_client.get_client_guid(),
+				purpose_guid=receive_device_announcement_base_model.purpose_guid,
+				socket_port=receive_device_announcement_base_model.socket_port,
+				instance_guid=None if _device is None else _device.get_instance_guid()
+			)
+			if _device is None:
+				_device = _shard_device
+		# the device restarted or moved, so connections to it are no longer of use
+		__device_connection_pool.invalidate(
+			device_guid=_device.get_device_guid()
 		)
-		_device = _database.insert_device(
-			device_guid=receive_device_announcement_base_model.device_guid,
-			client_guid=_client.get_client_guid(),
-			purpose_guid=receive_device_announcement_base_model.purpose_guid,
-			socket_port=receive_device_announcement_base_model.socket_port
+		# the device is expected to be reachable again
+		__destination_circuit_breaker.reset(
+			destination_device_guid=_device.get_device_guid()
 		)
 		_response_json = {
 			"device": _device.to_json()
@@ -201,6 +493,7 @@ def v1_receive_device_announcement(receive_device_announcement_base_model: Recei
 
 class ListAvailableDevicesBaseModel(BaseModel):
 	purpose_guid: str
+	last_known_within_seconds: float = None
 
 
 @app.post("/v1/device/list")
@@ -218,8 +511,13 @@ def v1_list_available_devices(list_available_devices_base_model: ListAvailableDe
 
 	try:
 		_database = get_database()
+		if list_available_devices_base_model.last_known_within_seconds is None:
+			_minimum_last_known_datetime = None
+		else:
+			_minimum_last_known_datetime = datetime.utcnow() - timedelta(seconds=list_available_devices_base_model.last_known_within_seconds)
 		_devices = _database.get_devices_by_purpose(
-			purpose_guid=list_available_devices_base_model.purpose_guid
+			purpose_guid=list_available_devices_base_model.purpose_guid,
+			minimum_last_known_datetime=_minimum_last_known_datetime
 		)
 		_devices_json_array = []
 		for _device in _devices:
@@ -262,7 +560,9 @@ def v1_send_json_transmission(send_json_transmission_base_model: SendJsonTransmi
 	_error_message = None
 
 	try:
-		_database = get_database()
+		_database = __database_factory.get_shard_database(
+			queue_guid=send_json_transmission_base_model.queue_guid
+		)
 		_client = _database.insert_client(
 			ip_address=request.client.host
 		)
@@ -287,8 +587,9 @@ def v1_send_json_transmission(send_json_transmission_base_model: SendJsonTransmi
 			destination_device_instance_guid=send_json_transmission_base_model.destination_device_instance_guid
 		)
 
-		# trigger transmitter, potentially adding a processing thread
-		__transmitter.trigger_transmission_dequeue()
+		trigger_transmission_dequeue(
+			queue_guid=_queue.get_queue_guid()
+		)
 
 		_response_json = {
 			"transmission": _transmission.to_json()
@@ -305,6 +606,78 @@ def v1_send_json_transmission(send_json_transmission_base_model: SendJsonTransmi
 	}
 
 
+class SendJsonTransmissionBatchBaseModel(BaseModel):
+	transmissions: List[SendJsonTransmissionBaseModel]
+
+
+@app.post("/v1/transmission/send_json_batch")
+def v1_send_json_transmission_batch(send_json_transmission_batch_base_model: SendJsonTransmissionBatchBaseModel, request: Request):
+
+	log_api_entrypoint(
+		api_entrypoint=ApiEntrypoint.V1ReceiveDeviceTransmissionBatch,
+		args_json=json.loads(send_json_transmission_batch_base_model.json()),
+		request=request
+	)
+
+	_is_successful = False
+	_response_json = None
+	_error_message = None
+
+	try:
+		# the transmissions are grouped by the shard of their queue while keeping the order they were given in
+		_transmission_parser = SendJsonTransmissionParser()
+		_indexed_transmissions_per_shard_index = {}  # type: Dict[int, List[Tuple[int, Tuple[str, str, str, str, str, str]]]]
+		for _index, _send_json_transmission_base_model in enumerate(send_json_transmission_batch_base_model.transmissions):
+			_encapsulated_json_string = _transmission_parser.store_transmission(
+				json_string=json.dumps({
+					"message": _send_json_transmission_base_model.transmission_json_string
+				})
+			)
+			_shard_index = __database_factory.get_shard_index(
+				queue_guid=_send_json_transmission_base_model.queue_guid
+			)
+			if _shard_index not in _indexed_transmissions_per_shard_index:
+				_indexed_transmissions_per_shard_index[_shard_index] = []
+			_indexed_transmissions_per_shard_index[_shard_index].append((_index, (_send_json_transmission_base_model.queue_guid, _send_json_transmission_base_model.source_device_guid, _send_json_transmission_base_model.source_device_instance_guid, _encapsulated_json_string, _send_json_transmission_base_model.destination_device_guid, _send_json_transmission_base_model.destination_device_instance_guid)))
+
+		_transmission_receipts = [None] * len(send_json_transmission_batch_base_model.transmissions)  # type: List[TransmissionReceipt]
+		for _shard_index, _indexed_transmissions in _indexed_transmissions_per_shard_index.items():
+			_database = __database_factory.get_shard_databases()[_shard_index]
+			_client = _database.insert_client(
+				ip_address=request.client.host
+			)
+			for _queue_guid in {_transmission[0] for _index, _transmission in _indexed_transmissions}:
+				_database.insert_queue(
+					queue_guid=_queue_guid
+				)
+
+			# the transmissions of each shard are enqueued in one transaction, in the order given
+			_shard_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[_transmission for _index, _transmission in _indexed_transmissions]
+			)
+			for (_index, _transmission), _transmission_receipt in zip(_indexed_transmissions, _shard_transmission_receipts):
+				_transmission_receipts[_index] = _transmission_receipt
+
+			trigger_transmission_dequeue(
+				queue_guid=_indexed_transmissions[0][1][0]
+			)
+
+		_response_json = {
+			"transmissions": [_transmission_receipt.to_json() for _transmission_receipt in _transmission_receipts]
+		}
+		_is_successful = True
+	except Exception as ex:
+		_error_message = str(ex)
+		traceback.print_exc()
+
+	return {
+		"is_successful": _is_successful,
+		"response": _response_json,
+		"error": _error_message
+	}
+
+
 @app.post("/v1/uuid")
 def v1_get_uuid(request: Request):
 
@@ -334,6 +707,43 @@ def v1_get_uuid(request: Request):
 	}
 
 
+@app.get("/v1/queue/stats")
+def v1_get_queue_stats(request: Request):
+
+	global __database_factory
+
+	log_api_entrypoint(
+		api_entrypoint=ApiEntrypoint.V1GetQueueStats,
+		args_json={},
+		request=request
+	)
+
+	_is_successful = False
+	_response_json = None
+	_error_message = None
+
+	try:
+		_queue_stats, _destination_device_stats = __database_factory.get_queue_stats()
+		_response_json = {
+			"queues": [_queue_stats_element.to_json() for _queue_stats_element in _queue_stats],
+			"destination_devices": [_destination_device_stats_element.to_json() for _destination_device_stats_element in _destination_device_stats],
+			# the circuits are kept by this worker process
+			"destination_circuit_breaker": __destination_circuit_breaker.get_statistics(),
+			"destination_circuits": [_destination_circuit.to_json() for _destination_circuit in __destination_circuit_breaker.get_destination_circuits()],
+			"transmission_retry_scheduler": __transmission_retry_scheduler.get_statistics()
+		}
+		_is_successful = True
+	except Exception as ex:
+		_error_message = str(ex)
+		traceback.print_exc()
+
+	return {
+		"is_successful": _is_successful,
+		"response": _response_json,
+		"error": _error_message
+	}
+
+
 class DownloadGitRepositoryBaseModel(BaseModel):
 	queue_guid: str
 	source_device_guid: str
@@ -358,7 +768,9 @@ def v1_download_git_repository(download_git_repository_base_model: DownloadGitRe
 
 	try:
 
-		_database = get_database()
+		_database = __database_factory.get_shard_database(
+			queue_guid=download_git_repository_base_model.queue_guid
+		)
 		_client = _database.insert_client(
 			ip_address=request.client.host
 		)
@@ -383,8 +795,9 @@ def v1_download_git_repository(download_git_repository_base_model: DownloadGitRe
 			destination_device_instance_guid=download_git_repository_base_model.destination_device_instance_guid
 		)
 
-		# trigger transmitter, potentially adding a processing thread
-		__transmitter.trigger_transmission_dequeue()
+		trigger_transmission_dequeue(
+			queue_guid=_queue.get_queue_guid()
+		)
 
 		_response_json = {
 			"transmission": _transmission.to_json()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+from typing import List, Tuple, Dict, Callable
+import threading
+
+
+class PeriodicWorker():
+
+	def __init__(self, *, name: str, cycle_interval_seconds: float, cycle: Callable[[], object], on_exception: Callable[[Exception], None], is_cycled_on_start: bool = False):
+		# NOTE once started, cycle is called on a daemon thread every cycle_interval_seconds until disposed, and also right away if is_cycled_on_start,
+		#  where an exception raised by a cycle is passed to on_exception without stopping the thread
+		# NOTE the name is that of the component performing the work, for the error raised when it is started twice
+
+		self.__name = name
+		self.__cycle_interval_seconds = cycle_interval_seconds
+		self.__cycle = cycle
+		self.__on_exception = on_exception
+		self.__is_cycled_on_start = is_cycled_on_start
+
+		self.__cycle_thread = None  # type: threading.Thread
+		self.__is_disposed_event = threading.Event()
+
+	def __cycle_thread_method(self):
+
+		_is_disposed = not self.__is_cycled_on_start and self.__is_disposed_event.wait(self.__cycle_interval_seconds)
+		while not _is_disposed:
+			try:
+				self.__cycle()
+			except Exception as ex:
+				self.__on_exception(ex)
+			_is_disposed = self.__is_disposed_event.wait(self.__cycle_interval_seconds)
+
+	def is_disposed(self) -> bool:
+		return self.__is_disposed_event.is_set()
+
+	def start(self):
+
+		if self.__cycle_thread is not None:
+			raise Exception(f"{self.__name} already started.")
+
+		self.__cycle_thread = threading.Thread(
+			target=self.__cycle_thread_method,
+			daemon=True
+		)
+		self.__cycle_thread.start()
+
+	def dispose(self):
+
+		# NOTE waits for a cycle in progress to finish
+
+		self.__is_disposed_event.set()
+		if self.__cycle_thread is not None:
+			self.__cycle_thread.join()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+from app.database import DatabaseFactory
+from app.periodic_worker import PeriodicWorker
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict, Callable
+import threading
+import uuid
+import json
+import gzip
+import os
+
+
+class Retention():
+
+	def __init__(self, *, database_factory: DatabaseFactory, archive_directory_path: str, transmission_retention_seconds: float, api_entrypoint_log_retention_seconds: float, batch_rows_total: int, cycle_interval_seconds: float, on_exception: Callable[[Exception], None]):
+		# NOTE terminal transmission chains and api entrypoint logs older than their retention are moved out of the live tables
+		#  into gzip compressed json lines segment files within archive_directory_path, batch_rows_total at a time
+
+		self.__database_factory = database_factory
+		self.__archive_directory_path = archive_directory_path
+		self.__transmission_retention_seconds = transmission_retention_seconds
+		self.__api_entrypoint_log_retention_seconds = api_entrypoint_log_retention_seconds
+		self.__batch_rows_total = batch_rows_total
+
+		self.__archived_rows_total_per_table_name = {}  # type: Dict[str, int]
+		self.__archive_segments_total = 0
+		self.__archive_semaphore = threading.Semaphore()
+		self.__periodic_worker = PeriodicWorker(
+			name="Retention",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.archive,
+			on_exception=on_exception
+		)
+
+		os.makedirs(self.__archive_directory_path, exist_ok=True)
+
+	def __write_archive_segment(self, *, segment_name: str, rows_per_table_name: Dict[str, List[Dict]]):
+
+		_archive_segment_file_name = f"{segment_name}_{datetime.utcnow().strftime('%Y%m%d%H%M%S%f')}_{str(uuid.uuid4()).upper()}.jsonl.gz"
+		_archive_segment_file_path = os.path.join(self.__archive_directory_path, _archive_segment_file_name)
+
+		# the segment only appears under its final name once it is completely written
+		_temporary_file_path = f"{_archive_segment_file_path}.tmp"
+		try:
+			with open(_temporary_file_path, "wb") as _file_handle:
+				with gzip.GzipFile(fileobj=_file_handle, mode="wb") as _gzip_file_handle:
+					for _table_name, _rows in rows_per_table_name.items():
+						for _row in _rows:
+							_gzip_file_handle.write((json.dumps({"table": _table_name, "row": _row}) + "\n").encode())
+				_file_handle.flush()
+				os.fsync(_file_handle.fileno())
+			os.replace(_temporary_file_path, _archive_segment_file_path)
+		except Exception as ex:
+			if os.path.exists(_temporary_file_path):
+				os.remove(_temporary_file_path)
+			raise ex
+
+		self.__archive_segments_total += 1
+
+	def __add_archived_rows_totals(self, *, archived_rows_total_per_table_name: Dict[str, int]) -> int:
+
+		_archived_rows_total = 0
+		for _table_name, _archived_rows_total_for_table in archived_rows_total_per_table_name.items():
+			if _table_name not in self.__archived_rows_total_per_table_name:
+				self.__archived_rows_total_per_table_name[_table_name] = 0
+			self.__archived_rows_total_per_table_name[_table_name] += _archived_rows_total_for_table
+			_archived_rows_total += _archived_rows_total_for_table
+		return _archived_rows_total
+
+	def archive(self) -> int:
+
+		# NOTE archives batch after batch until nothing older than the retention remains and returns the number of rows archived
+
+		self.__archive_semaphore.acquire()
+
+		try:
+			_database = self.__database_factory.get_database()
+			_now = datetime.utcnow()
+
+			_archived_rows_total = 0
+			# the api entrypoint logs are only ever written to the first shard, but transmissions live within every shard
+			for _shard_database in self.__database_factory.get_shard_databases():
+				_is_transmission_archived = True
+				while _is_transmission_archived:
+					_archived_rows_total_per_table_name = _shard_database.archive_terminal_transmissions(
+						maximum_row_created_datetime=_now - timedelta(seconds=self.__transmission_retention_seconds),
+						transmissions_total_maximum=self.__batch_rows_total,
+						write_archive_segment_method=lambda _rows_per_table_name: self.__write_archive_segment(
+							segment_name="transmission",
+							rows_per_table_name=_rows_per_table_name
+						)
+					)
+					_is_transmission_archived = len(_archived_rows_total_per_table_name) != 0
+					_archived_rows_total += self.__add_archived_rows_totals(
+						archived_rows_total_per_table_name=_archived_rows_total_per_table_name
+					)
+
+			_is_api_entrypoint_log_archived = True
+			while _is_api_entrypoint_log_archived:
+				_archived_rows_total_per_table_name = _database.archive_api_entrypoint_logs(
+					maximum_row_created_datetime=_now - timedelta(seconds=self.__api_entrypoint_log_retention_seconds),
+					api_entrypoint_logs_total_maximum=self.__batch_rows_total,
+					write_archive_segment_method=lambda _rows_per_table_name: self.__write_archive_segment(
+						segment_name="api_entrypoint_log",
+						rows_per_table_name=_rows_per_table_name
+					)
+				)
+				_is_api_entrypoint_log_archived = len(_archived_rows_total_per_table_name) != 0
+				_archived_rows_total += self.__add_archived_rows_totals(
+					archived_rows_total_per_table_name=_archived_rows_total_per_table_name
+				)
+		except Exception as ex:
+			self.__archive_semaphore.release()
+			raise ex
+
+		self.__archive_semaphore.release()
+
+		return _archived_rows_total
+
+	def get_statistics(self) -> Dict:
+
+		_live_rows_total_per_table_name = {}  # type: Dict[str, int]
+		for _shard_database in self.__database_factory.get_shard_databases():
+			for _table_name, _live_rows_total in _shard_database.get_table_rows_totals().items():
+				if _table_name not in _live_rows_total_per_table_name:
+					_live_rows_total_per_table_name[_table_name] = 0
+				_live_rows_total_per_table_name[_table_name] += _live_rows_total
+
+		return {
+			"archived_rows_total_per_table_name": self.__archived_rows_total_per_table_name.copy(),
+			"archive_segments_total": self.__archive_segments_total,
+			"live_rows_total_per_table_name": _live_rows_total_per_table_name
+		}
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+		self.__periodic_worker.dispose()
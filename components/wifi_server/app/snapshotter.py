@@ -0,0 +1,71 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database
+from app.periodic_worker import PeriodicWorker
+from typing import List, Tuple, Dict, Callable
+import threading
+import os
+
+
+class Snapshotter():
+
+	def __init__(self, *, database_factory: DatabaseFactory, snapshot_directory_path: str, pages_per_step: int, snapshots_total_maximum: int, cycle_interval_seconds: float, on_exception: Callable[[Exception], None]):
+		# NOTE the database is copied into a new snapshot file within snapshot_directory_path every cycle_interval_seconds
+		#  and only the newest snapshots_total_maximum snapshots are kept
+
+		self.__database_factory = database_factory
+		self.__snapshot_directory_path = snapshot_directory_path
+		self.__pages_per_step = pages_per_step
+		self.__snapshots_total_maximum = snapshots_total_maximum
+
+		self.__snapshots_total = 0
+		self.__maximum_pause_seconds = 0.0
+		self.__last_snapshot_statistics = None  # type: Dict[str, object]
+		self.__snapshot_semaphore = threading.Semaphore()
+		self.__periodic_worker = PeriodicWorker(
+			name="Snapshotter",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.snapshot,
+			on_exception=on_exception
+		)
+
+		os.makedirs(self.__snapshot_directory_path, exist_ok=True)
+
+	def snapshot(self) -> Dict[str, object]:
+
+		self.__snapshot_semaphore.acquire()
+
+		try:
+			_snapshot_statistics = self.__database_factory.get_database().snapshot(
+				snapshot_directory_path=self.__snapshot_directory_path,
+				pages_per_step=self.__pages_per_step
+			)
+
+			self.__snapshots_total += 1
+			self.__maximum_pause_seconds = max(self.__maximum_pause_seconds, _snapshot_statistics["maximum_pause_seconds"])
+			self.__last_snapshot_statistics = _snapshot_statistics
+
+			_snapshot_file_paths = Database.get_snapshot_file_paths(
+				snapshot_directory_path=self.__snapshot_directory_path
+			)
+			for _snapshot_file_path in _snapshot_file_paths[:max(0, len(_snapshot_file_paths) - self.__snapshots_total_maximum)]:
+				os.remove(_snapshot_file_path)
+		except Exception as ex:
+			self.__snapshot_semaphore.release()
+			raise ex
+
+		self.__snapshot_semaphore.release()
+
+		return _snapshot_statistics
+
+	def get_statistics(self) -> Dict:
+		return {
+			"snapshots_total": self.__snapshots_total,
+			"maximum_pause_seconds": self.__maximum_pause_seconds,
+			"last_snapshot": None if self.__last_snapshot_statistics is None else self.__last_snapshot_statistics.copy()
+		}
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+		self.__periodic_worker.dispose()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+from app.database import Database, Client, TransmissionDequeue
+from typing import List, Tuple, Dict, Callable, Set
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+class TransmissionDeliveryPool():
+
+	def __init__(self, *, database: Database, delivery_workers_total: int, deliver: Callable[[Database, Client, List[TransmissionDequeue]], None], on_delivered: Callable[[], None], on_exception: Callable[[Exception], None], batch_transmissions_total_maximum: int = 1, batched_parser_type: str = None, get_excluded_destination_device_guids: Callable[[], Set[str]] = None, on_excluded: Callable[[List[str]], None] = None):
+		# NOTE up to delivery_workers_total batches of transmissions are delivered at the same time by calling deliver, each one as soon as a worker is idle,
+		#  and on_delivered is called after each delivery
+		# NOTE a batch holds up to batch_transmissions_total_maximum consecutive transmissions to one destination device stored by the batched_parser_type
+		# NOTE transmissions to the destination devices returned by get_excluded_destination_device_guids are not claimed, such as those of devices that recently failed,
+		#  and on_excluded is called with the destination devices whose next transmission was passed over because of it
+		# NOTE the database never claims a transmission while an earlier transmission to the same destination device or from the same queue is in flight,
+		#  so the workers only ever deliver to distinct destination devices and the order per destination device and per queue is kept
+
+		if delivery_workers_total < 1:
+			raise Exception(f"At least one delivery worker is required. Found: {delivery_workers_total}.")
+
+		self.__database = database
+		self.__delivery_workers_total = delivery_workers_total
+		self.__deliver = deliver
+		self.__on_delivered = on_delivered
+		self.__on_exception = on_exception
+		self.__batch_transmissions_total_maximum = batch_transmissions_total_maximum
+		self.__batched_parser_type = batched_parser_type
+		self.__get_excluded_destination_device_guids = get_excluded_destination_device_guids
+		self.__on_excluded = on_excluded
+
+		self.__client = None  # type: Client
+		self.__in_flight_total = 0
+		self.__delivered_total = 0
+		self.__delivered_transmissions_total = 0
+		self.__dispatch_semaphore = threading.Semaphore()
+		self.__thread_pool_executor = ThreadPoolExecutor(
+			max_workers=delivery_workers_total
+		)
+		self.__is_disposed = False
+
+	def dispatch(self) -> int:
+
+		# NOTE claims a batch of transmissions for every idle worker and returns the number of batches claimed
+
+		self.__dispatch_semaphore.acquire()
+
+		try:
+			_transmission_dequeue_batches = []  # type: List[List[TransmissionDequeue]]
+			if not self.__is_disposed and self.__in_flight_total < self.__delivery_workers_total:
+				if self.__client is None:
+					self.__client = self.__database.insert_client(
+						ip_address="0.0.0.0"
+					)
+				_transmission_dequeue_batches = self.__database.get_next_transmission_dequeue_batches(
+					client_guid=self.__client.get_client_guid(),
+					limit=self.__delivery_workers_total - self.__in_flight_total,
+					batch_transmissions_total_maximum=self.__batch_transmissions_total_maximum,
+					batched_parser_type=self.__batched_parser_type,
+					excluded_destination_device_guids=None if self.__get_excluded_destination_device_guids is None else self.__get_excluded_destination_device_guids(),
+					on_excluded=self.__on_excluded
+				)
+				self.__in_flight_total += len(_transmission_dequeue_batches)
+				for _transmission_dequeue_batch in _transmission_dequeue_batches:
+					self.__thread_pool_executor.submit(self.__deliver_transmission_dequeue_batch, _transmission_dequeue_batch)
+		except Exception as ex:
+			self.__dispatch_semaphore.release()
+			raise ex
+
+		self.__dispatch_semaphore.release()
+
+		return len(_transmission_dequeue_batches)
+
+	def __deliver_transmission_dequeue_batch(self, transmission_dequeue_batch: List[TransmissionDequeue]):
+
+		try:
+			self.__deliver(self.__database, self.__client, transmission_dequeue_batch)
+		except Exception as ex:
+			self.__on_exception(ex)
+
+		self.__dispatch_semaphore.acquire()
+		self.__in_flight_total -= 1
+		self.__delivered_total += 1
+		self.__delivered_transmissions_total += len(transmission_dequeue_batch)
+		self.__dispatch_semaphore.release()
+
+		try:
+			self.__on_delivered()
+
+			# the worker is idle again and the delivery may have exposed the next transmission to its destination device
+			self.dispatch()
+		except Exception as ex:
+			self.__on_exception(ex)
+
+	def get_statistics(self) -> Dict:
+		return {
+			"delivery_workers_total": self.__delivery_workers_total,
+			"in_flight_total": self.__in_flight_total,
+			"delivered_total": self.__delivered_total,
+			"delivered_transmissions_total": self.__delivered_transmissions_total
+		}
+
+	def dispose(self):
+
+		self.__dispatch_semaphore.acquire()
+		self.__is_disposed = True
+		self.__dispatch_semaphore.release()
+
+		# the transmissions in flight are delivered before returning
+		self.__thread_pool_executor.shutdown(
+			wait=True
+		)
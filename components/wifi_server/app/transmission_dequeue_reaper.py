@@ -0,0 +1,64 @@
+from __future__ import annotations
+from app.database import DatabaseFactory
+from app.periodic_worker import PeriodicWorker
+from typing import List, Tuple, Dict, Callable
+import threading
+
+
+class TransmissionDequeueReaper():
+
+	def __init__(self, *, database_factory: DatabaseFactory, batch_rows_total: int, cycle_interval_seconds: float, on_reaped: Callable[[int], None], on_exception: Callable[[Exception], None]):
+		# NOTE every cycle_interval_seconds the transmissions whose dequeue lease expired are made pending again, batch_rows_total at a time,
+		#  and on_reaped is called with the number of transmissions exposed so that they may be delivered again
+
+		self.__database_factory = database_factory
+		self.__batch_rows_total = batch_rows_total
+		self.__on_reaped = on_reaped
+
+		self.__reaped_rows_total = 0
+		self.__reap_semaphore = threading.Semaphore()
+		self.__periodic_worker = PeriodicWorker(
+			name="TransmissionDequeueReaper",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.reap,
+			on_exception=on_exception
+		)
+
+	def reap(self) -> int:
+
+		# NOTE reaps batch after batch until no expired lease remains and returns the number of transmissions exposed again
+
+		self.__reap_semaphore.acquire()
+
+		try:
+			_reaped_rows_total = 0
+			for _shard_database in self.__database_factory.get_shard_databases():
+				_is_reaped = True
+				while _is_reaped:
+					_batch_reaped_rows_total = _shard_database.reap_expired_transmission_dequeues(
+						transmission_dequeues_total_maximum=self.__batch_rows_total
+					)
+					_is_reaped = _batch_reaped_rows_total == self.__batch_rows_total
+					_reaped_rows_total += _batch_reaped_rows_total
+			self.__reaped_rows_total += _reaped_rows_total
+
+			if _reaped_rows_total != 0:
+				self.__on_reaped(_reaped_rows_total)
+		except Exception as ex:
+			self.__reap_semaphore.release()
+			raise ex
+
+		self.__reap_semaphore.release()
+
+		return _reaped_rows_total
+
+	def get_statistics(self) -> Dict:
+		return {
+			"reaped_rows_total": self.__reaped_rows_total
+		}
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+		self.__periodic_worker.dispose()
@@ -3,6 +3,7 @@ from abc import ABC, abstractmethod
 from austin_heller_repo.socket import Encryption, json, ClientSocket
 import tempfile
 import os
+from typing import List
 from app.git_interface import GitInterface
 
 
@@ -108,7 +109,7 @@ class SendJsonTransmissionParser(TransmissionParser):
 		})
 		return _encapsulated_json_string
 
-	def process_transmission(self, *, json_string: str, source_device_guid: str, source_instance_guid: str, source_purpose_guid: str, destination_device_guid: str, destination_instance_guid: str, destination_purpose_guid: str, client_socket: ClientSocket):
+	def __get_file_path(self, *, json_string: str) -> str:
 
 		_json = json.loads(json_string)
 		if "parser_type" not in _json:
@@ -120,24 +121,58 @@ class SendJsonTransmissionParser(TransmissionParser):
 		elif not os.path.exists(_json["file_path"]):
 			raise Exception(f"File missing: \"{_json['file_path']}\".")
 		else:
-			client_socket.write(json.dumps({
-				"type": "send message",
-				"meta": {
-					"total": 1
-				},
-				"routing": {
-					"source_device_guid": source_device_guid,
-					"source_instance_guid": source_instance_guid,
-					"source_purpose_guid": source_purpose_guid,
-					"destination_device_guid": destination_device_guid,
-					"destination_instance_guid": destination_instance_guid,
-					"destination_purpose_guid": destination_purpose_guid
-				}
-			}))
+			return _json["file_path"]
+
+	def get_stored_bytes_total(self, *, json_string: str) -> int:
+		return os.path.getsize(self.__get_file_path(
+			json_string=json_string
+		))
+
+	def process_transmission(self, *, json_string: str, source_device_guid: str, source_instance_guid: str, source_purpose_guid: str, destination_device_guid: str, destination_instance_guid: str, destination_purpose_guid: str, client_socket: ClientSocket):
+
+		self.process_transmissions(
+			json_strings=[json_string],
+			source_device_guid=source_device_guid,
+			source_instance_guid=source_instance_guid,
+			source_purpose_guid=source_purpose_guid,
+			destination_device_guid=destination_device_guid,
+			destination_instance_guid=destination_instance_guid,
+			destination_purpose_guid=destination_purpose_guid,
+			client_socket=client_socket
+		)
+
+	def process_transmissions(self, *, json_strings: List[str], source_device_guid: str, source_instance_guid: str, source_purpose_guid: str, destination_device_guid: str, destination_instance_guid: str, destination_purpose_guid: str, client_socket: ClientSocket):
+
+		# NOTE the transmissions are sent under one header so that the destination device reads all of them from the same connection,
+		#  and their files are only removed once every one of them was sent so that they may be sent again after a failure
+
+		_file_paths = []  # type: List[str]
+		for _json_string in json_strings:
+			_file_paths.append(self.__get_file_path(
+				json_string=_json_string
+			))
+
+		client_socket.write(json.dumps({
+			"type": "send message",
+			"meta": {
+				"total": len(_file_paths)
+			},
+			"routing": {
+				"source_device_guid": source_device_guid,
+				"source_instance_guid": source_instance_guid,
+				"source_purpose_guid": source_purpose_guid,
+				"destination_device_guid": destination_device_guid,
+				"destination_instance_guid": destination_instance_guid,
+				"destination_purpose_guid": destination_purpose_guid
+			}
+		}))
+		for _file_path in _file_paths:
 			client_socket.upload(
-				file_path=_json["file_path"]
+				file_path=_file_path
 			)
-			os.unlink(_json["file_path"])
+
+		for _file_path in _file_paths:
+			os.unlink(_file_path)
 
 
 class SendJsonTransmissionParserFactory():
@@ -0,0 +1,166 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database, TransmissionStatus, TransmissionDequeueErrorTransmissionDequeue
+from app.periodic_worker import PeriodicWorker
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict, Callable
+import threading
+
+
+class TransmissionRetryScheduler():
+
+	def __init__(self, *, database_factory: DatabaseFactory, attempts_total_maximum: int, backoff_seconds: List[float], batch_rows_total: int, cycle_interval_seconds: float, on_retried: Callable[[int], None], on_exception: Callable[[Exception], None]):
+		# NOTE every cycle_interval_seconds the failed transmissions are decided on behalf of their source devices, batch_rows_total at a time,
+		#  where a transmission that failed attempts_total_maximum times is cancelled as dead-lettered and any other is retried after backoff_seconds[n - 1] for its n-th failure,
+		#  or the last backoff for any later failure, and on_retried is called with the number of transmissions that became ready to retry
+		# NOTE a failed transmission remains the head of its destination device and queue while waiting, so the transmissions behind it keep their order
+
+		if attempts_total_maximum < 1:
+			raise Exception(f"At least one attempt is required. Found: {attempts_total_maximum}.")
+		if len(backoff_seconds) == 0:
+			raise Exception("At least one backoff is required.")
+
+		self.__database_factory = database_factory
+		self.__attempts_total_maximum = attempts_total_maximum
+		self.__backoff_seconds = backoff_seconds
+		self.__batch_rows_total = batch_rows_total
+		self.__on_retried = on_retried
+
+		self.__client_guid_per_shard_index = {}  # type: Dict[int, str]
+		self.__first_failed_datetime_and_shard_index_per_transmission_guid = {}  # type: Dict[str, Tuple[datetime, int]]
+		self.__retries_scheduled_total = 0
+		self.__retried_total = 0
+		self.__dead_lettered_total = 0
+		self.__recovered_total = 0
+		self.__recovery_seconds_total = 0.0
+		self.__recovery_seconds_maximum = 0.0
+		self.__schedule_semaphore = threading.Semaphore()
+		self.__periodic_worker = PeriodicWorker(
+			name="TransmissionRetryScheduler",
+			cycle_interval_seconds=cycle_interval_seconds,
+			cycle=self.schedule,
+			on_exception=on_exception
+		)
+
+	def __decide_failed_transmission(self, *, shard_database: Database, shard_index: int, client_guid: str, transmission_dequeue_error_transmission_dequeue: TransmissionDequeueErrorTransmissionDequeue):
+
+		_transmission_guid = transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission().get_transmission_dequeue().get_transmission_guid()
+		_transmission_dequeue_error_transmissions = shard_database.get_transmission_dequeue_error_transmissions(
+			transmission_guid=_transmission_guid
+		)
+		_failures_total = len(_transmission_dequeue_error_transmissions)
+
+		if _failures_total >= self.__attempts_total_maximum:
+			# the transmission is given up so that the transmissions behind it may be delivered
+			shard_database.failed_transmission_completed(
+				client_guid=client_guid,
+				transmission_dequeue_error_transmission_dequeue_guid=transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+				is_retry_requested=False
+			)
+			self.__first_failed_datetime_and_shard_index_per_transmission_guid.pop(_transmission_guid, None)
+			self.__dead_lettered_total += 1
+		else:
+			shard_database.failed_transmission_completed(
+				client_guid=client_guid,
+				transmission_dequeue_error_transmission_dequeue_guid=transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+				is_retry_requested=True,
+				retry_datetime=datetime.utcnow() + timedelta(seconds=self.__backoff_seconds[min(_failures_total, len(self.__backoff_seconds)) - 1])
+			)
+			self.__first_failed_datetime_and_shard_index_per_transmission_guid[_transmission_guid] = (_transmission_dequeue_error_transmissions[0].get_row_created_datetime(), shard_index)
+			self.__retries_scheduled_total += 1
+
+	def __measure_recoveries(self):
+
+		# NOTE the time to recovery spans from the first failure of a retried transmission until it is found complete, so it is measured to within a cycle
+
+		for _transmission_guid, (_first_failed_datetime, _shard_index) in list(self.__first_failed_datetime_and_shard_index_per_transmission_guid.items()):
+			_is_successful, _transmission = self.__database_factory.get_shard_databases()[_shard_index].try_get_transmission(
+				transmission_guid=_transmission_guid
+			)
+			if not _is_successful or _transmission.get_status() >= TransmissionStatus.Complete:
+				del self.__first_failed_datetime_and_shard_index_per_transmission_guid[_transmission_guid]
+				if _is_successful and _transmission.get_status() == TransmissionStatus.Complete:
+					_recovery_seconds = (datetime.utcnow() - _first_failed_datetime).total_seconds()
+					self.__recovered_total += 1
+					self.__recovery_seconds_total += _recovery_seconds
+					self.__recovery_seconds_maximum = max(self.__recovery_seconds_maximum, _recovery_seconds)
+
+	def schedule(self) -> int:
+
+		# NOTE decides the failed transmissions, retries those whose backoff passed, and returns the number of transmissions ready to retry
+
+		self.__schedule_semaphore.acquire()
+
+		try:
+			_retried_total = 0
+			for _shard_index, _shard_database in enumerate(self.__database_factory.get_shard_databases()):
+				if _shard_index not in self.__client_guid_per_shard_index:
+					self.__client_guid_per_shard_index[_shard_index] = _shard_database.insert_client(
+						ip_address="0.0.0.0"
+					).get_client_guid()
+				_client_guid = self.__client_guid_per_shard_index[_shard_index]
+
+				_decided_rows_total = 0
+				_transmission_dequeue_error_transmission_dequeue = _shard_database.get_next_failed_transmission_dequeue(
+					client_guid=_client_guid
+				)
+				while _transmission_dequeue_error_transmission_dequeue is not None:
+					try:
+						self.__decide_failed_transmission(
+							shard_database=_shard_database,
+							shard_index=_shard_index,
+							client_guid=_client_guid,
+							transmission_dequeue_error_transmission_dequeue=_transmission_dequeue_error_transmission_dequeue
+						)
+					except Exception as ex:
+						# the failed transmission is decided again once its source device announces itself
+						_shard_database.failed_transmission_failed(
+							client_guid=_client_guid,
+							transmission_dequeue_error_transmission_dequeue_guid=_transmission_dequeue_error_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+							error_message_json_string=str(ex)
+						)
+						raise ex
+					_decided_rows_total += 1
+					if _decided_rows_total == self.__batch_rows_total:
+						_transmission_dequeue_error_transmission_dequeue = None
+					else:
+						_transmission_dequeue_error_transmission_dequeue = _shard_database.get_next_failed_transmission_dequeue(
+							client_guid=_client_guid
+						)
+
+				_is_retried = True
+				while _is_retried:
+					_batch_retried_total = len(_shard_database.retry_scheduled_transmissions(
+						transmissions_total_maximum=self.__batch_rows_total
+					))
+					_is_retried = _batch_retried_total == self.__batch_rows_total
+					_retried_total += _batch_retried_total
+			self.__retried_total += _retried_total
+
+			self.__measure_recoveries()
+
+			if _retried_total != 0:
+				self.__on_retried(_retried_total)
+		except Exception as ex:
+			self.__schedule_semaphore.release()
+			raise ex
+
+		self.__schedule_semaphore.release()
+
+		return _retried_total
+
+	def get_statistics(self) -> Dict:
+		return {
+			"retries_scheduled_total": self.__retries_scheduled_total,
+			"retried_total": self.__retried_total,
+			"dead_lettered_total": self.__dead_lettered_total,
+			"awaiting_recovery_total": len(self.__first_failed_datetime_and_shard_index_per_transmission_guid),
+			"recovered_total": self.__recovered_total,
+			"recovery_seconds_average": None if self.__recovered_total == 0 else self.__recovery_seconds_total / self.__recovered_total,
+			"recovery_seconds_maximum": self.__recovery_seconds_maximum
+		}
+
+	def start(self):
+		self.__periodic_worker.start()
+
+	def dispose(self):
+		self.__periodic_worker.dispose()
@@ -1,81 +1,365 @@
 from __future__ import annotations
-from austin_heller_repo.socket import ThreadCycle, CyclingUnitOfWork, ThreadCycleCache, PreparedSemaphoreRequest, ClientSocketFactory, json
-from app.database import DatabaseFactory, TransmissionDequeue
-from app.transmission_parser import SendJsonTransmissionParser, ChangePurposeTransmissionParser, TransmissionParser
-from typing import List
+from austin_heller_repo.socket import ThreadCycle, CyclingUnitOfWork, ThreadCycleCache, PreparedSemaphoreRequest, ClientSocketFactory, ClientSocket, json
+from app.database import DatabaseFactory, Database, Client, TransmissionDequeue
+from app.transmission_parser import SendJsonTransmissionParser, ChangePurposeTransmissionParser, TransmissionParser, SendJsonTransmissionParserFactory, ChangePurposeTransmissionParserFactory
+from app.transmission_delivery_pool import TransmissionDeliveryPool
+from app.device_connection_pool import DeviceConnectionPool, is_socket_open
+from app.destination_circuit_breaker import DestinationCircuitBreaker, DestinationCircuitState
+from typing import List, Tuple, Dict, Callable
+import threading
+import socket
+
+
+def get_client_socket_socket(*, client_socket: ClientSocket) -> socket.socket:
+
+	# NOTE the client socket does not expose its socket, so it is read from the private attribute of the client socket,
+	#  failing instead of taking every connection to be open should the attribute no longer be found
+
+	_socket = getattr(client_socket, "_ClientSocket__socket", None)
+	if _socket is None:
+		raise Exception(f"The socket of the client socket was not found. Found: {type(client_socket).__name__}.")
+	return _socket
+
+
+def get_device_connection_pool(*, client_socket_factory: ClientSocketFactory, idle_seconds: float, connection_seconds_maximum: float, connections_per_device_maximum: int, cycle_interval_seconds: float, on_exception: Callable[[Exception], None]) -> DeviceConnectionPool:
+
+	def _open_connection(ip_address: str, port: int) -> ClientSocket:
+		_client_socket = client_socket_factory.get_client_socket()
+		_client_socket.connect_to_server(
+			ip_address=ip_address,
+			port=port
+		)
+		return _client_socket
+
+	def _close_connection(client_socket: ClientSocket):
+		client_socket.close()
+
+	def _is_connection_open(client_socket: ClientSocket) -> bool:
+		return is_socket_open(
+			socket_object=get_client_socket_socket(
+				client_socket=client_socket
+			)
+		)
+
+	return DeviceConnectionPool(
+		open_connection=_open_connection,
+		close_connection=_close_connection,
+		idle_seconds=idle_seconds,
+		connection_seconds_maximum=connection_seconds_maximum,
+		connections_per_device_maximum=connections_per_device_maximum,
+		cycle_interval_seconds=cycle_interval_seconds,
+		on_exception=on_exception,
+		is_connection_open=_is_connection_open
+	)
+
+
+class WriteTrackingClientSocket():
+
+	# NOTE passes everything through to the client socket while recording whether a write or upload completed over it
+
+	def __init__(self, *, client_socket: ClientSocket):
+
+		self.__client_socket = client_socket
+		self.__is_written = False
+
+	def is_written(self) -> bool:
+		return self.__is_written
+
+	def write(self, *args, **kwargs):
+		self.__client_socket.write(*args, **kwargs)
+		self.__is_written = True
+
+	def upload(self, *args, **kwargs):
+		self.__client_socket.upload(*args, **kwargs)
+		self.__is_written = True
+
+	def __getattr__(self, name: str):
+		return getattr(self.__client_socket, name)
 
 
 class TransmissionDequeueCyclingUnitOfWork(CyclingUnitOfWork):
 
-	def __init__(self, *, database_factory: DatabaseFactory, client_socket_factory: ClientSocketFactory, send_json_transmission_parser_factory: SendJsonTransmissionParserFactory, change_purpose_transmission_parser_factory: ChangePurposeTransmissionParserFactory):
+	def __init__(self, *, database_factory: DatabaseFactory, client_socket_factory: ClientSocketFactory, send_json_transmission_parser_factory: SendJsonTransmissionParserFactory, change_purpose_transmission_parser_factory: ChangePurposeTransmissionParserFactory, delivery_workers_total: int = 1, shard_index: int = 0, on_transmission_dequeues_processed: Callable[[], None] = None, transmission_dequeue_lease_renew_interval_seconds: float = None, device_connection_pool: DeviceConnectionPool = None, batch_transmissions_total_maximum: int = 1, batch_bytes_total_maximum: int = None, destination_circuit_breaker: DestinationCircuitBreaker = None):
 		super().__init__()
 
+		# NOTE on_transmission_dequeues_processed is called after transmissions were delivered so that the transmitters of other shards
+		#  may claim transmissions to the same destination devices that were waiting on them
+		# NOTE the lease of a transmission dequeue is renewed every transmission_dequeue_lease_renew_interval_seconds while it is being delivered,
+		#  which must be shorter than the lease of the database
+		# NOTE up to delivery_workers_total transmissions to distinct destination devices are delivered at the same time,
+		#  so that a slow destination device only holds up the transmissions sent to it
+		# NOTE the connections to the destination devices are reused through the device_connection_pool if provided,
+		#  otherwise a connection is opened for every transmission
+		# NOTE up to batch_transmissions_total_maximum consecutive json transmissions to the same destination device instance are claimed at once
+		#  and sent under one header, in parts of at most batch_bytes_total_maximum bytes unless a single transmission is larger
+		# NOTE if a destination_circuit_breaker is provided the transmissions of a failed delivery are released to be delivered again once the destination device backed off,
+		#  and only recorded as failed once its circuit opens, while the transmissions to destination devices that are backing off are not claimed
+
 		self.__database_factory = database_factory
 		self.__client_socket_factory = client_socket_factory
 		self.__send_json_transmission_parser_factory = send_json_transmission_parser_factory
 		self.__change_purpose_transmission_parser_factory = change_purpose_transmission_parser_factory
+		self.__shard_index = shard_index
+		self.__on_transmission_dequeues_processed = on_transmission_dequeues_processed
+		self.__transmission_dequeue_lease_renew_interval_seconds = transmission_dequeue_lease_renew_interval_seconds
+		self.__batch_bytes_total_maximum = batch_bytes_total_maximum
+		self.__destination_circuit_breaker = destination_circuit_breaker
 
-	def perform(self, *, try_get_next_work_queue_element_prepared_semaphore_request: PreparedSemaphoreRequest, acknowledge_nonempty_work_queue_prepared_semaphore_request: PreparedSemaphoreRequest) -> bool:
+		if device_connection_pool is None:
+			device_connection_pool = get_device_connection_pool(
+				client_socket_factory=client_socket_factory,
+				idle_seconds=0,
+				connection_seconds_maximum=0,
+				connections_per_device_maximum=1,
+				cycle_interval_seconds=1,
+				on_exception=self.__on_transmission_dequeue_delivery_exception
+			)
+		self.__device_connection_pool = device_connection_pool
 
-		print(f"TransmissionDequeueCyclingUnitOfWork: perform started")
-
-		_database = self.__database_factory.get_database()
-		_client = _database.insert_client(
-			ip_address="0.0.0.0"
-		)
-		_transmission_dequeue = None  # type: TransmissionDequeue
-		try_get_next_work_queue_element_prepared_semaphore_request.apply()
-		_transmission_dequeue = _database.get_next_transmission_dequeue(
-			client_guid=_client.get_client_guid()
+		self.__transmission_delivery_pool = TransmissionDeliveryPool(
+			database=database_factory.get_shard_databases()[shard_index],
+			delivery_workers_total=delivery_workers_total,
+			deliver=lambda database, client, transmission_dequeues: self.__process_transmission_dequeues(
+				database=database,
+				client=client,
+				transmission_dequeues=transmission_dequeues
+			),
+			on_delivered=self.__on_transmission_dequeue_delivered,
+			on_exception=self.__on_transmission_dequeue_delivery_exception,
+			batch_transmissions_total_maximum=batch_transmissions_total_maximum,
+			batched_parser_type=SendJsonTransmissionParser.__name__,
+			get_excluded_destination_device_guids=None if destination_circuit_breaker is None else destination_circuit_breaker.get_blocked_destination_device_guids,
+			on_excluded=None if destination_circuit_breaker is None else lambda destination_device_guids: destination_circuit_breaker.record_skipped(
+				destination_device_guids=destination_device_guids
+			)
 		)
-		if _transmission_dequeue is not None:
-			acknowledge_nonempty_work_queue_prepared_semaphore_request.apply()
-			_is_transmission_sent = False
+
+	def __on_transmission_dequeue_delivered(self):
+		if self.__on_transmission_dequeues_processed is not None:
+			self.__on_transmission_dequeues_processed()
+
+	def __on_transmission_dequeue_delivery_exception(self, ex: Exception):
+		print(f"TransmissionDequeueCyclingUnitOfWork: failed to deliver: {ex}")
+
+	def __renew_transmission_dequeue_lease_thread_method(self, *, database: Database, transmission_dequeues: List[TransmissionDequeue], is_processed_event: threading.Event):
+
+		_is_renewed = True
+		while _is_renewed and not is_processed_event.wait(self.__transmission_dequeue_lease_renew_interval_seconds):
 			try:
-				_parser_type = json.loads(_transmission_dequeue.get_transmission().get_stored_transmission_json_string())["parser_type"]
+				for _transmission_dequeue in transmission_dequeues:
+					if _is_renewed:
+						_is_renewed = database.renew_transmission_dequeue_lease(
+							transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+						)
+			except Exception as ex:
+				# the lease is left to expire so that the transmission is delivered again
+				print(f"TransmissionDequeueCyclingUnitOfWork: failed to renew lease: {ex}")
+				_is_renewed = False
+
+	def __process_transmission_dequeues(self, *, database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
 
-				_transmission_parser = None  # type: TransmissionParser
-				if _parser_type == SendJsonTransmissionParser.get_type_name():
-					_transmission_parser = self.__send_json_transmission_parser_factory.get_send_json_transmission_parser()
-				elif _parser_type == ChangePurposeTransmissionParser.get_type_name():
-					_transmission_parser = self.__change_purpose_transmission_parser_factory.get_change_purpose_transmission_parser()
+		if self.__transmission_dequeue_lease_renew_interval_seconds is None:
+			_renew_thread = None
+		else:
+			_is_processed_event = threading.Event()
+			_renew_thread = threading.Thread(
+				target=self.__renew_transmission_dequeue_lease_thread_method,
+				kwargs={
+					"database": database,
+					"transmission_dequeues": transmission_dequeues,
+					"is_processed_event": _is_processed_event
+				},
+				daemon=True
+			)
+			_renew_thread.start()
 
-				_client_socket = self.__client_socket_factory.get_client_socket()
+		try:
+			self.__deliver_transmission_dequeues(
+				database=database,
+				client=client,
+				transmission_dequeues=transmission_dequeues
+			)
+		finally:
+			if _renew_thread is not None:
+				_is_processed_event.set()
+				_renew_thread.join()
 
-				_client_socket.connect_to_server(
-					ip_address=_transmission_dequeue.get_transmission().get_destination_device().get_last_known_client().get_ip_address(),
-					port=_transmission_dequeue.get_transmission().get_destination_device().get_socket_port()
+	def __get_transmission_parser(self, *, transmission_dequeue: TransmissionDequeue) -> TransmissionParser:
+
+		_parser_type = json.loads(transmission_dequeue.get_transmission().get_stored_transmission_json_string())["parser_type"]
+
+		# the parsers store their class name as the parser type
+		if _parser_type == SendJsonTransmissionParser.__name__:
+			return self.__send_json_transmission_parser_factory.get_send_json_transmission_parser()
+		elif _parser_type == ChangePurposeTransmissionParser.__name__:
+			return self.__change_purpose_transmission_parser_factory.get_change_purpose_transmission_parser()
+		else:
+			raise Exception(f"Unexpected parser type: \"{_parser_type}\".")
+
+	def __get_transmission_dequeue_parts(self, *, transmission_dequeues: List[TransmissionDequeue]) -> List[Tuple[List[TransmissionDequeue], Exception]]:
+
+		# NOTE splits a batch into consecutive parts of at most batch_bytes_total_maximum stored bytes, each holding at least one transmission
+		# NOTE a transmission whose stored size cannot be read is placed in a part of its own along with the exception, since it cannot be delivered
+
+		if len(transmission_dequeues) == 1 or self.__batch_bytes_total_maximum is None:
+			return [(transmission_dequeues, None)]
+
+		_send_json_transmission_parser = self.__send_json_transmission_parser_factory.get_send_json_transmission_parser()
+		_transmission_dequeue_parts = []  # type: List[Tuple[List[TransmissionDequeue], Exception]]
+		_part_bytes_total = None  # type: int
+		for _transmission_dequeue in transmission_dequeues:
+			try:
+				_bytes_total = _send_json_transmission_parser.get_stored_bytes_total(
+					json_string=_transmission_dequeue.get_transmission().get_stored_transmission_json_string()
 				)
+			except Exception as ex:
+				_transmission_dequeue_parts.append(([_transmission_dequeue], ex))
+				_part_bytes_total = None
+				continue
+			if _part_bytes_total is None or _part_bytes_total + _bytes_total > self.__batch_bytes_total_maximum:
+				_transmission_dequeue_parts.append(([], None))
+				_part_bytes_total = 0
+			_transmission_dequeue_parts[-1][0].append(_transmission_dequeue)
+			_part_bytes_total += _bytes_total
+
+		return _transmission_dequeue_parts
 
-				_transmission_parser.process_transmission(
-					json_string=_transmission_dequeue.get_transmission().get_stored_transmission_json_string(),
-					source_device_guid=_transmission_dequeue.get_transmission().get_source_device().get_device_guid(),
-					source_instance_guid=_transmission_dequeue.get_transmission().get_source_device().get_instance_guid(),
-					source_purpose_guid=_transmission_dequeue.get_transmission().get_source_device().get_purpose_guid(),
-					destination_device_guid=_transmission_dequeue.get_transmission().get_destination_device().get_device_guid(),
-					destination_instance_guid=_transmission_dequeue.get_transmission().get_destination_device().get_instance_guid(),
-					destination_purpose_guid=_transmission_dequeue.get_transmission().get_destination_device().get_purpose_guid(),
-					client_socket=_client_socket
+	def __send_transmissions(self, *, transmission_parser: TransmissionParser, transmission_dequeues: List[TransmissionDequeue]):
+
+		# NOTE every transmission of a batch shares its source device instance and destination device instance
+
+		_source_device = transmission_dequeues[0].get_transmission().get_source_device()
+		_destination_device = transmission_dequeues[0].get_transmission().get_destination_device()
+
+		_is_transmission_sent = False
+		while not _is_transmission_sent:
+			_device_connection, _is_reused = self.__device_connection_pool.acquire(
+				device_guid=_destination_device.get_device_guid(),
+				instance_guid=_destination_device.get_instance_guid(),
+				ip_address=_destination_device.get_last_known_client().get_ip_address(),
+				port=_destination_device.get_socket_port()
+			)
+			_client_socket = WriteTrackingClientSocket(
+				client_socket=_device_connection.get_connection()
+			)
+			try:
+				if len(transmission_dequeues) == 1:
+					transmission_parser.process_transmission(
+						json_string=transmission_dequeues[0].get_transmission().get_stored_transmission_json_string(),
+						source_device_guid=_source_device.get_device_guid(),
+						source_instance_guid=_source_device.get_instance_guid(),
+						source_purpose_guid=_source_device.get_purpose_guid(),
+						destination_device_guid=_destination_device.get_device_guid(),
+						destination_instance_guid=_destination_device.get_instance_guid(),
+						destination_purpose_guid=_destination_device.get_purpose_guid(),
+						client_socket=_client_socket
+					)
+				else:
+					# only json transmissions are batched
+					transmission_parser.process_transmissions(
+						json_strings=[_transmission_dequeue.get_transmission().get_stored_transmission_json_string() for _transmission_dequeue in transmission_dequeues],
+						source_device_guid=_source_device.get_device_guid(),
+						source_instance_guid=_source_device.get_instance_guid(),
+						source_purpose_guid=_source_device.get_purpose_guid(),
+						destination_device_guid=_destination_device.get_device_guid(),
+						destination_instance_guid=_destination_device.get_instance_guid(),
+						destination_purpose_guid=_destination_device.get_purpose_guid(),
+						client_socket=_client_socket
+					)
+			except Exception as ex:
+				self.__device_connection_pool.release(
+					device_connection=_device_connection,
+					is_reusable=False
 				)
+				if not _is_reused or _client_socket.is_written():
+					raise ex
+				# the device closed the reused connection before anything was sent over it, so the transmissions are sent over a new connection
+				#  while once something was written the device may have received it and a failure is reported instead of sending it twice
+				self.__device_connection_pool.invalidate(
+					device_guid=_destination_device.get_device_guid()
+				)
+			else:
+				self.__device_connection_pool.release(
+					device_connection=_device_connection,
+					is_reusable=True
+				)
+				_is_transmission_sent = True
+
+	def __deliver_transmission_dequeues(self, *, database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
 
-				_client_socket.close()
+		_transmission_dequeue_parts = self.__get_transmission_dequeue_parts(
+			transmission_dequeues=transmission_dequeues
+		)
+		for _part_index, (_transmission_dequeue_part, _part_exception) in enumerate(_transmission_dequeue_parts):
+			_is_transmission_sent = False
+			try:
+				if _part_exception is not None:
+					raise _part_exception
+				self.__send_transmissions(
+					transmission_parser=self.__get_transmission_parser(
+						transmission_dequeue=_transmission_dequeue_part[0]
+					),
+					transmission_dequeues=_transmission_dequeue_part
+				)
 				_is_transmission_sent = True
 			except Exception as ex:
-				_database.transmission_failed(
-					client_guid=_client.get_client_guid(),
-					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
-					error_message_json_string=str(ex)
-				)
+				if _part_exception is not None or self.__destination_circuit_breaker is None:
+					# the stored transmission itself is at fault when its size could not be read, so the destination device is not held back for it
+					_destination_circuit_state = DestinationCircuitState.Open
+				else:
+					_destination_circuit_state = self.__destination_circuit_breaker.record_failure(
+						destination_device_guid=_transmission_dequeue_part[0].get_transmission().get_destination_device_guid()
+					)
+				if _destination_circuit_state == DestinationCircuitState.Open:
+					# the failure is recorded against the first transmission of the part while the others wait behind it to be delivered again
+					database.transmission_failed(
+						client_guid=client.get_client_guid(),
+						transmission_dequeue_guid=_transmission_dequeue_part[0].get_transmission_dequeue_guid(),
+						error_message_json_string=str(ex)
+					)
+					_unsent_transmission_dequeues = _transmission_dequeue_part[1:]
+				else:
+					# the destination device is backing off, after which the whole part is delivered again
+					print(f"TransmissionDequeueCyclingUnitOfWork: backing off from destination device: {ex}")
+					_unsent_transmission_dequeues = _transmission_dequeue_part.copy()
+				_unsent_transmission_dequeues += [_transmission_dequeue for _unsent_transmission_dequeue_part, _ in _transmission_dequeue_parts[_part_index + 1:] for _transmission_dequeue in _unsent_transmission_dequeue_part]
+				if len(_unsent_transmission_dequeues) != 0:
+					database.release_transmission_dequeues(
+						transmission_dequeue_guids=[_transmission_dequeue.get_transmission_dequeue_guid() for _transmission_dequeue in _unsent_transmission_dequeues]
+					)
 
-			if _is_transmission_sent:
-				_database.transmission_completed(
-					client_guid=_client.get_client_guid(),
-					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			if not _is_transmission_sent:
+				break
+
+			if self.__destination_circuit_breaker is not None:
+				self.__destination_circuit_breaker.record_success(
+					destination_device_guid=_transmission_dequeue_part[0].get_transmission().get_destination_device_guid()
 				)
 
-		print(f"TransmissionDequeueCyclingUnitOfWork: perform ended: {_transmission_dequeue}")
+			database.transmissions_completed(
+				client_guid=client.get_client_guid(),
+				transmission_dequeue_guids=[_transmission_dequeue.get_transmission_dequeue_guid() for _transmission_dequeue in _transmission_dequeue_part]
+			)
+
+	def perform(self, *, try_get_next_work_queue_element_prepared_semaphore_request: PreparedSemaphoreRequest, acknowledge_nonempty_work_queue_prepared_semaphore_request: PreparedSemaphoreRequest) -> bool:
 
-		return _transmission_dequeue is not None
+		print(f"TransmissionDequeueCyclingUnitOfWork: perform started")
+
+		try_get_next_work_queue_element_prepared_semaphore_request.apply()
+		# the claimed transmissions are delivered by the idle workers of the pool while this cycle is free to claim more
+		_transmission_dequeues_total = self.__transmission_delivery_pool.dispatch()
+		if _transmission_dequeues_total != 0:
+			acknowledge_nonempty_work_queue_prepared_semaphore_request.apply()
+
+		print(f"TransmissionDequeueCyclingUnitOfWork: perform ended: {_transmission_dequeues_total} transmission dequeue(s)")
+
+		return _transmission_dequeues_total != 0
+
+	def get_statistics(self) -> Dict:
+		return self.__transmission_delivery_pool.get_statistics()
+
+	def dispose(self):
+		self.__transmission_delivery_pool.dispose()
 
 
 class Transmitter():
@@ -103,3 +387,4 @@ class Transmitter():
 	def dispose(self):
 
 		self.__transmission_dequeue_thread_cycle_cache.clear()
+		self.__transmission_dequeue_cycling_unit_of_work.dispose()
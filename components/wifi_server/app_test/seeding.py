@@ -0,0 +1,47 @@
+from __future__ import annotations
+from app.database import Database
+from typing import List, Tuple, Dict
+
+
+source_device_guid = "6B9C16F6-56B2-495F-9D89-98415C71EB7E"
+source_purpose_guid = "6EABEE26-24C2-4698-8BBA-8707E0397C7D"
+destination_device_guid = "2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B"
+destination_purpose_guid = "330A6549-57C5-4DA6-8C1C-A698A61B7DB5"
+queue_guid = "E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+
+
+def insert_transmissions(*, database: Database, transmissions_total: int = None, queue_guid_and_destination_device_guids: List[Tuple[str, str]] = None, stored_transmission_json_string: str = None) -> Tuple[str, List[str]]:
+
+	# NOTE every transmission is sent from the same source device, either transmissions_total of them through the same queue to the same destination device
+	#  or one for each queue and destination device, and holds its index unless stored_transmission_json_string is provided
+	# NOTE returns the guid of the client that sent them along with the guids of the transmissions in order
+
+	if queue_guid_and_destination_device_guids is None:
+		queue_guid_and_destination_device_guids = [(queue_guid, destination_device_guid)] * transmissions_total
+
+	_client = database.insert_client(
+		ip_address="127.0.0.1"
+	)
+	_source_device = database.insert_device(
+		device_guid=source_device_guid,
+		client_guid=_client.get_client_guid(),
+		purpose_guid=source_purpose_guid,
+		socket_port=24576
+	)
+	_instance_guid_per_destination_device_guid = {}  # type: Dict[str, str]
+	for _queue_guid, _destination_device_guid in queue_guid_and_destination_device_guids:
+		if _destination_device_guid not in _instance_guid_per_destination_device_guid:
+			_instance_guid_per_destination_device_guid[_destination_device_guid] = database.insert_device(
+				device_guid=_destination_device_guid,
+				client_guid=_client.get_client_guid(),
+				purpose_guid=destination_purpose_guid,
+				socket_port=24576
+			).get_instance_guid()
+		database.insert_queue(
+			queue_guid=_queue_guid
+		)
+	_transmission_receipts = database.insert_transmissions(
+		client_guid=_client.get_client_guid(),
+		transmissions=[(_queue_guid, _source_device.get_device_guid(), _source_device.get_instance_guid(), f"{{ \"index\": {_index} }}" if stored_transmission_json_string is None else stored_transmission_json_string, _destination_device_guid, _instance_guid_per_destination_device_guid[_destination_device_guid]) for _index, (_queue_guid, _destination_device_guid) in enumerate(queue_guid_and_destination_device_guids)]
+	)
+	return _client.get_client_guid(), [_transmission_receipt.get_transmission_guid() for _transmission_receipt in _transmission_receipts]
@@ -0,0 +1,285 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, ApiEntrypoint
+from app.api_entrypoint_log_writer import ApiEntrypointLogWriter, ApiEntrypointLogOverflowPolicy
+import unittest
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict
+
+
+def get_api_entrypoint_log_writer(*, database_factory: DatabaseFactory, flush_interval_seconds: float = 0.05, flush_rows_total: int = 10, buffered_rows_total_maximum: int = 100, overflow_policy: ApiEntrypointLogOverflowPolicy = ApiEntrypointLogOverflowPolicy.DropOldest, sample_rate: float = 1.0, exceptions: List[Exception] = None) -> ApiEntrypointLogWriter:
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return ApiEntrypointLogWriter(
+		database_factory=database_factory,
+		flush_interval_seconds=flush_interval_seconds,
+		flush_rows_total=flush_rows_total,
+		buffered_rows_total_maximum=buffered_rows_total_maximum,
+		overflow_policy=overflow_policy,
+		sample_rate=sample_rate,
+		is_request_headers_captured=True,
+		on_exception=_on_exception
+	)
+
+
+class ApiEntrypointLogWriterTest(unittest.TestCase):
+
+	def test_initialize(self):
+
+		_database_factory = DatabaseFactory()
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory
+		)
+		self.assertIsNotNone(_api_entrypoint_log_writer)
+		_api_entrypoint_log_writer.dispose()
+		_database_factory.get_database().dispose()
+
+	def test_flush_on_interval_0(self):
+		# fewer logs than a full batch are still written once the interval passes
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_exceptions = []  # type: List[Exception]
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			exceptions=_exceptions
+		)
+
+		_start_datetime = datetime.utcnow()
+		for _index in range(3):
+			self.assertTrue(_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json={"index": _index}
+			))
+
+		time.sleep(0.5)
+
+		self.assertEqual(3, _api_entrypoint_log_writer.get_written_rows_total())
+		self.assertEqual(0, _api_entrypoint_log_writer.get_buffered_rows_total())
+
+		_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+			inclusive_start_row_created_datetime=_start_datetime,
+			exclusive_end_row_created_datetime=datetime.utcnow() + timedelta(seconds=1)
+		)
+		self.assertEqual([0, 1, 2], [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+		for _api_entrypoint_log in _api_entrypoint_logs:
+			self.assertEqual(ApiEntrypoint.TestGet, _api_entrypoint_log.get_api_entrypoint())
+			self.assertEqual(_client.get_client_guid(), _api_entrypoint_log.get_request_client_guid())
+
+		_api_entrypoint_log_writer.dispose()
+		self.assertEqual([], _exceptions)
+		_database.dispose()
+
+	def test_dispose_flushes_0(self):
+		# logs still buffered when the writer is disposed are written first
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			flush_interval_seconds=60,
+			flush_rows_total=1000,
+			buffered_rows_total_maximum=1000
+		)
+
+		for _index in range(25):
+			_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestPost,
+				input_json={"index": _index}
+			)
+		self.assertEqual(25, _api_entrypoint_log_writer.get_buffered_rows_total())
+
+		_api_entrypoint_log_writer.dispose()
+
+		self.assertEqual(25, _api_entrypoint_log_writer.get_written_rows_total())
+		self.assertEqual(0, _api_entrypoint_log_writer.get_dropped_rows_total())
+
+		with self.assertRaises(Exception):
+			_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestPost,
+				input_json={}
+			)
+
+		_database.dispose()
+
+	def test_overflow_drop_newest_0(self):
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			flush_interval_seconds=60,
+			flush_rows_total=1000,
+			buffered_rows_total_maximum=5,
+			overflow_policy=ApiEntrypointLogOverflowPolicy.DropNewest
+		)
+
+		_is_buffered_per_index = []  # type: List[bool]
+		for _index in range(8):
+			_is_buffered_per_index.append(_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json={"index": _index}
+			))
+
+		self.assertEqual([True] * 5 + [False] * 3, _is_buffered_per_index)
+		self.assertEqual(3, _api_entrypoint_log_writer.get_dropped_rows_total())
+
+		_start_datetime = datetime.utcnow() - timedelta(seconds=60)
+		_api_entrypoint_log_writer.dispose()
+
+		_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+			inclusive_start_row_created_datetime=_start_datetime,
+			exclusive_end_row_created_datetime=datetime.utcnow() + timedelta(seconds=1)
+		)
+		self.assertEqual([0, 1, 2, 3, 4], [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+
+		_database.dispose()
+
+	def test_overflow_drop_oldest_0(self):
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			flush_interval_seconds=60,
+			flush_rows_total=1000,
+			buffered_rows_total_maximum=5,
+			overflow_policy=ApiEntrypointLogOverflowPolicy.DropOldest
+		)
+
+		for _index in range(8):
+			self.assertTrue(_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json={"index": _index}
+			))
+
+		self.assertEqual(3, _api_entrypoint_log_writer.get_dropped_rows_total())
+
+		_start_datetime = datetime.utcnow() - timedelta(seconds=60)
+		_api_entrypoint_log_writer.dispose()
+
+		_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+			inclusive_start_row_created_datetime=_start_datetime,
+			exclusive_end_row_created_datetime=datetime.utcnow() + timedelta(seconds=1)
+		)
+		self.assertEqual([3, 4, 5, 6, 7], [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+
+		_database.dispose()
+
+	def test_overflow_block_0(self):
+		# blocked callers resume once the flusher makes room and nothing is dropped
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			flush_interval_seconds=0.01,
+			flush_rows_total=2,
+			buffered_rows_total_maximum=2,
+			overflow_policy=ApiEntrypointLogOverflowPolicy.Block
+		)
+
+		def _thread_method():
+			for _index in range(25):
+				self.assertTrue(_api_entrypoint_log_writer.add_api_entrypoint_log(
+					client_guid=_client.get_client_guid(),
+					api_entrypoint=ApiEntrypoint.TestGet,
+					input_json={"index": _index}
+				))
+
+		_threads = []  # type: List[threading.Thread]
+		for _thread_index in range(4):
+			_thread = threading.Thread(
+				target=_thread_method
+			)
+			_thread.start()
+			_threads.append(_thread)
+		for _thread in _threads:
+			_thread.join()
+
+		_api_entrypoint_log_writer.dispose()
+
+		self.assertEqual(100, _api_entrypoint_log_writer.get_written_rows_total())
+		self.assertEqual(0, _api_entrypoint_log_writer.get_dropped_rows_total())
+
+		_database.dispose()
+
+	def test_sample_rate_0(self):
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			sample_rate=0.0
+		)
+
+		for _index in range(10):
+			self.assertFalse(_api_entrypoint_log_writer.add_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json={"index": _index}
+			))
+
+		_api_entrypoint_log_writer.dispose()
+
+		self.assertEqual(10, _api_entrypoint_log_writer.get_sampled_out_rows_total())
+		self.assertEqual(0, _api_entrypoint_log_writer.get_written_rows_total())
+		self.assertEqual(0, _api_entrypoint_log_writer.get_dropped_rows_total())
+
+		_database.dispose()
+
+	def test_write_failure_0(self):
+		# a batch that fails to write is counted as dropped and reported
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_exceptions = []  # type: List[Exception]
+		_api_entrypoint_log_writer = get_api_entrypoint_log_writer(
+			database_factory=_database_factory,
+			exceptions=_exceptions
+		)
+
+		_api_entrypoint_log_writer.add_api_entrypoint_log(
+			client_guid="missing client guid",
+			api_entrypoint=ApiEntrypoint.TestGet,
+			input_json={}
+		)
+
+		_api_entrypoint_log_writer.dispose()
+
+		self.assertEqual(1, _api_entrypoint_log_writer.get_dropped_rows_total())
+		self.assertEqual(1, len(_exceptions))
+
+		_database.dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,904 @@
+from __future__ import annotations
+from app.database import Database, DatabaseFactory, DatabaseSynchronous, ApiEntrypoint, Client, TransmissionDequeue
+from app.transmission_delivery_pool import TransmissionDeliveryPool
+from app.device_connection_pool import DeviceConnectionPool
+from app.transmission_retry_scheduler import TransmissionRetryScheduler
+import unittest
+import tempfile
+import os
+import time
+import threading
+import uuid
+import sys
+import tracemalloc
+import multiprocessing
+import socket
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict
+
+
+def get_enqueue_and_dequeue_transmissions_per_second(*, database: Database, transmissions_total: int) -> Tuple[float, float]:
+
+	_source_client = database.insert_client(
+		ip_address="127.0.0.1"
+	)
+	_source_device = database.insert_device(
+		device_guid="6B9C16F6-56B2-495F-9D89-98415C71EB7E",
+		client_guid=_source_client.get_client_guid(),
+		purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+		socket_port=24576
+	)
+	_destination_client = database.insert_client(
+		ip_address="127.0.0.2"
+	)
+	_destination_device = database.insert_device(
+		device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+		client_guid=_destination_client.get_client_guid(),
+		purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+		socket_port=24576
+	)
+	_queue = database.insert_queue(
+		queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+	)
+
+	_enqueue_start_time = time.perf_counter()
+	for _index in range(transmissions_total):
+		database.insert_transmission(
+			queue_guid=_queue.get_queue_guid(),
+			source_device_guid=_source_device.get_device_guid(),
+			source_device_instance_guid=_source_device.get_instance_guid(),
+			client_guid=_source_client.get_client_guid(),
+			stored_transmission_json_string=f"{{ \"index\": {_index} }}",
+			destination_device_guid=_destination_device.get_device_guid(),
+			destination_device_instance_guid=_destination_device.get_instance_guid()
+		)
+	_enqueue_seconds = time.perf_counter() - _enqueue_start_time
+
+	_dequeue_start_time = time.perf_counter()
+	for _index in range(transmissions_total):
+		_transmission_dequeue = database.get_next_transmission_dequeue(
+			client_guid=_source_client.get_client_guid()
+		)
+		database.transmission_completed(
+			client_guid=_source_client.get_client_guid(),
+			transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+		)
+	_dequeue_seconds = time.perf_counter() - _dequeue_start_time
+
+	return transmissions_total / _enqueue_seconds, transmissions_total / _dequeue_seconds
+
+
+
+def get_mixed_operations_per_second(*, database: Database, threads_total: int, operations_per_thread_total: int) -> float:
+	# every thread alternates between enqueueing a transmission and listing the devices of a purpose
+
+	_client = database.insert_client(
+		ip_address="127.0.0.1"
+	)
+	_device = database.insert_device(
+		device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+		client_guid=_client.get_client_guid(),
+		purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+		socket_port=24576
+	)
+	_queue = database.insert_queue(
+		queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+	)
+
+	def _thread_method():
+		for _index in range(operations_per_thread_total):
+			if _index % 2 == 0:
+				database.insert_transmission(
+					queue_guid=_queue.get_queue_guid(),
+					source_device_guid=_device.get_device_guid(),
+					source_device_instance_guid=_device.get_instance_guid(),
+					client_guid=_client.get_client_guid(),
+					stored_transmission_json_string="{ }",
+					destination_device_guid=_device.get_device_guid(),
+					destination_device_instance_guid=_device.get_instance_guid()
+				)
+			else:
+				database.get_devices_by_purpose(
+					purpose_guid=_device.get_purpose_guid()
+				)
+
+	_threads = []  # type: List[threading.Thread]
+	for _thread_index in range(threads_total):
+		_threads.append(threading.Thread(
+			target=_thread_method
+		))
+
+	_start_time = time.perf_counter()
+	for _thread in _threads:
+		_thread.start()
+	for _thread in _threads:
+		_thread.join()
+	_seconds = time.perf_counter() - _start_time
+
+	return threads_total * operations_per_thread_total / _seconds
+
+def enqueue_transmissions_in_process(database_file_path: str, transmissions_total: int, start_event: multiprocessing.Event, seconds_queue: multiprocessing.Queue):
+	# NOTE runs within a separate worker process, enqueueing transmissions and listing devices as the send_json and device list endpoints do
+
+	with Database(database_file_path=database_file_path) as _database:
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_device = _database.get_devices_by_purpose(
+			purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5"
+		)[0]
+
+		start_event.wait()
+		_start_time = time.perf_counter()
+		for _index in range(transmissions_total):
+			_database.insert_transmission(
+				queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F",
+				source_device_guid=_device.get_device_guid(),
+				source_device_instance_guid=_device.get_instance_guid(),
+				client_guid=_client.get_client_guid(),
+				stored_transmission_json_string=f"{{ \"index\": {_index} }}",
+				destination_device_guid=_device.get_device_guid(),
+				destination_device_instance_guid=_device.get_instance_guid()
+			)
+			_database.get_devices_by_purpose(
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5"
+			)
+		seconds_queue.put(time.perf_counter() - _start_time)
+
+
+# NOTE the benchmarks take minutes and only report their measurements, so they are run by setting WIFI_SERVER_BENCHMARK
+@unittest.skipUnless(os.environ.get("WIFI_SERVER_BENCHMARK", None), "set WIFI_SERVER_BENCHMARK to run the benchmarks")
+class BenchmarkTest(unittest.TestCase):
+
+	def test_storage_mode_throughput_0(self):
+		# compare enqueue and dequeue throughput between the in-memory and file-backed WAL databases
+
+		_transmissions_total = 500
+
+		with Database() as _database:
+			_memory_enqueue_per_second, _memory_dequeue_per_second = get_enqueue_and_dequeue_transmissions_per_second(
+				database=_database,
+				transmissions_total=_transmissions_total
+			)
+
+		_results = [
+			("memory", _memory_enqueue_per_second, _memory_dequeue_per_second)
+		]  # type: List[Tuple[str, float, float]]
+
+		for _synchronous in [DatabaseSynchronous.Off, DatabaseSynchronous.Normal, DatabaseSynchronous.Full]:
+			with tempfile.TemporaryDirectory() as _temp_directory_path:
+				_database_factory = DatabaseFactory(
+					database_file_path=os.path.join(_temp_directory_path, "wifi_server.db"),
+					synchronous=_synchronous
+				)
+				with _database_factory.get_database() as _database:
+					_wal_enqueue_per_second, _wal_dequeue_per_second = get_enqueue_and_dequeue_transmissions_per_second(
+						database=_database,
+						transmissions_total=_transmissions_total
+					)
+				_results.append((f"wal {_synchronous.name.lower()}", _wal_enqueue_per_second, _wal_dequeue_per_second))
+
+		for _mode, _enqueue_per_second, _dequeue_per_second in _results:
+			print(f"test_storage_mode_throughput_0: {_mode}: enqueue {_enqueue_per_second:.1f}/s, dequeue {_dequeue_per_second:.1f}/s")
+			self.assertGreater(_enqueue_per_second, 0)
+			self.assertGreater(_dequeue_per_second, 0)
+
+	def test_dequeue_history_size_0(self):
+		# dequeue cost should not grow with the number of completed transmissions already in the database
+
+		_history_checkpoints = [1000, 5000, 10000]
+		_sampled_dequeues_total = 200
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_device = _database.insert_device(
+				device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+			)
+
+			_history_total = 0
+			_dequeue_microseconds_per_checkpoint = []  # type: List[Tuple[int, float]]
+			for _history_checkpoint in _history_checkpoints:
+				_dequeue_seconds = 0.0
+				_dequeues_total = 0
+				while _history_total < _history_checkpoint:
+					_database.insert_transmission(
+						queue_guid=_queue.get_queue_guid(),
+						source_device_guid=_device.get_device_guid(),
+						source_device_instance_guid=_device.get_instance_guid(),
+						client_guid=_client.get_client_guid(),
+						stored_transmission_json_string="{ }",
+						destination_device_guid=_device.get_device_guid(),
+						destination_device_instance_guid=_device.get_instance_guid()
+					)
+					_dequeue_start_time = time.perf_counter()
+					_transmission_dequeue = _database.get_next_transmission_dequeue(
+						client_guid=_client.get_client_guid()
+					)
+					if _history_checkpoint - _history_total <= _sampled_dequeues_total:
+						_dequeue_seconds += time.perf_counter() - _dequeue_start_time
+						_dequeues_total += 1
+					_database.transmission_completed(
+						client_guid=_client.get_client_guid(),
+						transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+					)
+					_history_total += 1
+				_dequeue_microseconds_per_checkpoint.append((_history_total, _dequeue_seconds * 10**6 / _dequeues_total))
+
+			for _history_total, _dequeue_microseconds in _dequeue_microseconds_per_checkpoint:
+				print(f"test_dequeue_history_size_0: history {_history_total}: {_dequeue_microseconds:.1f} us per dequeue")
+
+
+	def test_mixed_read_write_throughput_0(self):
+		# compare mixed enqueue and device list throughput as the number of client threads grows
+
+		_operations_total = 1600
+
+		_results = []  # type: List[Tuple[str, int, float]]
+		for _threads_total in [1, 4, 16]:
+			with Database() as _database:
+				_results.append(("memory", _threads_total, get_mixed_operations_per_second(
+					database=_database,
+					threads_total=_threads_total,
+					operations_per_thread_total=_operations_total // _threads_total
+				)))
+			with tempfile.TemporaryDirectory() as _temp_directory_path:
+				with DatabaseFactory(database_file_path=os.path.join(_temp_directory_path, "wifi_server.db")).get_database() as _database:
+					_results.append(("wal normal", _threads_total, get_mixed_operations_per_second(
+						database=_database,
+						threads_total=_threads_total,
+						operations_per_thread_total=_operations_total // _threads_total
+					)))
+
+		for _mode, _threads_total, _operations_per_second in _results:
+			print(f"test_mixed_read_write_throughput_0: {_mode}: {_threads_total} thread(s): {_operations_per_second:.1f} operations/s")
+			self.assertGreater(_operations_per_second, 0)
+
+	def test_dequeue_pending_backlog_0(self):
+		# dequeue cost should not grow with the number of pending transmissions ordered ahead by sequence
+
+		_backlog_checkpoints = [1000, 5000, 10000]
+		_sampled_dequeues_total = 200
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_device = _database.insert_device(
+				device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+			)
+
+			_backlog_total = 0
+			_dequeue_microseconds_per_checkpoint = []  # type: List[Tuple[int, float]]
+			for _backlog_checkpoint in _backlog_checkpoints:
+				while _backlog_total < _backlog_checkpoint:
+					_database.insert_transmission(
+						queue_guid=_queue.get_queue_guid(),
+						source_device_guid=_device.get_device_guid(),
+						source_device_instance_guid=_device.get_instance_guid(),
+						client_guid=_client.get_client_guid(),
+						stored_transmission_json_string="{ }",
+						destination_device_guid=_device.get_device_guid(),
+						destination_device_instance_guid=_device.get_instance_guid()
+					)
+					_backlog_total += 1
+
+				_dequeue_seconds = 0.0
+				for _index in range(_sampled_dequeues_total):
+					_dequeue_start_time = time.perf_counter()
+					_transmission_dequeue = _database.get_next_transmission_dequeue(
+						client_guid=_client.get_client_guid()
+					)
+					_dequeue_seconds += time.perf_counter() - _dequeue_start_time
+					_database.transmission_completed(
+						client_guid=_client.get_client_guid(),
+						transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+					)
+				_backlog_total -= _sampled_dequeues_total
+				_dequeue_microseconds_per_checkpoint.append((_backlog_checkpoint, _dequeue_seconds * 10**6 / _sampled_dequeues_total))
+
+			for _backlog_total, _dequeue_microseconds in _dequeue_microseconds_per_checkpoint:
+				print(f"test_dequeue_pending_backlog_0: backlog {_backlog_total}: {_dequeue_microseconds:.1f} us per dequeue")
+
+	def test_entity_parsing_0(self):
+		# objects per second and bytes per object when listing many devices and exporting many logs
+
+		_objects_total = 5000
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			for _index in range(_objects_total):
+				_database.insert_device(
+					device_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+					socket_port=24576
+				)
+			_start_datetime = datetime.utcnow()
+			_database.insert_api_entrypoint_logs(
+				api_entrypoint_logs=[(_client.get_client_guid(), ApiEntrypoint.TestGet, "{ }", datetime.utcnow()) for _index in range(_objects_total)]
+			)
+
+			_list_start_time = time.perf_counter()
+			_devices = _database.get_devices_by_purpose(
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5"
+			)
+			_list_seconds = time.perf_counter() - _list_start_time
+
+			_export_start_time = time.perf_counter()
+			_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+				inclusive_start_row_created_datetime=_start_datetime,
+				exclusive_end_row_created_datetime=datetime.utcnow() + timedelta(seconds=1)
+			)
+			_export_seconds = time.perf_counter() - _export_start_time
+
+			self.assertEqual(_objects_total, len(_devices))
+			self.assertEqual(_objects_total, len(_api_entrypoint_logs))
+
+			for _name, _objects, _seconds in [("device", _devices, _list_seconds), ("api entrypoint log", _api_entrypoint_logs, _export_seconds)]:
+				# the entities keep their fields in slots instead of a per-instance dict
+				self.assertFalse(hasattr(_objects[0], "__dict__"))
+				print(f"test_entity_parsing_0: {_name}: {len(_objects) / _seconds:.1f} objects/s, {sys.getsizeof(_objects[0])} bytes per object")
+
+	def test_api_entrypoint_log_export_memory_0(self):
+		# streaming an export keeps one page in memory while building the list keeps every log
+
+		_api_entrypoint_logs_total = 20000
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_start_datetime = datetime.utcnow()
+			_database.insert_api_entrypoint_logs(
+				api_entrypoint_logs=[(_client.get_client_guid(), ApiEntrypoint.TestPost, f"{{ \"index\": {_index} }}", datetime.utcnow()) for _index in range(_api_entrypoint_logs_total)]
+			)
+			_end_datetime = datetime.utcnow() + timedelta(seconds=1)
+
+			tracemalloc.start()
+			_streamed_api_entrypoint_logs_total = 0
+			for _api_entrypoint_log in _database.iterate_api_entrypoint_logs(
+				inclusive_start_row_created_datetime=_start_datetime,
+				exclusive_end_row_created_datetime=_end_datetime,
+				page_rows_total=500
+			):
+				_streamed_api_entrypoint_logs_total += 1
+			_, _streamed_peak_bytes = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+
+			tracemalloc.start()
+			_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+				inclusive_start_row_created_datetime=_start_datetime,
+				exclusive_end_row_created_datetime=_end_datetime
+			)
+			_, _listed_peak_bytes = tracemalloc.get_traced_memory()
+			tracemalloc.stop()
+
+			print(f"test_api_entrypoint_log_export_memory_0: streamed peak: {_streamed_peak_bytes} bytes, listed peak: {_listed_peak_bytes} bytes")
+
+			self.assertEqual(_api_entrypoint_logs_total, _streamed_api_entrypoint_logs_total)
+			self.assertEqual(_api_entrypoint_logs_total, len(_api_entrypoint_logs))
+			self.assertLess(_streamed_peak_bytes * 4, _listed_peak_bytes)
+
+	def test_insert_transmissions_batch_size_0(self):
+		# messages per second when a producer enqueues its burst in batches of different sizes
+
+		_transmissions_total = 2000
+
+		for _batch_size in [1, 10, 100, 1000]:
+			with tempfile.TemporaryDirectory() as _temporary_directory_path:
+				with Database(database_file_path=os.path.join(_temporary_directory_path, "database.db")) as _database:
+					_client = _database.insert_client(
+						ip_address="127.0.0.1"
+					)
+					_device = _database.insert_device(
+						device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+						client_guid=_client.get_client_guid(),
+						purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+						socket_port=24576
+					)
+					_queue = _database.insert_queue(
+						queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+					)
+
+					_start_time = time.perf_counter()
+					for _batch_index in range(_transmissions_total // _batch_size):
+						_database.insert_transmissions(
+							client_guid=_client.get_client_guid(),
+							transmissions=[(_queue.get_queue_guid(), _device.get_device_guid(), _device.get_instance_guid(), f"{{ \"index\": {_batch_index * _batch_size + _index} }}", _device.get_device_guid(), _device.get_instance_guid()) for _index in range(_batch_size)]
+						)
+					_seconds = time.perf_counter() - _start_time
+
+					print(f"test_insert_transmissions_batch_size_0: batch size {_batch_size}: {_transmissions_total / _seconds:.1f} messages/s")
+
+					self.assertEqual(_transmissions_total, _database.get_table_rows_totals()["transmission"])
+
+	def test_snapshot_and_restore_0(self):
+		# pause seen by a concurrent writer while a million row in-memory database is snapshotted, and the time to restore it
+
+		_rows_total = 1000000
+
+		with tempfile.TemporaryDirectory() as _snapshot_directory_path:
+			_database = Database()
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			for _batch_index in range(_rows_total // 10000):
+				_database.insert_api_entrypoint_logs(
+					api_entrypoint_logs=[(_client.get_client_guid(), ApiEntrypoint.TestPost, f"{{ \"index\": {_batch_index * 10000 + _index} }}", datetime.utcnow()) for _index in range(10000)]
+				)
+
+			for _pages_per_step in [64, 1024]:
+				_is_writing_event = threading.Event()
+				_is_writing_event.set()
+				_write_seconds = []  # type: List[float]
+
+				def _write_thread_method():
+					while _is_writing_event.is_set():
+						_write_start_time = time.perf_counter()
+						_database.insert_queue(
+							queue_guid=str(uuid.uuid4()).upper()
+						)
+						_write_seconds.append(time.perf_counter() - _write_start_time)
+						time.sleep(0.001)
+
+				_write_thread = threading.Thread(
+					target=_write_thread_method
+				)
+				_write_thread.start()
+
+				_snapshot_statistics = _database.snapshot(
+					snapshot_directory_path=_snapshot_directory_path,
+					pages_per_step=_pages_per_step
+				)
+
+				_is_writing_event.clear()
+				_write_thread.join()
+
+				print(f"test_snapshot_and_restore_0: pages per step {_pages_per_step}: {_snapshot_statistics['pages_total']} pages in {_snapshot_statistics['total_seconds']:.3f}s, {_snapshot_statistics['steps_total']} steps, {_snapshot_statistics['restarts_total']} restarts, maximum pause {_snapshot_statistics['maximum_pause_seconds'] * 1000:.1f}ms, {len(_write_seconds)} concurrent writes with maximum latency {max(_write_seconds) * 1000:.1f}ms")
+
+			_database.dispose()
+
+			_restore_start_time = time.perf_counter()
+			_restored_database = DatabaseFactory(
+				snapshot_directory_path=_snapshot_directory_path
+			).get_database()
+			_restore_seconds = time.perf_counter() - _restore_start_time
+
+			print(f"test_snapshot_and_restore_0: restored in {_restore_seconds:.3f}s")
+
+			self.assertEqual(_rows_total, _restored_database.get_table_rows_totals()["api_entrypoint_log"])
+
+			_restored_database.dispose()
+	def test_sharded_enqueue_throughput_0(self):
+		# messages per second enqueued by one producer thread per shard, each sending to its own queue
+
+		_transmissions_per_thread_total = 1000
+
+		for _shards_total in [1, 2, 4]:
+			with tempfile.TemporaryDirectory() as _temporary_directory_path:
+				_database_factory = DatabaseFactory(
+					database_file_path=os.path.join(_temporary_directory_path, "database.db"),
+					shards_total=_shards_total
+				)
+				_queue_guid_per_shard_index = {}  # type: Dict[int, str]
+				while len(_queue_guid_per_shard_index) != _shards_total:
+					_queue_guid = str(uuid.uuid4()).upper()
+					_queue_guid_per_shard_index[_database_factory.get_shard_index(queue_guid=_queue_guid)] = _queue_guid
+
+				_device_guids = [str(uuid.uuid4()).upper() for _index in range(_shards_total)]
+				_instance_guids = [str(uuid.uuid4()).upper() for _index in range(_shards_total)]
+				_client_guid_per_shard_index = {}  # type: Dict[int, str]
+				for _shard_index, _shard_database in enumerate(_database_factory.get_shard_databases()):
+					_client_guid_per_shard_index[_shard_index] = _shard_database.insert_client(
+						ip_address="127.0.0.1"
+					).get_client_guid()
+					for _device_guid, _instance_guid in zip(_device_guids, _instance_guids):
+						_shard_database.insert_device(
+							device_guid=_device_guid,
+							client_guid=_client_guid_per_shard_index[_shard_index],
+							purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+							socket_port=24576,
+							instance_guid=_instance_guid
+						)
+					_shard_database.insert_queue(
+						queue_guid=_queue_guid_per_shard_index[_shard_index]
+					)
+
+				def _thread_method(shard_index: int):
+					_shard_database = _database_factory.get_shard_databases()[shard_index]
+					for _index in range(_transmissions_per_thread_total):
+						_shard_database.insert_transmission(
+							queue_guid=_queue_guid_per_shard_index[shard_index],
+							source_device_guid=_device_guids[shard_index],
+							source_device_instance_guid=_instance_guids[shard_index],
+							client_guid=_client_guid_per_shard_index[shard_index],
+							stored_transmission_json_string=f"{{ \"index\": {_index} }}",
+							destination_device_guid=_device_guids[shard_index],
+							destination_device_instance_guid=_instance_guids[shard_index]
+						)
+
+				_threads = []  # type: List[threading.Thread]
+				for _shard_index in range(_shards_total):
+					_threads.append(threading.Thread(
+						target=_thread_method,
+						args=(_shard_index,)
+					))
+				_start_time = time.perf_counter()
+				for _thread in _threads:
+					_thread.start()
+				for _thread in _threads:
+					_thread.join()
+				_seconds = time.perf_counter() - _start_time
+
+				print(f"test_sharded_enqueue_throughput_0: {_shards_total} shard(s): {_shards_total * _transmissions_per_thread_total / _seconds:.1f} messages/s")
+
+				for _shard_database in _database_factory.get_shard_databases():
+					self.assertEqual(_transmissions_per_thread_total, _shard_database.get_table_rows_totals()["transmission"])
+					_shard_database.dispose()
+
+	def test_worker_processes_throughput_0(self):
+		# requests per second when worker processes share one database file, each request enqueueing a transmission and listing devices
+
+		_transmissions_per_process_total = 1000
+
+		for _processes_total in [1, 2, 4]:
+			with tempfile.TemporaryDirectory() as _temporary_directory_path:
+				_database_file_path = os.path.join(_temporary_directory_path, "database.db")
+				with Database(database_file_path=_database_file_path) as _database:
+					_client = _database.insert_client(
+						ip_address="127.0.0.1"
+					)
+					_database.insert_device(
+						device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+						client_guid=_client.get_client_guid(),
+						purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+						socket_port=24576
+					)
+					_database.insert_queue(
+						queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+					)
+
+				_context = multiprocessing.get_context("spawn")
+				_start_event = _context.Event()
+				_seconds_queue = _context.Queue()
+				_processes = []  # type: List[multiprocessing.Process]
+				for _process_index in range(_processes_total):
+					_process = _context.Process(
+						target=enqueue_transmissions_in_process,
+						args=(_database_file_path, _transmissions_per_process_total, _start_event, _seconds_queue)
+					)
+					_process.start()
+					_processes.append(_process)
+
+				# the processes are given time to open the database before they start together
+				time.sleep(2)
+				_start_event.set()
+				_maximum_seconds = max([_seconds_queue.get(timeout=120) for _process in _processes])
+				for _process in _processes:
+					_process.join()
+					self.assertEqual(0, _process.exitcode)
+
+				print(f"test_worker_processes_throughput_0: {_processes_total} process(es): {_processes_total * _transmissions_per_process_total / _maximum_seconds:.1f} requests/s")
+
+				with Database(database_file_path=_database_file_path) as _database:
+					self.assertEqual(_processes_total * _transmissions_per_process_total, _database.get_table_rows_totals()["transmission"])
+
+	def test_delivery_workers_throughput_0(self):
+		# messages per second delivered to a fleet of simulated devices where a few devices are slow to respond,
+		#  comparing the claim of a batch that waits on its slowest delivery against a pool of workers that claim as soon as they are idle
+
+		_devices_total = 16
+		_slow_devices_total = 2
+		_transmissions_per_device_total = 5
+		_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(_devices_total)]
+		_delivery_seconds_per_device_guid = {_device_guid: 0.1 if _index < _slow_devices_total else 0.02 for _index, _device_guid in enumerate(_device_guids)}
+
+		def _deliver(database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
+			for _transmission_dequeue in transmission_dequeues:
+				time.sleep(_delivery_seconds_per_device_guid[_transmission_dequeue.get_transmission().get_destination_device_guid()])
+				database.transmission_completed(
+					client_guid=client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+
+		def _insert_transmissions(database: Database):
+			_client = database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_instance_guid_per_device_guid = {}  # type: Dict[str, str]
+			for _index, _device_guid in enumerate(_device_guids):
+				_instance_guid_per_device_guid[_device_guid] = database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client.get_client_guid(),
+					purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+					socket_port=24576
+				).get_instance_guid()
+				database.insert_queue(
+					queue_guid=f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}"
+				)
+			database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[(f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}", _device_guid, _instance_guid_per_device_guid[_device_guid], "{ }", _device_guid, _instance_guid_per_device_guid[_device_guid]) for _transmission_index in range(_transmissions_per_device_total) for _index, _device_guid in enumerate(_device_guids)]
+			)
+
+		_transmissions_total = _devices_total * _transmissions_per_device_total
+
+		for _batch_limit in [1, 4, 16]:
+			with Database() as _database:
+				_insert_transmissions(_database)
+				_client = _database.insert_client(
+					ip_address="0.0.0.0"
+				)
+				_start_time = time.perf_counter()
+				_delivered_total = 0
+				while _delivered_total != _transmissions_total:
+					_transmission_dequeues = _database.get_next_transmission_dequeues(
+						client_guid=_client.get_client_guid(),
+						limit=_batch_limit
+					)
+					_threads = [threading.Thread(target=_deliver, args=(_database, _client, [_transmission_dequeue])) for _transmission_dequeue in _transmission_dequeues]
+					for _thread in _threads:
+						_thread.start()
+					for _thread in _threads:
+						_thread.join()
+					_delivered_total += len(_transmission_dequeues)
+				_seconds = time.perf_counter() - _start_time
+
+				print(f"test_delivery_workers_throughput_0: batch of {_batch_limit}: {_transmissions_total / _seconds:.1f} messages/s")
+
+		for _delivery_workers_total in [1, 4, 16]:
+			with Database() as _database:
+				_insert_transmissions(_database)
+				_is_delivered_event = threading.Event()
+				_exceptions = []  # type: List[Exception]
+
+				_transmission_delivery_pool = None  # type: TransmissionDeliveryPool
+
+				def _on_delivered():
+					if _transmission_delivery_pool.get_statistics()["delivered_total"] == _transmissions_total:
+						_is_delivered_event.set()
+
+				_transmission_delivery_pool = TransmissionDeliveryPool(
+					database=_database,
+					delivery_workers_total=_delivery_workers_total,
+					deliver=_deliver,
+					on_delivered=_on_delivered,
+					on_exception=_exceptions.append
+				)
+				_start_time = time.perf_counter()
+				_transmission_delivery_pool.dispatch()
+				self.assertTrue(_is_delivered_event.wait(30))
+				_seconds = time.perf_counter() - _start_time
+
+				print(f"test_delivery_workers_throughput_0: pool of {_delivery_workers_total}: {_transmissions_total / _seconds:.1f} messages/s")
+
+				_transmission_delivery_pool.dispose()
+				self.assertEqual([], _exceptions)
+
+	def test_device_connection_reuse_0(self):
+		# messages per second written to a local device over a new tcp connection per message compared to a pooled connection
+
+		_messages_total = 100
+		_message_bytes = b"{ \"type\": \"send message\" }"
+
+		_server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		_server_socket.bind(("127.0.0.1", 0))
+		_server_socket.listen(16)
+		_port = _server_socket.getsockname()[1]
+
+		def _read_thread_method(connection: socket.socket):
+			while connection.recv(4096) != b"":
+				pass
+			connection.close()
+
+		def _accept_thread_method():
+			try:
+				while True:
+					_connection, _address = _server_socket.accept()
+					threading.Thread(target=_read_thread_method, args=(_connection,), daemon=True).start()
+			except OSError:
+				pass
+
+		_accept_thread = threading.Thread(
+			target=_accept_thread_method,
+			daemon=True
+		)
+		_accept_thread.start()
+
+		for _idle_seconds in [0, 60]:
+			_device_connection_pool = DeviceConnectionPool(
+				open_connection=lambda ip_address, port: socket.create_connection((ip_address, port)),
+				close_connection=lambda connection: connection.close(),
+				idle_seconds=_idle_seconds,
+				connection_seconds_maximum=60,
+				connections_per_device_maximum=1,
+				cycle_interval_seconds=1,
+				on_exception=lambda ex: print(ex)
+			)
+			_start_time = time.perf_counter()
+			for _index in range(_messages_total):
+				_device_connection, _is_reused = _device_connection_pool.acquire(
+					device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+					instance_guid="A1C4F7D0-5B0E-4A4E-8F2B-3C9D6E1F0A2B",
+					ip_address="127.0.0.1",
+					port=_port
+				)
+				_device_connection.get_connection().sendall(_message_bytes)
+				_device_connection_pool.release(
+					device_connection=_device_connection,
+					is_reusable=True
+				)
+			_seconds = time.perf_counter() - _start_time
+
+			_statistics = _device_connection_pool.get_statistics()
+			print(f"test_device_connection_reuse_0: idle seconds {_idle_seconds}: {_messages_total / _seconds:.1f} messages/s, {_statistics['opened_connections_total']} connection(s) opened")
+
+			_device_connection_pool.dispose()
+
+		_server_socket.close()
+
+	def test_transmission_batch_throughput_0(self):
+		# messages per second delivered to a single device where every header sent costs a fixed round trip,
+		#  comparing one transmission per header against consecutive json transmissions coalesced under one header
+
+		_transmissions_total = 200
+		_header_seconds = 0.005
+		_device_guid = "2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B"
+
+		def _deliver(database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
+			time.sleep(_header_seconds)
+			database.transmissions_completed(
+				client_guid=client.get_client_guid(),
+				transmission_dequeue_guids=[_transmission_dequeue.get_transmission_dequeue_guid() for _transmission_dequeue in transmission_dequeues]
+			)
+
+		for _batch_transmissions_total_maximum in [1, 4, 16]:
+			with Database() as _database:
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_device = _database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client.get_client_guid(),
+					purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+					socket_port=24576
+				)
+				_queue = _database.insert_queue(
+					queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+				)
+				_database.insert_transmissions(
+					client_guid=_client.get_client_guid(),
+					transmissions=[(_queue.get_queue_guid(), _device.get_device_guid(), _device.get_instance_guid(), "{ \"parser_type\": \"SendJsonTransmissionParser\" }", _device.get_device_guid(), _device.get_instance_guid())] * _transmissions_total
+				)
+
+				_is_delivered_event = threading.Event()
+				_exceptions = []  # type: List[Exception]
+
+				_transmission_delivery_pool = None  # type: TransmissionDeliveryPool
+
+				def _on_delivered():
+					if _transmission_delivery_pool.get_statistics()["delivered_transmissions_total"] == _transmissions_total:
+						_is_delivered_event.set()
+
+				_transmission_delivery_pool = TransmissionDeliveryPool(
+					database=_database,
+					delivery_workers_total=1,
+					deliver=_deliver,
+					on_delivered=_on_delivered,
+					on_exception=_exceptions.append,
+					batch_transmissions_total_maximum=_batch_transmissions_total_maximum,
+					batched_parser_type="SendJsonTransmissionParser"
+				)
+				_start_time = time.perf_counter()
+				_transmission_delivery_pool.dispatch()
+				self.assertTrue(_is_delivered_event.wait(30))
+				_seconds = time.perf_counter() - _start_time
+
+				_statistics = _transmission_delivery_pool.get_statistics()
+				print(f"test_transmission_batch_throughput_0: batch of {_batch_transmissions_total_maximum}: {_transmissions_total / _seconds:.1f} messages/s, {_statistics['delivered_total']} header(s) sent")
+
+				_transmission_delivery_pool.dispose()
+				self.assertEqual([], _exceptions)
+
+	def test_transient_drop_recovery_0(self):
+		# seconds from the end of a network drop until every transmission was delivered, for a few backoff schedules of the retry scheduler
+
+		_devices_total = 8
+		_transmissions_per_device_total = 5
+		_drop_seconds = 0.5
+		_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(_devices_total)]
+		_transmissions_total = _devices_total * _transmissions_per_device_total
+
+		for _backoff_seconds in [[0.05, 0.1, 0.2, 0.4], [0.25], [1.0]]:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_instance_guid_per_device_guid = {}  # type: Dict[str, str]
+			for _index, _device_guid in enumerate(_device_guids):
+				_instance_guid_per_device_guid[_device_guid] = _database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client.get_client_guid(),
+					purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+					socket_port=24576
+				).get_instance_guid()
+				_database.insert_queue(
+					queue_guid=f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}"
+				)
+			_database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[(f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}", _device_guid, _instance_guid_per_device_guid[_device_guid], "{ }", _device_guid, _instance_guid_per_device_guid[_device_guid]) for _transmission_index in range(_transmissions_per_device_total) for _index, _device_guid in enumerate(_device_guids)]
+			)
+
+			_drop_end_time = time.perf_counter() + _drop_seconds
+
+			def _deliver(database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
+				for _transmission_dequeue in transmission_dequeues:
+					time.sleep(0.005)
+					if time.perf_counter() < _drop_end_time:
+						database.transmission_failed(
+							client_guid=client.get_client_guid(),
+							transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
+							error_message_json_string="\"Failed to connect.\""
+						)
+					else:
+						database.transmission_completed(
+							client_guid=client.get_client_guid(),
+							transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+						)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = TransmissionDeliveryPool(
+				database=_database,
+				delivery_workers_total=_devices_total,
+				deliver=_deliver,
+				on_delivered=lambda: None,
+				on_exception=_exceptions.append
+			)
+			_transmission_retry_scheduler = TransmissionRetryScheduler(
+				database_factory=_database_factory,
+				attempts_total_maximum=100,
+				backoff_seconds=_backoff_seconds,
+				batch_rows_total=100,
+				cycle_interval_seconds=0.02,
+				on_retried=lambda retried_total: _transmission_delivery_pool.dispatch(),
+				on_exception=_exceptions.append
+			)
+			_transmission_retry_scheduler.start()
+			_transmission_delivery_pool.dispatch()
+
+			# the queue stats only hold the destination devices with transmissions not yet delivered
+			while len(_database.get_queue_stats()[1]) != 0:
+				self.assertLess(time.perf_counter(), _drop_end_time + 30)
+				time.sleep(0.01)
+			_recovery_seconds = time.perf_counter() - _drop_end_time
+
+			_transmission_retry_scheduler.dispose()
+			_transmission_delivery_pool.dispose()
+			self.assertEqual([], _exceptions)
+
+			_statistics = _transmission_retry_scheduler.get_statistics()
+			print(f"test_transient_drop_recovery_0: backoff seconds {_backoff_seconds}: {_transmissions_total} transmissions delivered {_recovery_seconds:.2f}s after a {_drop_seconds}s drop, {_statistics['retried_total']} retries, {_statistics['recovered_total']} recovered taking {_statistics['recovery_seconds_maximum']:.2f}s at most")
+
+			_database.dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -1,10 +1,37 @@
 from __future__ import annotations
-from app.database import Database, Client, Device, Transmission, ApiEntrypoint
+from app.database import Database, Client, Device, Transmission, ApiEntrypoint, DatabaseFactory, DatabaseSynchronous, TransmissionStatus, QueueStats, DestinationDeviceStats, Queue, TransmissionDequeue
 import unittest
 import sqlite3
+import threading
+import time
+import tempfile
+import os
+import json
 from typing import List, Tuple, Dict
 import uuid
-from datetime import datetime
+import multiprocessing
+from datetime import datetime, timedelta
+
+
+def deliver_transmissions_in_process(database_file_path: str, transmissions_total: int, delivered_transmission_guids_queue: multiprocessing.Queue):
+	# NOTE runs within a separate process, delivering transmissions until every one of them is complete
+
+	with Database(database_file_path=database_file_path) as _database:
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_delivered_transmission_guids = []  # type: List[str]
+		while _database.get_table_rows_totals()["transmission_complete"] < transmissions_total:
+			for _transmission_dequeue in _database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=2
+			):
+				_delivered_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+		delivered_transmission_guids_queue.put(_delivered_transmission_guids)
 
 
 class DatabaseTest(unittest.TestCase):
@@ -2467,6 +2494,16 @@ class DatabaseTest(unittest.TestCase):
 				api_entrypoint=ApiEntrypoint.V1DownloadGitRepository,
 				input_json_string=None
 			)
+			_database.insert_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.V1ReceiveDeviceTransmissionBatch,
+				input_json_string="{ \"transmissions\": [] }"
+			)
+			_database.insert_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.V1GetQueueStats,
+				input_json_string="{ }"
+			)
 
 			_end_datetime = datetime.utcnow()
 
@@ -2483,6 +2520,8 @@ class DatabaseTest(unittest.TestCase):
 			self.assertEqual("{ \"transmission_dequeue_guid\": \"7F496997-57D1-4803-8DD5-57ECFC858DE9\" }", _api_entrypoint_logs[4].get_input_json_string())
 			self.assertEqual("{ \"first\": 1, \"second\": 2 }", _api_entrypoint_logs[5].get_input_json_string())
 			self.assertEqual(f"{{ \"size_test\": \"{'1234567890' * 10**7}\" }}", _api_entrypoint_logs[6].get_input_json_string())
+			self.assertEqual("{ \"transmissions\": [] }", _api_entrypoint_logs[8].get_input_json_string())
+			self.assertEqual("{ }", _api_entrypoint_logs[9].get_input_json_string())
 
 	def test_different_queues_2(self):
 		# insert transmission into different queue, two transmissions and two dequeuers and two reporters, same source and destination so second dequeuer must wait for earlier transmission for first dequeuer
@@ -2767,6 +2806,1392 @@ class DatabaseTest(unittest.TestCase):
 			self.assertIsNotNone(_second_failed_transmission_dequeue)
 			self.assertEqual(_first_transmission_dequeue.get_transmission_dequeue_guid(), _second_failed_transmission_dequeue.get_transmission_dequeue_error_transmission().get_transmission_dequeue_guid())
 
+	def test_database_file_0(self):
+		# queued transmission survives reopening the file-backed database
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			with Database(database_file_path=_database_file_path, synchronous=DatabaseSynchronous.Full) as _database:
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_device = _database.insert_device(
+					device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+					client_guid=_client.get_client_guid(),
+					purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+					socket_port=24576
+				)
+				_queue = _database.insert_queue(
+					queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+				)
+				_transmission = _database.insert_transmission(
+					queue_guid=_queue.get_queue_guid(),
+					source_device_guid=_device.get_device_guid(),
+					source_device_instance_guid=_device.get_instance_guid(),
+					client_guid=_client.get_client_guid(),
+					stored_transmission_json_string="{ \"test\": true }",
+					destination_device_guid=_device.get_device_guid(),
+					destination_device_instance_guid=_device.get_instance_guid()
+				)
+				self.assertIsNotNone(_transmission)
+
+			_database_factory = DatabaseFactory(
+				database_file_path=_database_file_path
+			)
+			with _database_factory.get_database() as _database:
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+				self.assertIsNotNone(_transmission_dequeue)
+				self.assertEqual(_transmission.get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+				self.assertEqual(1, len(_database.get_all_devices()))
+
+	def test_schema_version_0(self):
+		# reopening a file-backed database only checks its version and every api entrypoint is present exactly once
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			with Database(database_file_path=_database_file_path) as _database:
+				_schema_version = _database.get_schema_version()
+				self.assertLess(0, _schema_version)
+				_database.insert_client(
+					ip_address="127.0.0.1"
+				)
+
+			for _index in range(2):
+				with Database(database_file_path=_database_file_path) as _database:
+					self.assertEqual(_schema_version, _database.get_schema_version())
+					self.assertEqual(1, _database.get_table_rows_totals()["client"])
+
+			_connection = sqlite3.connect(_database_file_path)
+			self.assertEqual(list(range(1, _schema_version + 1)), [_row[0] for _row in _connection.execute("SELECT version FROM schema_version ORDER BY version").fetchall()])
+			self.assertEqual(sorted(int(_api_entrypoint) for _api_entrypoint in ApiEntrypoint), [_row[0] for _row in _connection.execute("SELECT api_entrypoint_id FROM api_entrypoint ORDER BY api_entrypoint_id").fetchall()])
+			_connection.close()
+
+	def test_schema_migration_0(self):
+		# an older database is brought up to date without losing its rows, including one created before the schema was versioned
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			with Database(database_file_path=_database_file_path) as _database:
+				_schema_version = _database.get_schema_version()
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_database.insert_api_entrypoint_log(
+					client_guid=_client.get_client_guid(),
+					api_entrypoint=ApiEntrypoint.TestGet,
+					input_json_string="{ }"
+				)
+
+			for _index, _migration_sql in enumerate([
+				"DELETE FROM api_entrypoint WHERE api_entrypoint_id = 9; DELETE FROM schema_version WHERE version >= 2;",
+				"DROP TABLE schema_version;"
+			]):
+				_connection = sqlite3.connect(_database_file_path)
+				_connection.executescript(_migration_sql)
+				_connection.close()
+
+				with Database(database_file_path=_database_file_path) as _database:
+					self.assertEqual(_schema_version, _database.get_schema_version())
+					self.assertEqual(1, _database.get_table_rows_totals()["client"])
+					self.assertEqual(_index + 1, _database.get_table_rows_totals()["api_entrypoint_log"])
+					# the api entrypoint restored by the migration can be logged against again
+					_database.insert_api_entrypoint_log(
+						client_guid=_client.get_client_guid(),
+						api_entrypoint=ApiEntrypoint.V1ReceiveDeviceTransmissionBatch,
+						input_json_string="{ }"
+					)
+
+	def test_iterate_api_entrypoint_logs_0(self):
+		# logs stream in pages in the order they were created, including logs sharing the same timestamp, and can be filtered
+		with Database() as _database:
+			_first_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_second_client = _database.insert_client(
+				ip_address="127.0.0.2"
+			)
+			_start_datetime = datetime.utcnow()
+			_row_created_datetime = _start_datetime + timedelta(seconds=1)
+			_database.insert_api_entrypoint_logs(
+				api_entrypoint_logs=[(_first_client.get_client_guid() if _index % 2 == 0 else _second_client.get_client_guid(), ApiEntrypoint.TestGet if _index % 3 == 0 else ApiEntrypoint.TestPost, f"{{ \"index\": {_index} }}", _row_created_datetime + timedelta(seconds=_index // 4)) for _index in range(23)]
+			)
+			_end_datetime = _row_created_datetime + timedelta(seconds=60)
+
+			for _page_rows_total in [1, 4, 5, 23, 100]:
+				_api_entrypoint_logs = _database.iterate_api_entrypoint_logs(
+					inclusive_start_row_created_datetime=_start_datetime,
+					exclusive_end_row_created_datetime=_end_datetime,
+					page_rows_total=_page_rows_total
+				)
+				self.assertFalse(isinstance(_api_entrypoint_logs, list))
+				self.assertEqual(list(range(23)), [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+
+			_api_entrypoint_logs = list(_database.iterate_api_entrypoint_logs(
+				inclusive_start_row_created_datetime=_start_datetime,
+				exclusive_end_row_created_datetime=_end_datetime,
+				api_entrypoint=ApiEntrypoint.TestGet,
+				client_guid=_second_client.get_client_guid(),
+				page_rows_total=2
+			))
+			self.assertEqual([3, 9, 15, 21], [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+
+			_api_entrypoint_logs = _database.get_api_entrypoint_logs(
+				inclusive_start_row_created_datetime=_start_datetime,
+				exclusive_end_row_created_datetime=_row_created_datetime + timedelta(seconds=2),
+				client_guid=_first_client.get_client_guid()
+			)
+			self.assertEqual([0, 2, 4, 6], [json.loads(_api_entrypoint_log.get_input_json_string())["index"] for _api_entrypoint_log in _api_entrypoint_logs])
+
+	def test_query_plan_0(self):
+		# dequeue queries must be answered from indexes instead of full table scans
+		with Database() as _database:
+			_query_plans = _database.get_query_plans()
+			self.assertIn("get_next_transmission_dequeues", _query_plans)
+			self.assertIn("get_next_failed_transmission_dequeue", _query_plans)
+			self.assertIn("get_transmission_dequeue_graphs", _query_plans)
+			self.assertIn("get_devices_by_purpose", _query_plans)
+			self.assertIn("get_api_entrypoint_logs_page", _query_plans)
+			for _query_name, _query_plan_details in _query_plans.items():
+				print(f"test_query_plan_0: {_query_name}: {_query_plan_details}")
+				self.assertNotEqual(0, len(_query_plan_details))
+				for _query_plan_detail in _query_plan_details:
+					if _query_plan_detail.startswith("SCAN "):
+						self.assertIn(" USING ", _query_plan_detail, f"Full table scan in {_query_name}: {_query_plan_detail}")
+					self.assertNotIn("AUTOMATIC", _query_plan_detail, f"Automatic index in {_query_name}: {_query_plan_detail}")
+					self.assertNotIn("TEMP B-TREE", _query_plan_detail, f"Temporary sort in {_query_name}: {_query_plan_detail}")
+
+	def test_transmission_status_0(self):
+		# status follows the transmission through dequeue, failure, retry, and completion
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_source_device = _database.insert_device(
+				device_guid="6B9C16F6-56B2-495F-9D89-98415C71EB7E",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+				socket_port=24576
+			)
+			_destination_device = _database.insert_device(
+				device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+			)
+			_first_transmission = _database.insert_transmission(
+				queue_guid=_queue.get_queue_guid(),
+				source_device_guid=_source_device.get_device_guid(),
+				source_device_instance_guid=_source_device.get_instance_guid(),
+				client_guid=_client.get_client_guid(),
+				stored_transmission_json_string="{ \"order\": \"first\" }",
+				destination_device_guid=_destination_device.get_device_guid(),
+				destination_device_instance_guid=_destination_device.get_instance_guid()
+			)
+			self.assertEqual(TransmissionStatus.Pending, _first_transmission.get_status())
+			_second_transmission = _database.insert_transmission(
+				queue_guid=_queue.get_queue_guid(),
+				source_device_guid=_source_device.get_device_guid(),
+				source_device_instance_guid=_source_device.get_instance_guid(),
+				client_guid=_client.get_client_guid(),
+				stored_transmission_json_string="{ \"order\": \"second\" }",
+				destination_device_guid=_destination_device.get_device_guid(),
+				destination_device_instance_guid=_destination_device.get_instance_guid()
+			)
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_first_transmission.get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+			self.assertEqual(TransmissionStatus.InFlight, _transmission_dequeue.get_transmission().get_status())
+
+			_database.transmission_failed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
+				error_message_json_string="{ \"error\": \"message\" }"
+			)
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_first_transmission.get_transmission_guid()
+			)
+			self.assertEqual(TransmissionStatus.Failed, _transmission.get_status())
+
+			_failed_transmission_dequeue = _database.get_next_failed_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			_database.failed_transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_error_transmission_dequeue_guid=_failed_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+				is_retry_requested=True
+			)
+			self.assertIsNone(_database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			))
+
+			_database.insert_device(
+				device_guid=_destination_device.get_device_guid(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=_destination_device.get_purpose_guid(),
+				socket_port=24576
+			)
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_first_transmission.get_transmission_guid()
+			)
+			self.assertEqual(TransmissionStatus.Retry, _transmission.get_status())
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_first_transmission.get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+			_database.transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			)
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_first_transmission.get_transmission_guid()
+			)
+			self.assertEqual(TransmissionStatus.Complete, _transmission.get_status())
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_second_transmission.get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+
+	def test_get_next_transmission_dequeues_0(self):
+		# batch dequeue only claims transmissions that do not block each other by destination or queue
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_source_device = _database.insert_device(
+				device_guid="6B9C16F6-56B2-495F-9D89-98415C71EB7E",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+				socket_port=24576
+			)
+			_first_destination_device = _database.insert_device(
+				device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24576
+			)
+			_second_destination_device = _database.insert_device(
+				device_guid="7B0C7428-AD10-4E0E-BB5E-6B38CF9AB7BA",
+				client_guid=_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24576
+			)
+			_first_queue = _database.insert_queue(
+				queue_guid="66053259-5456-455A-8898-E5F708F07C27"
+			)
+			_second_queue = _database.insert_queue(
+				queue_guid="CE50E40E-D888-4684-B72C-654FCF81975F"
+			)
+			_transmissions = []  # type: List[Transmission]
+			for _queue, _destination_device in [
+				(_first_queue, _first_destination_device),
+				(_second_queue, _second_destination_device),
+				(_first_queue, _second_destination_device)
+			]:
+				_transmissions.append(_database.insert_transmission(
+					queue_guid=_queue.get_queue_guid(),
+					source_device_guid=_source_device.get_device_guid(),
+					source_device_instance_guid=_source_device.get_instance_guid(),
+					client_guid=_client.get_client_guid(),
+					stored_transmission_json_string="{ }",
+					destination_device_guid=_destination_device.get_device_guid(),
+					destination_device_instance_guid=_destination_device.get_instance_guid()
+				))
+
+			_transmission_dequeues = _database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=5
+			)
+			self.assertEqual(2, len(_transmission_dequeues))
+			self.assertEqual(_transmissions[0].get_transmission_guid(), _transmission_dequeues[0].get_transmission_guid())
+			self.assertEqual(_transmissions[1].get_transmission_guid(), _transmission_dequeues[1].get_transmission_guid())
+			self.assertEqual(0, len(_database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=5
+			)))
+
+			# the third transmission waits on the first by queue and on the second by destination
+			_database.transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeues[0].get_transmission_dequeue_guid()
+			)
+			self.assertEqual(0, len(_database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=5
+			)))
+			_database.transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeues[1].get_transmission_dequeue_guid()
+			)
+			_transmission_dequeues = _database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=5
+			)
+			self.assertEqual(1, len(_transmission_dequeues))
+			self.assertEqual(_transmissions[2].get_transmission_guid(), _transmission_dequeues[0].get_transmission_guid())
+
+
+	def test_concurrent_reads_and_writes_0(self):
+		# many threads inserting and reading at the same time through the writer thread and the read connections
+
+		_threads_total = 8
+		_transmissions_per_thread_total = 25
+
+		with Database(read_connections_total=2) as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_guids = []  # type: List[str]
+
+			def _thread_method():
+				try:
+					for _index in range(_transmissions_per_thread_total):
+						_transmission = _database.insert_transmission(
+							queue_guid=_queue.get_queue_guid(),
+							source_device_guid=_device.get_device_guid(),
+							source_device_instance_guid=_device.get_instance_guid(),
+							client_guid=_client.get_client_guid(),
+							stored_transmission_json_string="{ }",
+							destination_device_guid=_device.get_device_guid(),
+							destination_device_instance_guid=_device.get_instance_guid()
+						)
+						_transmission_guids.append(_transmission.get_transmission_guid())
+						_devices = _database.get_devices_by_purpose(
+							purpose_guid=_device.get_purpose_guid()
+						)
+						self.assertEqual(1, len(_devices))
+				except Exception as ex:
+					_exceptions.append(ex)
+
+			_threads = []  # type: List[threading.Thread]
+			for _thread_index in range(_threads_total):
+				_thread = threading.Thread(
+					target=_thread_method
+				)
+				_thread.start()
+				_threads.append(_thread)
+			for _thread in _threads:
+				_thread.join()
+
+			self.assertEqual([], _exceptions)
+			self.assertEqual(_threads_total * _transmissions_per_thread_total, len(set(_transmission_guids)))
+
+			for _transmission_guid in _transmission_guids:
+				_is_successful, _transmission = _database.try_get_transmission(
+					transmission_guid=_transmission_guid
+				)
+				self.assertTrue(_is_successful)
+
+	def test_write_exception_0(self):
+		# a failed write is raised to the caller and does not stop the writer thread
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+
+			with self.assertRaises(sqlite3.IntegrityError):
+				_database.insert_transmission(
+					queue_guid=str(uuid.uuid4()).upper(),
+					source_device_guid=str(uuid.uuid4()).upper(),
+					source_device_instance_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					stored_transmission_json_string="{ }",
+					destination_device_guid=str(uuid.uuid4()).upper(),
+					destination_device_instance_guid=str(uuid.uuid4()).upper()
+				)
+
+			_other_client = _database.insert_client(
+				ip_address="127.0.0.2"
+			)
+			_is_successful, _found_client = _database.try_get_client(
+				client_guid=_other_client.get_client_guid()
+			)
+			self.assertTrue(_is_successful)
+
+	def test_transmission_dequeue_graph_0(self):
+		# a dequeued transmission arrives with both devices and their last known clients populated
+		with Database() as _database:
+			_source_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_source_device = _database.insert_device(
+				device_guid="6B9C16F6-56B2-495F-9D89-98415C71EB7E",
+				client_guid=_source_client.get_client_guid(),
+				purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+				socket_port=24576
+			)
+			_destination_client = _database.insert_client(
+				ip_address="127.0.0.2"
+			)
+			_destination_device = _database.insert_device(
+				device_guid="2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B",
+				client_guid=_destination_client.get_client_guid(),
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5",
+				socket_port=24577
+			)
+			_queue = _database.insert_queue(
+				queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"
+			)
+			_transmission = _database.insert_transmission(
+				queue_guid=_queue.get_queue_guid(),
+				source_device_guid=_source_device.get_device_guid(),
+				source_device_instance_guid=_source_device.get_instance_guid(),
+				client_guid=_source_client.get_client_guid(),
+				stored_transmission_json_string="{ \"test\": true }",
+				destination_device_guid=_destination_device.get_device_guid(),
+				destination_device_instance_guid=_destination_device.get_instance_guid()
+			)
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_source_client.get_client_guid()
+			)
+
+			_is_successful, _found_transmission_dequeue = _database.try_get_transmission_dequeue(
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			)
+			self.assertTrue(_is_successful)
+
+			for _dequeue in [_transmission_dequeue, _found_transmission_dequeue]:
+				self.assertEqual(_transmission.get_transmission_guid(), _dequeue.get_transmission().get_transmission_guid())
+				self.assertEqual(TransmissionStatus.InFlight, _dequeue.get_transmission().get_status())
+				self.assertEqual(_destination_client.get_client_guid(), _dequeue.get_destination_client_guid())
+				self.assertEqual(_source_device.get_device_guid(), _dequeue.get_transmission().get_source_device().get_device_guid())
+				self.assertEqual("127.0.0.1", _dequeue.get_transmission().get_source_device().get_last_known_client().get_ip_address())
+				self.assertEqual(_destination_device.get_device_guid(), _dequeue.get_transmission().get_destination_device().get_device_guid())
+				self.assertEqual(24577, _dequeue.get_transmission().get_destination_device().get_socket_port())
+				self.assertEqual("127.0.0.2", _dequeue.get_transmission().get_destination_device().get_last_known_client().get_ip_address())
+
+			_is_successful, _missing_transmission_dequeue = _database.try_get_transmission_dequeue(
+				transmission_dequeue_guid=str(uuid.uuid4()).upper()
+			)
+			self.assertFalse(_is_successful)
+			self.assertIsNone(_missing_transmission_dequeue)
+
+	def test_get_devices_by_purpose_last_known_datetime_0(self):
+		# only the devices announced since the minimum last known datetime are listed
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_purpose_guid = str(uuid.uuid4()).upper()
+			_stale_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=_purpose_guid,
+				socket_port=24576
+			)
+			_minimum_last_known_datetime = datetime.utcnow()
+			time.sleep(0.01)
+			_fresh_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=_purpose_guid,
+				socket_port=24576
+			)
+			_database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+
+			_devices = _database.get_devices_by_purpose(
+				purpose_guid=_purpose_guid
+			)
+			self.assertEqual({_stale_device.get_device_guid(), _fresh_device.get_device_guid()}, {_device.get_device_guid() for _device in _devices})
+			for _device in _devices:
+				self.assertEqual(_client.get_client_guid(), _device.get_last_known_client().get_client_guid())
+				self.assertEqual("127.0.0.1", _device.get_last_known_client().get_ip_address())
+
+			_devices = _database.get_devices_by_purpose(
+				purpose_guid=_purpose_guid,
+				minimum_last_known_datetime=_minimum_last_known_datetime
+			)
+			self.assertEqual([_fresh_device.get_device_guid()], [_device.get_device_guid() for _device in _devices])
+
+	def test_client_cache_0(self):
+		# repeated inserts of the same ip address are answered by the client cache
+		with Database(cached_clients_total_maximum=2) as _database:
+			_first_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			self.assertEqual(0, _database.get_client_cache().get_hits_total())
+			self.assertEqual(1, _database.get_client_cache().get_misses_total())
+
+			for _index in range(3):
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				self.assertEqual(_first_client.get_client_guid(), _client.get_client_guid())
+			self.assertEqual(3, _database.get_client_cache().get_hits_total())
+			self.assertEqual(1, _database.get_client_cache().get_misses_total())
+
+			_database.insert_client(
+				ip_address="127.0.0.2"
+			)
+			_database.insert_client(
+				ip_address="127.0.0.3"
+			)
+			self.assertEqual(3, _database.get_client_cache().get_misses_total())
+
+			# the least recently used client was evicted but is still found in the database
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			self.assertEqual(_first_client.get_client_guid(), _client.get_client_guid())
+			self.assertEqual(3, _database.get_client_cache().get_hits_total())
+			self.assertEqual(4, _database.get_client_cache().get_misses_total())
+
+			_database.insert_client(
+				ip_address="127.0.0.3"
+			)
+			self.assertEqual(4, _database.get_client_cache().get_hits_total())
+			self.assertEqual(4, _database.get_client_cache().get_misses_total())
+
+	def test_transmission_sequence_order_0(self):
+		# transmissions inserted back to back are dequeued in insertion order even if their datetimes tie
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+			_transmission_guids = []  # type: List[str]
+			for _index in range(200):
+				_transmission = _database.insert_transmission(
+					queue_guid=_queue.get_queue_guid(),
+					source_device_guid=_device.get_device_guid(),
+					source_device_instance_guid=_device.get_instance_guid(),
+					client_guid=_client.get_client_guid(),
+					stored_transmission_json_string="{ }",
+					destination_device_guid=_device.get_device_guid(),
+					destination_device_instance_guid=_device.get_instance_guid()
+				)
+				_transmission_guids.append(_transmission.get_transmission_guid())
+
+			_dequeued_transmission_guids = []  # type: List[str]
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			while _transmission_dequeue is not None:
+				_dequeued_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+
+			self.assertEqual(_transmission_guids, _dequeued_transmission_guids)
+
+	def test_insert_transmissions_0(self):
+		# a batch across queues and destinations is sequenced in the order given and delivered after earlier transmissions
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_devices = []  # type: List[Device]
+			for _index in range(2):
+				_devices.append(_database.insert_device(
+					device_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					purpose_guid=str(uuid.uuid4()).upper(),
+					socket_port=24576
+				))
+			_queues = []
+			for _index in range(2):
+				_queues.append(_database.insert_queue(
+					queue_guid=str(uuid.uuid4()).upper()
+				))
+
+			self.assertEqual([], _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[]
+			))
+
+			_first_transmission = _database.insert_transmission(
+				queue_guid=_queues[1].get_queue_guid(),
+				source_device_guid=_devices[0].get_device_guid(),
+				source_device_instance_guid=_devices[0].get_instance_guid(),
+				client_guid=_client.get_client_guid(),
+				stored_transmission_json_string="{ \"index\": -1 }",
+				destination_device_guid=_devices[1].get_device_guid(),
+				destination_device_instance_guid=_devices[1].get_instance_guid()
+			)
+
+			_transmissions = []  # type: List[Tuple[str, str, str, str, str, str]]
+			for _index in range(20):
+				_source_device = _devices[_index % 2]
+				_destination_device = _devices[(_index + 1) % 2]
+				_transmissions.append((_queues[(_index // 3) % 2].get_queue_guid(), _source_device.get_device_guid(), _source_device.get_instance_guid(), f"{{ \"index\": {_index} }}", _destination_device.get_device_guid(), _destination_device.get_instance_guid()))
+			_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=_transmissions
+			)
+
+			self.assertEqual(20, len(_transmission_receipts))
+			self.assertEqual([_transmission[0] for _transmission in _transmissions], [_transmission_receipt.get_queue_guid() for _transmission_receipt in _transmission_receipts])
+			_first_sequence = _transmission_receipts[0].get_sequence()
+			self.assertEqual(list(range(_first_sequence, _first_sequence + 20)), [_transmission_receipt.get_sequence() for _transmission_receipt in _transmission_receipts])
+
+			for _transmission_receipt in _transmission_receipts:
+				_is_successful, _transmission = _database.try_get_transmission(
+					transmission_guid=_transmission_receipt.get_transmission_guid()
+				)
+				self.assertTrue(_is_successful)
+				self.assertEqual(TransmissionStatus.Pending, _transmission.get_status())
+				self.assertEqual(_client.get_client_guid(), _transmission.get_request_client_guid())
+
+			_dequeued_transmission_guids = []  # type: List[str]
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			while _transmission_dequeue is not None:
+				_dequeued_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+
+			self.assertEqual([_first_transmission.get_transmission_guid()] + [_transmission_receipt.get_transmission_guid() for _transmission_receipt in _transmission_receipts], _dequeued_transmission_guids)
+
+	def test_sharded_database_factory_0(self):
+		# transmissions to one destination device are delivered in the order they were sent even when their queues live in different shards
+
+		_database_factory = DatabaseFactory(
+			shards_total=3
+		)
+		self.assertEqual(3, _database_factory.get_shards_total())
+		_shard_databases = _database_factory.get_shard_databases()
+		self.assertEqual(3, len(_shard_databases))
+		self.assertIs(_shard_databases[0], _database_factory.get_database())
+
+		# the shard of a queue does not depend on the case of its guid or on the process
+		self.assertEqual(_database_factory.get_shard_index(queue_guid="e7fcc183-d1b4-4f3b-9be7-a54cf25fa78f"), _database_factory.get_shard_index(queue_guid="E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F"))
+
+		_queue_guid_per_shard_index = {}  # type: Dict[int, str]
+		while len(_queue_guid_per_shard_index) != 3:
+			_queue_guid = str(uuid.uuid4()).upper()
+			_queue_guid_per_shard_index[_database_factory.get_shard_index(queue_guid=_queue_guid)] = _queue_guid
+
+		# devices are known to every shard under the same instance
+		_device_guids = [str(uuid.uuid4()).upper() for _index in range(2)]
+		_instance_guids = [str(uuid.uuid4()).upper() for _index in range(2)]
+		_client_per_shard_index = {}  # type: Dict[int, Client]
+		for _shard_index, _shard_database in enumerate(_shard_databases):
+			_client_per_shard_index[_shard_index] = _shard_database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			for _device_guid, _instance_guid in zip(_device_guids, _instance_guids):
+				_shard_database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client_per_shard_index[_shard_index].get_client_guid(),
+					purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+					socket_port=24576,
+					instance_guid=_instance_guid
+				)
+			self.assertIs(_shard_database, _database_factory.get_shard_database(
+				queue_guid=_queue_guid_per_shard_index[_shard_index]
+			))
+			_shard_database.insert_queue(
+				queue_guid=_queue_guid_per_shard_index[_shard_index]
+			)
+
+		_transmission_guids = []  # type: List[str]
+		for _index in range(12):
+			_shard_index = (_index * 7) % 3
+			_transmission = _shard_databases[_shard_index].insert_transmission(
+				queue_guid=_queue_guid_per_shard_index[_shard_index],
+				source_device_guid=_device_guids[0],
+				source_device_instance_guid=_instance_guids[0],
+				client_guid=_client_per_shard_index[_shard_index].get_client_guid(),
+				stored_transmission_json_string=f"{{ \"index\": {_index} }}",
+				destination_device_guid=_device_guids[1],
+				destination_device_instance_guid=_instance_guids[1]
+			)
+			_transmission_guids.append(_transmission.get_transmission_guid())
+
+		_dequeued_transmission_guids = []  # type: List[str]
+		_is_dequeued = True
+		while _is_dequeued:
+			_is_dequeued = False
+			for _shard_index, _shard_database in enumerate(_shard_databases):
+				_transmission_dequeues = _shard_database.get_next_transmission_dequeues(
+					client_guid=_client_per_shard_index[_shard_index].get_client_guid(),
+					limit=4
+				)
+				# only the shard holding the earliest transmission to the destination device may deliver
+				self.assertLessEqual(len(_transmission_dequeues), 1)
+				for _transmission_dequeue in _transmission_dequeues:
+					_dequeued_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+					self.assertEqual(None, _shard_databases[(_shard_index + 1) % 3].get_next_transmission_dequeue(
+						client_guid=_client_per_shard_index[(_shard_index + 1) % 3].get_client_guid()
+					))
+					_shard_database.transmission_completed(
+						client_guid=_client_per_shard_index[_shard_index].get_client_guid(),
+						transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+					)
+					_is_dequeued = True
+
+		self.assertEqual(_transmission_guids, _dequeued_transmission_guids)
+
+		for _shard_database in _shard_databases:
+			_shard_database.dispose()
+
+	def test_sharded_database_factory_1(self):
+		# reopened shard files continue delivering in order from the transmissions they still hold
+
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			_device_guid = str(uuid.uuid4()).upper()
+			_instance_guid = str(uuid.uuid4()).upper()
+
+			_database_factory = DatabaseFactory(
+				database_file_path=_database_file_path,
+				shards_total=2
+			)
+			_queue_guid_per_shard_index = {}  # type: Dict[int, str]
+			while len(_queue_guid_per_shard_index) != 2:
+				_queue_guid = str(uuid.uuid4()).upper()
+				_queue_guid_per_shard_index[_database_factory.get_shard_index(queue_guid=_queue_guid)] = _queue_guid
+
+			_transmission_guids = []  # type: List[str]
+			for _shard_index, _shard_database in enumerate(_database_factory.get_shard_databases()):
+				_client = _shard_database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_shard_database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client.get_client_guid(),
+					purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+					socket_port=24576,
+					instance_guid=_instance_guid
+				)
+				_shard_database.insert_queue(
+					queue_guid=_queue_guid_per_shard_index[_shard_index]
+				)
+			for _index in range(4):
+				_shard_index = 1 - _index % 2
+				_shard_database = _database_factory.get_shard_databases()[_shard_index]
+				_transmission = _shard_database.insert_transmission(
+					queue_guid=_queue_guid_per_shard_index[_shard_index],
+					source_device_guid=_device_guid,
+					source_device_instance_guid=_instance_guid,
+					client_guid=_shard_database.insert_client(ip_address="127.0.0.1").get_client_guid(),
+					stored_transmission_json_string="{ }",
+					destination_device_guid=_device_guid,
+					destination_device_instance_guid=_instance_guid
+				)
+				_transmission_guids.append(_transmission.get_transmission_guid())
+			for _shard_database in _database_factory.get_shard_databases():
+				_shard_database.dispose()
+
+			self.assertTrue(os.path.exists(_database_file_path))
+			self.assertTrue(os.path.exists(os.path.join(_temp_directory_path, "wifi_server_shard_1.db")))
+
+			_database_factory = DatabaseFactory(
+				database_file_path=_database_file_path,
+				shards_total=2
+			)
+			_dequeued_transmission_guids = []  # type: List[str]
+			_is_dequeued = True
+			while _is_dequeued:
+				_is_dequeued = False
+				for _shard_database in _database_factory.get_shard_databases():
+					_client = _shard_database.insert_client(
+						ip_address="127.0.0.1"
+					)
+					_transmission_dequeue = _shard_database.get_next_transmission_dequeue(
+						client_guid=_client.get_client_guid()
+					)
+					if _transmission_dequeue is not None:
+						_dequeued_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+						_shard_database.transmission_completed(
+							client_guid=_client.get_client_guid(),
+							transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+						)
+						_is_dequeued = True
+
+			self.assertEqual(_transmission_guids, _dequeued_transmission_guids)
+
+			for _shard_database in _database_factory.get_shard_databases():
+				_shard_database.dispose()
+
+	def test_sharded_database_factory_2(self):
+
+		with self.assertRaises(Exception):
+			DatabaseFactory(
+				shards_total=0
+			)
+
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			with self.assertRaises(Exception):
+				DatabaseFactory(
+					shards_total=2,
+					snapshot_directory_path=_temp_directory_path
+				)
+
+	def test_multiple_processes_0(self):
+		# processes sharing a database file never deliver the same transmission twice
+
+		_transmissions_total = 300
+
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			_transmission_guids = []  # type: List[str]
+			with Database(database_file_path=_database_file_path) as _database:
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_devices = []  # type: List[Device]
+				for _index in range(4):
+					_devices.append(_database.insert_device(
+						device_guid=str(uuid.uuid4()).upper(),
+						client_guid=_client.get_client_guid(),
+						purpose_guid=str(uuid.uuid4()).upper(),
+						socket_port=24576
+					))
+				_queues = []
+				for _index in range(2):
+					_queues.append(_database.insert_queue(
+						queue_guid=str(uuid.uuid4()).upper()
+					))
+				_transmission_receipts = _database.insert_transmissions(
+					client_guid=_client.get_client_guid(),
+					transmissions=[(_queues[_index % 2].get_queue_guid(), _devices[0].get_device_guid(), _devices[0].get_instance_guid(), "{ }", _devices[_index % 4].get_device_guid(), _devices[_index % 4].get_instance_guid()) for _index in range(_transmissions_total)]
+				)
+				_transmission_guids.extend([_transmission_receipt.get_transmission_guid() for _transmission_receipt in _transmission_receipts])
+
+			_context = multiprocessing.get_context("spawn")
+			_delivered_transmission_guids_queue = _context.Queue()
+			_processes = []  # type: List[multiprocessing.Process]
+			for _index in range(3):
+				_process = _context.Process(
+					target=deliver_transmissions_in_process,
+					args=(_database_file_path, _transmissions_total, _delivered_transmission_guids_queue)
+				)
+				_process.start()
+				_processes.append(_process)
+
+			_delivered_transmission_guids = []  # type: List[str]
+			for _process in _processes:
+				_delivered_transmission_guids.extend(_delivered_transmission_guids_queue.get(timeout=60))
+			for _process in _processes:
+				_process.join()
+				self.assertEqual(0, _process.exitcode)
+
+			self.assertEqual(_transmissions_total, len(_delivered_transmission_guids))
+			self.assertEqual(set(_transmission_guids), set(_delivered_transmission_guids))
+
+			with Database(database_file_path=_database_file_path) as _database:
+				self.assertEqual(_transmissions_total, _database.get_table_rows_totals()["transmission_dequeue"])
+
+	def test_transmission_dequeue_lease_0(self):
+		# a transmission whose dequeue lease expired is delivered again in its original order and the stale dequeue can no longer be completed
+		with Database(transmission_dequeue_lease_seconds=0.2) as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+			_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[(_queue.get_queue_guid(), _device.get_device_guid(), _device.get_instance_guid(), "{ }", _device.get_device_guid(), _device.get_instance_guid()) for _index in range(2)]
+			)
+
+			_stale_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_transmission_receipts[0].get_transmission_guid(), _stale_transmission_dequeue.get_transmission_guid())
+			self.assertEqual(0, _database.reap_expired_transmission_dequeues(
+				transmission_dequeues_total_maximum=10
+			))
+
+			time.sleep(0.1)
+			self.assertTrue(_database.renew_transmission_dequeue_lease(
+				transmission_dequeue_guid=_stale_transmission_dequeue.get_transmission_dequeue_guid()
+			))
+			time.sleep(0.15)
+			self.assertEqual(0, _database.reap_expired_transmission_dequeues(
+				transmission_dequeues_total_maximum=10
+			))
+			self.assertIsNone(_database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			))
+
+			time.sleep(0.1)
+			self.assertFalse(_database.renew_transmission_dequeue_lease(
+				transmission_dequeue_guid=_stale_transmission_dequeue.get_transmission_dequeue_guid()
+			))
+			self.assertEqual(1, _database.reap_expired_transmission_dequeues(
+				transmission_dequeues_total_maximum=10
+			))
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_transmission_receipts[0].get_transmission_guid()
+			)
+			self.assertEqual(TransmissionStatus.Pending, _transmission.get_status())
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_transmission_receipts[0].get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+
+			with self.assertRaises(Exception):
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_stale_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+			with self.assertRaises(Exception):
+				_database.transmission_failed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_stale_transmission_dequeue.get_transmission_dequeue_guid(),
+					error_message_json_string="{ }"
+				)
+
+			_database.transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			)
+			self.assertFalse(_database.renew_transmission_dequeue_lease(
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			))
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_transmission_receipts[1].get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+
+	def test_transmission_dequeue_lease_1(self):
+		# transmissions left in flight by a database from before leases existed are exposed again by the first reap
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			with Database(database_file_path=_database_file_path) as _database:
+				_client = _database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_device = _database.insert_device(
+					device_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					purpose_guid=str(uuid.uuid4()).upper(),
+					socket_port=24576
+				)
+				_queue = _database.insert_queue(
+					queue_guid=str(uuid.uuid4()).upper()
+				)
+				_transmission_receipts = _database.insert_transmissions(
+					client_guid=_client.get_client_guid(),
+					transmissions=[(_queue.get_queue_guid(), _device.get_device_guid(), _device.get_instance_guid(), "{ }", _device.get_device_guid(), _device.get_instance_guid()) for _index in range(2)]
+				)
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+				_database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+
+			_connection = sqlite3.connect(_database_file_path)
+			_connection.executescript("DROP INDEX ix_transmission_dequeue_lease_expiration_datetime; ALTER TABLE transmission_dequeue DROP COLUMN lease_expiration_datetime; DELETE FROM schema_version WHERE version >= 4;")
+			_connection.close()
+
+			with Database(database_file_path=_database_file_path) as _database:
+				self.assertEqual(1, _database.reap_expired_transmission_dequeues(
+					transmission_dequeues_total_maximum=10
+				))
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+				self.assertEqual(_transmission_receipts[1].get_transmission_guid(), _transmission_dequeue.get_transmission_guid())
+
+	def test_queue_stats_0(self):
+		# the counters follow every transition of a transmission and the oldest pending transmission of each queue and destination device
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_devices = []  # type: List[Device]
+			for _index in range(2):
+				_devices.append(_database.insert_device(
+					device_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					purpose_guid=str(uuid.uuid4()).upper(),
+					socket_port=24576
+				))
+			_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+
+			def _get_totals() -> Tuple[List[Tuple[str, int, int, int, int, int]], List[Tuple[str, int, int, int, int, int]]]:
+				_queue_stats, _destination_device_stats = _database.get_queue_stats()
+				return [(_queue_stats_element.get_queue_guid(), _queue_stats_element.get_pending_total(), _queue_stats_element.get_in_flight_total(), _queue_stats_element.get_failed_total(), _queue_stats_element.get_retry_requested_total(), _queue_stats_element.get_oldest_pending_sequence()) for _queue_stats_element in _queue_stats], \
+					sorted([(_destination_device_stats_element.get_destination_device_guid(), _destination_device_stats_element.get_pending_total(), _destination_device_stats_element.get_in_flight_total(), _destination_device_stats_element.get_failed_total(), _destination_device_stats_element.get_retry_requested_total(), _destination_device_stats_element.get_oldest_pending_sequence()) for _destination_device_stats_element in _destination_device_stats], key=lambda _totals: _devices.index(next(_device for _device in _devices if _device.get_device_guid() == _totals[0])))
+
+			self.assertEqual(([], []), _database.get_queue_stats())
+
+			_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[(_queue.get_queue_guid(), _devices[0].get_device_guid(), _devices[0].get_instance_guid(), "{ }", _devices[_index % 2].get_device_guid(), _devices[_index % 2].get_instance_guid()) for _index in range(4)]
+			)
+			_sequences = [_transmission_receipt.get_sequence() for _transmission_receipt in _transmission_receipts]
+			_queue_guid = _queue.get_queue_guid()
+			_first_device_guid = _devices[0].get_device_guid()
+			_second_device_guid = _devices[1].get_device_guid()
+			self.assertEqual(([(_queue_guid, 4, 0, 0, 0, _sequences[0])], [(_first_device_guid, 2, 0, 0, 0, _sequences[0]), (_second_device_guid, 2, 0, 0, 0, _sequences[1])]), _get_totals())
+
+			_queue_stats, _destination_device_stats = _database.get_queue_stats()
+			self.assertEqual(_transmission_receipts[0].get_row_created_datetime(), _queue_stats[0].get_oldest_pending_row_created_datetime())
+			self.assertEqual(_queue_guid, _queue_stats[0].to_json()["queue_guid"])
+
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(([(_queue_guid, 3, 1, 0, 0, _sequences[1])], [(_first_device_guid, 1, 1, 0, 0, _sequences[2]), (_second_device_guid, 2, 0, 0, 0, _sequences[1])]), _get_totals())
+
+			_database.transmission_failed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
+				error_message_json_string="{ }"
+			)
+			self.assertEqual(([(_queue_guid, 3, 0, 1, 0, _sequences[1])], [(_first_device_guid, 1, 0, 1, 0, _sequences[2]), (_second_device_guid, 2, 0, 0, 0, _sequences[1])]), _get_totals())
+
+			_failed_transmission_dequeue = _database.get_next_failed_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			_database.failed_transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_error_transmission_dequeue_guid=_failed_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+				is_retry_requested=True
+			)
+			# the failed transmission is no longer awaiting a decision but waiting for its retry
+			self.assertEqual(([(_queue_guid, 3, 0, 0, 1, _sequences[1])], [(_first_device_guid, 1, 0, 0, 1, _sequences[2]), (_second_device_guid, 2, 0, 0, 0, _sequences[1])]), _get_totals())
+
+			# the failed transmission is pending again once its destination device announces itself
+			_database.insert_device(
+				device_guid=_first_device_guid,
+				client_guid=_client.get_client_guid(),
+				purpose_guid=_devices[0].get_purpose_guid(),
+				socket_port=24576
+			)
+			self.assertEqual(([(_queue_guid, 4, 0, 0, 0, _sequences[0])], [(_first_device_guid, 2, 0, 0, 0, _sequences[0]), (_second_device_guid, 2, 0, 0, 0, _sequences[1])]), _get_totals())
+
+			for _index in range(4):
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+			self.assertEqual(([], []), _get_totals())
+
+	def test_queue_stats_1(self):
+		# the counters of a database from before they existed start from its transmissions and stats of a destination device are combined across shards
+		with tempfile.TemporaryDirectory() as _temp_directory_path:
+			_database_file_path = os.path.join(_temp_directory_path, "wifi_server.db")
+			_database_factory = DatabaseFactory(
+				database_file_path=_database_file_path,
+				shards_total=2
+			)
+			_queue_guid_per_shard_index = {}  # type: Dict[int, str]
+			while len(_queue_guid_per_shard_index) != 2:
+				_queue_guid = str(uuid.uuid4()).upper()
+				_queue_guid_per_shard_index[_database_factory.get_shard_index(queue_guid=_queue_guid)] = _queue_guid
+
+			_device_guid = str(uuid.uuid4()).upper()
+			_instance_guid = str(uuid.uuid4()).upper()
+			_sequences = []  # type: List[int]
+			for _shard_index in [1, 0, 0]:
+				_shard_database = _database_factory.get_shard_databases()[_shard_index]
+				_client = _shard_database.insert_client(
+					ip_address="127.0.0.1"
+				)
+				_shard_database.insert_device(
+					device_guid=_device_guid,
+					client_guid=_client.get_client_guid(),
+					purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+					socket_port=24576,
+					instance_guid=_instance_guid
+				)
+				_shard_database.insert_queue(
+					queue_guid=_queue_guid_per_shard_index[_shard_index]
+				)
+				_sequences.extend([_transmission_receipt.get_sequence() for _transmission_receipt in _shard_database.insert_transmissions(
+					client_guid=_client.get_client_guid(),
+					transmissions=[(_queue_guid_per_shard_index[_shard_index], _device_guid, _instance_guid, "{ }", _device_guid, _instance_guid)]
+				)])
+			for _shard_database in _database_factory.get_shard_databases():
+				_shard_database.dispose()
+
+			_connection = sqlite3.connect(_database_file_path)
+			_connection.executescript("DROP TABLE transmission_queue_stats; DROP TABLE transmission_destination_stats; DELETE FROM schema_version WHERE version >= 5;")
+			_connection.close()
+
+			_database_factory = DatabaseFactory(
+				database_file_path=_database_file_path,
+				shards_total=2
+			)
+			_queue_stats, _destination_device_stats = _database_factory.get_queue_stats()
+			self.assertEqual(sorted([(_queue_guid_per_shard_index[0], 2, _sequences[1]), (_queue_guid_per_shard_index[1], 1, _sequences[0])]), [(_queue_stats_element.get_queue_guid(), _queue_stats_element.get_pending_total(), _queue_stats_element.get_oldest_pending_sequence()) for _queue_stats_element in _queue_stats])
+			self.assertEqual([(_device_guid, 3, 0, 0, _sequences[0])], [(_destination_device_stats_element.get_destination_device_guid(), _destination_device_stats_element.get_pending_total(), _destination_device_stats_element.get_in_flight_total(), _destination_device_stats_element.get_failed_total(), _destination_device_stats_element.get_oldest_pending_sequence()) for _destination_device_stats_element in _destination_device_stats])
+
+			for _shard_database in _database_factory.get_shard_databases():
+				_shard_database.dispose()
+
+	def test_transmission_dequeue_batches_0(self):
+		# a claimed transmission is batched with the pending transmissions next in line for both its destination device and its queue
+
+		_json_string = "{ \"parser_type\": \"SendJsonTransmissionParser\", \"file_path\": \"\" }"
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_source_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+			_destination_device = _database.insert_device(
+				device_guid=str(uuid.uuid4()).upper(),
+				client_guid=_client.get_client_guid(),
+				purpose_guid=str(uuid.uuid4()).upper(),
+				socket_port=24576
+			)
+			_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+			_other_queue = _database.insert_queue(
+				queue_guid=str(uuid.uuid4()).upper()
+			)
+
+			def _get_transmission(queue: Queue, json_string: str) -> Tuple[str, str, str, str, str, str]:
+				return (queue.get_queue_guid(), _source_device.get_device_guid(), _source_device.get_instance_guid(), json_string, _destination_device.get_device_guid(), _destination_device.get_instance_guid())
+
+			_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=[
+					_get_transmission(_queue, _json_string),
+					_get_transmission(_queue, _json_string),
+					_get_transmission(_queue, _json_string),
+					_get_transmission(_other_queue, _json_string),  # another queue is next in line for the destination device
+					_get_transmission(_queue, _json_string),
+					_get_transmission(_queue, "{ }"),  # another parser
+					_get_transmission(_queue, _json_string)
+				]
+			)
+			_transmission_guids = [_transmission_receipt.get_transmission_guid() for _transmission_receipt in _transmission_receipts]
+
+			with self.assertRaises(Exception):
+				_database.get_next_transmission_dequeue_batches(
+					client_guid=_client.get_client_guid(),
+					limit=1,
+					batch_transmissions_total_maximum=2
+				)
+
+			def _get_next_batches(batch_transmissions_total_maximum: int) -> List[List[TransmissionDequeue]]:
+				return _database.get_next_transmission_dequeue_batches(
+					client_guid=_client.get_client_guid(),
+					limit=10,
+					batch_transmissions_total_maximum=batch_transmissions_total_maximum,
+					batched_parser_type="SendJsonTransmissionParser"
+				)
+
+			_transmission_dequeue_batches = _get_next_batches(2)
+			self.assertEqual([_transmission_guids[0:2]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+			for _transmission_dequeue in _transmission_dequeue_batches[0]:
+				self.assertEqual(_transmission_guids[0:2].index(_transmission_dequeue.get_transmission_guid()), _transmission_dequeue_batches[0].index(_transmission_dequeue))
+				self.assertEqual(_destination_device.get_device_guid(), _transmission_dequeue.get_transmission().get_destination_device().get_device_guid())
+
+			# the batch is in flight as a whole
+			self.assertEqual([], _get_next_batches(10))
+
+			_database.transmissions_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guids=[_transmission_dequeue.get_transmission_dequeue_guid() for _transmission_dequeue in _transmission_dequeue_batches[0]]
+			)
+			for _transmission_guid in _transmission_guids[0:2]:
+				_is_successful, _transmission = _database.try_get_transmission(
+					transmission_guid=_transmission_guid
+				)
+				self.assertEqual(TransmissionStatus.Complete, _transmission.get_status())
+
+			_transmission_dequeue_batches = _get_next_batches(10)
+			self.assertEqual([[_transmission_guids[2]]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+			_database.transmissions_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guids=[_transmission_dequeue_batches[0][0].get_transmission_dequeue_guid()]
+			)
+
+			_transmission_dequeue_batches = _get_next_batches(10)
+			self.assertEqual([[_transmission_guids[3]]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+			_database.transmissions_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guids=[_transmission_dequeue_batches[0][0].get_transmission_dequeue_guid()]
+			)
+
+			# the transmission of another parser ends the batch
+			_transmission_dequeue_batches = _get_next_batches(10)
+			self.assertEqual([[_transmission_guids[4]]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+
+			# a released batch is claimed again as it was
+			_database.release_transmission_dequeues(
+				transmission_dequeue_guids=[_transmission_dequeue_batches[0][0].get_transmission_dequeue_guid()]
+			)
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_transmission_guids[4]
+			)
+			self.assertEqual(TransmissionStatus.Pending, _transmission.get_status())
+			_transmission_dequeue_batches = _get_next_batches(10)
+			self.assertEqual([[_transmission_guids[4]]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+
+			with self.assertRaises(Exception):
+				_database.release_transmission_dequeues(
+					transmission_dequeue_guids=[str(uuid.uuid4()).upper()]
+				)
+
+	def test_transmission_dequeue_batches_1(self):
+		# a batch stops at a transmission that waits on an earlier transmission to the same destination device in another shard
+
+		_json_string = "{ \"parser_type\": \"SendJsonTransmissionParser\", \"file_path\": \"\" }"
+		_database_factory = DatabaseFactory(
+			shards_total=2
+		)
+		_queue_guid_per_shard_index = {}  # type: Dict[int, str]
+		while len(_queue_guid_per_shard_index) != 2:
+			_queue_guid = str(uuid.uuid4()).upper()
+			_queue_guid_per_shard_index[_database_factory.get_shard_index(queue_guid=_queue_guid)] = _queue_guid
+
+		_device_guid = str(uuid.uuid4()).upper()
+		_instance_guid = str(uuid.uuid4()).upper()
+		_client_guid_per_shard_index = {}  # type: Dict[int, str]
+		for _shard_index, _shard_database in enumerate(_database_factory.get_shard_databases()):
+			_client_guid_per_shard_index[_shard_index] = _shard_database.insert_client(
+				ip_address="127.0.0.1"
+			).get_client_guid()
+			_shard_database.insert_device(
+				device_guid=_device_guid,
+				client_guid=_client_guid_per_shard_index[_shard_index],
+				purpose_guid="6EABEE26-24C2-4698-8BBA-8707E0397C7D",
+				socket_port=24576,
+				instance_guid=_instance_guid
+			)
+			_shard_database.insert_queue(
+				queue_guid=_queue_guid_per_shard_index[_shard_index]
+			)
+
+		_transmission_guids = []  # type: List[str]
+		for _shard_index in [0, 0, 1, 0]:
+			_transmission_guids.extend([_transmission_receipt.get_transmission_guid() for _transmission_receipt in _database_factory.get_shard_databases()[_shard_index].insert_transmissions(
+				client_guid=_client_guid_per_shard_index[_shard_index],
+				transmissions=[(_queue_guid_per_shard_index[_shard_index], _device_guid, _instance_guid, _json_string, _device_guid, _instance_guid)]
+			)])
+
+		_shard_database = _database_factory.get_shard_databases()[0]
+		_transmission_dequeue_batches = _shard_database.get_next_transmission_dequeue_batches(
+			client_guid=_client_guid_per_shard_index[0],
+			limit=10,
+			batch_transmissions_total_maximum=10,
+			batched_parser_type="SendJsonTransmissionParser"
+		)
+		self.assertEqual([_transmission_guids[0:2]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+
+		for _database in _database_factory.get_shard_databases():
+			_database.dispose()
+
+
+	def test_excluded_destination_devices_0(self):
+		# transmissions to excluded destination devices stay deliverable while the others are claimed
+
+		with Database() as _database:
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_devices = []  # type: List[Device]
+			_transmissions = []  # type: List[Tuple[str, str, str, str, str, str]]
+			for _index in range(3):
+				_device = _database.insert_device(
+					device_guid=str(uuid.uuid4()).upper(),
+					client_guid=_client.get_client_guid(),
+					purpose_guid=str(uuid.uuid4()).upper(),
+					socket_port=24576
+				)
+				_queue = _database.insert_queue(
+					queue_guid=str(uuid.uuid4()).upper()
+				)
+				_devices.append(_device)
+				_transmissions.append((_queue.get_queue_guid(), _device.get_device_guid(), _device.get_instance_guid(), "{ }", _device.get_device_guid(), _device.get_instance_guid()))
+			_transmission_receipts = _database.insert_transmissions(
+				client_guid=_client.get_client_guid(),
+				transmissions=_transmissions
+			)
+
+			_excluded_destination_device_guid_lists = []  # type: List[List[str]]
+			_transmission_dequeue_batches = _database.get_next_transmission_dequeue_batches(
+				client_guid=_client.get_client_guid(),
+				limit=1,
+				excluded_destination_device_guids={_devices[0].get_device_guid()},
+				on_excluded=_excluded_destination_device_guid_lists.append
+			)
+			self.assertEqual([[_transmission_receipts[1].get_transmission_guid()]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+			self.assertEqual([[_devices[0].get_device_guid()]], _excluded_destination_device_guid_lists)
+
+			# an excluded destination device without a deliverable transmission is not reported
+			_transmission_dequeue_batches = _database.get_next_transmission_dequeue_batches(
+				client_guid=_client.get_client_guid(),
+				limit=10,
+				excluded_destination_device_guids={_devices[0].get_device_guid(), _devices[1].get_device_guid()},
+				on_excluded=_excluded_destination_device_guid_lists.append
+			)
+			self.assertEqual([[_transmission_receipts[2].get_transmission_guid()]], [[_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeue_batch] for _transmission_dequeue_batch in _transmission_dequeue_batches])
+			self.assertEqual([[_devices[0].get_device_guid()], [_devices[0].get_device_guid()]], _excluded_destination_device_guid_lists)
+
+			_transmission_dequeues = _database.get_next_transmission_dequeues(
+				client_guid=_client.get_client_guid(),
+				limit=10
+			)
+			self.assertEqual([_transmission_receipts[0].get_transmission_guid()], [_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeues])
+
 
 if __name__ == "__main__":
 	unittest.main()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+from app.destination_circuit_breaker import DestinationCircuitBreaker, DestinationCircuitState
+import unittest
+import time
+from typing import List, Tuple, Dict
+
+
+def get_destination_circuit_breaker(*, failures_total_threshold: int = 2, backoff_seconds_minimum: float = 0.1, backoff_seconds_maximum: float = 0.4, jitter_ratio: float = 0, backoffs_elapsed: List[float] = None, exceptions: List[Exception] = None) -> DestinationCircuitBreaker:
+
+	def _on_backoff_elapsed():
+		if backoffs_elapsed is not None:
+			backoffs_elapsed.append(time.perf_counter())
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return DestinationCircuitBreaker(
+		failures_total_threshold=failures_total_threshold,
+		backoff_seconds_minimum=backoff_seconds_minimum,
+		backoff_seconds_maximum=backoff_seconds_maximum,
+		jitter_ratio=jitter_ratio,
+		cycle_interval_seconds=0.02,
+		on_backoff_elapsed=_on_backoff_elapsed,
+		on_exception=_on_exception
+	)
+
+
+_destination_device_guid = "2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B"
+_other_destination_device_guid = "6B9C16F6-56B2-495F-9D89-98415C71EB7E"
+
+
+class DestinationCircuitBreakerTest(unittest.TestCase):
+
+	def test_backoff_0(self):
+		# a failed destination device is held back for its backoff while other destination devices are not
+
+		_destination_circuit_breaker = get_destination_circuit_breaker()
+
+		self.assertEqual(set(), _destination_circuit_breaker.get_blocked_destination_device_guids())
+
+		self.assertEqual(DestinationCircuitState.Closed, _destination_circuit_breaker.record_failure(
+			destination_device_guid=_destination_device_guid
+		))
+		self.assertEqual({_destination_device_guid}, _destination_circuit_breaker.get_blocked_destination_device_guids())
+
+		time.sleep(0.15)
+
+		self.assertEqual(0, _destination_circuit_breaker.get_statistics()["backing_off_total"])
+		self.assertEqual(set(), _destination_circuit_breaker.get_blocked_destination_device_guids())
+
+		# a completed delivery forgets the failures
+		_destination_circuit_breaker.record_success(
+			destination_device_guid=_destination_device_guid
+		)
+		self.assertEqual(DestinationCircuitState.Closed, _destination_circuit_breaker.record_failure(
+			destination_device_guid=_destination_device_guid
+		))
+		self.assertEqual(1, _destination_circuit_breaker.get_destination_circuits()[0].get_failures_total())
+		self.assertEqual({"backing_off_total": 1, "open_total": 0, "half_open_total": 0, "opened_total": 0, "skipped_total": 0}, _destination_circuit_breaker.get_statistics())
+
+	def test_open_0(self):
+		# the circuit opens after consecutive failures and a failed trial opens it again for a longer backoff
+
+		_destination_circuit_breaker = get_destination_circuit_breaker()
+
+		for _expected_state in [DestinationCircuitState.Closed, DestinationCircuitState.Open]:
+			self.assertEqual(_expected_state, _destination_circuit_breaker.record_failure(
+				destination_device_guid=_destination_device_guid
+			))
+		_destination_circuit = _destination_circuit_breaker.get_destination_circuits()[0]
+		self.assertAlmostEqual(0.2, _destination_circuit.get_retry_time() - time.perf_counter(), delta=0.05)
+		self.assertEqual({_destination_device_guid}, _destination_circuit_breaker.get_blocked_destination_device_guids())
+
+		time.sleep(0.25)
+
+		self.assertEqual(set(), _destination_circuit_breaker.get_blocked_destination_device_guids())
+		# finding the blocked devices does not change the circuits
+		self.assertEqual(DestinationCircuitState.Open, _destination_circuit.get_state())
+		self.assertEqual(1, _destination_circuit_breaker.signal_elapsed_backoffs())
+		self.assertEqual(DestinationCircuitState.HalfOpen, _destination_circuit.get_state())
+		self.assertEqual(0, _destination_circuit_breaker.signal_elapsed_backoffs())
+
+		self.assertEqual(DestinationCircuitState.Open, _destination_circuit_breaker.record_failure(
+			destination_device_guid=_destination_device_guid
+		))
+		# the backoff doubles up to its maximum
+		self.assertAlmostEqual(0.4, _destination_circuit.get_retry_time() - time.perf_counter(), delta=0.05)
+		self.assertEqual(2, _destination_circuit_breaker.get_statistics()["opened_total"])
+		self.assertEqual("Open", _destination_circuit.to_json()["state"])
+
+		# the device announced itself again
+		_destination_circuit_breaker.reset(
+			destination_device_guid=_destination_device_guid
+		)
+		self.assertEqual(set(), _destination_circuit_breaker.get_blocked_destination_device_guids())
+		self.assertEqual([], _destination_circuit_breaker.get_destination_circuits())
+
+	def test_skipped_0(self):
+		# only the passed over transmissions are counted as skipped, however often the blocked devices are found
+
+		_destination_circuit_breaker = get_destination_circuit_breaker()
+		_destination_circuit_breaker.record_failure(
+			destination_device_guid=_destination_device_guid
+		)
+		for _index in range(3):
+			self.assertEqual({_destination_device_guid}, _destination_circuit_breaker.get_blocked_destination_device_guids())
+		self.assertEqual(0, _destination_circuit_breaker.get_statistics()["skipped_total"])
+
+		_destination_circuit_breaker.record_skipped(
+			destination_device_guids=[_destination_device_guid]
+		)
+		self.assertEqual(1, _destination_circuit_breaker.get_statistics()["skipped_total"])
+
+	def test_jitter_0(self):
+		# the backoff is shortened by up to the jitter ratio
+
+		_destination_circuit_breaker = get_destination_circuit_breaker(
+			failures_total_threshold=100,
+			backoff_seconds_minimum=10,
+			backoff_seconds_maximum=10,
+			jitter_ratio=0.5
+		)
+
+		_backoff_seconds = []  # type: List[float]
+		for _index in range(20):
+			_destination_circuit_breaker.record_failure(
+				destination_device_guid=_destination_device_guid
+			)
+			_backoff_seconds.append(_destination_circuit_breaker.get_destination_circuits()[0].get_retry_time() - time.perf_counter())
+
+		self.assertTrue(all([4.9 <= _backoff_seconds_element <= 10 for _backoff_seconds_element in _backoff_seconds]))
+		self.assertGreater(len(set([round(_backoff_seconds_element, 3) for _backoff_seconds_element in _backoff_seconds])), 1)
+
+	def test_start_0(self):
+		# a started breaker signals once per cycle in which backoffs passed
+
+		_backoffs_elapsed = []  # type: List[float]
+		_exceptions = []  # type: List[Exception]
+		_destination_circuit_breaker = get_destination_circuit_breaker(
+			backoffs_elapsed=_backoffs_elapsed,
+			exceptions=_exceptions
+		)
+		_destination_circuit_breaker.start()
+
+		for _destination_device_guid_element in [_destination_device_guid, _other_destination_device_guid]:
+			_destination_circuit_breaker.record_failure(
+				destination_device_guid=_destination_device_guid_element
+			)
+
+		time.sleep(0.05)
+		self.assertEqual([], _backoffs_elapsed)
+
+		time.sleep(0.15)
+		self.assertEqual(1, len(_backoffs_elapsed))
+
+		with self.assertRaises(Exception):
+			_destination_circuit_breaker.start()
+
+		_destination_circuit_breaker.dispose()
+		self.assertEqual([], _exceptions)
+
+	def test_failures_total_threshold_0(self):
+
+		with self.assertRaises(Exception):
+			get_destination_circuit_breaker(
+				failures_total_threshold=0
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,394 @@
+from __future__ import annotations
+from app.device_connection_pool import DeviceConnectionPool, DeviceConnection, is_socket_open
+import unittest
+import threading
+import socket
+import time
+from typing import List, Tuple, Dict
+
+
+class FakeConnection():
+
+	def __init__(self, *, ip_address: str, port: int):
+
+		self.ip_address = ip_address
+		self.port = port
+		self.is_closed = False
+		self.is_closed_by_device = False
+
+
+def get_device_connection_pool(*, idle_seconds: float = 5, connection_seconds_maximum: float = 60, connections_per_device_maximum: int = 1, opened_connections: List[FakeConnection] = None, exceptions: List[Exception] = None, is_open_failing: bool = False) -> DeviceConnectionPool:
+
+	def _open_connection(ip_address: str, port: int) -> FakeConnection:
+		if is_open_failing:
+			raise Exception(f"Failed to connect to {ip_address}:{port}.")
+		_connection = FakeConnection(
+			ip_address=ip_address,
+			port=port
+		)
+		if opened_connections is not None:
+			opened_connections.append(_connection)
+		return _connection
+
+	def _close_connection(connection: FakeConnection):
+		connection.is_closed = True
+
+	def _is_connection_open(connection: FakeConnection) -> bool:
+		return not connection.is_closed_by_device
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return DeviceConnectionPool(
+		open_connection=_open_connection,
+		close_connection=_close_connection,
+		idle_seconds=idle_seconds,
+		connection_seconds_maximum=connection_seconds_maximum,
+		connections_per_device_maximum=connections_per_device_maximum,
+		cycle_interval_seconds=0.05,
+		on_exception=_on_exception,
+		is_connection_open=_is_connection_open
+	)
+
+
+_device_guid = "2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B"
+_instance_guid = "A1C4F7D0-5B0E-4A4E-8F2B-3C9D6E1F0A2B"
+
+
+class DeviceConnectionPoolTest(unittest.TestCase):
+
+	def test_reuse_0(self):
+		# a released connection is reused for the next transmission to the same device instance and address
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_device_connection_pool = get_device_connection_pool(
+			opened_connections=_opened_connections
+		)
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		self.assertFalse(_is_reused)
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+
+		_reused_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		self.assertTrue(_is_reused)
+		self.assertIs(_device_connection.get_connection(), _reused_device_connection.get_connection())
+		self.assertEqual(1, len(_opened_connections))
+		self.assertEqual({"idle_connections_total": 0, "leased_connections_total": 1, "opened_connections_total": 1, "reused_connections_total": 1, "stale_connections_total": 0, "closed_connections_total": 0}, _device_connection_pool.get_statistics())
+
+		# a connection that failed during a transmission is closed
+		_device_connection_pool.release(
+			device_connection=_reused_device_connection,
+			is_reusable=False
+		)
+		self.assertTrue(_opened_connections[0].is_closed)
+		self.assertEqual(0, _device_connection_pool.get_statistics()["idle_connections_total"])
+
+		_device_connection_pool.dispose()
+
+	def test_not_pooled_0(self):
+		# without an idle time every connection is closed once released
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_device_connection_pool = get_device_connection_pool(
+			idle_seconds=0,
+			opened_connections=_opened_connections
+		)
+
+		for _index in range(2):
+			_device_connection, _is_reused = _device_connection_pool.acquire(
+				device_guid=_device_guid,
+				instance_guid=_instance_guid,
+				ip_address="127.0.0.1",
+				port=24576
+			)
+			self.assertFalse(_is_reused)
+			_device_connection_pool.release(
+				device_connection=_device_connection,
+				is_reusable=True
+			)
+
+		self.assertEqual(2, len(_opened_connections))
+		self.assertTrue(all([_opened_connection.is_closed for _opened_connection in _opened_connections]))
+
+		_device_connection_pool.dispose()
+
+	def test_address_change_0(self):
+		# a new instance or address of the device replaces the connection to the previous one
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_device_connection_pool = get_device_connection_pool(
+			opened_connections=_opened_connections
+		)
+
+		for _instance_guid_element, _ip_address in [(_instance_guid, "127.0.0.1"), (_instance_guid, "127.0.0.2"), ("F0E1D2C3-B4A5-4968-8776-655443322110", "127.0.0.2")]:
+			_device_connection, _is_reused = _device_connection_pool.acquire(
+				device_guid=_device_guid,
+				instance_guid=_instance_guid_element,
+				ip_address=_ip_address,
+				port=24576
+			)
+			self.assertFalse(_is_reused)
+			self.assertEqual(_ip_address, _device_connection.get_connection().ip_address)
+			_device_connection_pool.release(
+				device_connection=_device_connection,
+				is_reusable=True
+			)
+
+		self.assertEqual([True, True, False], [_opened_connection.is_closed for _opened_connection in _opened_connections])
+
+		_device_connection_pool.dispose()
+		self.assertTrue(_opened_connections[2].is_closed)
+
+	def test_invalidate_0(self):
+		# invalidating a device closes its idle connections at once and the connections in use once released
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_device_connection_pool = get_device_connection_pool(
+			connections_per_device_maximum=2,
+			opened_connections=_opened_connections
+		)
+
+		_device_connections = []  # type: List[DeviceConnection]
+		for _index in range(2):
+			_device_connection, _is_reused = _device_connection_pool.acquire(
+				device_guid=_device_guid,
+				instance_guid=_instance_guid,
+				ip_address="127.0.0.1",
+				port=24576
+			)
+			_device_connections.append(_device_connection)
+		_device_connection_pool.release(
+			device_connection=_device_connections[0],
+			is_reusable=True
+		)
+
+		_device_connection_pool.invalidate(
+			device_guid=_device_guid
+		)
+		self.assertEqual([True, False], [_opened_connection.is_closed for _opened_connection in _opened_connections])
+
+		_device_connection_pool.release(
+			device_connection=_device_connections[1],
+			is_reusable=True
+		)
+		self.assertEqual([True, True], [_opened_connection.is_closed for _opened_connection in _opened_connections])
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		self.assertFalse(_is_reused)
+
+		_device_connection_pool.dispose()
+
+	def test_connections_per_device_maximum_0(self):
+		# a device never has more connections in use than allowed while other devices are not held up
+
+		_device_connection_pool = get_device_connection_pool()
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+
+		_other_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid="6B9C16F6-56B2-495F-9D89-98415C71EB7E",
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.2",
+			port=24576
+		)
+
+		_acquired_device_connections = []  # type: List[Tuple[DeviceConnection, bool]]
+
+		def _acquire_thread_method():
+			_acquired_device_connections.append(_device_connection_pool.acquire(
+				device_guid=_device_guid,
+				instance_guid=_instance_guid,
+				ip_address="127.0.0.1",
+				port=24576
+			))
+
+		_acquire_thread = threading.Thread(
+			target=_acquire_thread_method
+		)
+		_acquire_thread.start()
+
+		time.sleep(0.1)
+		self.assertEqual([], _acquired_device_connections)
+
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+		_acquire_thread.join()
+		self.assertEqual([(_device_connection, True)], _acquired_device_connections)
+
+		_device_connection_pool.dispose()
+
+	def test_expiry_0(self):
+		# idle connections are closed by the cycle once their idle time or their lifetime passed
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_exceptions = []  # type: List[Exception]
+		_device_connection_pool = get_device_connection_pool(
+			idle_seconds=0.1,
+			opened_connections=_opened_connections,
+			exceptions=_exceptions
+		)
+		_device_connection_pool.start()
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+		self.assertFalse(_opened_connections[0].is_closed)
+
+		time.sleep(0.3)
+
+		self.assertTrue(_opened_connections[0].is_closed)
+		self.assertEqual(0, _device_connection_pool.get_statistics()["idle_connections_total"])
+
+		with self.assertRaises(Exception):
+			_device_connection_pool.start()
+
+		_device_connection_pool.dispose()
+		self.assertEqual([], _exceptions)
+
+		_device_connection_pool = get_device_connection_pool(
+			connection_seconds_maximum=0.1,
+			opened_connections=_opened_connections
+		)
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+
+		time.sleep(0.2)
+
+		self.assertEqual(1, _device_connection_pool.close_expired())
+		self.assertTrue(_opened_connections[1].is_closed)
+
+		_device_connection_pool.dispose()
+
+	def test_open_failure_0(self):
+		# a connection that could not be opened does not count against the device
+
+		_device_connection_pool = get_device_connection_pool(
+			is_open_failing=True
+		)
+
+		for _index in range(2):
+			with self.assertRaises(Exception):
+				_device_connection_pool.acquire(
+					device_guid=_device_guid,
+					instance_guid=_instance_guid,
+					ip_address="127.0.0.1",
+					port=24576
+				)
+
+		self.assertEqual(0, _device_connection_pool.get_statistics()["leased_connections_total"])
+
+		_device_connection_pool.dispose()
+
+	def test_stale_0(self):
+		# an idle connection closed by the device is replaced by a new connection instead of being reused
+
+		_opened_connections = []  # type: List[FakeConnection]
+		_device_connection_pool = get_device_connection_pool(
+			opened_connections=_opened_connections
+		)
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+		_opened_connections[0].is_closed_by_device = True
+
+		_device_connection, _is_reused = _device_connection_pool.acquire(
+			device_guid=_device_guid,
+			instance_guid=_instance_guid,
+			ip_address="127.0.0.1",
+			port=24576
+		)
+		self.assertFalse(_is_reused)
+		self.assertIs(_opened_connections[1], _device_connection.get_connection())
+		self.assertTrue(_opened_connections[0].is_closed)
+
+		_statistics = _device_connection_pool.get_statistics()
+		self.assertEqual(1, _statistics["stale_connections_total"])
+		self.assertEqual(0, _statistics["reused_connections_total"])
+		self.assertEqual(1, _statistics["leased_connections_total"])
+
+		_device_connection_pool.release(
+			device_connection=_device_connection,
+			is_reusable=True
+		)
+		_device_connection_pool.dispose()
+
+	def test_is_socket_open_0(self):
+		# an idle socket is open until the other end closes it or sends something unexpected
+
+		_socket, _other_socket = socket.socketpair()
+		self.assertTrue(is_socket_open(
+			socket_object=_socket
+		))
+		self.assertIsNone(_socket.gettimeout())
+
+		_other_socket.sendall(b"x")
+		self.assertFalse(is_socket_open(
+			socket_object=_socket
+		))
+		self.assertEqual(b"x", _socket.recv(1))
+
+		_other_socket.close()
+		self.assertFalse(is_socket_open(
+			socket_object=_socket
+		))
+		_socket.close()
+
+	def test_connections_per_device_maximum_1(self):
+
+		with self.assertRaises(Exception):
+			get_device_connection_pool(
+				connections_per_device_maximum=0
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+from app.database import DatabaseFactory
+from app.leader_lease import LeaderLease
+import unittest
+import tempfile
+import time
+import os
+from typing import List, Tuple, Dict
+
+
+def get_leader_lease(*, database_factory: DatabaseFactory, lease_seconds: float = 5, leader_cycles: List[str] = None, exceptions: List[Exception] = None) -> LeaderLease:
+
+	def _on_leader_cycle():
+		if leader_cycles is not None:
+			leader_cycles.append(_leader_lease.get_holder_guid())
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	_leader_lease = LeaderLease(
+		database_factory=database_factory,
+		lease_name="transmitter",
+		lease_seconds=lease_seconds,
+		cycle_interval_seconds=0.05,
+		on_leader_cycle=_on_leader_cycle,
+		on_exception=_on_exception
+	)
+	return _leader_lease
+
+
+class LeaderLeaseTest(unittest.TestCase):
+
+	def test_single_leader_0(self):
+		# only one of the processes sharing a database file leads until it hands the lease over
+
+		with tempfile.TemporaryDirectory() as _temporary_directory_path:
+			_database_file_path = os.path.join(_temporary_directory_path, "database.db")
+			_database_factories = [DatabaseFactory(database_file_path=_database_file_path) for _index in range(2)]
+			_leader_cycles = []  # type: List[str]
+			_leader_leases = [get_leader_lease(database_factory=_database_factory, leader_cycles=_leader_cycles) for _database_factory in _database_factories]
+
+			self.assertTrue(_leader_leases[0].cycle())
+			self.assertFalse(_leader_leases[1].cycle())
+			self.assertTrue(_leader_leases[0].cycle())
+			self.assertTrue(_leader_leases[0].is_leader())
+			self.assertFalse(_leader_leases[1].is_leader())
+			self.assertEqual([_leader_leases[0].get_holder_guid()] * 2, _leader_cycles)
+
+			_leader_leases[0].dispose()
+			self.assertFalse(_leader_leases[0].is_leader())
+
+			self.assertTrue(_leader_leases[1].cycle())
+			self.assertEqual(1, _leader_leases[1].get_statistics()["leader_terms_total"])
+
+			_leader_leases[1].dispose()
+			for _database_factory in _database_factories:
+				_database_factory.get_database().dispose()
+
+	def test_lease_expiry_0(self):
+		# a leader that stops renewing its lease is replaced once the lease expires
+
+		with tempfile.TemporaryDirectory() as _temporary_directory_path:
+			_database_file_path = os.path.join(_temporary_directory_path, "database.db")
+			_database_factories = [DatabaseFactory(database_file_path=_database_file_path) for _index in range(2)]
+			_leader_leases = [get_leader_lease(database_factory=_database_factory, lease_seconds=0.2) for _database_factory in _database_factories]
+
+			self.assertTrue(_leader_leases[0].cycle())
+			self.assertFalse(_leader_leases[1].cycle())
+
+			time.sleep(0.3)
+
+			self.assertTrue(_leader_leases[1].cycle())
+			self.assertFalse(_leader_leases[0].cycle())
+
+			for _leader_lease in _leader_leases:
+				_leader_lease.dispose()
+			for _database_factory in _database_factories:
+				_database_factory.get_database().dispose()
+
+	def test_start_0(self):
+		# started leases elect exactly one leader which keeps cycling
+
+		with tempfile.TemporaryDirectory() as _temporary_directory_path:
+			_database_file_path = os.path.join(_temporary_directory_path, "database.db")
+			_database_factories = [DatabaseFactory(database_file_path=_database_file_path) for _index in range(3)]
+			_leader_cycles = []  # type: List[str]
+			_exceptions = []  # type: List[Exception]
+			_leader_leases = [get_leader_lease(database_factory=_database_factory, leader_cycles=_leader_cycles, exceptions=_exceptions) for _database_factory in _database_factories]
+
+			for _leader_lease in _leader_leases:
+				_leader_lease.start()
+
+			time.sleep(0.5)
+
+			self.assertEqual(1, len([_leader_lease for _leader_lease in _leader_leases if _leader_lease.is_leader()]))
+			self.assertEqual(1, len(set(_leader_cycles)))
+			self.assertLess(1, len(_leader_cycles))
+
+			with self.assertRaises(Exception):
+				_leader_leases[0].start()
+
+			for _leader_lease in _leader_leases:
+				_leader_lease.dispose()
+			self.assertEqual([], _exceptions)
+			for _database_factory in _database_factories:
+				_database_factory.get_database().dispose()
+
+	def test_cycle_interval_0(self):
+
+		with self.assertRaises(Exception):
+			LeaderLease(
+				database_factory=DatabaseFactory(),
+				lease_name="transmitter",
+				lease_seconds=1,
+				cycle_interval_seconds=1,
+				on_leader_cycle=lambda: None,
+				on_exception=lambda ex: None
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -189,6 +189,52 @@ class MainTest(unittest.TestCase):
 		_match = re.search("^[A-F0-9]{8}\\-[A-F0-9]{4}\\-[A-F0-9]{4}\\-[A-F0-9]{4}\\-[A-F0-9]{12}$", _uuid)
 		self.assertIsNotNone(_match)
 
+	def test_send_json_batch_0(self):
+		# a batch of transmissions is enqueued in the order given
+		_app = TestClient(app)
+
+		_source_device_guid = "0C58DBC4-0B7F-4A7C-9E0E-1D7D5B1F4C1D"
+		_response = _app.post("/v1/device/announce", json={"device_guid": _source_device_guid, "purpose_guid": "1B0B3BA2-6A57-4E0F-8B9A-7B7A7F0E7C11", "socket_port": 27545})
+		self.assertEqual(200, _response.status_code)
+		_source_device = _response.json()["response"]["device"]
+
+		_destination_device_guid = "5E2C8A8B-2B2F-4D8E-A2D1-6B5B7E4C9F20"
+		_response = _app.post("/v1/device/announce", json={"device_guid": _destination_device_guid, "purpose_guid": "C3D2C0A1-8E5B-4E84-9C1C-0F6B7F2B2D31", "socket_port": 23222})
+		self.assertEqual(200, _response.status_code)
+		_destination_device = _response.json()["response"]["device"]
+
+		_queue_guid = "9A7E3B4C-5D6F-4A1B-8C2D-3E4F5A6B7C8D"
+		_response = _app.post("/v1/transmission/send_json_batch", json={"transmissions": [{
+			"queue_guid": _queue_guid,
+			"source_device_guid": _source_device["device_guid"],
+			"source_device_instance_guid": _source_device["instance_guid"],
+			"transmission_json_string": json.dumps({"index": _index}),
+			"destination_device_guid": _destination_device["device_guid"],
+			"destination_device_instance_guid": _destination_device["instance_guid"]
+		} for _index in range(10)]})
+		self.assertEqual(200, _response.status_code)
+		_response_json = _response.json()
+		self.assertIsNone(_response_json["error"])
+		self.assertTrue(_response_json["is_successful"])
+		_transmissions = _response_json["response"]["transmissions"]
+		self.assertEqual(10, len(_transmissions))
+		for _transmission in _transmissions:
+			self.assertEqual(_queue_guid, _transmission["queue_guid"])
+		self.assertEqual(sorted([_transmission["sequence"] for _transmission in _transmissions]), [_transmission["sequence"] for _transmission in _transmissions])
+
+	def test_get_queue_stats_0(self):
+		_app = TestClient(app)
+		_response = _app.get("/v1/queue/stats")
+		self.assertEqual(200, _response.status_code)
+		_response_json = _response.json()
+		self.assertIsNone(_response_json["error"])
+		self.assertTrue(_response_json["is_successful"])
+		self.assertIn("queues", _response_json["response"])
+		self.assertIn("destination_devices", _response_json["response"])
+		self.assertEqual(0, _response_json["response"]["destination_circuit_breaker"]["open_total"])
+		self.assertIn("destination_circuits", _response_json["response"])
+		self.assertIn("recovered_total", _response_json["response"]["transmission_retry_scheduler"])
+
 	def test_sending_notification_to_dequeuer_0(self):
 		# create source, destination, and dequeuer then enqueue one message
 		_app = TestClient(app)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+from app.periodic_worker import PeriodicWorker
+import unittest
+import time
+from typing import List, Tuple, Dict
+
+
+class PeriodicWorkerTest(unittest.TestCase):
+
+	def test_cycle_0(self):
+		# a failing cycle is reported without stopping the cycles that follow
+
+		_cycle_times = []  # type: List[float]
+		_exceptions = []  # type: List[Exception]
+
+		def _cycle():
+			_cycle_times.append(time.perf_counter())
+			if len(_cycle_times) == 1:
+				raise Exception("Failed first cycle.")
+
+		_periodic_worker = PeriodicWorker(
+			name="Test",
+			cycle_interval_seconds=0.05,
+			cycle=_cycle,
+			on_exception=_exceptions.append
+		)
+		_start_time = time.perf_counter()
+		_periodic_worker.start()
+
+		time.sleep(0.175)
+
+		self.assertFalse(_periodic_worker.is_disposed())
+		_periodic_worker.dispose()
+		self.assertTrue(_periodic_worker.is_disposed())
+
+		self.assertLessEqual(2, len(_cycle_times))
+		self.assertLessEqual(0.05, _cycle_times[0] - _start_time)
+		self.assertEqual(1, len(_exceptions))
+
+		with self.assertRaises(Exception):
+			_periodic_worker.start()
+
+	def test_cycled_on_start_0(self):
+
+		_cycle_times = []  # type: List[float]
+		_periodic_worker = PeriodicWorker(
+			name="Test",
+			cycle_interval_seconds=10,
+			cycle=lambda: _cycle_times.append(time.perf_counter()),
+			on_exception=lambda ex: None,
+			is_cycled_on_start=True
+		)
+		_periodic_worker.start()
+
+		time.sleep(0.05)
+
+		# disposing does not wait for the interval to pass
+		_dispose_start_time = time.perf_counter()
+		_periodic_worker.dispose()
+		self.assertLess(time.perf_counter() - _dispose_start_time, 1)
+		self.assertEqual(1, len(_cycle_times))
+
+
+if __name__ == "__main__":
+	unittest.main()
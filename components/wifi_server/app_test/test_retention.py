@@ -0,0 +1,192 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database, ApiEntrypoint, TransmissionStatus
+from app.retention import Retention
+from app_test.seeding import insert_transmissions
+import unittest
+import tempfile
+import json
+import gzip
+import os
+from datetime import datetime, timedelta
+from typing import List, Tuple, Dict
+
+
+def get_retention(*, database_factory: DatabaseFactory, archive_directory_path: str, batch_rows_total: int = 2, exceptions: List[Exception] = None) -> Retention:
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return Retention(
+		database_factory=database_factory,
+		archive_directory_path=archive_directory_path,
+		transmission_retention_seconds=0,
+		api_entrypoint_log_retention_seconds=0,
+		batch_rows_total=batch_rows_total,
+		cycle_interval_seconds=0.05,
+		on_exception=_on_exception
+	)
+
+
+def get_archived_rows(*, archive_directory_path: str) -> List[Tuple[str, Dict]]:
+
+	_archived_rows = []  # type: List[Tuple[str, Dict]]
+	for _file_name in sorted(os.listdir(archive_directory_path)):
+		with gzip.open(os.path.join(archive_directory_path, _file_name), "rt") as _file_handle:
+			for _line in _file_handle:
+				_archived_row = json.loads(_line)
+				_archived_rows.append((_archived_row["table"], _archived_row["row"]))
+	return _archived_rows
+
+class RetentionTest(unittest.TestCase):
+
+	def test_archive_completed_transmissions_0(self):
+		# completed transmissions leave the live tables in bounded batches while pending ones stay
+
+		with tempfile.TemporaryDirectory() as _archive_directory_path:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				transmissions_total=6
+			)
+			for _index in range(5):
+				_transmission_dequeue = _database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+				_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+			_database.insert_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json_string="{ }"
+			)
+
+			_retention = get_retention(
+				database_factory=_database_factory,
+				archive_directory_path=_archive_directory_path
+			)
+			_archived_rows_total = _retention.archive()
+
+			# five transmissions with a dequeue and a complete each, plus the log
+			self.assertEqual(16, _archived_rows_total)
+
+			_statistics = _retention.get_statistics()
+			self.assertEqual({"transmission": 5, "transmission_dequeue": 5, "transmission_complete": 5, "transmission_dequeue_error_transmission": 0, "transmission_dequeue_error_transmission_dequeue": 0, "transmission_dequeue_error_transmission_complete": 0, "transmission_dequeue_error_transmission_error": 0, "api_entrypoint_log": 1}, _statistics["archived_rows_total_per_table_name"])
+			# batches of two transmissions plus one batch of logs
+			self.assertEqual(4, _statistics["archive_segments_total"])
+			self.assertEqual(1, _statistics["live_rows_total_per_table_name"]["transmission"])
+			self.assertEqual(0, _statistics["live_rows_total_per_table_name"]["transmission_dequeue"])
+			self.assertEqual(0, _statistics["live_rows_total_per_table_name"]["transmission_complete"])
+			self.assertEqual(0, _statistics["live_rows_total_per_table_name"]["api_entrypoint_log"])
+
+			_archived_rows = get_archived_rows(
+				archive_directory_path=_archive_directory_path
+			)
+			self.assertEqual(16, len(_archived_rows))
+			self.assertEqual(set(_transmission_guids[:5]), {_row["transmission_guid"] for _table_name, _row in _archived_rows if _table_name == "transmission"})
+
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_transmission_guids[5]
+			)
+			self.assertTrue(_is_successful)
+			self.assertEqual(TransmissionStatus.Pending, _transmission.get_status())
+
+			# the remaining transmission is still delivered after the history is gone
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(_transmission_guids[5], _transmission_dequeue.get_transmission_guid())
+
+			self.assertEqual(0, _retention.archive())
+
+			_retention.dispose()
+			_database.dispose()
+
+	def test_archive_waits_for_failure_completion_0(self):
+		# a transmission that completed after a failure stays live until the failure is completed by its source device
+
+		with tempfile.TemporaryDirectory() as _archive_directory_path:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				transmissions_total=1
+			)
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			_database.transmission_failed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
+				error_message_json_string="{ }"
+			)
+
+			_retention = get_retention(
+				database_factory=_database_factory,
+				archive_directory_path=_archive_directory_path
+			)
+			self.assertEqual(0, _retention.archive())
+
+			_failed_transmission_dequeue = _database.get_next_failed_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			self.assertEqual(0, _retention.archive())
+
+			_database.failed_transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_error_transmission_dequeue_guid=_failed_transmission_dequeue.get_transmission_dequeue_error_transmission_dequeue_guid(),
+				is_retry_requested=False
+			)
+			# the transmission, its dequeue, the failure, the failure dequeue, and the failure completion
+			self.assertEqual(5, _retention.archive())
+
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_transmission_guids[0]
+			)
+			self.assertFalse(_is_successful)
+
+			_retention.dispose()
+			_database.dispose()
+
+	def test_archive_failure_keeps_rows_0(self):
+		# rows are only removed once their archive segment was written
+
+		with tempfile.TemporaryDirectory() as _temporary_directory_path:
+			_archive_directory_path = os.path.join(_temporary_directory_path, "archive")
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_database.insert_api_entrypoint_log(
+				client_guid=_client.get_client_guid(),
+				api_entrypoint=ApiEntrypoint.TestGet,
+				input_json_string="{ }"
+			)
+
+			_retention = get_retention(
+				database_factory=_database_factory,
+				archive_directory_path=_archive_directory_path
+			)
+			os.rmdir(_archive_directory_path)
+
+			with self.assertRaises(Exception):
+				_retention.archive()
+
+			self.assertEqual(1, _database.get_table_rows_totals()["api_entrypoint_log"])
+
+			_retention.dispose()
+			_database.dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
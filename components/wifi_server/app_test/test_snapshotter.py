@@ -0,0 +1,235 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database, TransmissionStatus
+from app.snapshotter import Snapshotter
+from app_test.seeding import insert_transmissions
+import unittest
+import tempfile
+import threading
+import time
+import os
+from typing import List, Tuple, Dict
+
+
+def get_snapshotter(*, database_factory: DatabaseFactory, snapshot_directory_path: str, pages_per_step: int = 4, snapshots_total_maximum: int = 2, exceptions: List[Exception] = None) -> Snapshotter:
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return Snapshotter(
+		database_factory=database_factory,
+		snapshot_directory_path=snapshot_directory_path,
+		pages_per_step=pages_per_step,
+		snapshots_total_maximum=snapshots_total_maximum,
+		cycle_interval_seconds=0.05,
+		on_exception=_on_exception
+	)
+
+class SnapshotterTest(unittest.TestCase):
+
+	def test_snapshot_and_restore_0(self):
+		# a new in-memory database continues from the newest snapshot
+
+		with tempfile.TemporaryDirectory() as _snapshot_directory_path:
+			_database_factory = DatabaseFactory(
+				snapshot_directory_path=_snapshot_directory_path
+			)
+			_database = _database_factory.get_database()
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				transmissions_total=100
+			)
+			_client = _database.insert_client(
+				ip_address="127.0.0.1"
+			)
+			_transmission_dequeue = _database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			_database.transmission_completed(
+				client_guid=_client.get_client_guid(),
+				transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+			)
+
+			_snapshotter = get_snapshotter(
+				database_factory=_database_factory,
+				snapshot_directory_path=_snapshot_directory_path
+			)
+			_snapshot_statistics = _snapshotter.snapshot()
+			self.assertTrue(os.path.exists(_snapshot_statistics["snapshot_file_path"]))
+			self.assertLess(1, _snapshot_statistics["steps_total"])
+			self.assertEqual(0, _snapshot_statistics["restarts_total"])
+
+			# not part of the snapshot
+			insert_transmissions(
+				database=_database,
+				transmissions_total=1
+			)
+
+			_snapshotter.dispose()
+			_database.dispose()
+
+			_restored_database_factory = DatabaseFactory(
+				snapshot_directory_path=_snapshot_directory_path
+			)
+			_restored_database = _restored_database_factory.get_database()
+
+			self.assertEqual(100, _restored_database.get_table_rows_totals()["transmission"])
+			self.assertEqual(1, len(_restored_database.get_devices_by_purpose(
+				purpose_guid="330A6549-57C5-4DA6-8C1C-A698A61B7DB5"
+			)))
+			_is_successful, _transmission = _restored_database.try_get_transmission(
+				transmission_guid=_transmission_guids[0]
+			)
+			self.assertTrue(_is_successful)
+			self.assertEqual(TransmissionStatus.Complete, _transmission.get_status())
+
+			# transmissions enqueued after the restore are still delivered after the restored ones
+			_, _restored_transmission_guids = insert_transmissions(
+				database=_restored_database,
+				transmissions_total=1
+			)
+			_dequeued_transmission_guids = []  # type: List[str]
+			_transmission_dequeue = _restored_database.get_next_transmission_dequeue(
+				client_guid=_client.get_client_guid()
+			)
+			while _transmission_dequeue is not None:
+				_dequeued_transmission_guids.append(_transmission_dequeue.get_transmission_guid())
+				_restored_database.transmission_completed(
+					client_guid=_client.get_client_guid(),
+					transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+				)
+				_transmission_dequeue = _restored_database.get_next_transmission_dequeue(
+					client_guid=_client.get_client_guid()
+				)
+			self.assertEqual(_transmission_guids[1:] + _restored_transmission_guids, _dequeued_transmission_guids)
+
+			_restored_database.dispose()
+
+	def test_writes_during_snapshot_0(self):
+		# writes keep succeeding while a snapshot is taken and the snapshot still completes
+
+		with tempfile.TemporaryDirectory() as _snapshot_directory_path:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			insert_transmissions(
+				database=_database,
+				transmissions_total=2000
+			)
+			_snapshotter = get_snapshotter(
+				database_factory=_database_factory,
+				snapshot_directory_path=_snapshot_directory_path,
+				pages_per_step=1
+			)
+
+			_is_writing_event = threading.Event()
+			_is_writing_event.set()
+			_writes_total = 0
+
+			def _write_thread_method():
+				nonlocal _writes_total
+				while _is_writing_event.is_set():
+					_database.insert_client(
+						ip_address=f"10.0.{_writes_total // 256}.{_writes_total % 256}"
+					)
+					_writes_total += 1
+
+			_write_thread = threading.Thread(
+				target=_write_thread_method
+			)
+			_write_thread.start()
+
+			_snapshot_statistics = _snapshotter.snapshot()
+
+			_is_writing_event.clear()
+			_write_thread.join()
+
+			print(f"test_writes_during_snapshot_0: {_snapshot_statistics}, writes: {_writes_total}")
+
+			self.assertLess(0, _writes_total)
+			self.assertTrue(os.path.exists(_snapshot_statistics["snapshot_file_path"]))
+			self.assertLessEqual(_snapshot_statistics["restarts_total"], 4)
+
+			_snapshotter.dispose()
+			_database.dispose()
+
+			_restored_database = Database(
+				restore_snapshot_file_path=_snapshot_statistics["snapshot_file_path"]
+			)
+			self.assertEqual(2000, _restored_database.get_table_rows_totals()["transmission"])
+			_restored_database.dispose()
+
+	def test_snapshots_total_maximum_0(self):
+		# only the newest snapshots are kept and the newest one is restored
+
+		with tempfile.TemporaryDirectory() as _snapshot_directory_path:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_snapshotter = get_snapshotter(
+				database_factory=_database_factory,
+				snapshot_directory_path=_snapshot_directory_path,
+				snapshots_total_maximum=2
+			)
+
+			_snapshot_file_paths = []  # type: List[str]
+			for _index in range(5):
+				_database.insert_client(
+					ip_address=f"127.0.0.{_index + 1}"
+				)
+				_snapshot_file_paths.append(_snapshotter.snapshot()["snapshot_file_path"])
+
+			self.assertEqual(_snapshot_file_paths[-2:], Database.get_snapshot_file_paths(
+				snapshot_directory_path=_snapshot_directory_path
+			))
+			self.assertEqual(5, _snapshotter.get_statistics()["snapshots_total"])
+
+			_snapshotter.dispose()
+			_database.dispose()
+
+			_restored_database = DatabaseFactory(
+				snapshot_directory_path=_snapshot_directory_path
+			).get_database()
+			self.assertEqual(5, _restored_database.get_table_rows_totals()["client"])
+			_restored_database.dispose()
+
+	def test_snapshot_cycle_0(self):
+
+		with tempfile.TemporaryDirectory() as _snapshot_directory_path:
+			_database_factory = DatabaseFactory()
+			_database = _database_factory.get_database()
+			_exceptions = []  # type: List[Exception]
+			_snapshotter = get_snapshotter(
+				database_factory=_database_factory,
+				snapshot_directory_path=_snapshot_directory_path,
+				exceptions=_exceptions
+			)
+			_snapshotter.start()
+
+			_is_snapshot_taken = False
+			for _index in range(100):
+				if _snapshotter.get_statistics()["snapshots_total"] != 0:
+					_is_snapshot_taken = True
+					break
+				time.sleep(0.05)
+
+			_snapshotter.dispose()
+
+			self.assertTrue(_is_snapshot_taken)
+			self.assertEqual([], _exceptions)
+			self.assertGreaterEqual(2, len(Database.get_snapshot_file_paths(
+				snapshot_directory_path=_snapshot_directory_path
+			)))
+
+			_database.dispose()
+
+	def test_restore_file_database_0(self):
+
+		with tempfile.TemporaryDirectory() as _temporary_directory_path:
+			with self.assertRaises(Exception):
+				Database(
+					database_file_path=os.path.join(_temporary_directory_path, "database.db"),
+					restore_snapshot_file_path=os.path.join(_temporary_directory_path, "snapshot_0.db")
+				)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,300 @@
+from __future__ import annotations
+from app.database import Database, Client, TransmissionDequeue
+from app.transmission_delivery_pool import TransmissionDeliveryPool
+from app_test.seeding import insert_transmissions
+import unittest
+import threading
+import time
+from typing import List, Tuple, Dict
+
+
+class DeliveryRecorder():
+
+	def __init__(self, *, delivery_seconds_per_destination_device_guid: Dict[str, float]):
+
+		self.__delivery_seconds_per_destination_device_guid = delivery_seconds_per_destination_device_guid
+
+		self.__lock = threading.Lock()
+		self.__delivered_transmission_guids = []  # type: List[str]
+		self.__batch_totals = []  # type: List[int]
+		self.__in_flight_destination_device_guids = []  # type: List[str]
+		self.__in_flight_totals = []  # type: List[int]
+		self.__is_destination_device_overlapped = False
+
+	def deliver(self, database: Database, client: Client, transmission_dequeues: List[TransmissionDequeue]):
+
+		with self.__lock:
+			self.__batch_totals.append(len(transmission_dequeues))
+		for _transmission_dequeue in transmission_dequeues:
+			self.__deliver_transmission_dequeue(
+				database=database,
+				client=client,
+				transmission_dequeue=_transmission_dequeue
+			)
+
+	def __deliver_transmission_dequeue(self, *, database: Database, client: Client, transmission_dequeue: TransmissionDequeue):
+
+		_destination_device_guid = transmission_dequeue.get_transmission().get_destination_device_guid()
+		with self.__lock:
+			if _destination_device_guid in self.__in_flight_destination_device_guids:
+				self.__is_destination_device_overlapped = True
+			self.__in_flight_destination_device_guids.append(_destination_device_guid)
+			self.__in_flight_totals.append(len(self.__in_flight_destination_device_guids))
+
+		time.sleep(self.__delivery_seconds_per_destination_device_guid[_destination_device_guid])
+
+		with self.__lock:
+			self.__in_flight_destination_device_guids.remove(_destination_device_guid)
+			self.__delivered_transmission_guids.append(transmission_dequeue.get_transmission_guid())
+
+		database.transmission_completed(
+			client_guid=client.get_client_guid(),
+			transmission_dequeue_guid=transmission_dequeue.get_transmission_dequeue_guid()
+		)
+
+	def get_delivered_transmission_guids(self) -> List[str]:
+		with self.__lock:
+			return self.__delivered_transmission_guids.copy()
+
+	def get_batch_totals(self) -> List[int]:
+		with self.__lock:
+			return self.__batch_totals.copy()
+
+	def get_maximum_in_flight_total(self) -> int:
+		return max(self.__in_flight_totals)
+
+	def is_destination_device_overlapped(self) -> bool:
+		return self.__is_destination_device_overlapped
+
+def wait_for_delivered_total(*, transmission_delivery_pool: TransmissionDeliveryPool, delivered_total: int, timeout_seconds: float):
+
+	_timeout_time = time.perf_counter() + timeout_seconds
+	while transmission_delivery_pool.get_statistics()["delivered_total"] < delivered_total:
+		if time.perf_counter() > _timeout_time:
+			raise Exception(f"Timed out waiting for {delivered_total} deliveries. Delivered: {transmission_delivery_pool.get_statistics()['delivered_total']}.")
+		time.sleep(0.01)
+
+
+def get_transmission_delivery_pool(*, database: Database, delivery_workers_total: int, delivery_recorder: DeliveryRecorder, exceptions: List[Exception], batch_transmissions_total_maximum: int = 1) -> TransmissionDeliveryPool:
+
+	def _on_exception(ex: Exception):
+		exceptions.append(ex)
+
+	return TransmissionDeliveryPool(
+		database=database,
+		delivery_workers_total=delivery_workers_total,
+		deliver=delivery_recorder.deliver,
+		on_delivered=lambda: None,
+		on_exception=_on_exception,
+		batch_transmissions_total_maximum=batch_transmissions_total_maximum,
+		batched_parser_type="SendJsonTransmissionParser"
+	)
+
+
+class TransmissionDeliveryPoolTest(unittest.TestCase):
+
+	def test_slow_destination_device_0(self):
+		# a slow destination device only holds up its own transmissions while each destination device receives its transmissions in order
+
+		_slow_device_guid = "2D2EA5D3-95E3-4B71-AE7A-000000000000"
+		_fast_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(1, 3)]
+		_delivery_recorder = DeliveryRecorder(
+			delivery_seconds_per_destination_device_guid={
+				_slow_device_guid: 0.2,
+				**{_fast_device_guid: 0.01 for _fast_device_guid in _fast_device_guids}
+			}
+		)
+
+		with Database() as _database:
+			_queue_guid_and_destination_device_guids = []  # type: List[Tuple[str, str]]
+			for _index in range(3):
+				for _device_index, _device_guid in enumerate([_slow_device_guid] + _fast_device_guids):
+					_queue_guid_and_destination_device_guids.append((f"E7FCC183-D1B4-4F3B-9BE7-{_device_index:012d}", _device_guid))
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				queue_guid_and_destination_device_guids=_queue_guid_and_destination_device_guids
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = get_transmission_delivery_pool(
+				database=_database,
+				delivery_workers_total=3,
+				delivery_recorder=_delivery_recorder,
+				exceptions=_exceptions
+			)
+			self.assertEqual(3, _transmission_delivery_pool.dispatch())
+			# every worker is busy
+			self.assertEqual(0, _transmission_delivery_pool.dispatch())
+
+			wait_for_delivered_total(
+				transmission_delivery_pool=_transmission_delivery_pool,
+				delivered_total=7,
+				timeout_seconds=5
+			)
+			_delivered_transmission_guids = _delivery_recorder.get_delivered_transmission_guids()
+			# the fast destination devices received everything while the slow one was still receiving its first transmission
+			self.assertEqual(_transmission_guids[0], _delivered_transmission_guids[6])
+
+			wait_for_delivered_total(
+				transmission_delivery_pool=_transmission_delivery_pool,
+				delivered_total=9,
+				timeout_seconds=5
+			)
+			_delivered_transmission_guids = _delivery_recorder.get_delivered_transmission_guids()
+			for _device_index in range(3):
+				_device_transmission_guids = _transmission_guids[_device_index::3]
+				self.assertEqual(_device_transmission_guids, [_transmission_guid for _transmission_guid in _delivered_transmission_guids if _transmission_guid in _device_transmission_guids])
+			self.assertFalse(_delivery_recorder.is_destination_device_overlapped())
+			self.assertEqual(3, _delivery_recorder.get_maximum_in_flight_total())
+
+			_transmission_delivery_pool.dispose()
+			self.assertEqual([], _exceptions)
+			self.assertEqual({"delivery_workers_total": 3, "in_flight_total": 0, "delivered_total": 9, "delivered_transmissions_total": 9}, _transmission_delivery_pool.get_statistics())
+
+	def test_bounded_workers_0(self):
+		# no more than the configured number of transmissions are delivered at the same time
+
+		_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(6)]
+		_delivery_recorder = DeliveryRecorder(
+			delivery_seconds_per_destination_device_guid={_device_guid: 0.02 for _device_guid in _device_guids}
+		)
+
+		with Database() as _database:
+			insert_transmissions(
+				database=_database,
+				queue_guid_and_destination_device_guids=[(f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}", _device_guid) for _index, _device_guid in enumerate(_device_guids)]
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = get_transmission_delivery_pool(
+				database=_database,
+				delivery_workers_total=2,
+				delivery_recorder=_delivery_recorder,
+				exceptions=_exceptions
+			)
+			self.assertEqual(2, _transmission_delivery_pool.dispatch())
+
+			wait_for_delivered_total(
+				transmission_delivery_pool=_transmission_delivery_pool,
+				delivered_total=6,
+				timeout_seconds=5
+			)
+			self.assertEqual(2, _delivery_recorder.get_maximum_in_flight_total())
+
+			_transmission_delivery_pool.dispose()
+			self.assertEqual([], _exceptions)
+
+	def test_shared_queue_0(self):
+		# transmissions of one queue are delivered one after another even though they go to distinct destination devices
+
+		_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(4)]
+		_delivery_recorder = DeliveryRecorder(
+			delivery_seconds_per_destination_device_guid={_device_guid: 0.01 for _device_guid in _device_guids}
+		)
+
+		with Database() as _database:
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				queue_guid_and_destination_device_guids=[("E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F", _device_guid) for _device_guid in _device_guids]
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = get_transmission_delivery_pool(
+				database=_database,
+				delivery_workers_total=4,
+				delivery_recorder=_delivery_recorder,
+				exceptions=_exceptions
+			)
+			self.assertEqual(1, _transmission_delivery_pool.dispatch())
+
+			wait_for_delivered_total(
+				transmission_delivery_pool=_transmission_delivery_pool,
+				delivered_total=4,
+				timeout_seconds=5
+			)
+			self.assertEqual(_transmission_guids, _delivery_recorder.get_delivered_transmission_guids())
+			self.assertEqual(1, _delivery_recorder.get_maximum_in_flight_total())
+
+			_transmission_delivery_pool.dispose()
+			self.assertEqual([], _exceptions)
+
+	def test_batch_0(self):
+		# consecutive transmissions to one destination device are delivered together in order
+
+		_device_guid = "2D2EA5D3-95E3-4B71-AE7A-DDD0ED5AA40B"
+		_delivery_recorder = DeliveryRecorder(
+			delivery_seconds_per_destination_device_guid={_device_guid: 0.01}
+		)
+
+		with Database() as _database:
+			_, _transmission_guids = insert_transmissions(
+				database=_database,
+				queue_guid_and_destination_device_guids=[("E7FCC183-D1B4-4F3B-9BE7-A54CF25FA78F", _device_guid)] * 5,
+				stored_transmission_json_string="{ \"parser_type\": \"SendJsonTransmissionParser\" }"
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = get_transmission_delivery_pool(
+				database=_database,
+				delivery_workers_total=2,
+				delivery_recorder=_delivery_recorder,
+				exceptions=_exceptions,
+				batch_transmissions_total_maximum=3
+			)
+			self.assertEqual(1, _transmission_delivery_pool.dispatch())
+
+			wait_for_delivered_total(
+				transmission_delivery_pool=_transmission_delivery_pool,
+				delivered_total=2,
+				timeout_seconds=5
+			)
+			self.assertEqual([3, 2], _delivery_recorder.get_batch_totals())
+			self.assertEqual(_transmission_guids, _delivery_recorder.get_delivered_transmission_guids())
+
+			_transmission_delivery_pool.dispose()
+			self.assertEqual([], _exceptions)
+			self.assertEqual({"delivery_workers_total": 2, "in_flight_total": 0, "delivered_total": 2, "delivered_transmissions_total": 5}, _transmission_delivery_pool.get_statistics())
+
+	def test_dispose_0(self):
+		# the transmissions in flight are delivered before dispose returns and nothing is claimed afterwards
+
+		_device_guids = [f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}" for _index in range(2)]
+		_delivery_recorder = DeliveryRecorder(
+			delivery_seconds_per_destination_device_guid={_device_guid: 0.1 for _device_guid in _device_guids}
+		)
+
+		with Database() as _database:
+			insert_transmissions(
+				database=_database,
+				queue_guid_and_destination_device_guids=[(f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}", _device_guids[_index % 2]) for _index in range(4)]
+			)
+
+			_exceptions = []  # type: List[Exception]
+			_transmission_delivery_pool = get_transmission_delivery_pool(
+				database=_database,
+				delivery_workers_total=2,
+				delivery_recorder=_delivery_recorder,
+				exceptions=_exceptions
+			)
+			self.assertEqual(2, _transmission_delivery_pool.dispatch())
+			_transmission_delivery_pool.dispose()
+
+			self.assertEqual(2, len(_delivery_recorder.get_delivered_transmission_guids()))
+			self.assertEqual(0, _transmission_delivery_pool.dispatch())
+			self.assertEqual([], _exceptions)
+
+	def test_delivery_workers_total_0(self):
+
+		with Database() as _database:
+			with self.assertRaises(Exception):
+				TransmissionDeliveryPool(
+					database=_database,
+					delivery_workers_total=0,
+					deliver=lambda database, client, transmission_dequeues: None,
+					on_delivered=lambda: None,
+					on_exception=lambda ex: None
+				)
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,124 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database, TransmissionStatus
+from app.transmission_dequeue_reaper import TransmissionDequeueReaper
+from app_test.seeding import insert_transmissions
+import unittest
+import time
+from typing import List, Tuple, Dict
+
+
+def get_transmission_dequeue_reaper(*, database_factory: DatabaseFactory, batch_rows_total: int = 2, reaped_rows_totals: List[int] = None, exceptions: List[Exception] = None) -> TransmissionDequeueReaper:
+
+	def _on_reaped(reaped_rows_total: int):
+		if reaped_rows_totals is not None:
+			reaped_rows_totals.append(reaped_rows_total)
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return TransmissionDequeueReaper(
+		database_factory=database_factory,
+		batch_rows_total=batch_rows_total,
+		cycle_interval_seconds=0.05,
+		on_reaped=_on_reaped,
+		on_exception=_on_exception
+	)
+
+
+def claim_transmissions(*, database: Database, transmissions_total: int) -> List[str]:
+
+	# NOTE every transmission is sent to its own destination device so that all of them are claimed at once
+
+	_client_guid, _transmission_guids = insert_transmissions(
+		database=database,
+		queue_guid_and_destination_device_guids=[(f"E7FCC183-D1B4-4F3B-9BE7-{_index:012d}", f"2D2EA5D3-95E3-4B71-AE7A-{_index:012d}") for _index in range(transmissions_total)]
+	)
+	_transmission_dequeues = database.get_next_transmission_dequeues(
+		client_guid=_client_guid,
+		limit=transmissions_total
+	)
+	if len(_transmission_dequeues) != transmissions_total:
+		raise Exception(f"Unexpected number of transmission dequeues. Expected {transmissions_total}, found {len(_transmission_dequeues)}.")
+	return _transmission_guids
+
+
+class TransmissionDequeueReaperTest(unittest.TestCase):
+
+	def test_reap_0(self):
+		# every expired lease is reaped in bounded batches and reported once per reap
+
+		_database_factory = DatabaseFactory(
+			transmission_dequeue_lease_seconds=0.1
+		)
+		_database = _database_factory.get_database()
+		_transmission_guids = claim_transmissions(
+			database=_database,
+			transmissions_total=5
+		)
+
+		_reaped_rows_totals = []  # type: List[int]
+		_transmission_dequeue_reaper = get_transmission_dequeue_reaper(
+			database_factory=_database_factory,
+			reaped_rows_totals=_reaped_rows_totals
+		)
+		self.assertEqual(0, _transmission_dequeue_reaper.reap())
+		self.assertEqual([], _reaped_rows_totals)
+
+		time.sleep(0.2)
+
+		self.assertEqual(5, _transmission_dequeue_reaper.reap())
+		self.assertEqual([5], _reaped_rows_totals)
+		self.assertEqual(5, _transmission_dequeue_reaper.get_statistics()["reaped_rows_total"])
+		for _transmission_guid in _transmission_guids:
+			_is_successful, _transmission = _database.try_get_transmission(
+				transmission_guid=_transmission_guid
+			)
+			self.assertEqual(TransmissionStatus.Pending, _transmission.get_status())
+
+		self.assertEqual(0, _transmission_dequeue_reaper.reap())
+
+		_transmission_dequeue_reaper.dispose()
+		_database.dispose()
+
+	def test_start_0(self):
+		# a started reaper exposes stuck transmissions within a few cycles
+
+		_database_factory = DatabaseFactory(
+			transmission_dequeue_lease_seconds=0.1
+		)
+		_database = _database_factory.get_database()
+		_transmission_guids = claim_transmissions(
+			database=_database,
+			transmissions_total=3
+		)
+
+		_reaped_rows_totals = []  # type: List[int]
+		_exceptions = []  # type: List[Exception]
+		_transmission_dequeue_reaper = get_transmission_dequeue_reaper(
+			database_factory=_database_factory,
+			reaped_rows_totals=_reaped_rows_totals,
+			exceptions=_exceptions
+		)
+		_transmission_dequeue_reaper.start()
+
+		time.sleep(0.5)
+
+		self.assertEqual(3, sum(_reaped_rows_totals))
+
+		_client = _database.insert_client(
+			ip_address="127.0.0.1"
+		)
+		_transmission_dequeues = _database.get_next_transmission_dequeues(
+			client_guid=_client.get_client_guid(),
+			limit=10
+		)
+		self.assertEqual(_transmission_guids, [_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in _transmission_dequeues])
+
+		_transmission_dequeue_reaper.dispose()
+		self.assertEqual([], _exceptions)
+		_database.dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,249 @@
+from __future__ import annotations
+from app.database import DatabaseFactory, Database, TransmissionStatus
+from app.transmission_retry_scheduler import TransmissionRetryScheduler
+from app_test.seeding import insert_transmissions
+import unittest
+import time
+from typing import List, Tuple, Dict
+
+
+def get_transmission_retry_scheduler(*, database_factory: DatabaseFactory, attempts_total_maximum: int = 3, backoff_seconds: List[float] = None, retried_totals: List[int] = None, exceptions: List[Exception] = None) -> TransmissionRetryScheduler:
+
+	def _on_retried(retried_total: int):
+		if retried_totals is not None:
+			retried_totals.append(retried_total)
+
+	def _on_exception(ex: Exception):
+		if exceptions is not None:
+			exceptions.append(ex)
+
+	return TransmissionRetryScheduler(
+		database_factory=database_factory,
+		attempts_total_maximum=attempts_total_maximum,
+		backoff_seconds=[0.1] if backoff_seconds is None else backoff_seconds,
+		batch_rows_total=2,
+		cycle_interval_seconds=0.05,
+		on_retried=_on_retried,
+		on_exception=_on_exception
+	)
+
+def fail_next_transmission(*, database: Database, client_guid: str) -> str:
+
+	_transmission_dequeue = database.get_next_transmission_dequeue(
+		client_guid=client_guid
+	)
+	database.transmission_failed(
+		client_guid=client_guid,
+		transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid(),
+		error_message_json_string="\"Failed to connect.\""
+	)
+	return _transmission_dequeue.get_transmission_guid()
+
+
+def get_next_transmission_guids(*, database: Database, client_guid: str) -> List[str]:
+	return [_transmission_dequeue.get_transmission_guid() for _transmission_dequeue in database.get_next_transmission_dequeues(
+		client_guid=client_guid,
+		limit=10
+	)]
+
+
+class TransmissionRetrySchedulerTest(unittest.TestCase):
+
+	def test_retry_0(self):
+		# a failed transmission is retried after its backoff while the transmissions behind it keep waiting
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client_guid, _transmission_guids = insert_transmissions(
+			database=_database,
+			transmissions_total=2
+		)
+		self.assertEqual(_transmission_guids[0], fail_next_transmission(
+			database=_database,
+			client_guid=_client_guid
+		))
+
+		_retried_totals = []  # type: List[int]
+		_transmission_retry_scheduler = get_transmission_retry_scheduler(
+			database_factory=_database_factory,
+			retried_totals=_retried_totals
+		)
+		self.assertEqual(0, _transmission_retry_scheduler.schedule())
+		self.assertEqual(TransmissionStatus.Failed, _database.try_get_transmission(
+			transmission_guid=_transmission_guids[0]
+		)[1].get_status())
+		self.assertEqual([], get_next_transmission_guids(
+			database=_database,
+			client_guid=_client_guid
+		))
+
+		time.sleep(0.15)
+
+		self.assertEqual(1, _transmission_retry_scheduler.schedule())
+		self.assertEqual([1], _retried_totals)
+		self.assertEqual(0, _transmission_retry_scheduler.schedule())
+
+		# the retried transmission is delivered before the one behind it
+		_transmission_dequeue = _database.get_next_transmission_dequeue(
+			client_guid=_client_guid
+		)
+		self.assertEqual(_transmission_guids[0], _transmission_dequeue.get_transmission_guid())
+		self.assertEqual([], get_next_transmission_guids(
+			database=_database,
+			client_guid=_client_guid
+		))
+		_database.transmission_completed(
+			client_guid=_client_guid,
+			transmission_dequeue_guid=_transmission_dequeue.get_transmission_dequeue_guid()
+		)
+
+		_transmission_retry_scheduler.schedule()
+
+		_statistics = _transmission_retry_scheduler.get_statistics()
+		self.assertEqual(1, _statistics["retries_scheduled_total"])
+		self.assertEqual(1, _statistics["retried_total"])
+		self.assertEqual(0, _statistics["dead_lettered_total"])
+		self.assertEqual(0, _statistics["awaiting_recovery_total"])
+		self.assertEqual(1, _statistics["recovered_total"])
+		self.assertLessEqual(0.1, _statistics["recovery_seconds_maximum"])
+		self.assertEqual(_statistics["recovery_seconds_maximum"], _statistics["recovery_seconds_average"])
+
+		self.assertEqual([_transmission_guids[1]], get_next_transmission_guids(
+			database=_database,
+			client_guid=_client_guid
+		))
+
+		_transmission_retry_scheduler.dispose()
+		_database.dispose()
+
+	def test_dead_letter_0(self):
+		# a transmission that failed every attempt is cancelled so that the transmissions behind it are delivered
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client_guid, _transmission_guids = insert_transmissions(
+			database=_database,
+			transmissions_total=2
+		)
+
+		_transmission_retry_scheduler = get_transmission_retry_scheduler(
+			database_factory=_database_factory,
+			attempts_total_maximum=2,
+			backoff_seconds=[0]
+		)
+		for _index in range(2):
+			self.assertEqual(_transmission_guids[0], fail_next_transmission(
+				database=_database,
+				client_guid=_client_guid
+			))
+			_transmission_retry_scheduler.schedule()
+
+		self.assertEqual(TransmissionStatus.Cancelled, _database.try_get_transmission(
+			transmission_guid=_transmission_guids[0]
+		)[1].get_status())
+		self.assertEqual(2, len(_database.get_transmission_dequeue_error_transmissions(
+			transmission_guid=_transmission_guids[0]
+		)))
+		self.assertEqual([_transmission_guids[1]], get_next_transmission_guids(
+			database=_database,
+			client_guid=_client_guid
+		))
+
+		_statistics = _transmission_retry_scheduler.get_statistics()
+		self.assertEqual(1, _statistics["retries_scheduled_total"])
+		self.assertEqual(1, _statistics["dead_lettered_total"])
+		self.assertEqual(0, _statistics["recovered_total"])
+		self.assertIsNone(_statistics["recovery_seconds_average"])
+
+		_transmission_retry_scheduler.dispose()
+		_database.dispose()
+
+	def test_backoff_seconds_0(self):
+		# every failure waits for its own backoff, where the last backoff applies to any later failure
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client_guid, _transmission_guids = insert_transmissions(
+			database=_database,
+			transmissions_total=1
+		)
+
+		_transmission_retry_scheduler = get_transmission_retry_scheduler(
+			database_factory=_database_factory,
+			attempts_total_maximum=10,
+			backoff_seconds=[0, 0.2]
+		)
+		fail_next_transmission(
+			database=_database,
+			client_guid=_client_guid
+		)
+		self.assertEqual(1, _transmission_retry_scheduler.schedule())
+
+		for _index in range(2):
+			fail_next_transmission(
+				database=_database,
+				client_guid=_client_guid
+			)
+			self.assertEqual(0, _transmission_retry_scheduler.schedule())
+			time.sleep(0.25)
+			self.assertEqual(1, _transmission_retry_scheduler.schedule())
+
+		_transmission_retry_scheduler.dispose()
+		_database.dispose()
+
+	def test_start_0(self):
+		# a started scheduler retries failed transmissions within a few cycles
+
+		_database_factory = DatabaseFactory()
+		_database = _database_factory.get_database()
+		_client_guid, _transmission_guids = insert_transmissions(
+			database=_database,
+			transmissions_total=1
+		)
+		fail_next_transmission(
+			database=_database,
+			client_guid=_client_guid
+		)
+
+		_retried_totals = []  # type: List[int]
+		_exceptions = []  # type: List[Exception]
+		_transmission_retry_scheduler = get_transmission_retry_scheduler(
+			database_factory=_database_factory,
+			retried_totals=_retried_totals,
+			exceptions=_exceptions
+		)
+		_transmission_retry_scheduler.start()
+
+		time.sleep(0.4)
+
+		self.assertEqual([1], _retried_totals)
+		self.assertEqual(_transmission_guids, get_next_transmission_guids(
+			database=_database,
+			client_guid=_client_guid
+		))
+
+		with self.assertRaises(Exception):
+			_transmission_retry_scheduler.start()
+
+		_transmission_retry_scheduler.dispose()
+		self.assertEqual([], _exceptions)
+		_database.dispose()
+
+	def test_attempts_total_maximum_0(self):
+
+		_database_factory = DatabaseFactory()
+		with self.assertRaises(Exception):
+			get_transmission_retry_scheduler(
+				database_factory=_database_factory,
+				attempts_total_maximum=0
+			)
+		with self.assertRaises(Exception):
+			get_transmission_retry_scheduler(
+				database_factory=_database_factory,
+				backoff_seconds=[]
+			)
+		_database_factory.get_database().dispose()
+
+
+if __name__ == "__main__":
+	unittest.main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+from app.transmitter import get_client_socket_socket
+from app.device_connection_pool import is_socket_open
+from austin_heller_repo.socket import ServerSocket, ClientSocket, ClientSocketFactory
+import unittest
+from typing import List, Tuple, Dict
+
+
+class TransmitterTest(unittest.TestCase):
+
+	def test_get_client_socket_socket_0(self):
+		# the socket of a connected client socket is found, so that a connection closed by the device is not taken to be open
+
+		_server_socket = ServerSocket(
+			to_client_packet_bytes_length=4096,
+			listening_limit_total=10,
+			accept_timeout_seconds=0.1,
+			client_read_failed_delay_seconds=0.1
+		)
+		_server_socket.start_accepting_clients(
+			host_ip_address="0.0.0.0",
+			host_port=27545,
+			on_accepted_client_method=lambda client_socket: None
+		)
+
+		_client_socket = ClientSocketFactory(
+			to_server_packet_bytes_length=4096,
+			server_read_failed_delay_seconds=0.1
+		).get_client_socket()
+		_client_socket.connect_to_server(
+			ip_address="127.0.0.1",
+			port=27545
+		)
+
+		_socket = get_client_socket_socket(
+			client_socket=_client_socket
+		)
+		self.assertIsNotNone(_socket)
+		self.assertTrue(is_socket_open(
+			socket_object=_socket
+		))
+
+		_client_socket.close()
+
+	def test_get_client_socket_socket_1(self):
+		# anything without the socket fails instead of being taken to be open
+
+		with self.assertRaises(Exception):
+			get_client_socket_socket(
+				client_socket=object()
+			)
+
+
+if __name__ == "__main__":
+	unittest.main()